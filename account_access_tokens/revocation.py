@@ -0,0 +1,276 @@
+# python
+import math
+import time
+import hashlib
+import threading
+
+# django
+from django.conf import settings
+from django.core.cache import cache
+
+# redis
+from django_redis import get_redis_connection
+
+# restframework
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+class BloomFilter:
+    """
+    A fixed size set of strings answering membership with no false negatives and a bounded rate of false positives.
+
+    Attributes:
+        size (int): The number of bits.
+        hashes (int): The number of bits set per item.
+        bits (bytearray): The filter.
+    """
+
+    __slots__ = ('size', 'hashes', 'bits')
+
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(math.ceil(self.size / 8))
+
+    def positions(self, item):
+        # double hashing, two 64 bit halves of one digest stand in for k independent hash functions
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:], 'big') | 1
+
+        return ((first + index * second) % self.size for index in range(self.hashes))
+
+    def add(self, item):
+        for position in self.positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(item))
+
+
+class TokenRevocations:
+    """
+    Revokes access tokens by JTI, or every token of an account issued before a point in time.
+
+    Revocations are written to the shared cache, which stays the authority, and when the cache is Redis they
+    are also recorded in two hashes and published to every worker. Each worker loads the hashes once into a
+    Bloom filter of revoked JTIs and a dict of account watermarks, and keeps both current from the
+    subscription, so a token that was never revoked is accepted without a network hop and only filter hits
+    are confirmed against the cache. Until the subscription is up (or after it drops) checks read the cache.
+    """
+
+    channel = 'token_revocations'
+    tokens_key = 'revoked_tokens'
+    watermarks_key = 'revoked_token_watermarks'
+
+    token_prefix = 'revoked_token_'
+    watermark_prefix = 'tokens_revoked_before_'
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Bloom filter of the revoked JTIs of this process, None while the subscription is down
+        self.filter = None
+        self.filter_capacity = 0
+        self.filter_count = 0
+        # account primary key -> tokens issued before this timestamp are revoked
+        self.watermarks = {}
+        self.listening = False
+        # guards the filter and watermarks against the listener thread, and buffers its messages while a load
+        # is in progress, they are replayed once the loaded filter is in place
+        self.messages_lock = threading.Lock()
+        self.pending_messages = None
+
+    @property
+    def connection(self):
+        try:
+            return get_redis_connection('default')
+        except NotImplementedError:
+            # not a redis cache, every check reads the cache
+            return None
+
+    def lifetime(self):
+        return int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+
+    def revoke(self, access_token):
+        """
+        Revokes one access token for the remainder of its lifespan.
+
+        Args:
+            access_token (str): The encoded access token.
+        """
+        token = AccessToken(access_token, verify=False)
+
+        remaining = token['exp'] - int(time.time())
+        if remaining <= 0:
+            return
+
+        cache.set(self.token_prefix + token['jti'], True, timeout=remaining)
+
+        connection = self.connection
+        if connection is not None:
+            pipeline = connection.pipeline()
+            pipeline.hset(self.tokens_key, token['jti'], token['exp'])
+            pipeline.publish(self.channel, f"token:{token['jti']}")
+            pipeline.execute()
+
+    def revoke_account(self, account_pk):
+        """
+        Revokes every access token issued to an account before now, logging it out of all its devices. Tokens
+        issued within the same second, like the one of a user logging straight back in, stay valid.
+
+        Args:
+            account_pk (int): The primary key of the account, the `user_id` claim of its tokens.
+        """
+        watermark = int(time.time())
+
+        cache.set(self.watermark_prefix + str(account_pk), watermark, timeout=self.lifetime())
+
+        connection = self.connection
+        if connection is not None:
+            pipeline = connection.pipeline()
+            pipeline.hset(self.watermarks_key, account_pk, watermark)
+            pipeline.publish(self.channel, f'account:{account_pk}:{watermark}')
+            pipeline.execute()
+
+    def is_revoked(self, token):
+        """
+        Checks whether a decoded access token has been revoked.
+
+        Args:
+            token (AccessToken): The decoded access token.
+
+        Returns:
+            bool: True if the token was revoked, or issued before its account was logged out of all devices.
+        """
+        # the listener thread can drop the filter at any time, so it is read once
+        bloom_filter = self.ready()
+
+        if bloom_filter is None:
+            values = cache.get_many([self.token_prefix + token['jti'], self.watermark_prefix + str(token['user_id'])])
+            watermark = values.get(self.watermark_prefix + str(token['user_id']))
+
+            return self.token_prefix + token['jti'] in values or (watermark is not None and token.get('iat', 0) < watermark)
+
+        watermark = self.watermarks.get(token['user_id'])
+        if watermark is not None and token.get('iat', 0) < watermark:
+            return True
+
+        if token['jti'] not in bloom_filter:
+            return False
+
+        # revoked, or a false positive of the filter
+        return cache.get(self.token_prefix + token['jti']) is not None
+
+    def ready(self):
+        # returns the filter of this process, loading it if needed, None if checks have to read the cache
+        bloom_filter = self.filter
+        if bloom_filter is not None:
+            return bloom_filter
+
+        connection = self.connection
+        if connection is None:
+            return None
+
+        with self.lock:
+            if not self.listening:
+                # subscribe before loading so no revocation published in between is missed
+                pubsub = connection.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+
+                self.listening = True
+                threading.Thread(target=self.listen, args=(pubsub,), daemon=True).start()
+
+            if self.filter is None:
+                self.load(connection)
+
+            return self.filter
+
+    def load(self, connection):
+        # revocations published from here on are buffered, the hashes read below may or may not include them
+        with self.messages_lock:
+            self.pending_messages = []
+
+        try:
+            self.load_snapshot(connection)
+
+        finally:
+            with self.messages_lock:
+                self.pending_messages = None
+
+    def load_snapshot(self, connection):
+        now = int(time.time())
+        lifetime = self.lifetime()
+
+        tokens = {jti.decode(): int(exp) for jti, exp in connection.hgetall(self.tokens_key).items()}
+        watermarks = {int(account): int(watermark) for account, watermark in connection.hgetall(self.watermarks_key).items()}
+
+        # drop what expired, the hashes only ever hold revocations still in force
+        expired_tokens = [jti for jti, exp in tokens.items() if exp <= now]
+        if expired_tokens:
+            connection.hdel(self.tokens_key, *expired_tokens)
+
+        expired_watermarks = [account for account, watermark in watermarks.items() if watermark + lifetime <= now]
+        if expired_watermarks:
+            connection.hdel(self.watermarks_key, *expired_watermarks)
+
+        filter_count = len(tokens) - len(expired_tokens)
+        filter_capacity = max(settings.TOKEN_REVOCATION_FILTER_CAPACITY, filter_count * 2)
+
+        bloom_filter = BloomFilter(filter_capacity, settings.TOKEN_REVOCATION_FILTER_ERROR_RATE)
+        for jti, exp in tokens.items():
+            if exp > now:
+                bloom_filter.add(jti)
+
+        with self.messages_lock:
+            self.filter_count, self.filter_capacity = filter_count, filter_capacity
+            self.watermarks = {account: watermark for account, watermark in watermarks.items() if watermark + lifetime > now}
+            # without the listener the filter would go stale, checks keep reading the cache
+            self.filter = bloom_filter if self.listening else None
+
+            pending_messages, self.pending_messages = self.pending_messages, None
+            for message in pending_messages:
+                self.record(message)
+
+    def apply(self, message):
+        with self.messages_lock:
+            if self.pending_messages is not None:
+                self.pending_messages.append(message)
+                return
+
+            self.record(message)
+
+    def record(self, message):
+        kind, _, value = message.partition(':')
+
+        if kind == 'token' and self.filter is not None:
+            self.filter.add(value)
+            self.filter_count += 1
+
+            if self.filter_count > self.filter_capacity:
+                # past its capacity the filter answers too many false positives, rebuild it bigger on the next check
+                self.filter = None
+
+        elif kind == 'account':
+            account, _, watermark = value.partition(':')
+            # a watermark only ever moves forward, whatever order the snapshot and messages arrive in
+            self.watermarks[int(account)] = max(self.watermarks.get(int(account), 0), int(watermark))
+
+    def listen(self, pubsub):
+        try:
+            for message in pubsub.listen():
+                if message['type'] == 'message':
+                    self.apply(message['data'].decode())
+
+        except Exception:
+            pass
+
+        finally:
+            # revocations published from now on would be missed, fall back to the cache until it is reloaded
+            with self.messages_lock:
+                self.listening = False
+                self.filter = None
+            pubsub.close()
+
+
+# Initialize the TokenRevocations instance
+token_revocations = TokenRevocations()
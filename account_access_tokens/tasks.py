@@ -0,0 +1,26 @@
+# celery
+from celery import shared_task
+
+# django
+from django.conf import settings
+
+# utility functions
+from account_access_tokens.write_behind import session_writes
+from account_access_tokens.utils import prune_expired_access_tokens
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def flush_session_writes_task(self):
+    try:
+        access_tokens, last_used = session_writes.flush()
+        return {"access_tokens": access_tokens, "last_used": last_used}
+    except Exception as e:
+        raise self.retry(exc=e)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def prune_expired_access_tokens_task(self):
+    try:
+        return {"deleted": prune_expired_access_tokens(settings.ACCESS_TOKEN_PRUNE_CHUNK_SIZE)}
+    except Exception as e:
+        raise self.retry(exc=e)
@@ -1,3 +1,244 @@
-from django.test import TestCase
+# python
+import time
+from datetime import timedelta
+from unittest import skipUnless
+from unittest.mock import patch, PropertyMock
 
-# Create your tests here.
+# redis, fakeredis (and its Lua runtime, lupa) are test only dependencies left out of requirements.txt
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+# django
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+from django.utils import timezone
+
+# simple jwt
+from rest_framework_simplejwt.tokens import AccessToken
+
+# models
+from accounts.models import Founder
+from account_access_tokens.models import AccountAccessToken
+from account_browsers.models import AccountBrowsers
+
+# utility functions
+from account_access_tokens.revocation import BloomFilter, TokenRevocations, token_revocations
+from account_access_tokens.write_behind import SessionWrites, session_writes
+from account_access_tokens.utils import manage_user_sessions, prune_expired_access_tokens
+
+# tasks
+from account_access_tokens.tasks import flush_session_writes_task
+
+
+class BloomFilterTest(TestCase):
+
+    def test_no_false_negatives_and_few_false_positives(self):
+        bloom_filter = BloomFilter(1000, 0.01)
+
+        revoked = [f'revoked-{index}' for index in range(1000)]
+        for jti in revoked:
+            bloom_filter.add(jti)
+
+        self.assertTrue(all(jti in bloom_filter for jti in revoked))
+
+        false_positives = sum(f'valid-{index}' in bloom_filter for index in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TokenRevocationsTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.account = Founder.objects.create(name='John', surname='Doe', email_address='john.doe@example.com', role='FOUNDER')
+
+    def issue(self, issued_at=None):
+        token = AccessToken.for_user(self.account)
+        if issued_at is not None:
+            token['iat'] = issued_at
+        return str(token)
+
+    def test_revoking_a_token(self):
+        revoked, other = self.issue(), self.issue()
+
+        token_revocations.revoke(revoked)
+
+        self.assertTrue(token_revocations.is_revoked(AccessToken(revoked)))
+        self.assertFalse(token_revocations.is_revoked(AccessToken(other)))
+
+    def test_revoking_every_token_of_an_account(self):
+        now = int(time.time())
+        earlier = self.issue(issued_at=now - 10)
+
+        with patch('account_access_tokens.revocation.time.time', return_value=now - 5):
+            token_revocations.revoke_account(self.account.pk)
+
+        later = self.issue()
+
+        self.assertTrue(token_revocations.is_revoked(AccessToken(earlier)))
+        self.assertFalse(token_revocations.is_revoked(AccessToken(later)))
+
+    def test_token_issued_in_the_second_of_the_revoke_stays_valid(self):
+        now = int(time.time())
+
+        with patch('account_access_tokens.revocation.time.time', return_value=now + 0.5):
+            token_revocations.revoke_account(self.account.pk)
+
+        # logging straight back in after a password change
+        self.assertTrue(token_revocations.is_revoked(AccessToken(self.issue(issued_at=now - 1))))
+        self.assertFalse(token_revocations.is_revoked(AccessToken(self.issue(issued_at=now))))
+
+    def test_revocations_published_while_the_filter_loads_are_kept(self):
+        now = int(time.time())
+        revocations = TokenRevocations()
+        revocations.listening = True
+
+        class PublishingConnection:
+            # the hashes hold one revocation of each kind, two more are published once they have been read
+            hashes = {TokenRevocations.tokens_key: {b'jti-a': str(now + 60).encode()}, TokenRevocations.watermarks_key: {b'7': str(now - 10).encode()}}
+
+            def hgetall(self, key):
+                if key == TokenRevocations.watermarks_key:
+                    revocations.apply('token:jti-b')
+                    revocations.apply(f'account:7:{now}')
+                return self.hashes[key]
+
+            def hdel(self, key, *fields):
+                pass
+
+        revocations.load(PublishingConnection())
+
+        self.assertTrue('jti-a' in revocations.filter and 'jti-b' in revocations.filter)
+        self.assertEqual(revocations.watermarks[7], now)
+
+        # an older watermark arriving late does not move it back
+        revocations.apply(f'account:7:{now - 30}')
+        self.assertEqual(revocations.watermarks[7], now)
+
+    def test_filter_dropped_by_the_listener_during_a_check(self):
+        class DroppedFilter(TokenRevocations):
+            # the listener thread drops the filter right after the check first reads it
+            reads = 0
+
+            @property
+            def filter(self):
+                self.reads += 1
+                return BloomFilter(10, 0.01) if self.reads == 1 else None
+
+            @filter.setter
+            def filter(self, value):
+                pass
+
+        token = self.issue()
+        self.assertFalse(DroppedFilter().is_revoked(AccessToken(token)))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class SessionWritesTest(TestCase):
+
+    def setUp(self):
+        self.account = Founder.objects.create(name='John', surname='Doe', email_address='john.doe@example.com', role='FOUNDER')
+        self.browser = {'device_type': 'PC', 'os': 'Linux', 'os_version': '', 'browser': 'Firefox', 'browser_version': '130', 'language': 'en', 'time_zone': 'UTC'}
+
+    def test_access_tokens_are_written_with_their_browser(self):
+        session_writes.write([
+            {'account': self.account.pk, 'access_token': 'token-a', 'browser': self.browser},
+            {'account': self.account.pk, 'access_token': 'token-b', 'browser': None},
+            {'account': self.account.pk + 1, 'access_token': 'token-c', 'browser': None},
+        ])
+
+        self.assertEqual(set(AccountAccessToken.objects.values_list('access_token_string', flat=True)), {'token-a', 'token-b'})
+        self.assertEqual(AccountBrowsers.objects.get().access_token.access_token_string, 'token-a')
+
+    def test_last_used_timestamps_are_bulk_updated(self):
+        session_writes.write([{'account': self.account.pk, 'access_token': 'token-a', 'browser': self.browser}])
+        last_used = time.time() + 60
+
+        with self.assertNumQueries(2):
+            session_writes.write_last_used({'token-a': last_used, 'token-b': last_used})
+
+        self.assertAlmostEqual(AccountBrowsers.objects.get().last_used.timestamp(), last_used, places=3)
+
+    def test_uses_of_a_token_are_recorded_once_per_interval(self):
+        session_writes.touched.clear()
+        session_writes.write([{'account': self.account.pk, 'access_token': 'token-a', 'browser': self.browser}])
+
+        session_writes.touch('token-a')
+        first_used = AccountBrowsers.objects.get().last_used
+
+        # the requests that follow within the interval write nothing
+        with self.assertNumQueries(0):
+            session_writes.touch('token-a')
+        self.assertEqual(AccountBrowsers.objects.get().last_used, first_used)
+
+        with patch('account_access_tokens.write_behind.time.time', return_value=time.time() + 61):
+            session_writes.touch('token-a')
+        self.assertGreater(AccountBrowsers.objects.get().last_used, first_used)
+
+    def test_session_limit_and_pruning(self):
+        for index in range(3):
+            self.assertIsNone(manage_user_sessions(self.account, {'access': f'token-{index}'}))
+
+        self.assertEqual(manage_user_sessions(self.account, {'access': 'token-3'}).status_code, 403)
+
+        AccountAccessToken.objects.update(timestamp=timezone.now() - timedelta(hours=25))
+        self.assertEqual(prune_expired_access_tokens(chunk_size=2), 3)
+        self.assertIsNone(manage_user_sessions(self.account, {'access': 'token-3'}))
+
+
+@skipUnless(fakeredis, 'fakeredis is not installed')
+class SessionWritesRedisTest(TestCase):
+    """
+    Test cases for the Redis write-behind buffer and its flush task.
+    """
+
+    def setUp(self):
+        self.redis = fakeredis.FakeStrictRedis()
+        connection = patch.object(SessionWrites, 'connection', new_callable=PropertyMock, return_value=self.redis)
+        connection.start()
+        self.addCleanup(connection.stop)
+        session_writes.touched.clear()
+
+        self.account = Founder.objects.create(name='John', surname='Doe', email_address='john.doe@example.com', role='FOUNDER')
+        self.browser = {'device_type': 'PC', 'os': 'Linux', 'os_version': '', 'browser': 'Firefox', 'browser_version': '130', 'language': 'en', 'time_zone': 'UTC'}
+
+    def buffer(self, *access_tokens):
+        for access_token in access_tokens:
+            session_writes.add_access_token(self.account.pk, access_token, self.browser)
+            session_writes.touch(access_token)
+
+    def test_buffered_writes_are_flushed_in_bulk_by_the_task(self):
+        with self.assertNumQueries(0):
+            self.buffer('token-a', 'token-b')
+            session_writes.touch('token-a')
+
+        self.assertEqual(session_writes.pending_access_tokens(self.account.pk), 2)
+
+        # the account, two bulk inserts and the token lookup, one read and one bulk update of the last used times,
+        # and the savepoints of the flush's transaction
+        with self.assertNumQueries(10):
+            result = flush_session_writes_task.apply().get()
+
+        self.assertEqual(result, {'access_tokens': 2, 'last_used': 2})
+        self.assertEqual(set(AccountAccessToken.objects.values_list('access_token_string', flat=True)), {'token-a', 'token-b'})
+        self.assertEqual(AccountBrowsers.objects.filter(last_used__isnull=False).count(), 2)
+
+        # the session limit counts the flushed tokens from the database, and nothing is left to flush
+        self.assertEqual(session_writes.pending_access_tokens(self.account.pk), 0)
+        self.assertEqual(session_writes.flush(), (0, 0))
+
+    def test_a_failed_flush_is_rolled_back_and_retried_whole(self):
+        self.buffer('token-a', 'token-b')
+
+        with patch.object(SessionWrites, 'write_last_used', side_effect=RuntimeError('database went away')):
+            with self.assertRaises(RuntimeError):
+                session_writes.flush()
+
+        # nothing was written, the tokens wait for the next flush
+        self.assertFalse(AccountAccessToken.objects.exists())
+        self.assertEqual(session_writes.pending_access_tokens(self.account.pk), 2)
+
+        self.assertEqual(session_writes.flush(), (2, 0))
+        self.assertEqual(AccountBrowsers.objects.count(), 2)
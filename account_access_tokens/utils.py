@@ -7,15 +7,17 @@ from rest_framework import status
 
 # django
 from django.utils import timezone
-from django.db import transaction
 
 # models
 from account_access_tokens.models import AccountAccessToken
 
+# utility functions
+from account_access_tokens.write_behind import session_writes
+
 
 def manage_user_sessions(account, token, max_sessions=3):
     """
-    Manages user sessions by expiring old tokens and limiting the number of active sessions.
+    Manages user sessions by limiting the number of active sessions.
     
     Args:
         user: The user for whom the session is being managed.
@@ -28,24 +30,38 @@ def manage_user_sessions(account, token, max_sessions=3):
     """
     try:
         cutoff_time = timezone.now() - timedelta(hours=24)
-        
-        # Expire old access tokens (older than 24 hours)
-        with transaction.atomic():
-            expired_access_tokens = account.access_tokens.filter(timestamp__lt=cutoff_time)
-            if expired_access_tokens.exists():
-                expired_access_tokens.delete()
 
-        # Check the number of active sessions
-        access_tokens_count = account.access_tokens.count()
+        # Check the number of active sessions, expired access tokens are pruned by a periodic task
+        access_tokens_count = account.access_tokens.filter(timestamp__gte=cutoff_time).count() + session_writes.pending_access_tokens(account.pk)
 
         if access_tokens_count >= max_sessions:
             return Response({"error": "Could not process your request, you have reached the maximum number of access tokens for your account. Please logout from one of your other devices to proceed."}, status=status.HTTP_403_FORBIDDEN)
         
-        # Create a new access token record
-        with transaction.atomic():
-            AccountAccessToken.objects.create(account=account, access_token_string=token['access'])
+        # Record the new access token, it is written to the database with the next flush
+        session_writes.add_access_token(account.pk, token['access'])
 
         return None  # No error, so return None
 
     except Exception as e:
-        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def prune_expired_access_tokens(chunk_size):
+    """
+    Deletes the access tokens older than 24 hours, a chunk at a time so no delete holds locks for long.
+
+    Args:
+        chunk_size (int): The number of access tokens deleted per statement.
+
+    Returns:
+        int: The number of access tokens deleted.
+    """
+    cutoff_time = timezone.now() - timedelta(hours=24)
+    deleted = 0
+
+    while True:
+        expired_access_tokens = list(AccountAccessToken.objects.filter(timestamp__lt=cutoff_time).values_list('pk', flat=True)[:chunk_size])
+        if not expired_access_tokens:
+            return deleted
+
+        deleted += AccountAccessToken.objects.filter(pk__in=expired_access_tokens).delete()[1].get(AccountAccessToken._meta.label, 0)
@@ -0,0 +1,218 @@
+# python
+import json
+import time
+from datetime import datetime, timezone as dt_timezone
+
+# django
+from django.conf import settings
+from django.db import transaction
+
+# redis
+from django_redis import get_redis_connection
+
+# restframework
+from rest_framework_simplejwt.settings import api_settings
+
+
+class SessionWrites:
+    """
+    Write-behind buffer for the access token and browser rows written by logins and authenticated requests.
+
+    With the Redis cache, new access tokens (with the browser that requested them, if any) are kept in a hash and
+    the last time each token was used in another, and a periodic task moves both to Postgres with one
+    `bulk_create` and one `bulk_update`. Tokens waiting to be flushed are also kept in a set per account so the
+    session limit counts them. Other cache backends write straight to the database.
+
+    A token's use is recorded at most once every `ACCESS_TOKEN_TOUCH_INTERVAL` seconds per process, the
+    requests in between neither write nor reach Redis.
+    """
+
+    tokens_key = 'pending_access_tokens'
+    last_used_key = 'pending_browser_last_used'
+    account_prefix = 'pending_access_tokens_'
+
+    def __init__(self):
+        # access token -> when this process last recorded it was used
+        self.touched = {}
+
+    @property
+    def connection(self):
+        try:
+            return get_redis_connection('default')
+        except NotImplementedError:
+            return None
+
+    def account_key(self, account_pk):
+        return self.account_prefix + str(account_pk)
+
+    def add_access_token(self, account_pk, access_token, browser=None):
+        """
+        Records a new access token of an account, with the details of the browser it was issued to.
+
+        Args:
+            account_pk (int): The primary key of the account.
+            access_token (str): The encoded access token.
+            browser (dict): AccountBrowsers field values, None to record the token alone.
+        """
+        entry = {'account': account_pk, 'access_token': access_token, 'browser': browser}
+
+        connection = self.connection
+        if connection is None:
+            return self.write([entry])
+
+        pipeline = connection.pipeline()
+        pipeline.hset(self.tokens_key, access_token, json.dumps(entry))
+        pipeline.sadd(self.account_key(account_pk), access_token)
+        pipeline.expire(self.account_key(account_pk), int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()))
+        pipeline.execute()
+
+    def pending_access_tokens(self, account_pk):
+        """
+        Returns the number of access tokens of an account not flushed to the database yet.
+        """
+        connection = self.connection
+        if connection is None:
+            return 0
+
+        return connection.scard(self.account_key(account_pk))
+
+    def discard_access_token(self, account_pk, access_token):
+        """
+        Drops an access token that has not been flushed yet, e.g. on log out.
+        """
+        connection = self.connection
+        if connection is None:
+            return
+
+        pipeline = connection.pipeline()
+        pipeline.hdel(self.tokens_key, access_token)
+        pipeline.srem(self.account_key(account_pk), access_token)
+        pipeline.execute()
+
+    def discard_account(self, account_pk):
+        """
+        Drops every access token of an account that has not been flushed yet.
+
+        Returns:
+            list: The dropped access tokens.
+        """
+        connection = self.connection
+        if connection is None:
+            return []
+
+        access_tokens = [access_token.decode() for access_token in connection.smembers(self.account_key(account_pk))]
+
+        pipeline = connection.pipeline()
+        if access_tokens:
+            pipeline.hdel(self.tokens_key, *access_tokens)
+        pipeline.delete(self.account_key(account_pk))
+        pipeline.execute()
+
+        return access_tokens
+
+    def touch(self, access_token):
+        """
+        Records that the browser holding an access token was just used, unless that was recorded less than
+        `ACCESS_TOKEN_TOUCH_INTERVAL` seconds ago.
+        """
+        now, interval = time.time(), settings.ACCESS_TOKEN_TOUCH_INTERVAL
+        if now - self.touched.get(access_token, 0) < interval:
+            return
+
+        if len(self.touched) >= settings.ACCESS_TOKEN_TOUCH_MAX_TRACKED:
+            # forget the tokens whose interval is over, they are recorded on their next use anyway
+            self.touched = {token: touched for token, touched in self.touched.items() if now - touched < interval}
+        self.touched[access_token] = now
+
+        connection = self.connection
+        if connection is None:
+            return self.write_last_used({access_token: now})
+
+        connection.hset(self.last_used_key, access_token, now)
+
+    def flush(self):
+        """
+        Moves the buffered access tokens and last used timestamps to the database.
+
+        Returns:
+            tuple: The number of access tokens and last used timestamps flushed.
+        """
+        connection = self.connection
+        if connection is None:
+            return 0, 0
+
+        # take everything buffered so far in one transaction, writes arriving meanwhile wait for the next flush
+        pipeline = connection.pipeline(transaction=True)
+        pipeline.hgetall(self.tokens_key)
+        pipeline.delete(self.tokens_key)
+        pipeline.hgetall(self.last_used_key)
+        pipeline.delete(self.last_used_key)
+        pending_tokens, _, last_used, _ = pipeline.execute()
+
+        entries = [json.loads(entry) for entry in pending_tokens.values()]
+
+        try:
+            # both writes commit together, a failed flush leaves nothing behind that the next one would write twice
+            with transaction.atomic():
+                self.write(entries)
+                self.write_last_used({access_token.decode(): float(timestamp) for access_token, timestamp in last_used.items()})
+
+        except Exception:
+            # put the tokens back for the next flush, a last used timestamp is superseded by the next anyway
+            if pending_tokens:
+                connection.hset(self.tokens_key, mapping=pending_tokens)
+            raise
+
+        # the session limit counts the flushed tokens from the database from now on
+        if entries:
+            pipeline = connection.pipeline()
+            for entry in entries:
+                pipeline.srem(self.account_key(entry['account']), entry['access_token'])
+            pipeline.execute()
+
+        return len(entries), len(last_used)
+
+    def write(self, entries):
+        # models
+        from accounts.models import BaseAccount
+        from account_access_tokens.models import AccountAccessToken
+        from account_browsers.models import AccountBrowsers
+
+        if not entries:
+            return
+
+        # accounts deleted since their tokens were issued have nothing left to write
+        accounts = set(BaseAccount.objects.filter(pk__in={entry['account'] for entry in entries}).values_list('pk', flat=True))
+        entries = [entry for entry in entries if entry['account'] in accounts]
+
+        with transaction.atomic():
+            AccountAccessToken.objects.bulk_create(
+                [AccountAccessToken(account_id=entry['account'], access_token_string=entry['access_token']) for entry in entries],
+                ignore_conflicts=True
+            )
+
+            browsers = [entry for entry in entries if entry['browser']]
+            if browsers:
+                access_tokens = dict(AccountAccessToken.objects.filter(access_token_string__in=[entry['access_token'] for entry in browsers]).values_list('access_token_string', 'pk'))
+
+                AccountBrowsers.objects.bulk_create([
+                    AccountBrowsers(account_id=entry['account'], access_token_id=access_tokens.get(entry['access_token']), **entry['browser'])
+                    for entry in browsers
+                ])
+
+    def write_last_used(self, last_used):
+        # models
+        from account_browsers.models import AccountBrowsers
+
+        if not last_used:
+            return
+
+        browsers = list(AccountBrowsers.objects.filter(access_token__access_token_string__in=last_used).select_related('access_token').only('id', 'last_used', 'access_token__access_token_string'))
+        for browser in browsers:
+            browser.last_used = datetime.fromtimestamp(last_used[browser.access_token.access_token_string], tz=dt_timezone.utc)
+
+        AccountBrowsers.objects.bulk_update(browsers, ['last_used'], batch_size=500)
+
+
+# Initialize the SessionWrites instance
+session_writes = SessionWrites()
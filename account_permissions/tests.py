@@ -1,3 +1,117 @@
-from django.test import TestCase
+# python
+import threading
+from types import SimpleNamespace
+from collections import OrderedDict
+from unittest.mock import patch
 
-# Create your tests here.
+# django
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+
+# models
+from schools.models import School
+from accounts.models import Admin
+from permission_groups.models import AdminPermissionGroup
+from account_permissions.models import AdminAccountPermission
+
+# utility functions
+from account_permissions.utils import has_permission, get_permissions, local_permissions, local_permissions_versions, permissions_version_key
+
+
+class InterleavedPermissions(OrderedDict):
+    """Runs a lookup on another thread in between finding a set and moving it to the end of the LRU."""
+
+    interleaved = None
+    thread = None
+
+    def get(self, key, default=None):
+        permissions = super().get(key, default)
+
+        interleaved, self.interleaved = self.interleaved, None
+        if interleaved is not None:
+            self.thread = threading.Thread(target=interleaved)
+            self.thread.start()
+            # while the LRU is locked the other lookup has to wait for this one
+            self.thread.join(timeout=0.2)
+
+        return permissions
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CompiledPermissionsTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        local_permissions.clear()
+        local_permissions_versions.clear()
+
+        self.school = School.objects.create(name='Seeran High', email_address='office@seeran.example.com', contact_number='0110000000')
+        self.admin = Admin.objects.create(name='John', surname='Doe', email_address='john.doe@example.com', role='ADMIN', school=self.school)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group = AdminPermissionGroup.objects.create(group_name='Registrars', school=self.school)
+            AdminAccountPermission.objects.create(linked_permission_group=self.group, action='CREATE', target_model='ACCOUNT')
+            AdminAccountPermission.objects.create(linked_permission_group=self.group, action='DELETE', target_model='ACCOUNT', can_execute=False)
+            self.group.update_subscribers(subscribers_list=[self.admin.account_id], subscribe=True)
+
+    def test_permissions_are_compiled_once(self):
+        self.assertTrue(has_permission(self.admin, 'CREATE', 'ACCOUNT'))
+
+        # the compiled set answers every following check without touching the database
+        with self.assertNumQueries(0):
+            self.assertTrue(has_permission(self.admin, 'CREATE', 'ACCOUNT'))
+            self.assertFalse(has_permission(self.admin, 'DELETE', 'ACCOUNT'))
+            self.assertFalse(has_permission(self.admin, 'VIEW', 'ACCOUNT'))
+
+        # another process finds the set in the shared cache
+        local_permissions.clear()
+        with self.assertNumQueries(0):
+            self.assertTrue(has_permission(self.admin, 'CREATE', 'ACCOUNT'))
+
+    def test_permission_checks_reuse_the_local_permissions_version(self):
+        self.assertTrue(has_permission(self.admin, 'CREATE', 'ACCOUNT'))
+
+        with patch.object(cache, 'get', wraps=cache.get) as cache_get:
+            self.assertTrue(has_permission(self.admin, 'CREATE', 'ACCOUNT'))
+            self.assertFalse(has_permission(self.admin, 'DELETE', 'ACCOUNT'))
+        cache_get.assert_not_called()
+
+        # another process revokes the permission, this one applies the change once its local version expires
+        self.group.update_subscribers(subscribers_list=[self.admin.account_id], subscribe=False)
+        cache.incr(permissions_version_key(self.school.pk))
+        self.assertTrue(has_permission(self.admin, 'CREATE', 'ACCOUNT'))
+
+        version, expires_at = local_permissions_versions[self.school.pk]
+        local_permissions_versions[self.school.pk] = (version, 0)
+        self.assertFalse(has_permission(self.admin, 'CREATE', 'ACCOUNT'))
+
+    def test_changes_to_permission_groups_invalidate_the_compiled_sets(self):
+        self.assertTrue(has_permission(self.admin, 'CREATE', 'ACCOUNT'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.update_subscribers(subscribers_list=[self.admin.account_id], subscribe=False)
+        self.assertFalse(has_permission(self.admin, 'CREATE', 'ACCOUNT'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.update_subscribers(subscribers_list=[self.admin.account_id], subscribe=True)
+        self.assertTrue(has_permission(self.admin, 'CREATE', 'ACCOUNT'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.delete()
+        self.assertFalse(has_permission(self.admin, 'CREATE', 'ACCOUNT'))
+
+    @override_settings(PERMISSIONS_LOCAL_CACHE_SIZE=1)
+    def test_sets_evicted_by_other_threads_mid_lookup_are_still_served(self):
+        self.assertTrue(has_permission(self.admin, 'CREATE', 'ACCOUNT'))
+
+        other_account = SimpleNamespace(account_id='account-b', school_id=self.school.pk)
+        interleaved = InterleavedPermissions(local_permissions)
+        interleaved.interleaved = lambda: get_permissions(other_account)
+
+        with patch('account_permissions.utils.local_permissions', interleaved), \
+                patch('account_permissions.utils.compile_permissions', return_value=frozenset()):
+            self.assertTrue(has_permission(self.admin, 'CREATE', 'ACCOUNT'))
+            interleaved.thread.join()
+
+        # the other thread's set evicted the admin's once the lookup was done
+        self.assertEqual([account_id for account_id, version in interleaved], ['account-b'])
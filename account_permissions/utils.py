@@ -1,12 +1,151 @@
+# python
+import time
+import threading
+from collections import OrderedDict
+
+# django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# utility functions
+from seeran_backend.utils import memoize_within_batch
+
+
+# compiled permission sets of this process, (account id, permissions version) -> frozenset of (action, target model)
+local_permissions = OrderedDict()
+
+# guards local_permissions, requests of the same process look sets up from several threads at once
+local_permissions_lock = threading.Lock()
+
+# permissions versions of this process, school id -> (version, monotonic time it expires at)
+local_permissions_versions = {}
+
+
+def permissions_version_key(school_id):
+    return f'permissions_version_{school_id}'
+
+
+def compiled_permissions_key(account_id, version):
+    return f'permissions_{account_id}_{version}'
+
+
+def get_permissions_version(school_id):
+    """
+    Returns the version of a school's permission groups, bumped whenever one of them changes.
+
+    A missing version (first use, or evicted from the cache) starts at the current time in nanoseconds, so a
+    version number is never handed out twice and permission sets compiled under an older version are never served.
+    """
+    key = permissions_version_key(school_id)
+
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+
+    return version
+
+
+def get_local_permissions_version(school_id):
+    """
+    Returns the version of a school's permission groups as this process last read it from the shared cache.
+
+    Versions are reused for `PERMISSIONS_VERSION_LOCAL_TIMEOUT` seconds, so permission checks rarely make a cache
+    round trip. Changes made through this process apply right away, changes made through other processes once
+    the local version expires.
+    """
+    now = time.monotonic()
+
+    local_version = local_permissions_versions.get(school_id)
+    if local_version is not None and local_version[1] > now:
+        return local_version[0]
+
+    version = get_permissions_version(school_id)
+    local_permissions_versions[school_id] = (version, now + settings.PERMISSIONS_VERSION_LOCAL_TIMEOUT)
+
+    return version
+
+
+def permissions_changed(school_id):
+    """
+    Invalidates the compiled permissions of every account in a school once the current transaction commits.
+
+    Args:
+        school_id (int): The primary key of the school whose permission groups (permissions or subscribers) changed.
+    """
+    def bump():
+        key = permissions_version_key(school_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+        local_permissions_versions.pop(school_id, None)
+
+    transaction.on_commit(bump)
+
+
+def compile_permissions(account):
+    """
+    Compiles the (action, target model) pairs granted to an account by all the permission groups it is subscribed to.
+
+    Args:
+        account (Admin or Teacher): The account to compile permissions for.
+
+    Returns:
+        frozenset: The granted (action, target model) pairs.
+    """
+    return frozenset(
+        account.permissions.filter(permissions__can_execute=True).values_list('permissions__action', 'permissions__target_model')
+    )
+
+
+def get_permissions(account):
+    """
+    Returns the compiled permissions of an account.
+
+    Sets are looked up in this process first and then in the shared cache, both keyed by the version of the
+    account's school permissions (see `get_local_permissions_version`), and compiled from the database only
+    when neither has the current version.
+
+    Args:
+        account (Admin or Teacher): The account to look up permissions for.
+
+    Returns:
+        frozenset: The granted (action, target model) pairs.
+    """
+    version = get_local_permissions_version(account.school_id)
+    local_key = (account.account_id, version)
+
+    with local_permissions_lock:
+        permissions = local_permissions.get(local_key)
+        if permissions is not None:
+            local_permissions.move_to_end(local_key)
+
+    if permissions is not None:
+        return permissions
+
+    key = compiled_permissions_key(account.account_id, version)
+    permissions = cache.get(key)
+    if permissions is None:
+        permissions = compile_permissions(account)
+        cache.set(key, permissions, timeout=settings.PERMISSIONS_CACHE_TIMEOUT)
+
+    with local_permissions_lock:
+        local_permissions[local_key] = permissions
+        while len(local_permissions) > settings.PERMISSIONS_LOCAL_CACHE_SIZE:
+            local_permissions.popitem(last=False)
+
+    return permissions
+
+
+@memoize_within_batch
 def has_permission(account, action, target_model):
-    print('çhecking permissions..')
     try:
         # Check if any permission group grants the required action on the target model
-        if account.permissions.filter(permissions__action=action, permissions__target_model=target_model, permissions__can_execute=True).exists():
-            return True
-        return False
-    
-    except Exception as e:
-        return {'error': str(e)}
-
+        return (action, target_model) in get_permissions(account)
 
+    except Exception:
+        # never grant a permission that could not be checked
+        return False
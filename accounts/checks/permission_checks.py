@@ -3,8 +3,12 @@
 
     - these functions check for permissions to determine if an account can view, update or message the entity they are trying to access
     - if the account passes the check then nothing is returned else an object with a error message is returned
+    - teacher-student and parent-child relationships are answered from the per school relationship index
 """
 
+# relationship index
+from accounts.checks.relationships import relationships
+
 
 def view_account(requesting_account, requested_account):
     if requesting_account.role not in ['PRINCIPAL', 'ADMIN', 'TEACHER', 'PARENT', 'STUDENT']:
@@ -17,37 +21,38 @@ def view_account(requesting_account, requested_account):
     # Admins and principals can only view profiles of accounts linked to their own school
     elif requesting_account.role in ['PRINCIPAL', 'ADMIN']:
         if requested_account.role == 'PARENT':
-            if not requested_account.children.filter(school=requesting_account.school).exists():
+            if not relationships.get(requesting_account.school_id).has_children(requested_account.id):
                 return {"error": "unauthorized access. you can only view parent profiles associated with students in your school"}
         else:
-            if requesting_account.school != requested_account.school:
+            if requesting_account.school_id != requested_account.school_id:
                 return {"error": "unauthorized access. you are not permitted to view profiles of accounts outside your own school"}
 
     # Teachers can view parents and students in their own class, and admins/principals in their school
     elif requesting_account.role == 'TEACHER':
         if requested_account.role == 'PARENT':
-            if not requested_account.children.filter(enrolled_classrooms__teacher=requesting_account).exists():
+            if not relationships.get(requesting_account.school_id).teaches_children_of(requesting_account.id, requested_account.id):
                 return {"error": "unauthorized access. you can only view parent profiles associated with students you teach"}
         elif requested_account.role == 'STUDENT':
-            if not requested_account.enrolled_classrooms.filter(teacher=requesting_account).exists():
+            if not relationships.get(requesting_account.school_id).teaches(requesting_account.id, requested_account.id):
                 return {"error": "unauthorized access. you can only view student profiles of students you teach"}
         else:
-            if requesting_account.school != requested_account.school:
+            if requesting_account.school_id != requested_account.school_id:
                 return {"error": "unauthorized access. you are not permitted to view profiles of admins, principals, or other teachers outside your own school"}
 
     # Parents can view their children (students), teachers of their children, admins/principals of their children's schools, and other parents they share children with
     elif requesting_account.role == 'PARENT':
         if requested_account.role in ['PRINCIPAL', 'ADMIN']:
-            if not requesting_account.children.filter(school=requested_account.school).exists():
+            if not relationships.get(requested_account.school_id).has_children(requesting_account.id):
                 return {"error": "unauthorized access. you can only view profiles of admins and principals of your children's schools"}
         elif requested_account.role == 'TEACHER':
-            if not requesting_account.children.filter(enrolled_classrooms__teacher=requested_account).exists():
+            if not relationships.get(requested_account.school_id).teaches_children_of(requested_account.id, requesting_account.id):
                 return {"error": "unauthorized access. you can only view profiles of teachers who teach your children"}
         elif requested_account.role == 'PARENT':
+            # parents are not tied to one school, shared children are looked up in the database
             if not requesting_account.children.filter(id__in=requested_account.children.values_list('id', flat=True)).exists():
                 return {"error": "unauthorized access. you are not permitted to view profiles of parents who do not share children with you"}
         else:
-            if not requesting_account.children.filter(id=requested_account.id).exists():
+            if not relationships.get(requested_account.school_id).is_parent_of(requesting_account.id, requested_account.id):
                 return {"error": "unauthorized access. you are not permitted to view profiles of students who are not your children"}
 
     # Students can only view their parents, teachers who teach them, and admins/principals from their own school
@@ -55,13 +60,13 @@ def view_account(requesting_account, requested_account):
         if requested_account.role not in ['PARENT', 'TEACHER', 'PRINCIPAL', 'ADMIN']:
             return {"error": "unauthorized access. you are not permitted to view profiles outside of parents, teachers, principals, and admins"}
         elif requested_account.role == 'PARENT':
-            if not requested_account.children.filter(id=requesting_account.id).exists():
+            if not relationships.get(requesting_account.school_id).is_parent_of(requested_account.id, requesting_account.id):
                 return {"error": "unauthorized access. you can only view profiles of your parents"}
         elif requested_account.role == 'TEACHER':
-            if not requesting_account.enrolled_classrooms.filter(teacher=requested_account).exists():
+            if not relationships.get(requested_account.school_id).teaches(requested_account.id, requesting_account.id):
                 return {"error": "unauthorized access. you can only view profiles of teachers who teach you"}
         else:
-            if requesting_account.school != requested_account.school:
+            if requesting_account.school_id != requested_account.school_id:
                 return {"error": "unauthorized access. you can only view profiles of admins and principals of your own school"}
 
     # If no errors, return None indicating permission granted
@@ -78,11 +83,11 @@ def update_account(requesting_account, requested_account):
 
     # Admins and principals can only view profiles of accounts linked to their own school
     elif requested_account.role == 'PARENT':
-        if not requested_account.children.filter(school=requesting_account.school).exists():
+        if not relationships.get(requesting_account.school_id).has_children(requested_account.id):
             return {"error": "unauthorized access. you can only update parent profiles associated with students in your school"}
 
     else:
-        if requesting_account.school != requested_account.school:
+        if requesting_account.school_id != requested_account.school_id:
             return {"error": "unauthorized access. you are not permitted to update profiles of accounts outside your own school"}
 
     # If no errors, return None indicating permission granted
@@ -99,28 +104,29 @@ def message(requesting_account, requested_account):
 
     # Admins and principals can only message accounts linked to their own school
     elif requesting_account.role in ['PRINCIPAL', 'ADMIN']:
-        if requested_account.role != 'PARENT' and requesting_account.school != requested_account.school:
+        if requested_account.role != 'PARENT' and requesting_account.school_id != requested_account.school_id:
             return {"error": "unauthorized access. you are not permitted to message accounts outside your own school"}
-        elif requested_account.role == 'PARENT' and not requested_account.children.filter(school_id=requesting_account.school_id).exists():
+        elif requested_account.role == 'PARENT' and not relationships.get(requesting_account.school_id).has_children(requested_account.id):
             return {"error": "unauthorized access. you can only message parent accounts associated with students in your school"}
 
     # Teachers can message parents and students in their own class, and admins/principals in their school
     elif requesting_account.role == 'TEACHER':
         if requested_account.role in ['PRINCIPAL', 'ADMIN', 'TEACHER'] and requesting_account.school_id != requested_account.school_id:
             return {"error": "unauthorized access. you are not permitted to message admins, principals, or other teachers outside your own school"}
-        elif requested_account.role == 'PARENT' and not requested_account.children.filter(enrolled_classrooms__teacher=requesting_account).exists():
+        elif requested_account.role == 'PARENT' and not relationships.get(requesting_account.school_id).teaches_children_of(requesting_account.id, requested_account.id):
             return {"error": "unauthorized access. you can only message parent accounts associated with students you teach"}
-        elif requested_account.role == 'STUDENT' and not requesting_account.taught_classrooms.filter(students=requested_account).exists():
+        elif requested_account.role == 'STUDENT' and not relationships.get(requesting_account.school_id).teaches(requesting_account.id, requested_account.id):
             return {"error": "unauthorized access. you can only message student accounts you teach"}
 
     # Parents can message their children (students), teachers of their children, admins/principals of their children's schools, and other parents they share children with
     elif requesting_account.role == 'PARENT':
-        if requested_account.role in ['PRINCIPAL', 'ADMIN'] and not requesting_account.children.filter(school_id=requested_account.school_id).exists():
+        if requested_account.role in ['PRINCIPAL', 'ADMIN'] and not relationships.get(requested_account.school_id).has_children(requesting_account.id):
             return {"error": "unauthorized access. you can only message admins and principals of your children's schools"}
-        elif requested_account.role == 'TEACHER' and not requesting_account.children.filter(enrolled_classrooms__teacher=requested_account).exists():
+        elif requested_account.role == 'TEACHER' and not relationships.get(requested_account.school_id).teaches_children_of(requested_account.id, requesting_account.id):
             return {"error": "unauthorized access. you can only message teachers who teach your children"}
-        elif requested_account.role == 'STUDENT' and not requesting_account.children.filter(id=requested_account.id).exists():
+        elif requested_account.role == 'STUDENT' and not relationships.get(requested_account.school_id).is_parent_of(requesting_account.id, requested_account.id):
             return {"error": "unauthorized access. you are not permitted to message students who are not your children"}
+        # parents are not tied to one school, shared children are looked up in the database
         elif requested_account.role == 'PARENT' and not requesting_account.children.filter(id__in=requested_account.children.values_list('id', flat=True)).exists():
             return {"error": "unauthorized access. you are not permitted to message parents who do not share children with you"}
 
@@ -128,11 +134,11 @@ def message(requesting_account, requested_account):
     elif requesting_account.role == 'STUDENT':
         if requested_account.role not in ['PARENT', 'TEACHER', 'PRINCIPAL', 'ADMIN']:
             return {"error": "unauthorized access. you are not permitted to message accounts outside of parents, teachers, principals, and admins"}
-        elif requested_account.role in ['PRINCIPAL', 'ADMIN'] and requesting_account.school != requested_account.school:
+        elif requested_account.role in ['PRINCIPAL', 'ADMIN'] and requesting_account.school_id != requested_account.school_id:
             return {"error": "unauthorized access. you can only message admins and principals of your own school"}
-        elif requested_account.role == 'TEACHER' and not requesting_account.enrolled_classrooms.filter(teacher=requested_account).exists():
+        elif requested_account.role == 'TEACHER' and not relationships.get(requested_account.school_id).teaches(requested_account.id, requesting_account.id):
             return {"error": "unauthorized access. you can only message teachers who teach you"}
-        elif requested_account.role == 'PARENT' and not requesting_account.parents.filter(id=requested_account.id).exists():
+        elif requested_account.role == 'PARENT' and not relationships.get(requesting_account.school_id).is_parent_of(requested_account.id, requesting_account.id):
             return {"error": "unauthorized access. you can only message parent accounts of your parents"}
 
     # If no errors, return None indicating permission granted
@@ -0,0 +1,135 @@
+# python
+import time
+from collections import OrderedDict, defaultdict
+
+# django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+class SchoolRelationships:
+    """
+    The teacher-student and parent-child relationships of one school, as adjacency sets of account primary keys.
+
+    Attributes:
+        teacher_students (dict): Teacher id -> frozenset of the ids of the students they teach.
+        parent_children (dict): Parent id -> frozenset of the ids of their children enrolled in the school.
+    """
+
+    __slots__ = ('teacher_students', 'parent_children')
+
+    def __init__(self, teacher_students, parent_children):
+        self.teacher_students = teacher_students
+        self.parent_children = parent_children
+
+    def teaches(self, teacher_id, student_id):
+        return student_id in self.teacher_students.get(teacher_id, ())
+
+    def is_parent_of(self, parent_id, student_id):
+        return student_id in self.parent_children.get(parent_id, ())
+
+    def has_children(self, parent_id):
+        return parent_id in self.parent_children
+
+    def teaches_children_of(self, teacher_id, parent_id):
+        return not self.teacher_students.get(teacher_id, frozenset()).isdisjoint(self.parent_children.get(parent_id, ()))
+
+
+class RelationshipIndex:
+    """
+    Per school relationship indexes answering the account permission checks without joins.
+
+    An index is built with two queries (classroom enrollments and parent links of the school) and cached in
+    the process and in the shared cache under the school's relationship version. Creating, deleting or
+    updating a classroom (teacher or students) and linking or unlinking a parent bumps that version once
+    the transaction commits, so only the affected school is rebuilt, on its next check.
+    """
+
+    version_prefix = 'relationships_version_'
+    index_prefix = 'relationships_'
+
+    def __init__(self):
+        # (school id, version) -> SchoolRelationships of this process
+        self.local_indexes = OrderedDict()
+
+    def get_version(self, school_id):
+        # a missing version starts at the current time in nanoseconds so an outdated index is never read again
+        key = self.version_prefix + str(school_id)
+
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, time.time_ns(), timeout=None)
+            version = cache.get(key)
+
+        return version
+
+    def changed(self, school_id):
+        """
+        Invalidates the relationship index of a school once the current transaction commits.
+
+        Args:
+            school_id (int): The primary key of the school whose classrooms or parent links changed.
+        """
+        def bump():
+            key = self.version_prefix + str(school_id)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.add(key, time.time_ns(), timeout=None)
+
+        transaction.on_commit(bump)
+
+    def build(self, school_id):
+        # models
+        from accounts.models import Parent
+        from classrooms.models import Classroom
+
+        teacher_students = defaultdict(set)
+        for teacher_id, student_id in Classroom.objects.filter(school_id=school_id, teacher__isnull=False, students__isnull=False).values_list('teacher_id', 'students'):
+            teacher_students[teacher_id].add(student_id)
+
+        parent_children = defaultdict(set)
+        for parent_id, student_id in Parent.children.through.objects.filter(student__school_id=school_id).values_list('parent_id', 'student_id'):
+            parent_children[parent_id].add(student_id)
+
+        return SchoolRelationships(
+            {teacher_id: frozenset(students) for teacher_id, students in teacher_students.items()},
+            {parent_id: frozenset(children) for parent_id, children in parent_children.items()},
+        )
+
+    def get(self, school_id):
+        """
+        Returns the relationship index of a school.
+
+        Args:
+            school_id (int): The primary key of the school.
+
+        Returns:
+            SchoolRelationships: The school's current relationships.
+        """
+        version = self.get_version(school_id)
+        local_key = (school_id, version)
+
+        relationships = self.local_indexes.get(local_key)
+        if relationships is not None:
+            self.local_indexes.move_to_end(local_key)
+            return relationships
+
+        key = f'{self.index_prefix}{school_id}_{version}'
+        cached = cache.get(key)
+        if cached is None:
+            relationships = self.build(school_id)
+            cache.set(key, (relationships.teacher_students, relationships.parent_children), timeout=settings.RELATIONSHIPS_CACHE_TIMEOUT)
+        else:
+            relationships = SchoolRelationships(*cached)
+
+        self.local_indexes[local_key] = relationships
+        if len(self.local_indexes) > settings.RELATIONSHIPS_LOCAL_CACHE_SIZE:
+            self.local_indexes.popitem(last=False)
+
+        return relationships
+
+
+# Initialize the RelationshipIndex instance
+relationships = RelationshipIndex()
@@ -0,0 +1,184 @@
+# python
+from typing import NamedTuple
+
+# django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# utility functions
+from seeran_backend.utils import memoize_within_batch
+from account_permissions.utils import get_permissions_version, permissions_version_key
+
+
+# roles whose accounts are linked to a school
+SCHOOL_ROLES = ('PRINCIPAL', 'ADMIN', 'TEACHER', 'STUDENT')
+
+
+class AccountContext(NamedTuple):
+    """
+    Immutable snapshot of the identifiers most requests need about the requesting account.
+
+    Attributes:
+        account_pk (int): The primary key of the account.
+        account_id (str): The public account ID.
+        role (str): The account role.
+        school_pk (int): The primary key of the linked school, None for parents and founders.
+        school_compliant (bool): False if the linked school has been denied access.
+        grade_pk (int): The primary key of the student's grade, None for other roles.
+        permissions_version (int): The version of the school's permission groups, None without a school.
+    """
+    account_pk: int
+    account_id: str
+    role: str
+    school_pk: int = None
+    school_compliant: bool = True
+    grade_pk: int = None
+    permissions_version: int = None
+
+
+class AccountContextService:
+    """
+    Serves account context snapshots from the shared cache instead of Postgres.
+
+    The account part (primary keys of the account, school and grade) is cached per account and the compliance
+    flag per school, so a compliance change reaches every account of the school at once. Both are fetched with
+    the school's permissions version in at most two cache round trips, and reused for the remaining
+    sub-requests of a BATCH. The account ID and role behind an access token's `user_id` are cached the same way
+    for authentication. Saving or deleting an account or school drops its entries once the transaction commits.
+    """
+
+    account_prefix = 'account_context_'
+    school_prefix = 'school_context_'
+    identity_prefix = 'account_identity_'
+
+    def account_key(self, account, role):
+        return f'{self.account_prefix}{role}_{account}'
+
+    def school_key(self, school_id):
+        return self.school_prefix + str(school_id)
+
+    def identity_key(self, account_pk):
+        return self.identity_prefix + str(account_pk)
+
+    def load(self, account, role):
+        # models
+        from accounts.mappings import model_mapping
+
+        Model = model_mapping.account[role]
+
+        fields = ['id']
+        if role in SCHOOL_ROLES:
+            fields += ['school_id', 'school__none_compliant']
+        if role == 'STUDENT':
+            fields.append('grade_id')
+
+        row = dict(zip(fields, Model.objects.filter(account_id=account).values_list(*fields).get()))
+
+        cache.set(self.account_key(account, role), (row['id'], row.get('school_id'), row.get('grade_id')), timeout=settings.ACCOUNT_CONTEXT_TIMEOUT)
+        if row.get('school_id'):
+            cache.set(self.school_key(row['school_id']), row['school__none_compliant'], timeout=settings.ACCOUNT_CONTEXT_TIMEOUT)
+
+        return row['id'], row.get('school_id'), row.get('grade_id')
+
+    def load_school(self, school_id):
+        # models
+        from schools.models import School
+
+        none_compliant = School.objects.filter(pk=school_id).values_list('none_compliant', flat=True).get()
+        cache.set(self.school_key(school_id), none_compliant, timeout=settings.ACCOUNT_CONTEXT_TIMEOUT)
+
+        return none_compliant
+
+    def identify(self, account_pk):
+        """
+        Returns the account ID and role of an account from its primary key, the `user_id` claim of its access tokens.
+
+        Args:
+            account_pk (int): The primary key of the account.
+
+        Returns:
+            tuple: The account ID (str) and role of the account.
+
+        Raises:
+            BaseAccount.DoesNotExist: If no account has the provided primary key.
+        """
+        identity = cache.get(self.identity_key(account_pk))
+        if identity is None:
+            # models
+            from accounts.models import BaseAccount
+
+            account = BaseAccount.objects.values('account_id', 'role').get(pk=account_pk)
+            identity = (str(account['account_id']), account['role'])
+
+            cache.set(self.identity_key(account_pk), identity, timeout=settings.ACCOUNT_CONTEXT_TIMEOUT)
+
+        return identity
+
+    @memoize_within_batch
+    def get(self, account, role):
+        """
+        Returns the context snapshot of an account.
+
+        Args:
+            account (str): The account ID of the account.
+            role (str): The account role.
+
+        Returns:
+            AccountContext: The account's current context.
+
+        Raises:
+            DoesNotExist: If no account of the given role has the provided account ID.
+        """
+        cached = cache.get(self.account_key(account, role))
+        account_pk, school_pk, grade_pk = cached if cached is not None else self.load(account, role)
+
+        if school_pk is None:
+            return AccountContext(account_pk, str(account), role, grade_pk=grade_pk)
+
+        school_key = self.school_key(school_pk)
+        values = cache.get_many([school_key, permissions_version_key(school_pk)])
+
+        none_compliant = values.get(school_key)
+        if none_compliant is None:
+            none_compliant = self.load_school(school_pk)
+
+        permissions_version = values.get(permissions_version_key(school_pk))
+        if permissions_version is None:
+            permissions_version = get_permissions_version(school_pk)
+
+        return AccountContext(account_pk, str(account), role, school_pk, not none_compliant, grade_pk, permissions_version)
+
+    def account_changed(self, account, role, account_pk):
+        """
+        Drops the cached context and identity of an account once the current transaction commits.
+
+        Args:
+            account (str): The account ID of the saved or deleted account.
+            role (str): The account role.
+            account_pk (int): The primary key of the account.
+        """
+        transaction.on_commit(lambda: cache.delete_many([self.account_key(account, role), self.identity_key(account_pk)]))
+
+    def school_changed(self, school_id):
+        """
+        Drops the cached compliance flag of a school once the current transaction commits.
+
+        Args:
+            school_id (int): The primary key of the saved or deleted school.
+        """
+        transaction.on_commit(lambda: cache.delete(self.school_key(school_id)))
+
+    def schools_denied_access(self, school_ids):
+        """
+        Caches the compliance flag of schools just denied access once the current transaction commits, so
+        their accounts are turned away without reloading the schools.
+
+        Args:
+            school_ids (list): The primary keys of the schools.
+        """
+        transaction.on_commit(lambda: cache.set_many({self.school_key(school_id): True for school_id in school_ids}, timeout=settings.ACCOUNT_CONTEXT_TIMEOUT))
+
+
+# Initialize the AccountContextService instance
+account_contexts = AccountContextService()
@@ -1,7 +1,8 @@
+# relationships are answered by the relationship index, the permission checks only need the school
 permission_check = {
-    'PARENT': (None, 'children__school, children__enrolled_classrooms__teacher'),
+    'PARENT': (None, None),
     'PRINCIPAL': ('school', None),
     'ADMIN': ('school', None),
-    'TEACHER': ('school', 'taught_classrooms__students'),
-    'STUDENT': ('school', 'enrolled_classrooms__teacher'),
+    'TEACHER': ('school', None),
+    'STUDENT': ('school', None),
 }
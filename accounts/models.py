@@ -12,6 +12,7 @@ from django.core.validators import validate_email
 
 # utility functions
 from accounts import validators as users_validators
+from accounts.context import account_contexts
 
 
 class BaseAccountManager(BaseUserManager):
@@ -204,6 +205,13 @@ class BaseAccount(AbstractBaseUser, PermissionsMixin):
             # If it's not handled, re-raise the original exception
             raise ValidationError(_(error_message))
 
+        # drop the cached account context, the school or grade may have changed
+        account_contexts.account_changed(self.account_id, self.role, self.pk)
+
+    def delete(self, *args, **kwargs):
+        account_contexts.account_changed(self.account_id, self.role, self.pk)
+        return super().delete(*args, **kwargs)
+
     def clean(self):
         if self.role not in dict(BaseAccount.ROLE_CHOICES).keys():
             raise ValidationError(_('Could not process your request, the specified account role is invalid. Please choose a valid role from the options: %s.' % [dict(BaseAccount.ROLE_CHOICES).keys()]))
@@ -488,6 +496,10 @@ class Parent(BaseAccount):
         # If validation passes, add the child
         self.children.add(child)
 
+        # relationship index
+        from accounts.checks.relationships import relationships
+        relationships.changed(child.school_id)
+
 
 """
     Here's a list of some name and surname combinations for dummy data:
@@ -3,13 +3,23 @@ from threading import Thread
 
 # django
 from django.db import IntegrityError, transaction
-from django.test import TestCase, TransactionTestCase
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.core.exceptions import ValidationError
+from django.core.cache import cache
 
 # models
 from .models import BaseAccount, Founder, Principal, Admin, Teacher, Parent, Student
 from schools.models import School
 from grades.models import Grade
+from subjects.models import Subject
+from classrooms.models import Classroom
+
+# checks
+from accounts.checks import permission_checks
+from accounts.checks.relationships import relationships
+
+# utility functions
+from accounts.context import account_contexts
 
 
 class BaseUserTests(TestCase):
@@ -809,3 +819,93 @@ class ParentTests(TestCase):
             'Could not process your request, only student accounts can be assigned as children to a parent account.',
             error_message
         )
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class RelationshipIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        relationships.local_indexes.clear()
+
+        self.school = School.objects.create(name='Test School', email_address='school@example.com', contact_number='0123456789', type='SECONDARY')
+        self.grade = Grade.objects.create(major_subjects=1, none_major_subjects=2, grade='10', school=self.school)
+        self.subject = Subject.objects.create(subject='MATHEMATICS', major_subject=True, pass_mark=50.00, grade=self.grade, school=self.school)
+
+        self.teacher = Teacher.objects.create(name='John', surname='Doe', email_address='teacher@example.com', role='TEACHER', school=self.school)
+        self.student = Student.objects.create(name='Alice', surname='Wang', id_number='0208285344080', role='STUDENT', grade=self.grade, school=self.school)
+        self.other_student = Student.objects.create(name='Bob', surname='Marly', passport_number='652357849', role='STUDENT', grade=self.grade, school=self.school)
+        self.parent = Parent.objects.create(name='Jane', surname='Wang', email_address='parent@example.com', role='PARENT')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.classroom = Classroom.objects.create(classroom_number='1', group='A', grade=self.grade, subject=self.subject, school=self.school, teacher=self.teacher)
+            self.classroom.update_students(students=[self.student.account_id])
+            self.parent.add_child(self.student)
+
+    def test_checks_answer_from_the_index(self):
+        self.assertIsNone(permission_checks.message(self.teacher, self.student))
+        self.assertIsNotNone(permission_checks.message(self.teacher, self.other_student))
+
+        # the index is built once, every following check is answered without touching the database
+        with self.assertNumQueries(0):
+            self.assertIsNone(permission_checks.message(self.teacher, self.parent))
+            self.assertIsNone(permission_checks.message(self.parent, self.teacher))
+            self.assertIsNone(permission_checks.view_account(self.student, self.parent))
+            self.assertIsNone(permission_checks.view_account(self.parent, self.student))
+            self.assertIsNotNone(permission_checks.view_account(self.parent, self.other_student))
+            self.assertIsNotNone(permission_checks.view_account(self.other_student, self.teacher))
+
+    def test_enrollment_and_parent_link_changes_rebuild_the_index(self):
+        self.assertIsNone(permission_checks.view_account(self.teacher, self.student))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.classroom.update_students(students=[self.student.account_id], remove=True)
+        self.assertIsNotNone(permission_checks.view_account(self.teacher, self.student))
+        self.assertIsNotNone(permission_checks.view_account(self.teacher, self.parent))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.parent.add_child(self.other_student)
+        self.assertIsNone(permission_checks.view_account(self.parent, self.other_student))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class AccountContextTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.school = School.objects.create(name='Test School', email_address='school@example.com', contact_number='0123456789', type='SECONDARY')
+        self.grade = Grade.objects.create(major_subjects=1, none_major_subjects=2, grade='10', school=self.school)
+        self.student = Student.objects.create(name='Alice', surname='Wang', id_number='0208285344080', role='STUDENT', grade=self.grade, school=self.school)
+        self.parent = Parent.objects.create(name='Jane', surname='Wang', email_address='parent@example.com', role='PARENT')
+
+    def test_context_is_served_from_the_cache(self):
+        context = account_contexts.get(self.student.account_id, 'STUDENT')
+
+        self.assertEqual(context.account_pk, self.student.pk)
+        self.assertEqual(context.school_pk, self.school.pk)
+        self.assertEqual(context.grade_pk, self.grade.pk)
+        self.assertTrue(context.school_compliant)
+        self.assertIsNotNone(context.permissions_version)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(account_contexts.get(self.student.account_id, 'STUDENT'), context)
+
+        parent_context = account_contexts.get(self.parent.account_id, 'PARENT')
+        self.assertIsNone(parent_context.school_pk)
+        self.assertIsNone(parent_context.permissions_version)
+
+    def test_updates_invalidate_the_context(self):
+        account_contexts.get(self.student.account_id, 'STUDENT')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.school.none_compliant = True
+            self.school.save()
+        self.assertFalse(account_contexts.get(self.student.account_id, 'STUDENT').school_compliant)
+
+        other_grade = Grade.objects.create(major_subjects=1, none_major_subjects=2, grade='11', school=self.school)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.grade = other_grade
+            self.student.save()
+        self.assertEqual(account_contexts.get(self.student.account_id, 'STUDENT').grade_pk, other_grade.pk)
+
+        with self.assertRaises(Student.DoesNotExist):
+            account_contexts.get('00000000-0000-0000-0000-000000000000', 'STUDENT')
@@ -16,6 +16,9 @@ from accounts.models import Principal, Admin, Teacher, Student, Parent
 # queries
 from seeran_backend.complex_queries import queries
 
+# utility functions
+from seeran_backend.utils import memoize_within_batch
+
 # mappings
 from accounts.mappings import model_mapping, serializer_mappings, attr_mappings
 
@@ -82,6 +85,7 @@ def generate_signed_url(filename, expiration=timedelta(hours=24)):
     return signed_url
 
 
+@memoize_within_batch
 def get_account(account, role):
     try:
         Model = model_mapping.account[role]
@@ -147,6 +151,7 @@ def get_account_and_security_information(account, role):
         return {'error': str(e)}
 
 
+@memoize_within_batch
 def get_account_and_permission_check_attr(account, role):
     try:
         Model = model_mapping.account[role]
@@ -179,6 +184,7 @@ def get_account_and_permission_check_attr(account, role):
         return {'error': str(e)}
 
 
+@memoize_within_batch
 def get_account_and_linked_school(account, role):
     try:
         Model = model_mapping.account[role]
@@ -0,0 +1,90 @@
+# python
+import time
+import random
+from decimal import Decimal, ROUND_HALF_UP
+import numpy as np
+
+# django
+from django.core.management.base import BaseCommand
+
+# utility functions
+from seeran_backend import cohort_statistics
+
+
+def cohort(size):
+    # (score, student_id) rows as values_list returns them, ordered by score
+    scores = sorted(Decimal(random.gauss(62, 15)).quantize(Decimal('0.01')) for _ in range(size))
+    return [(max(min(score, Decimal('100.00')), Decimal('0.00')), student_id) for student_id, score in enumerate(scores, start=1)]
+
+
+def decimal_statistics(rows):
+    """
+    The statistics as the performance models computed them before the cohort statistics module, over Decimals.
+    The average, standard deviation and pass count came from a database aggregate and are left out, the
+    vectorized side computes them too so the comparison favours this side.
+    """
+    student_scores = np.array(rows)
+    scores = student_scores[:, 0]
+
+    percentiles = np.percentile(scores, [Decimal(10), Decimal(25), Decimal(50), Decimal(75), Decimal(90)])
+
+    buckets = {'10th': [], '25th': [], '50th': [], '75th': [], '90th': []}
+    for score, student_id in student_scores:
+        if score <= percentiles[0]:
+            buckets['10th'].append(student_id)
+        elif score <= percentiles[1]:
+            buckets['25th'].append(student_id)
+        elif score <= percentiles[2]:
+            buckets['50th'].append(student_id)
+        elif score <= percentiles[3]:
+            buckets['75th'].append(student_id)
+        else:
+            buckets['90th'].append(student_id)
+
+    percentile_distribution = {label: {'count': len(students), 'students': students} for label, students in buckets.items()}
+
+    median = np.median(scores)
+    unique_scores, counts = np.unique(scores, return_counts=True)
+    mode = unique_scores[np.argmax(counts)]
+    interquartile_range = Decimal(np.percentile(scores, Decimal(75)) - np.percentile(scores, Decimal(25))).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+    return median, mode, interquartile_range, percentile_distribution
+
+
+def vectorized_statistics(rows, pass_mark):
+    statistics = cohort_statistics.describe(rows, pass_mark=pass_mark)
+    return statistics, statistics.percentile_distribution(), [
+        cohort_statistics.to_decimal(value) for value in (statistics.mean, statistics.standard_deviation, statistics.median, statistics.mode, statistics.interquartile_range)
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Compare the Decimal and the vectorized cohort statistics on 1k, 10k and 100k score cohorts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000], help='Number of scores in each cohort')
+        parser.add_argument('--iterations', type=int, default=5, help='Number of rounds per cohort')
+
+    def measure(self, function, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        return (time.perf_counter() - start) / iterations * 1_000
+
+    def handle(self, *args, **options):
+        random.seed(0)
+        pass_mark, iterations = Decimal('50.00'), options['iterations']
+
+        self.stdout.write(f'{iterations} iterations, times in milliseconds per cohort\n')
+        self.stdout.write(f"{'scores':>10}{'decimal':>12}{'vectorized':>12}{'speedup':>10}")
+
+        for size in options['sizes']:
+            rows = cohort(size)
+
+            # both must place every student in the same bucket
+            assert decimal_statistics(rows)[-1] == vectorized_statistics(rows, pass_mark)[1]
+
+            decimal = self.measure(lambda: decimal_statistics(rows), iterations)
+            vectorized = self.measure(lambda: vectorized_statistics(rows, pass_mark), iterations)
+
+            self.stdout.write(f'{size:>10}{decimal:>12.1f}{vectorized:>12.1f}{decimal / vectorized:>9.1f}x')
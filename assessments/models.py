@@ -1,7 +1,6 @@
 # python
 import uuid
 from decimal import Decimal, ROUND_HALF_UP
-import numpy as np
 
 # django 
 from django.db import models, transaction
@@ -12,10 +11,9 @@ from django.apps import apps
 
 # utility functions 
 from accounts import utils as accounts_utilities
-
-# tasks
-from term_subject_performances import tasks as  term_subject_performances_tasks
-from classroom_performances import tasks as  classroom_performances_tasks
+from seeran_backend import cohort_statistics
+from assessments import window_statistics
+from seeran_backend.analytics_pipeline import AnalyticsRun
 
 
 batch_size = 20
@@ -335,13 +333,8 @@ class Assessment(models.Model):
 
         self.save()
 
-        accessed_students = (self.classroom.students if self.classroom else self.grade.students)
-        for student in accessed_students.all():
-            performance, created = student.subject_performances.get_or_create(subject=self.subject, term=self.term, defaults={'grade':self.grade, 'school':self.school})
-            performance.update_performance_metrics()
-        
-        self.update_performance_metrics()
-        # assessments_tasks.update_assessment_performance_metrics_task.delay(assessment_id=self.id)
+        # Recompute the assessment's metrics and everything depending on them, down to the progress reports, in one pipeline run
+        transaction.on_commit(lambda: AnalyticsRun({'assessment': [self.id]}).execute())
         print(f'grades released successfully')
 
     @transaction.atomic
@@ -365,125 +358,58 @@ class Assessment(models.Model):
         submission_count = self.submissions.exclude(models.Q(status='NOT_SUBMITTED') | models.Q(status='EXCUSED')).count()
         self.completion_rate = (submission_count / accessed_students_count) * 100
 
-        transcript_data = transcripts.aggregate(
-            avg_score=models.Avg('percent_score'),
-            passed_students=models.Count('id', filter=models.Q(percent_score__gte=self.subject.pass_mark)),
-            highest=models.Max('percent_score'),
-            lowest=models.Min('percent_score'),
-            stddev=models.StdDev('percent_score'),
-        )
+        # On Postgres the statistics, transcript percentiles, top performers and failed students are all computed and written in the database
+        computed_in_database = window_statistics.in_database()
+
+        # Compute the score statistics and percentile buckets of the submitted transcripts in one pass
+        if computed_in_database:
+            statistics = window_statistics.describe_assessment(self)
+        else:
+            statistics = cohort_statistics.describe(
+                transcripts.filter(percent_score__isnull=False).order_by('percent_score').values_list('percent_score', 'student_id'), pass_mark=self.subject.pass_mark
+            )
+
+        if statistics is None:
+            self.standard_deviation = self.interquartile_range = self.mode_score = None
+            self.pass_rate = self.failure_rate = None
+            return
 
         # Calculate pass rate and failure rate
-        self.pass_rate = (transcript_data['passed_students'] / accessed_students_count) * 100
+        self.pass_rate = (statistics.passed / accessed_students_count) * 100
         self.failure_rate = 100 - self.pass_rate
 
-        self.average_score = transcript_data['avg_score']
-        self.highest_score = transcript_data['highest']
-        self.lowest_score = transcript_data['lowest']
-        self.standard_deviation = transcript_data['stddev']
-
-        # Retrieve all scores and the associated student for the assessment
-        student_scores = np.array(transcripts.order_by('percent_score').values_list('percent_score', 'student_id'))
-        # Extract weighted scores for all students
-        scores = student_scores[:, 0]  # Extract the first column (weighted_score)
-
-        # Calculate percentile boundaries
-        percentiles = np.percentile(scores, [Decimal(10), Decimal(25), Decimal(50), Decimal(75), Decimal(90)])
-
-        # Create empty lists for student IDs based on percentile ranges
-        students_in_10th_percentile = []
-        students_in_25th_percentile = []
-        students_in_50th_percentile = []
-        students_in_75th_percentile = []
-        students_in_90th_percentile = []
-
-        # Assign students to percentiles based on their weighted score
-        for weighted_score, student_id in student_scores:
-            if weighted_score <= percentiles[0]:
-                students_in_10th_percentile.append(student_id)
-            elif weighted_score <= percentiles[1]:
-                students_in_25th_percentile.append(student_id)
-            elif weighted_score <= percentiles[2]:
-                students_in_50th_percentile.append(student_id)
-            elif weighted_score <= percentiles[3]:
-                students_in_75th_percentile.append(student_id)
-            else:
-                students_in_90th_percentile.append(student_id)
+        self.average_score = cohort_statistics.to_decimal(statistics.mean)
+        self.highest_score = cohort_statistics.to_decimal(statistics.highest)
+        self.lowest_score = cohort_statistics.to_decimal(statistics.lowest)
+        self.standard_deviation = cohort_statistics.to_decimal(statistics.standard_deviation)
+        self.median_score = cohort_statistics.to_decimal(statistics.median)
+        self.mode_score = cohort_statistics.to_decimal(statistics.mode)
+        self.interquartile_range = cohort_statistics.to_decimal(statistics.interquartile_range)
 
         # Store the percentile distribution
-        self.percentile_distribution = {
-            '10th': {'count': len(students_in_10th_percentile), 'students': students_in_10th_percentile},
-            '25th': {'count': len(students_in_25th_percentile), 'students': students_in_25th_percentile},
-            '50th': {'count': len(students_in_50th_percentile), 'students': students_in_50th_percentile},
-            '75th': {'count': len(students_in_75th_percentile), 'students': students_in_75th_percentile},
-            '90th': {'count': len(students_in_90th_percentile), 'students': students_in_90th_percentile},
-        }
-
-        # Get the Transcript model dynamically
-        Transcript = apps.get_model('assessment_transcripts', 'AssessmentTranscript')
-
-        # Create a dictionary mapping student IDs to percentiles
-        student_to_percentile = {}
-
-        for student_id in students_in_10th_percentile:
-            student_to_percentile[student_id] = Decimal(10.0)
-        for student_id in students_in_25th_percentile:
-            student_to_percentile[student_id] = Decimal(25.0)
-        for student_id in students_in_50th_percentile:
-            student_to_percentile[student_id] = Decimal(50.0)
-        for student_id in students_in_75th_percentile:
-            student_to_percentile[student_id] = Decimal(75.0)
-        for student_id in students_in_90th_percentile:
-            student_to_percentile[student_id] = Decimal(90.0)
-        
-        # Update each transcript with the calculated percentile
-        transcripts_to_update = []
-        for transcript in transcripts.all():
-            student_id = transcript.student_id
-            if student_id in student_to_percentile:
-                transcript.percentile = student_to_percentile[student_id].quantize(Decimal('0.01'))
-            else:
-                transcript.percentile = Decimal(0.0)  # If no percentile found, set to 0.0
-            transcripts_to_update.append(transcript)
-
-        # Batch update the transcripts
-        for i in range(0, len(transcripts_to_update), batch_size):
-            Transcript.objects.bulk_update(transcripts_to_update[i:i + batch_size], ['percentile'])
-
-        # Calculate median score, standard deviation, and interquartile range (IQR)
-        self.median_score = np.median(scores)
-
-        # Calculate the mode score (most common score)
-        unique_scores, counts = np.unique(scores, return_counts=True)
-        self.mode_score = unique_scores[np.argmax(counts)]
-
-        # Interquartile range (IQR)
-        q1 = np.percentile(scores, Decimal(25))
-        q3 = np.percentile(scores, Decimal(75))
-        self.interquartile_range = Decimal(q3 - q1).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-
-        # Top 5 performers
-        top_performers_count = 3
-        top_performers = transcripts.filter(percent_score__gte=self.subject.pass_mark).order_by('-percent_score').values_list('student_id', flat=True)[:top_performers_count]
-        if top_performers.exists():
-            self.top_performers.set(top_performers)
-
-        # Students Who Failed The Assessment
-        students_who_failed_the_assessment = transcripts.filter(percent_score__lt=self.subject.pass_mark).values_list('student_id', flat=True)
-        if students_who_failed_the_assessment.exists():
-            self.students_who_failed_the_assessment.set(students_who_failed_the_assessment)
+        self.percentile_distribution = statistics.percentile_distribution()
+
+        # The NumPy engine writes the percentiles, top performers and failed students from the app server
+        if not computed_in_database:
+            # Update the transcripts with their percentile, one update per bucket, transcripts without a score get 0
+            transcripts.filter(percent_score__isnull=True).update(percentile=Decimal('0.00'))
+            for percentile, student_ids in statistics.students_per_percentile().items():
+                if student_ids:
+                    transcripts.filter(student_id__in=student_ids).update(percentile=Decimal(percentile).quantize(Decimal('0.01')))
+
+            # Top 5 performers
+            top_performers = transcripts.filter(percent_score__gte=self.subject.pass_mark).order_by('-percent_score').values_list('student_id', flat=True)[:window_statistics.TOP_PERFORMERS_COUNT]
+            if top_performers.exists():
+                self.top_performers.set(top_performers)
+
+            # Students Who Failed The Assessment
+            students_who_failed_the_assessment = transcripts.filter(percent_score__lt=self.subject.pass_mark).values_list('student_id', flat=True)
+            if students_who_failed_the_assessment.exists():
+                self.students_who_failed_the_assessment.set(students_who_failed_the_assessment)
 
         self.save()
-        
-        if self.classroom:
-            classroom_performance, created = self.classroom.classroom_performances.get_or_create(term=self.term, defaults={'school': self.school})
-            classroom_performances_tasks.update_classroom_performance_metrics_task.delay(classroom_performance_id=classroom_performance.id)
-            # classroom_performance.update_performance_metrics() # for testing purposes
-        else:
-            term_performance, created = self.subject.termly_performances.get_or_create(term=self.term, defaults={'school': self.school})
-            term_subject_performances_tasks.update_term_performance_metrics_task.delay(term_performance_id=term_performance.id)
-            # term_performance.update_performance_metrics() # for testing purposes
-        
+
+        # the student subject, classroom and term performances that depend on this assessment are recomputed after it by the analytics pipeline
         print(f'assessment performance metrics calculated successfully')
 
 
@@ -544,7 +470,7 @@ class Assessment(models.Model):
             The average score represents the mean score of all students who participated in the assessment.
         Derivation:
             Average Score = Sum of all scores / Total number of students
-            This is calculated using Django's Avg function.
+            This is calculated with NumPy's mean, alongside the other score statistics in seeran_backend.cohort_statistics.
         Significance:
             The average score provides an overall sense of how well the group performed as a whole. It is a useful metric for
             comparing the difficulty of different assessments over time and for understanding the general level of student achievement.
@@ -3,7 +3,7 @@ from datetime import date
 from decimal import Decimal
 
 # django
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
@@ -18,6 +18,9 @@ from classrooms.models import Classroom
 from assessment_submissions.models import AssessmentSubmission
 from assessment_transcripts.models import AssessmentTranscript
 
+# utility functions
+from seeran_backend import cohort_statistics
+
 
 class AssessmentTest(TestCase):
     """
@@ -375,3 +378,87 @@ class AssessmentTest(TestCase):
         self.assertIsNotNone(assessment_a.pass_rate)
         self.assertIsNotNone(assessment_a.average_score)
 
+
+class CohortStatisticsTest(TestCase):
+    """
+    Test cases for the cohort statistics shared by the assessment, classroom and term performance metrics.
+    """
+
+    def test_statistics_and_percentile_buckets(self):
+        rows = [(Decimal(score), student_id) for student_id, score in enumerate(['20.00', '40.00', '40.00', '55.50', '60.00', '70.00', '80.00', '95.00'], start=1)]
+        statistics = cohort_statistics.describe(rows, pass_mark=Decimal('50.00'))
+
+        self.assertEqual((statistics.count, statistics.passed), (8, 5))
+        self.assertEqual(cohort_statistics.to_decimal(statistics.mean), Decimal('57.56'))
+        self.assertEqual(cohort_statistics.to_decimal(statistics.median), Decimal('57.75'))
+        self.assertEqual(cohort_statistics.to_decimal(statistics.mode), Decimal('40.00'))
+        self.assertEqual(cohort_statistics.to_decimal(statistics.interquartile_range), Decimal('32.50'))
+        self.assertEqual(cohort_statistics.to_decimal(statistics.standard_deviation), Decimal('22.63'))
+
+        # a score equal to a cut point stays in that cut point's bucket, as the if/elif chain it replaces did
+        cut_points = statistics.cut_points
+        expected = {'10th': [], '25th': [], '50th': [], '75th': [], '90th': []}
+        for score, student_id in rows:
+            label = next((label for label, cut_point in zip(expected, cut_points[:-1]) if float(score) <= cut_point), '90th')
+            expected[label].append(student_id)
+
+        self.assertEqual(statistics.percentile_distribution(), {label: {'count': len(students), 'students': students} for label, students in expected.items()})
+
+    def test_empty_cohort(self):
+        self.assertIsNone(cohort_statistics.describe([]))
+
+
+class WindowStatisticsTest(TestCase):
+    """
+    Test cases for the engine computing assessment statistics inside the database, which falls back to NumPy off Postgres.
+    """
+
+    def setUp(self):
+        self.school = School.objects.create(
+            name='Test School', email_address='secondaryschool@example.com', contact_number='0123456789', student_count=130, teacher_count=24, admin_count=19,
+            type='SECONDARY', province='GAUTENG', district='GAUTENG WEST', grading_system='A-F Grading', library_details='Well-stocked library',
+            laboratory_details='State-of-the-art labs', sports_facilities='Football field', operating_hours='07:45-14:00', location='456 INNER St', website='https://secondaryschool.com',
+        )
+        self.grade = Grade.objects.create(major_subjects=1, none_major_subjects=2, grade='10', school=self.school)
+        self.subject = Subject.objects.create(subject='MATHEMATICS', major_subject=True, pass_mark=Decimal('50.00'), grade=self.grade, school=self.school)
+        self.term = Term.objects.create(term_name='Term 1', weight=Decimal('20.00'), start_date=date(2024, 1, 15), end_date=date(2024, 4, 10), grade=self.grade, school=self.school)
+
+        self.assessment = Assessment.objects.bulk_create([Assessment(
+            title='Midterm Exam', dead_line=timezone.now(), total=Decimal('100.00'), formal=True, percentage_towards_term_mark=Decimal('30.00'), grades_released=True,
+            term=self.term, subject=self.subject, grade=self.grade, school=self.school
+        )])[0]
+
+        for index, percent_score in enumerate(['20.00', '40.00', '40.00', '55.50', '60.00', '70.00', '80.00', '95.00']):
+            student = Student.objects.create(name=f'Student {index}', surname='Wang', passport_number=f'6523578{index:02d}', role='STUDENT', grade=self.grade, school=self.school)
+            AssessmentSubmission.objects.bulk_create([AssessmentSubmission(assessment=self.assessment, student=student, status='ON_TIME')])
+            AssessmentTranscript.objects.bulk_create([AssessmentTranscript(
+                assessment=self.assessment, student=student, score=0, weighted_score=0, percent_score=Decimal(percent_score), school=self.school, comment=''
+            )])
+
+    def metrics(self, engine):
+        AssessmentTranscript.objects.update(percentile=None)
+        self.assessment.top_performers.clear()
+        self.assessment.students_who_failed_the_assessment.clear()
+
+        with override_settings(COHORT_STATISTICS_ENGINE=engine):
+            assessment = Assessment.objects.get(id=self.assessment.id)
+            assessment.update_performance_metrics()
+
+        assessment.refresh_from_db()
+        return (
+            [getattr(assessment, field) for field in ('pass_rate', 'average_score', 'highest_score', 'lowest_score', 'median_score', 'mode_score', 'standard_deviation', 'interquartile_range')],
+            assessment.percentile_distribution,
+            dict(AssessmentTranscript.objects.values_list('student_id', 'percentile')),
+            set(assessment.top_performers.values_list('id', flat=True)),
+            set(assessment.students_who_failed_the_assessment.values_list('id', flat=True)),
+        )
+
+    def test_database_and_numpy_engines_agree(self):
+        numpy_metrics = self.metrics('numpy')
+        self.assertEqual(numpy_metrics, self.metrics('database'))
+
+        statistics, distribution, percentiles, top_performers, failed = numpy_metrics
+        self.assertEqual(statistics[1:], [Decimal('57.56'), Decimal('95.00'), Decimal('20.00'), Decimal('57.75'), Decimal('40.00'), Decimal('22.63'), Decimal('32.50')])
+        self.assertEqual([distribution[label]['count'] for label in ('10th', '25th', '50th', '75th', '90th')], [1, 2, 1, 2, 2])
+        self.assertEqual(sorted(percentiles.values()), [Decimal('10.00'), Decimal('25.00'), Decimal('25.00'), Decimal('50.00'), Decimal('75.00'), Decimal('75.00'), Decimal('90.00'), Decimal('90.00')])
+        self.assertEqual((len(top_performers), len(failed)), (3, 3))
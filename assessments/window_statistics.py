@@ -0,0 +1,118 @@
+# python
+import numpy as np
+
+# django
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+
+# utility functions
+from seeran_backend.cohort_statistics import CohortStatistics, PERCENTILES
+
+
+# the number of students kept as an assessment's top performers
+TOP_PERFORMERS_COUNT = 3
+
+
+def in_database():
+    """
+    Whether assessment statistics are computed inside the database, only Postgres has the ordered-set aggregates
+    the engine relies on, other databases fall back to the NumPy engine.
+    """
+    return settings.COHORT_STATISTICS_ENGINE == 'database' and connection.vendor == 'postgresql'
+
+
+def statistics_sql():
+    # models
+    AssessmentTranscript = apps.get_model('assessment_transcripts', 'AssessmentTranscript')
+    Assessment = apps.get_model('assessments', 'Assessment')
+
+    quote = connection.ops.quote_name
+    transcripts = quote(AssessmentTranscript._meta.db_table)
+
+    top_performers = Assessment._meta.get_field('top_performers')
+    failed = Assessment._meta.get_field('students_who_failed_the_assessment')
+
+    # a score equal to a cut point stays in that cut point's bucket, as with `np.searchsorted(side='left')`
+    buckets = ' '.join(f'WHEN score <= cut_points[{index + 1}] THEN {index}' for index in range(len(PERCENTILES) - 1))
+    percentiles = ' '.join(f'WHEN {index} THEN {percentile}' for index, percentile in enumerate(PERCENTILES))
+    fractions = ', '.join(str(percentile / 100) for percentile in PERCENTILES)
+
+    def replace_students(name, field, students):
+        # drops the students no longer in the relation and adds the new ones, without reading either back
+        table, assessment_column, student_column = quote(field.m2m_db_table()), quote(field.m2m_column_name()), quote(field.m2m_reverse_name())
+        return f"""
+            {name}_stale AS (
+                DELETE FROM {table} WHERE {assessment_column} = %(assessment)s AND {student_column} NOT IN ({students})
+            ),
+            {name}_new AS (
+                INSERT INTO {table} ({assessment_column}, {student_column}) SELECT %(assessment)s, student_id FROM ({students}) AS students ON CONFLICT DO NOTHING
+            )"""
+
+    return f"""
+        WITH cohort AS (
+            SELECT id, student_id, percent_score::float8 AS score FROM {transcripts} WHERE assessment_id = %(assessment)s AND percent_score IS NOT NULL
+        ),
+        statistics AS (
+            SELECT
+                count(*) AS count,
+                avg(score) AS mean,
+                percentile_cont(0.5) WITHIN GROUP (ORDER BY score) AS median,
+                mode() WITHIN GROUP (ORDER BY score) AS mode,
+                stddev_pop(score) AS standard_deviation,
+                max(score) AS highest,
+                min(score) AS lowest,
+                count(*) FILTER (WHERE score >= %(pass_mark)s) AS passed,
+                percentile_cont(ARRAY[{fractions}]) WITHIN GROUP (ORDER BY score) AS cut_points
+            FROM cohort
+        ),
+        ranked AS (
+            SELECT cohort.id, cohort.student_id, cohort.score, CASE {buckets} ELSE {len(PERCENTILES) - 1} END AS bucket FROM cohort, statistics
+        ),
+        percentiles AS (
+            UPDATE {transcripts} SET percentile = CASE ranked.bucket {percentiles} END FROM ranked WHERE {transcripts}.id = ranked.id
+        ),
+        unscored AS (
+            UPDATE {transcripts} SET percentile = 0 WHERE assessment_id = %(assessment)s AND percent_score IS NULL
+        ),{replace_students('top_performers', top_performers, f'SELECT student_id FROM cohort WHERE score >= %(pass_mark)s ORDER BY score DESC, student_id LIMIT {TOP_PERFORMERS_COUNT}')},{replace_students('failed', failed, 'SELECT student_id FROM cohort WHERE score < %(pass_mark)s')}
+        SELECT
+            statistics.*,
+            (SELECT coalesce(array_agg(bucket ORDER BY score, student_id), '{{}}') FROM ranked),
+            (SELECT coalesce(array_agg(student_id ORDER BY score, student_id), '{{}}') FROM ranked)
+        FROM statistics
+    """
+
+
+def describe_assessment(assessment):
+    """
+    Computes an assessment's statistics inside Postgres in a single statement, which also writes every transcript's
+    percentile with one `UPDATE ... FROM` and replaces the top performers and failed students, so the transcripts
+    never round-trip through the app server. Only the bucket of each student comes back, for the percentile distribution.
+
+    Args:
+        assessment (Assessment): The assessment, with its grades released.
+
+    Returns:
+        CohortStatistics: The statistics of the assessment's scored transcripts, None if none is scored.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(statistics_sql(), {'assessment': assessment.id, 'pass_mark': assessment.subject.pass_mark})
+        count, mean, median, mode, standard_deviation, highest, lowest, passed, cut_points, buckets, student_ids = cursor.fetchone()
+
+    if not count:
+        return None
+
+    return CohortStatistics(
+        count=count,
+        mean=float(mean),
+        median=median,
+        mode=mode,
+        standard_deviation=float(standard_deviation),
+        highest=highest,
+        lowest=lowest,
+        interquartile_range=cut_points[PERCENTILES.index(75)] - cut_points[PERCENTILES.index(25)],
+        passed=passed,
+        cut_points=np.array(cut_points, dtype=np.float64),
+        buckets=np.array(buckets, dtype=np.int64),
+        student_ids=np.array(student_ids, dtype=np.int64),
+    )
@@ -1,20 +1,14 @@
-# python 
-import time
-
-# settings
-from django.conf import settings
-
 # django
-from django.utils import timezone
 from django.http import JsonResponse
-from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
 
 # rest framework
 from rest_framework import status
-from rest_framework_simplejwt.tokens import AccessToken
 
 # utility functions 
 from authentication import utils as authentication_utilities
+from account_access_tokens.write_behind import session_writes
+from authentication.pipeline import authenticate, AuthenticationFailed, TOKEN_MISSING, TOKEN_INVALID, TOKEN_REVOKED, ACCOUNT_MISSING
 
 # models
 from accounts.models import BaseAccount
@@ -26,46 +20,32 @@ import logging
 # emails_logger = logging.getLogger('emails_logger')
 
 
+# responses to requests the pipeline turns away
+authentication_errors = {
+    TOKEN_MISSING: ('Request not authenticated.. access denied', status.HTTP_401_UNAUTHORIZED),
+    TOKEN_INVALID: ('Invalid security credentials.. request revoked', status.HTTP_400_BAD_REQUEST),
+    TOKEN_REVOKED: ('The provided access token has been blacklisted.. request revoked', status.HTTP_400_BAD_REQUEST),
+    ACCOUNT_MISSING: ('Could not process your request, an account with the provided access credentials does not exist.. request revoked', status.HTTP_401_UNAUTHORIZED),
+}
+
+
 def token_required(view_func):
     def _wrapped_view_func(request, *args, **kwargs):
         try:
-            # Get access token from cookies
-            access_token = request.COOKIES.get('access_token')
-            if not access_token:
-                return authentication_utilities.remove_authorization_cookies(JsonResponse(
-                    {'error': 'Request not authenticated.. access denied'},
-                    status=status.HTTP_401_UNAUTHORIZED
-                ))
-
-            # Check if the token is blacklisted
-            if cache.get(access_token):
-                return authentication_utilities.remove_authorization_cookies(JsonResponse(
-                    {'error': 'The provided access token has been blacklisted.. request revoked'},
-                    status=status.HTTP_400_BAD_REQUEST
-                ))
-
-            # Decode and verify the access token
-            verified_access_token = authentication_utilities.validate_access_token(access_token)
-        
-            if verified_access_token == None:
-                return authentication_utilities.remove_authorization_cookies(JsonResponse(
-                    {'error': 'Invalid security credentials.. request revoked'},
-                    status=status.HTTP_400_BAD_REQUEST
-                ))
+            # Verify and decode the access token from the cookies, and resolve its account
+            try:
+                authentication = authenticate(request.COOKIES.get('access_token'))
 
-            # Calculate remaining lifespan of the token
-            decoded_token = AccessToken(verified_access_token)
+            except AuthenticationFailed as e:
+                error, status_code = authentication_errors[e.reason]
+                return authentication_utilities.remove_authorization_cookies(JsonResponse({'error': error}, status=status_code))
 
-            # Retrieve and set the authenticated user
-            try:
-                requesting_account = BaseAccount.objects.get(pk=decoded_token['user_id'])
-                request.user = requesting_account
+            # the account is only loaded if the view reads more than the authentication carries
+            request.user = SimpleLazyObject(lambda: BaseAccount.objects.get(pk=authentication.account_pk))
+            request.authentication = authentication
 
-            except BaseAccount.DoesNotExist:
-                return authentication_utilities.remove_authorization_cookies(JsonResponse(
-                    {'error': 'Could not process your request, an account with the provided access credentials does not exist.. request revoked'},
-                    status=status.HTTP_401_UNAUTHORIZED
-                ))
+            # the browser's last used timestamp is written to the database with the next flush
+            session_writes.touch(authentication.access_token)
 
             # Proceed to the view
             return view_func(request, *args, **kwargs)
@@ -76,7 +56,3 @@ def token_required(view_func):
             return JsonResponse({'error': 'Could not process your request, an unexpected error occurred while trying to authenticate your access credentails. Error:' + str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     return _wrapped_view_func
-
-
-
-
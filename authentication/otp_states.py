@@ -0,0 +1,190 @@
+# python
+import hmac
+import time
+import hashlib
+import secrets
+
+# django
+from django.conf import settings
+from django.core.cache import cache
+
+# redis
+from django_redis import get_redis_connection
+
+
+# verification outcomes
+OTP_VERIFIED = 'verified'
+OTP_EXPIRED = 'expired'
+OTP_INCORRECT = 'incorrect'
+OTP_EXHAUSTED = 'exhausted'
+OTP_UNAUTHORIZED = 'unauthorized'
+
+
+# checks a state's OTP and authorization OTP in one atomic step on the redis server. A wrong OTP spends one of
+# the state's attempts (the state is discarded once none are left), a wrong authorization OTP discards the state
+# and a verified state is discarded when asked to consume it. Returns the outcome and the attempts remaining.
+VERIFY_SCRIPT = """
+local state = redis.call('HMGET', KEYS[1], 'otp', 'authorization', 'attempts')
+if not state[2] then
+    return {'expired', 0}
+end
+
+if ARGV[1] ~= '' and state[1] ~= ARGV[1] then
+    local attempts = tonumber(state[3])
+    if attempts > 0 then
+        redis.call('HINCRBY', KEYS[1], 'attempts', -1)
+        return {'incorrect', attempts - 1}
+    end
+
+    redis.call('DEL', KEYS[1])
+    return {'exhausted', 0}
+end
+
+if state[2] ~= ARGV[2] then
+    redis.call('DEL', KEYS[1])
+    return {'unauthorized', 0}
+end
+
+if ARGV[3] == '1' then
+    redis.call('DEL', KEYS[1])
+end
+
+return {'verified', 0}
+"""
+
+
+def new_otp():
+    return str(secrets.randbelow(900000) + 100000)
+
+
+class OTPStates:
+    """
+    One state per (email address, flow) for the One Time Passcode flows of the authentication views.
+
+    A state holds the digest of the OTP emailed to the account (when the flow sends one), the digest of the
+    authorization OTP set as a cookie, and the OTP attempts left, in a single Redis hash with the state's
+    lifespan. Digests are HMACs keyed with the secret key and bound to the state, so they are computed before
+    reaching the cache and a verification, attempts included, is a single round trip running `VERIFY_SCRIPT`.
+    Other cache backends keep the state as one cache entry, checked without the atomicity.
+    """
+
+    prefix = 'otp_state_'
+    attempts = 3
+
+    def __init__(self):
+        self.script = None
+
+    @property
+    def connection(self):
+        try:
+            return get_redis_connection('default')
+        except NotImplementedError:
+            return None
+
+    def key(self, email_address, flow):
+        return f'{self.prefix}{flow}_{email_address}'
+
+    def digest(self, key, field, otp):
+        return hmac.new(settings.SECRET_KEY.encode(), f'{key}:{field}:{otp}'.encode(), hashlib.sha256).hexdigest()
+
+    def issue(self, email_address, flow, otp=None, timeout=300):
+        """
+        Starts a flow for an email address, replacing any state the flow had for it.
+
+        Args:
+            email_address (str): The email address the flow is for.
+            flow (str): The name of the flow, e.g. 'login'.
+            otp (str): The OTP emailed to the account, None for flows only authorized by cookie.
+            timeout (int): The lifespan of the state in seconds.
+
+        Returns:
+            str: The authorization OTP to set as a cookie.
+        """
+        key = self.key(email_address, flow)
+        authorization_otp = new_otp()
+
+        state = {'authorization': self.digest(key, 'authorization', authorization_otp), 'attempts': self.attempts}
+        if otp is not None:
+            state['otp'] = self.digest(key, 'otp', otp)
+
+        connection = self.connection
+        if connection is not None:
+            pipeline = connection.pipeline()
+            pipeline.delete(key)
+            pipeline.hset(key, mapping=state)
+            pipeline.expire(key, timeout)
+            pipeline.execute()
+        else:
+            state['expires'] = time.time() + timeout
+            cache.set(key, state, timeout=timeout)
+
+        return authorization_otp
+
+    def verify(self, email_address, flow, authorization_otp, otp=None, consume=True):
+        """
+        Verifies the OTP (if given) and the authorization OTP of a flow.
+
+        Args:
+            email_address (str): The email address the flow is for.
+            flow (str): The name of the flow.
+            authorization_otp (str): The authorization OTP from the request's cookies.
+            otp (str): The OTP from the request, None for flows only authorized by cookie.
+            consume (bool): Whether a verified state is discarded.
+
+        Returns:
+            tuple: The outcome, one of the OTP_ constants, and the OTP attempts remaining.
+        """
+        key = self.key(email_address, flow)
+
+        otp_digest = self.digest(key, 'otp', otp) if otp is not None else ''
+        authorization_digest = self.digest(key, 'authorization', authorization_otp or '')
+
+        connection = self.connection
+        if connection is not None:
+            if self.script is None:
+                self.script = connection.register_script(VERIFY_SCRIPT)
+
+            outcome, attempts = self.script(keys=[key], args=[otp_digest, authorization_digest, int(consume)])
+            return outcome.decode(), attempts
+
+        return self.verify_state(key, otp_digest, authorization_digest, consume)
+
+    def verify_state(self, key, otp_digest, authorization_digest, consume):
+        # VERIFY_SCRIPT for cache backends other than redis
+        state = cache.get(key)
+        if state is None:
+            return OTP_EXPIRED, 0
+
+        if otp_digest and state.get('otp') != otp_digest:
+            if state['attempts'] > 0:
+                state['attempts'] -= 1
+                cache.set(key, state, timeout=max(state['expires'] - time.time(), 1))
+                return OTP_INCORRECT, state['attempts']
+
+            cache.delete(key)
+            return OTP_EXHAUSTED, 0
+
+        if state['authorization'] != authorization_digest:
+            cache.delete(key)
+            return OTP_UNAUTHORIZED, 0
+
+        if consume:
+            cache.delete(key)
+
+        return OTP_VERIFIED, 0
+
+    def discard(self, email_address, flow):
+        """
+        Discards the state of a flow.
+        """
+        cache_key = self.key(email_address, flow)
+
+        connection = self.connection
+        if connection is not None:
+            connection.delete(cache_key)
+        else:
+            cache.delete(cache_key)
+
+
+# Initialize the OTPStates instance
+otp_states = OTPStates()
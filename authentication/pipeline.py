@@ -0,0 +1,84 @@
+# python
+from typing import NamedTuple
+
+# simple jwt
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.exceptions import TokenError
+
+# models
+from accounts.models import BaseAccount
+
+# utility functions
+from accounts.context import account_contexts
+from account_access_tokens.revocation import token_revocations
+
+
+# reasons an access token is turned away
+TOKEN_MISSING = 'missing'
+TOKEN_INVALID = 'invalid'
+TOKEN_REVOKED = 'revoked'
+ACCOUNT_MISSING = 'account_missing'
+
+
+class AuthenticationFailed(Exception):
+    """
+    Raised by `authenticate` when a request can not be authenticated, `reason` is one of the constants above
+    so the HTTP and websocket paths can each answer with their own response.
+    """
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class Authentication(NamedTuple):
+    """
+    The outcome of authenticating a request.
+
+    Attributes:
+        account_pk (int): The primary key of the account.
+        account_id (str): The public account ID.
+        role (str): The account role.
+        access_token (str): The encoded access token.
+        token (AccessToken): The verified and decoded access token.
+    """
+    account_pk: int
+    account_id: str
+    role: str
+    access_token: str
+    token: AccessToken
+
+
+def authenticate(access_token):
+    """
+    Authenticates an access token taken from the request's cookies, shared by `token_required` and the websocket middleware.
+
+    The token is verified and decoded once, revocation is answered from this process unless it might be revoked,
+    and the account is resolved from its cached identity, so an authenticated request costs no database query.
+
+    Args:
+        access_token (str): The access token cookie, None if the request carried none.
+
+    Returns:
+        Authentication: The authenticated account and its token.
+
+    Raises:
+        AuthenticationFailed: If the token is missing, invalid or expired, revoked, or its account no longer exists.
+    """
+    if not access_token:
+        raise AuthenticationFailed(TOKEN_MISSING)
+
+    try:
+        token = AccessToken(access_token)
+    except TokenError:
+        raise AuthenticationFailed(TOKEN_INVALID)
+
+    if token_revocations.is_revoked(token):
+        raise AuthenticationFailed(TOKEN_REVOKED)
+
+    try:
+        account_id, role = account_contexts.identify(token['user_id'])
+    except BaseAccount.DoesNotExist:
+        raise AuthenticationFailed(ACCOUNT_MISSING)
+
+    return Authentication(token['user_id'], account_id, role, access_token, token)
@@ -1,3 +1,106 @@
-from django.test import TestCase
+# asgiref
+from asgiref.sync import async_to_sync
 
-# Create your tests here.
+# django
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+
+# simple jwt
+from rest_framework_simplejwt.tokens import AccessToken
+
+# models
+from accounts.models import Founder
+
+# middleware
+from seeran_backend.middleware import WebsocketTokenAuthenticationMiddleware
+
+# utility functions
+from authentication.otp_states import otp_states, OTP_VERIFIED, OTP_EXPIRED, OTP_INCORRECT, OTP_EXHAUSTED, OTP_UNAUTHORIZED
+from authentication.pipeline import authenticate, AuthenticationFailed, TOKEN_MISSING, TOKEN_INVALID, TOKEN_REVOKED, ACCOUNT_MISSING
+from account_access_tokens.revocation import token_revocations
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class OTPStatesTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.email_address = 'john.doe@example.com'
+
+    def test_verifying_consumes_the_state(self):
+        authorization_otp = otp_states.issue(self.email_address, 'login', otp='123456')
+
+        self.assertEqual(otp_states.verify(self.email_address, 'login', authorization_otp, otp='123456'), (OTP_VERIFIED, 0))
+        self.assertEqual(otp_states.verify(self.email_address, 'login', authorization_otp, otp='123456')[0], OTP_EXPIRED)
+
+    def test_incorrect_otps_spend_the_attempts(self):
+        authorization_otp = otp_states.issue(self.email_address, 'login', otp='123456')
+
+        for remaining in (2, 1, 0):
+            self.assertEqual(otp_states.verify(self.email_address, 'login', authorization_otp, otp='654321'), (OTP_INCORRECT, remaining))
+
+        self.assertEqual(otp_states.verify(self.email_address, 'login', authorization_otp, otp='654321')[0], OTP_EXHAUSTED)
+        self.assertEqual(otp_states.verify(self.email_address, 'login', authorization_otp, otp='123456')[0], OTP_EXPIRED)
+
+    def test_incorrect_authorization_discards_the_state(self):
+        authorization_otp = otp_states.issue(self.email_address, 'reset_credentials')
+
+        self.assertEqual(otp_states.verify(self.email_address, 'reset_credentials', 'wrong', consume=False)[0], OTP_UNAUTHORIZED)
+        self.assertEqual(otp_states.verify(self.email_address, 'reset_credentials', authorization_otp)[0], OTP_EXPIRED)
+
+    def test_flows_are_kept_apart(self):
+        authorization_otp = otp_states.issue(self.email_address, 'activate_account')
+
+        self.assertEqual(otp_states.verify(self.email_address, 'activate_account', authorization_otp, consume=False)[0], OTP_VERIFIED)
+        self.assertEqual(otp_states.verify(self.email_address, 'reset_credentials', authorization_otp)[0], OTP_EXPIRED)
+
+        otp_states.discard(self.email_address, 'activate_account')
+        self.assertEqual(otp_states.verify(self.email_address, 'activate_account', authorization_otp)[0], OTP_EXPIRED)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class AuthenticationPipelineTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.account = Founder.objects.create(name='John', surname='Doe', email_address='john.doe@example.com', role='FOUNDER')
+        self.access_token = str(AccessToken.for_user(self.account))
+
+    def assertFails(self, access_token, reason):
+        with self.assertRaises(AuthenticationFailed) as failure:
+            authenticate(access_token)
+
+        self.assertEqual(failure.exception.reason, reason)
+
+    def test_authenticated_account_is_served_from_the_cache(self):
+        authenticate(self.access_token)
+
+        with self.assertNumQueries(0):
+            authentication = authenticate(self.access_token)
+
+        self.assertEqual((authentication.account_pk, authentication.account_id, authentication.role), (self.account.pk, str(self.account.account_id), 'FOUNDER'))
+
+    def test_turned_away_tokens(self):
+        self.assertFails(None, TOKEN_MISSING)
+        self.assertFails(self.access_token[:-2], TOKEN_INVALID)
+
+        revoked = str(AccessToken.for_user(self.account))
+        token_revocations.revoke(revoked)
+        self.assertFails(revoked, TOKEN_REVOKED)
+
+        authenticate(self.access_token)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.account.delete()
+
+        self.assertFails(self.access_token, ACCOUNT_MISSING)
+
+    def test_websocket_cookies_are_parsed_once(self):
+        scopes = []
+
+        async def application(scope, receive, send):
+            scopes.append(scope)
+
+        cookies = f'csrftoken=abc==; access_token={self.access_token}; theme=a=b'
+        async_to_sync(WebsocketTokenAuthenticationMiddleware(application))({'headers': [(b'cookie', cookies.encode())]}, None, None)
+
+        self.assertEqual((scopes[0]['path'], scopes[0]['account'], scopes[0]['access_token']), ('/ws/founder/', str(self.account.account_id), self.access_token))
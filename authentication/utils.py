@@ -3,8 +3,6 @@ import hashlib
 import re
 import regex
 import secrets
-import base64
-import requests
 from decouple import config
 
 # settings
@@ -20,22 +18,21 @@ from rest_framework_simplejwt.exceptions import TokenError
 from django.core.cache import cache
 
 # utility functions 
-from accounts import utils as accounts_utilities
+from accounts.context import account_contexts
+from emails.dispatcher import mail_dispatcher
 
 
 def send_otp_email(account, otp, reason, email_address=None):
     """
-    Sends an OTP email to the specified account.
+    Queues an OTP email to the specified account, it is delivered by the mail dispatcher off the request thread.
 
     Args:
         account (BaseUser): The user object to whom the OTP is to be sent.
         otp (str): The one-time passcode to be included in the email.
 
     Returns:
-        dict: A dictionary containing the response status and any relevant message.
+        dict: A dictionary containing the response status and the delivery ID the client can poll.
     """
-    mailgun_api_url = f"https://api.eu.mailgun.net/v3/{config('MAILGUN_DOMAIN')}/messages"
-
     recipient_email = email_address or account.email_address
     email_data = {
         "from": f"seeran grades <authorization@{config('MAILGUN_DOMAIN')}>",
@@ -46,21 +43,9 @@ def send_otp_email(account, otp, reason, email_address=None):
         "v:otpcodereason": reason
     }
 
-    headers = {
-        "Authorization": "Basic " + base64.b64encode(f"api:{config('MAILGUN_API_KEY')}".encode()).decode(),
-        "Content-Type": "application/x-www-form-urlencoded"
-    }
-
-    response = requests.post(mailgun_api_url, headers=headers, data=email_data)
+    email = mail_dispatcher.queue(email_data)
 
-    if response.status_code == 200:
-        return {"status": "success"}
-    elif response.status_code in [400, 401, 402, 403, 404]:
-        return {"status": "error", "message": f"There was an error sending the OTP to your email address. Please open a new bug ticket with the issue, error code {response.status_code}"}
-    elif response.status_code == 429:
-        return {"status": "error", "message": "There was an error sending the OTP to your email address. Please try again in a few moments"}
-    else:
-        return {"status": "error", "message": "There was an error sending the OTP to your email address."}
+    return {"status": "success", "delivery_id": str(email.email_id)}
 
 
 # validate token
@@ -82,10 +67,10 @@ def remove_authorization_cookies(response):
 # verifies wether an account can access the system, by checking the compliance status of the linked school account
 def accounts_access_control(account):
     if account.role in ['PRINCIPAL', 'ADMIN', 'TEACHER', 'STUDENT']:
-        # Fetch the corresponding child model based on the user's role
-        requesting_account = accounts_utilities.get_account_and_linked_school(account.account_id, account.role)
+        # Only the school's compliance flag is needed, read it from the cached account context
+        context = account_contexts.get(account.account_id, account.role)
 
-        if requesting_account.school.none_compliant:
+        if not context.school_compliant:
             return Response({"denied": "Could not process your request, access denied. Your school no longer has an active account on our system."}, status=status.HTTP_403_FORBIDDEN)
     return None
 
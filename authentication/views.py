@@ -10,9 +10,11 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
 
+# asgiref
+from asgiref.sync import async_to_sync
+
 # django
 from django.db import transaction
-from django.utils import timezone
 from django.core.exceptions import ValidationError
 from django.contrib.auth import authenticate as authenticate_user, password_validation
 from django.contrib.auth.password_validation import validate_password
@@ -22,7 +24,6 @@ from django.core.validators import validate_email
 # models
 from accounts.models import BaseAccount
 from account_access_tokens.models import AccountAccessToken
-from account_browsers.models import AccountBrowsers
 
 # serializers
 from accounts.serializers import general_serializers
@@ -30,8 +31,14 @@ from accounts.serializers import general_serializers
 # utility functions 
 from authentication import utils as authentication_utilities
 from account_access_tokens.utils import manage_user_sessions
+from account_access_tokens.revocation import token_revocations
+from account_access_tokens.write_behind import session_writes
+from authentication.otp_states import otp_states, new_otp, OTP_VERIFIED, OTP_EXPIRED, OTP_INCORRECT, OTP_UNAUTHORIZED
 from account_browsers.utils import generate_device_details
 
+# websocket manager
+from seeran_backend.middleware import connection_manager
+
 # custom decorators
 from .decorators import token_required
 
@@ -43,11 +50,11 @@ from .decorators import token_required
 def authenticate(request):
     try:
         # Access control based on user role and school compliance
-        compliant = authentication_utilities.accounts_access_control(request.user)
+        compliant = authentication_utilities.accounts_access_control(request.authentication)
         if compliant:
             return compliant
 
-        return Response({"role" : request.user.role}, status=status.HTTP_200_OK)
+        return Response({"role" : request.authentication.role}, status=status.HTTP_200_OK)
     
     except BaseAccount.DoesNotExist:
         # Handle the case where the provided email does not exist
@@ -141,7 +148,7 @@ def account_activation_credentials_verification(request):
     
         # print('genrating otp')
         # create an otp for the user
-        account_activation_otp, hashed_account_activation_otp, account_activation_salt = authentication_utilities.generate_otp()
+        account_activation_otp = new_otp()
         # print('otp genrated')
 
         # print('sending otp email')
@@ -153,20 +160,13 @@ def account_activation_credentials_verification(request):
 
         if email_response['status'] == 'success':
             # print('email sent')
-            cache.set( # Cache OTP for 5 mins
-                email_address + 'multi_factor_authentication_account_activation_otp_hash_and_salt', 
-                (hashed_account_activation_otp, account_activation_salt), 
-                timeout=300
-            ) 
-
             response = Response(
-                {"message": "A account activation OTP has been generated for your account and sent to your email address. It will be valid for the next 5 minutes.",}, 
+                {"message": "A account activation OTP has been generated for your account and sent to your email address. It will be valid for the next 5 minutes.", "delivery_id": email_response['delivery_id']}, 
                 status=status.HTTP_200_OK
             )
 
-            account_activation_authorization_otp = authentication_utilities.generate_and_cache_otp(
-                email_address + 'multi_factor_authentication_account_activation_authorization_otp_hash_and_salt'
-            )
+            # Cache the OTP and the authorization OTP for 5 mins
+            account_activation_authorization_otp = otp_states.issue(email_address, 'account_activation', otp=account_activation_otp)
             authentication_utilities.set_cookie(
                 response, 
                 'multi_factor_authentication_account_activation_authorization_otp', 
@@ -229,18 +229,6 @@ def account_activation_otp_verification(request):
         if compliant:
             return compliant
 
-        stored_hashed_account_activation_otp_and_salt = cache.get(email_address + 'multi_factor_authentication_account_activation_otp_hash_and_salt')
-        
-        # try to get the the authorization otp from cache
-        stored_hashed_account_activation_authorization_otp_and_salt = cache.get(email_address + 'multi_factor_authentication_account_activation_authorization_otp_hash_and_salt')
-        
-        if not (stored_hashed_account_activation_authorization_otp_and_salt or stored_hashed_account_activation_otp_and_salt):
-            # if there's no authorization otp in cache( wasn't provided in the first place, or expired since it also has a 5 minute lifespan )
-            return Response(
-                {"denied": "Could not process your request, your accounts multi-factor authentication login One Time Passcode has expired. To generate a new one you will have to re-authenticate from the login page."}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
         account_activation_otp = request.data.get('account_activation_otp')
         if not account_activation_otp:
             return Response(
@@ -248,65 +236,52 @@ def account_activation_otp_verification(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # if everything above checks out verify the provided otp against the stored otp
-        if authentication_utilities.verify_user_otp(
-            account_otp=account_activation_otp, 
-            stored_hashed_otp_and_salt=stored_hashed_account_activation_otp_and_salt
-        ):
-            # provided otp is verified successfully
-            if authentication_utilities.verify_user_otp(
-                account_otp=authorization_otp, 
-                stored_hashed_otp_and_salt=stored_hashed_account_activation_authorization_otp_and_salt
-            ):
+        # verify the provided otp and the authorization otp against the stored ones, in a single step
+        outcome, attempts = otp_states.verify(email_address, 'account_activation', authorization_otp, otp=account_activation_otp)
 
-                activate_account_authorization_otp, hashed_activate_account_authorization_otp, activate_account_salt = authentication_utilities.generate_otp()
+        if outcome == OTP_EXPIRED:
+            # if there's no otp in cache( wasn't provided in the first place, or expired since it has a 5 minute lifespan )
+            return Response(
+                {"denied": "Could not process your request, your accounts multi-factor authentication login One Time Passcode has expired. To generate a new one you will have to re-authenticate from the login page."}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-                cache.set( # 300 seconds = 5 mins
-                    email_address + 'activate_account_authorization_otp_hash_and_salt', 
-                    (hashed_activate_account_authorization_otp, activate_account_salt), 
-                    timeout= 60 * 60 * 24
-                ) 
-                
-                response = Response(
-                    {"message": "Your account activation One Time Passcode has been successfully verified, you can create a new password for your account on the next page to fully activate it."}, 
-                    status=status.HTTP_200_OK
-                )
+        if outcome == OTP_VERIFIED:
+            # provided otps are verified successfully, the account activation step is authorized for 24 hours
+            activate_account_authorization_otp = otp_states.issue(email_address, 'activate_account', timeout=60 * 60 * 24)
+            
+            response = Response(
+                {"message": "Your account activation One Time Passcode has been successfully verified, you can create a new password for your account on the next page to fully activate it."}, 
+                status=status.HTTP_200_OK
+            )
 
-                authentication_utilities.set_cookie(
-                    response, 
-                    'activate_account_authorization_otp', 
-                    activate_account_authorization_otp, 
-                    max_age= 60 * 60 * 24
-                )
-                authentication_utilities.set_cookie(
-                    response, 
-                    'activate_account_email_address', 
-                    email_address, 
-                    max_age= 60 * 60 * 24
-                )
-                authentication_utilities.set_cookie(
-                    response, 
-                    'request_authorized_for_account_activation', 
-                    True, 
-                    httponly=False, 
-                    max_age= 60 * 60 * 24
-                )
+            authentication_utilities.set_cookie(
+                response, 
+                'activate_account_authorization_otp', 
+                activate_account_authorization_otp, 
+                max_age= 60 * 60 * 24
+            )
+            authentication_utilities.set_cookie(
+                response, 
+                'activate_account_email_address', 
+                email_address, 
+                max_age= 60 * 60 * 24
+            )
+            authentication_utilities.set_cookie(
+                response, 
+                'request_authorized_for_account_activation', 
+                True, 
+                httponly=False, 
+                max_age= 60 * 60 * 24
+            )
 
-                response.delete_cookie('multi_factor_authentication_account_activation_email_address', domain=settings.SESSION_COOKIE_DOMAIN)
-                response.delete_cookie('multi_factor_authentication_account_activation_authorization_otp', domain=settings.SESSION_COOKIE_DOMAIN)
+            response.delete_cookie('multi_factor_authentication_account_activation_email_address', domain=settings.SESSION_COOKIE_DOMAIN)
+            response.delete_cookie('multi_factor_authentication_account_activation_authorization_otp', domain=settings.SESSION_COOKIE_DOMAIN)
 
-                # OTP is verified, prompt the user to set their password
-                cache.delete(email_address + 'multi_factor_authentication_account_activation_otp_hash_and_salt')
-                cache.delete(email_address + 'multi_factor_authentication_account_activation_authorization_otp_hash_and_salt')
-                cache.delete(email_address + 'account_activation_otp_failed_attempts')
-            
-                return response
-                        
-            # if there's no error till here verification is successful, delete all cached otps
-            cache.delete(email_address + 'multi_factor_authentication_account_activation_otp_hash_and_salt')
-            cache.delete(email_address + 'multi_factor_authentication_account_activation_authorization_otp_hash_and_salt')
-            cache.delete(email_address + 'account_activation_otp_failed_attempts')
-            
+            # OTP is verified, prompt the user to set their password
+            return response
+
+        if outcome == OTP_UNAUTHORIZED:
             # if the authorization otp does'nt match the one stored for the user return an error 
             response = Response({"denied": "Could not process your request, incorrect authorization OTP. Action forrbiden."}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -314,21 +289,11 @@ def account_activation_otp_verification(request):
             response.delete_cookie('multi_factor_authentication_account_activation_authorization_otp', domain=settings.SESSION_COOKIE_DOMAIN)
             return response
 
-        attempts = cache.get(email_address + 'account_activation_otp_failed_attempts', 3)
-        
-        if attempts > 0:
-            # Incorrect OTP, decrement attempts and handle expiration
-            attempts -= 1
-            cache.set(email_address + 'account_activation_otp_failed_attempts', attempts, timeout=300)  # Update attempts with expiration
-
+        if outcome == OTP_INCORRECT:
             return Response(
                 {"error": f"Could not process your request, the provided account activation One Time Passcode is incorrect. You have {attempts} {'attempts' if attempts > 1 else 'attempt'} remaining."}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        cache.delete(email_address + 'multi_factor_authentication_account_activation_otp_hash_and_salt')
-        cache.delete(email_address + 'multi_factor_authentication_account_activation_authorization_otp_hash_and_salt')
-        cache.delete(email_address + 'account_activation_otp_failed_attempts')
 
         response = Response(
             {"denied": "Could not process your request, you have exceeded the maximum number of One Time Passcode verification attempts. Generated account activation One Time Passcode for your account has been discarded."}, 
@@ -365,10 +330,10 @@ def activate_account(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # get authorization otp 
-        stored_activate_account_hashed_otp_and_salt = cache.get(email_address + 'activate_account_authorization_otp_hash_and_salt')
+        # verify the authorization otp, it is only consumed once the account is activated
+        outcome, _ = otp_states.verify(email_address, 'activate_account', authorization_otp, consume=False)
 
-        if not stored_activate_account_hashed_otp_and_salt:
+        if outcome == OTP_EXPIRED:
             response = Response(
                 {"denied": "Could not process your request, there is no account activation authorization One Time Passcode for your account on record. Your request can therefore not be authorized, returning you back to the account activation page shortly."}, 
                 status=status.HTTP_400_BAD_REQUEST
@@ -379,7 +344,7 @@ def activate_account(request):
             response.delete_cookie('request_authorized_for_account_activation', domain=settings.SESSION_COOKIE_DOMAIN)
             return response
 
-        if authentication_utilities.verify_user_otp(account_otp=authorization_otp, stored_hashed_otp_and_salt=stored_activate_account_hashed_otp_and_salt):
+        if outcome == OTP_VERIFIED:
             password = request.data.get('password')
             if not password:
                 return Response(
@@ -442,25 +407,12 @@ def activate_account(request):
 
                 # generate an access and refresh token for the user 
                 token = authentication_utilities.generate_token(account=account)
-                access_token = AccountAccessToken.objects.create(account=account, access_token_string=token['access'])
 
-                # Now update the account browsers with the current device info
+                # Record the access token with the current device info, both are written to the database with the next flush
                 browser_info = generate_device_details(request)
-                browser = AccountBrowsers.objects.create(
-                    account=account,
-                    access_token=access_token,
-                    static_key=static_key,
-                    device_type=browser_info['device_type'],
-                    os=browser_info['os'],
-                    os_version=browser_info['os_version'],
-                    browser=browser_info['browser'],
-                    browser_version=browser_info['browser_version'],
-                    language=browser_info['language'],
-                    time_zone=browser_info['time_zone'],
-                    created_at=timezone.now(),
-                )
+                session_writes.add_access_token(account.pk, token['access'], browser={'static_key': static_key, **browser_info})
 
-            cache.delete(email_address + 'activate_account_authorization_otp_hash_and_salt')
+            otp_states.discard(email_address, 'activate_account')
 
             account_details = general_serializers.BasicAccountDetailsSerializer(account)
 
@@ -499,13 +451,12 @@ def activate_account(request):
 
             return response
 
+        # the invalid authorization otp discarded the stored one
         response = Response(
             {"denied": "Could not process your request, your requests authorization One Time Passcode is invalid. Request forrbiden."}, 
             status=status.HTTP_403_FORBIDDEN
         )
 
-        cache.delete(email_address + 'activate_account_authorization_otp_hash_and_salt')
-
         response.delete_cookie('activate_account_email_address', domain=settings.SESSION_COOKIE_DOMAIN)
         response.delete_cookie('activate_account_authorization_otp', domain=settings.SESSION_COOKIE_DOMAIN)
         response.delete_cookie('request_authorized_for_account_activation', domain=settings.SESSION_COOKIE_DOMAIN)
@@ -596,7 +547,7 @@ def login(request):
                 )
             
             # Generate OTP and send to user's email for MFA
-            multi_factor_authentication_login_otp, multi_factor_authentication_hashed_otp, multi_factor_authentication_salt = authentication_utilities.generate_otp()
+            multi_factor_authentication_login_otp = new_otp()
             email_response = authentication_utilities.send_otp_email(
                 requesting_user, 
                 multi_factor_authentication_login_otp, 
@@ -604,20 +555,13 @@ def login(request):
             )
 
             if email_response['status'] == 'success':
-                cache.set( # Cache OTP for 5 mins
-                    email_address + 'multi_factor_authentication_login_otp_hash_and_salt', 
-                    (multi_factor_authentication_hashed_otp, multi_factor_authentication_salt), 
-                    timeout=300
-                ) 
-
                 response = Response(
-                    {"multifactor_authentication": "You have successufully authenticated using your email address and password, a new login One Time Passcode has been sent to your email address. Please check your inbox for the email."}, 
+                    {"multifactor_authentication": "You have successufully authenticated using your email address and password, a new login One Time Passcode has been sent to your email address. Please check your inbox for the email.", "delivery_id": email_response['delivery_id']}, 
                     status=status.HTTP_200_OK
                 )
                 
-                multi_factor_authentication_authorization_otp = authentication_utilities.generate_and_cache_otp(
-                    email_address + 'multi_factor_authentication_login_authorization_otp'
-                )
+                # Cache the OTP and the authorization OTP for 5 mins
+                multi_factor_authentication_authorization_otp = otp_states.issue(email_address, 'login', otp=multi_factor_authentication_login_otp)
                 authentication_utilities.set_cookie(
                     response, 
                     'multi_factor_authentication_login_authorization_otp', 
@@ -689,11 +633,12 @@ def login(request):
 def multi_factor_authentication_login(request):
     try:
         # retrieve the provided email, otp and the authorization otp in the cookie
+        email_address = request.COOKIES.get('multi_factor_authentication_login_account_email_address') 
         multi_factor_authentication_login_otp = request.data.get('multi_factor_authentication_login_otp')
         authorization_otp = request.COOKIES.get('multi_factor_authentication_login_authorization_otp')
         
         # if anyone of these is missing return a 400 error
-        if not (email_address or multi_factor_authentication_login_otp or authorization_otp):
+        if not (email_address and multi_factor_authentication_login_otp and authorization_otp):
             return Response(
                 {"denied": "Could not process your request, your request is missing required authentication credentials to process this request."}, 
                 status=status.HTTP_400_BAD_REQUEST
@@ -706,120 +651,79 @@ def multi_factor_authentication_login(request):
         if compliant:
             return compliant
 
-        # after getting the user object retrieve the stored otp from cache 
-        stored_hashed_otp_and_salt = cache.get(email_address + 'multi_factor_authentication_login_otp_hash_and_salt')
-        
-        # try to get the the authorization otp from cache
-        hashed_authorization_otp_and_salt = cache.get(email_address + 'multi_factor_authentication_login_authorization_otp')
-        
-        if not (hashed_authorization_otp_and_salt or stored_hashed_otp_and_salt):
-            # if there's no authorization otp in cache( wasn't provided in the first place, or expired since it also has a 5 minute lifespan )
+        # verify the provided otp and the authorization otp against the stored ones, in a single step
+        outcome, attempts = otp_states.verify(email_address, 'login', authorization_otp, otp=multi_factor_authentication_login_otp)
+
+        if outcome == OTP_EXPIRED:
+            # if there's no otp in cache( wasn't provided in the first place, or expired since it has a 5 minute lifespan )
             return Response(
                 {"denied": "Could not process your request, your accounts multi-factor authentication login One Time Passcode has expired. To generate a new one you will have to re-authenticate from the login page."}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
     
-        # if everything above checks out verify the provided otp against the stored otp
-        if authentication_utilities.verify_user_otp(account_otp=multi_factor_authentication_login_otp, stored_hashed_otp_and_salt=stored_hashed_otp_and_salt):
-            # provided otp is verified successfully
-            if authentication_utilities.verify_user_otp(account_otp=authorization_otp, stored_hashed_otp_and_salt=hashed_authorization_otp_and_salt):
-                email_address = request.COOKIES.get('multi_factor_authentication_login_account_email_address') 
-                # if anyone of these is missing return a 400 error
-                if not (email_address or multi_factor_authentication_login_otp or authorization_otp):
-                    return Response(
-                        {"denied": "Could not process your request, your request is missing required information. Request does not provide the accounts email address required to generate access credentials for your account."}, 
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-
-                # if there's no error till here verification is successful, delete all cached otps
-                cache.delete(email_address + 'multi_factor_authentication_login_otp_hash_and_salt')
-                cache.delete(email_address + 'multi_factor_authentication_login_failed_otp_attempts')
-                
-                # then generate an access and refresh token for the user 
-                token = authentication_utilities.generate_token(requesting_user)
+        if outcome == OTP_VERIFIED:
+            # then generate an access and refresh token for the user 
+            token = authentication_utilities.generate_token(requesting_user)
+            
+            if 'access' in token:
+                session_response = manage_user_sessions(requesting_user, token)
+                if session_response:  # If the function returns a response, it indicates an error
+                    return session_response
                 
-                if 'access' in token:
-                    session_response = manage_user_sessions(requesting_user, token)
-                    if session_response:  # If the function returns a response, it indicates an error
-                        return session_response
-                    
-                    # set access token cookie with custom expiration (5 mins)
-                    response = Response(
-                        {"message": "You will have access to your dashboard for the next 24 hours, until your session ends.", "role" : requesting_user.role}, 
-                        status=status.HTTP_200_OK
-                    )
-
-                    authentication_utilities.set_cookie(
-                        response, 
-                        'access_token', 
-                        token['access'], 
-                        max_age=86400
-                    )
-                    authentication_utilities.set_cookie(
-                        response, 
-                        'session_authenticated', 
-                        'This session is valid and active.', 
-                        httponly=False, 
-                        max_age=86400
-                    )
+                # set access token cookie with custom expiration (5 mins)
+                response = Response(
+                    {"message": "You will have access to your dashboard for the next 24 hours, until your session ends.", "role" : requesting_user.role}, 
+                    status=status.HTTP_200_OK
+                )
 
-                    cache.delete(requesting_user.email_address + 'multi_factor_authentication_login_otp_hash_and_salt')
-                    cache.delete(requesting_user.email_address + 'multi_factor_authentication_login_authorization_otp')
-                    cache.delete(email_address + 'multi_factor_authentication_login_failed_otp_attempts')
+                authentication_utilities.set_cookie(
+                    response, 
+                    'access_token', 
+                    token['access'], 
+                    max_age=86400
+                )
+                authentication_utilities.set_cookie(
+                    response, 
+                    'session_authenticated', 
+                    'This session is valid and active.', 
+                    httponly=False, 
+                    max_age=86400
+                )
 
-                    response.delete_cookie('multi_factor_authentication_login_authorization_otp', domain=settings.SESSION_COOKIE_DOMAIN)
-                    response.delete_cookie('multi_factor_authentication_login_account_email_address', domain=settings.SESSION_COOKIE_DOMAIN)
-                    response.delete_cookie('request_authorized_for_multi_factor_authentication_login', domain=settings.SESSION_COOKIE_DOMAIN)
+                response.delete_cookie('multi_factor_authentication_login_authorization_otp', domain=settings.SESSION_COOKIE_DOMAIN)
+                response.delete_cookie('multi_factor_authentication_login_account_email_address', domain=settings.SESSION_COOKIE_DOMAIN)
+                response.delete_cookie('request_authorized_for_multi_factor_authentication_login', domain=settings.SESSION_COOKIE_DOMAIN)
 
-                    return response
-                
-                return Response(
-                    {"error": "Could not process your request, the server could not generate an access token for your account. Please try again in a moment"}, 
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
+                return response
             
+            return Response(
+                {"error": "Could not process your request, the server could not generate an access token for your account. Please try again in a moment"}, 
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        
+        if outcome == OTP_INCORRECT:
+            return Response(
+                {"error": f"Could not process your request, incorrect One Time Passcode.. {attempts} remaining"}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if outcome == OTP_UNAUTHORIZED:
             # if the authorization otp does'nt match the one stored for the user return an error 
             response = Response(
                 {"denied": "Could not process your request, incorrect authorization OTP. Action forrbiden"}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
-                        
-            # if there's no error till here verification is successful, delete all cached otps
-            cache.delete(requesting_user.email_address + 'multi_factor_authentication_login_otp_hash_and_salt')
-            cache.delete(requesting_user.email_address + 'multi_factor_authentication_login_authorization_otp')
-            cache.delete(email_address + 'multi_factor_authentication_login_failed_otp_attempts')
-
-            response.delete_cookie('multi_factor_authentication_login_authorization_otp', domain=settings.SESSION_COOKIE_DOMAIN)
-            response.delete_cookie('multi_factor_authentication_login_account_email_address', domain=settings.SESSION_COOKIE_DOMAIN)
-            response.delete_cookie('request_authorized_for_multi_factor_authentication_login', domain=settings.SESSION_COOKIE_DOMAIN)
-            return response
-
-        attempts = cache.get(email_address + 'multi_factor_authentication_login_failed_otp_attempts', 3)
-        
-        if attempts <= 0:
+        else:
             response = Response(
                 {"denied": "Could not process your request, you have exceeded the maximum One Time Passcode verification attempts. Returning you to the login page shortly."}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-            cache.delete(requesting_user.email_address + 'multi_factor_authentication_login_otp_hash_and_salt')
-            cache.delete(requesting_user.email_address + 'multi_factor_authentication_login_authorization_otp')
-            cache.delete(email_address + 'multi_factor_authentication_login_failed_otp_attempts')
-
-            response.delete_cookie('multi_factor_authentication_login_authorization_otp', domain=settings.SESSION_COOKIE_DOMAIN)
-            response.delete_cookie('multi_factor_authentication_login_account_email_address', domain=settings.SESSION_COOKIE_DOMAIN)
-            response.delete_cookie('request_authorized_for_multi_factor_authentication_login', domain=settings.SESSION_COOKIE_DOMAIN)
+        response.delete_cookie('multi_factor_authentication_login_authorization_otp', domain=settings.SESSION_COOKIE_DOMAIN)
+        response.delete_cookie('multi_factor_authentication_login_account_email_address', domain=settings.SESSION_COOKIE_DOMAIN)
+        response.delete_cookie('request_authorized_for_multi_factor_authentication_login', domain=settings.SESSION_COOKIE_DOMAIN)
 
-            return response
-        
-        # Incorrect OTP, decrement attempts and handle expiration
-        attempts -= 1
-        cache.set(email_address + 'multi_factor_authentication_login_failed_otp_attempts', attempts, timeout=300)  # Update attempts with expiration
-
-        return Response(
-            {"error": f"Could not process your request, incorrect One Time Passcode.. {attempts} remaining"}, 
-            status=status.HTTP_400_BAD_REQUEST
-        )
+        return response
     
     except BaseAccount.DoesNotExist:
         # Handle the case where the provided email does not exist
@@ -876,7 +780,7 @@ def credentials_reset_email_verification(request):
 
         # if everything checks out without an error 
         # create an otp for the user
-        password_reset_otp, hashed_password_reset_otp, password_reset_salt = authentication_utilities.generate_otp()
+        password_reset_otp = new_otp()
         email_response = authentication_utilities.send_otp_email(
             requesting_user, 
             password_reset_otp, 
@@ -884,16 +788,13 @@ def credentials_reset_email_verification(request):
         )
 
         if email_response['status'] == 'success':
-            cache.set(email_address + 'multi_factor_authentication_password_reset_otp_hash_and_salt', (hashed_password_reset_otp, password_reset_salt), timeout=300)  # Cache OTP for 5 mins
-
             response = Response(
-                {"message": "A password reset One Time Password has been generated and sent to your email address. If you do not see the email check your spam/junk folder.",}, 
+                {"message": "A password reset One Time Password has been generated and sent to your email address. If you do not see the email check your spam/junk folder.", "delivery_id": email_response['delivery_id']}, 
                 status=status.HTTP_200_OK
             )
 
-            password_reset_authorization_otp = authentication_utilities.generate_and_cache_otp(
-                email_address + 'multi_factor_authentication_password_reset_authorization_otp_hash_and_salt'
-            )
+            # Cache the OTP and the authorization OTP for 5 mins
+            password_reset_authorization_otp = otp_states.issue(email_address, 'credentials_reset', otp=password_reset_otp)
             authentication_utilities.set_cookie(
                 response, 
                 'multi_factor_authentication_password_reset_authorization_otp', 
@@ -943,12 +844,19 @@ def credentials_reset_otp_verification(request):
         email_address = request.COOKIES.get('multi_factor_authentication_password_reset_account_email_address')
         password_reset_authorization_otp = request.COOKIES.get('multi_factor_authentication_password_reset_authorization_otp')
 
-        if not (email_address or password_reset_authorization_otp):
+        if not (email_address and password_reset_authorization_otp):
             return Response(
                 {"denied": "Could not process your request, your request is missing required authentication credentials to process this request."}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        password_reset_otp = request.data.get('password_reset_otp')
+        if not password_reset_otp:
+            return Response(
+                {"error": "Could not process your request, the provided information is invalid. Email address and One Time Passcode are required."}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         requesting_user = BaseAccount.objects.get(email_address=email_address)
 
         # Access control based on user role and school compliance
@@ -956,76 +864,39 @@ def credentials_reset_otp_verification(request):
         if compliant:
             return compliant
 
-        # after getting the user object retrieve the stored otp from cache 
-        stored_hashed_otp_and_salt = cache.get(email_address + 'multi_factor_authentication_password_reset_otp_hash_and_salt')
+        # verify the provided otp and the authorization otp against the stored ones, in a single step
+        outcome, attempts = otp_states.verify(email_address, 'credentials_reset', password_reset_authorization_otp, otp=password_reset_otp)
 
-        # try to get the the authorization otp from cache
-        multi_factor_authentication_password_reset_hashed_authorization_otp_and_salt = cache.get(email_address + 'multi_factor_authentication_password_reset_authorization_otp_hash_and_salt')
-
-        if not (multi_factor_authentication_password_reset_hashed_authorization_otp_and_salt and stored_hashed_otp_and_salt):
-            # if there's no authorization otp in cache( wasn't provided in the first place, or expired since it also has a 5 minute lifespan )
+        if outcome == OTP_EXPIRED:
+            # if there's no otp in cache( wasn't provided in the first place, or expired since it has a 5 minute lifespan )
             return Response(
                 {"denied": "Could not process your request, your accounts multi-factor authentication password reset One Time Password has expired. Returning you to the password reset page shortly."}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # if everything above checks out verify the provided otp against the stored otp
-        if authentication_utilities.verify_user_otp(account_otp=password_reset_otp, stored_hashed_otp_and_salt=stored_hashed_otp_and_salt):
-            # provided otp is verified successfully
-            if authentication_utilities.verify_user_otp(account_otp=password_reset_authorization_otp, stored_hashed_otp_and_salt=multi_factor_authentication_password_reset_hashed_authorization_otp_and_salt):
-                password_reset_otp = request.data.get('password_reset_otp')
-
-                if not password_reset_otp:
-                    return Response(
-                        {"error": "Could not process your request, the provided information is invalid. Email address and One Time Passcode are required."}, 
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-
-                response = Response(
-                    {"message": "Password reset one time passcode successfully verified. You will be redirected to the reset password page where you will be able to update your password."}, 
-                    status=status.HTTP_200_OK
-                )
-
-                password_reset_authorization_otp = authentication_utilities.generate_and_cache_otp(
-                    email_address + 'password_reset_hashed_authorization_otp_and_salt'
-                )
-                authentication_utilities.set_cookie(
-                    response, 
-                    'password_reset_authorization_otp', 
-                    password_reset_authorization_otp, 
-                )
-                authentication_utilities.set_cookie(
-                    response, 
-                    'password_reset_email_address', 
-                    email_address, 
-                )
-                authentication_utilities.set_cookie(
-                    response, 
-                    'request_authorized_to_reset_account_password', 
-                    email_address, 
-                    httponly=False, 
-                )
-
-                cache.delete(email_address + 'multi_factor_authentication_password_reset_otp_hash_and_salt')
-                cache.delete(email_address + 'multi_factor_authentication_password_reset_authorization_otp_hash_and_salt')
-                cache.delete(email_address + 'multi_factor_authentication_password_reset_failed_otp_attempts')
-
-                response.delete_cookie('multi_factor_authentication_password_reset_authorization_otp', domain=settings.SESSION_COOKIE_DOMAIN)
-                response.delete_cookie('multi_factor_authentication_password_reset_account_email_address', domain=settings.SESSION_COOKIE_DOMAIN)
-                response.delete_cookie('request_authorized_for_multi_factor_authentication_password_reset', domain=settings.SESSION_COOKIE_DOMAIN)
-
-                return response
-
-            # if the authorization otp does'nt match the one stored for the user return an error 
+        if outcome == OTP_VERIFIED:
             response = Response(
-                {"denied": "Could not process your request, incorrect authorization One Time Passcode. Action forrbiden."}, 
-                status=status.HTTP_400_BAD_REQUEST
+                {"message": "Password reset one time passcode successfully verified. You will be redirected to the reset password page where you will be able to update your password."}, 
+                status=status.HTTP_200_OK
             )
 
-            # if there's no error till here verification is successful, delete all cached otps
-            cache.delete(email_address + 'multi_factor_authentication_password_reset_otp_hash_and_salt')
-            cache.delete(email_address + 'multi_factor_authentication_password_reset_authorization_otp_hash_and_salt')
-            cache.delete(email_address + 'multi_factor_authentication_password_reset_failed_otp_attempts')
+            reset_credentials_authorization_otp = otp_states.issue(email_address, 'reset_credentials')
+            authentication_utilities.set_cookie(
+                response, 
+                'password_reset_authorization_otp', 
+                reset_credentials_authorization_otp, 
+            )
+            authentication_utilities.set_cookie(
+                response, 
+                'password_reset_email_address', 
+                email_address, 
+            )
+            authentication_utilities.set_cookie(
+                response, 
+                'request_authorized_to_reset_account_password', 
+                email_address, 
+                httponly=False, 
+            )
 
             response.delete_cookie('multi_factor_authentication_password_reset_authorization_otp', domain=settings.SESSION_COOKIE_DOMAIN)
             response.delete_cookie('multi_factor_authentication_password_reset_account_email_address', domain=settings.SESSION_COOKIE_DOMAIN)
@@ -1033,32 +904,29 @@ def credentials_reset_otp_verification(request):
 
             return response
 
-        attempts = cache.get(email_address + 'multi_factor_authentication_password_reset_failed_otp_attempts', 3)
-
-        if attempts <= 0:
-            cache.delete(email_address + 'multi_factor_authentication_password_reset_otp_hash_and_salt')
-            cache.delete(email_address + 'multi_factor_authentication_password_reset_authorization_otp_hash_and_salt')
-            cache.delete(email_address + 'multi_factor_authentication_password_reset_failed_otp_attempts')
+        if outcome == OTP_INCORRECT:
+            return Response(
+                {"error": f"Could not process your request, he provided password reset One Time Passcode is incorrect. You have {attempts} {'attempts' if attempts > 1 else 'attempt'} remaining."}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
+        if outcome == OTP_UNAUTHORIZED:
+            # if the authorization otp does'nt match the one stored for the user return an error 
+            response = Response(
+                {"denied": "Could not process your request, incorrect authorization One Time Passcode. Action forrbiden."}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        else:
             response = Response(
                 {"denied": "Could not process your request, you have exceeded the maximum number of One Time Passcode verification attempts."}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-            response.delete_cookie('multi_factor_authentication_password_reset_authorization_otp', domain=settings.SESSION_COOKIE_DOMAIN)
-            response.delete_cookie('multi_factor_authentication_password_reset_account_email_address', domain=settings.SESSION_COOKIE_DOMAIN)
-            response.delete_cookie('request_authorized_for_multi_factor_authentication_password_reset', domain=settings.SESSION_COOKIE_DOMAIN)
-
-            return response
-
-        # Incorrect OTP, decrement attempts and handle expiration
-        attempts -= 1
-        cache.set(email_address + 'multi_factor_authentication_password_reset_failed_otp_attempts', attempts, timeout=300)  # Update attempts with expiration
+        response.delete_cookie('multi_factor_authentication_password_reset_authorization_otp', domain=settings.SESSION_COOKIE_DOMAIN)
+        response.delete_cookie('multi_factor_authentication_password_reset_account_email_address', domain=settings.SESSION_COOKIE_DOMAIN)
+        response.delete_cookie('request_authorized_for_multi_factor_authentication_password_reset', domain=settings.SESSION_COOKIE_DOMAIN)
 
-        return Response(
-            {"error": f"Could not process your request, he provided password reset One Time Passcode is incorrect. You have {attempts} {'attempts' if attempts > 1 else 'attempt'} remaining."}, 
-            status=status.HTTP_400_BAD_REQUEST
-        )
+        return response
     
     except BaseAccount.DoesNotExist:
         # if theres no user with the provided email return an error
@@ -1094,9 +962,10 @@ def reset_credentials(request):
         if compliant:
             return compliant
         
-        # get authorization otp from cache and verify provided otp
-        hashed_authorization_otp_and_salt = cache.get(email_address + 'password_reset_hashed_authorization_otp_and_salt')
-        if not hashed_authorization_otp_and_salt:
+        # verify the authorization otp, it is only consumed once the password is updated
+        outcome, _ = otp_states.verify(email_address, 'reset_credentials', password_reset_otp, consume=False)
+
+        if outcome == OTP_EXPIRED:
             response = Response(
                 {"denied": "Could not process your request, there is no password reset authorization One Time Passcode for your account on record. Process forrbiden."}, 
                 status=status.HTTP_403_FORBIDDEN
@@ -1108,7 +977,7 @@ def reset_credentials(request):
 
             return response
 
-        if authentication_utilities.verify_user_otp(account_otp=password_reset_otp, stored_hashed_otp_and_salt=hashed_authorization_otp_and_salt):
+        if outcome == OTP_VERIFIED:
             new_password = request.data.get('new_password')
             if not new_password:
                 return Response(
@@ -1127,7 +996,7 @@ def reset_credentials(request):
                 status=status.HTTP_200_OK
             )
             
-            cache.delete(email_address + 'password_reset_hashed_authorization_otp_and_salt')
+            otp_states.discard(email_address, 'reset_credentials')
 
             response.delete_cookie('password_reset_email_address', domain=settings.SESSION_COOKIE_DOMAIN)
             response.delete_cookie('password_reset_authorization_otp', domain=settings.SESSION_COOKIE_DOMAIN)
@@ -1135,12 +1004,11 @@ def reset_credentials(request):
 
             return response
         
+        # the invalid authorization otp discarded the stored one
         response = Response(
             {"denied": "Could not process your request, the provided password reset authorization One Time Passcode is invalid. Process forrbiden."}, 
             status=status.HTTP_403_FORBIDDEN
         )
-    
-        cache.delete(email_address + 'password_reset_hashed_authorization_otp_and_salt')
 
         response.delete_cookie('password_reset_email_address', domain=settings.SESSION_COOKIE_DOMAIN)
         response.delete_cookie('password_reset_authorization_otp', domain=settings.SESSION_COOKIE_DOMAIN)
@@ -1188,9 +1056,7 @@ def email_address_update_account_password_verification(request): # first step
             status=status.HTTP_200_OK
         )
 
-        email_address_update_otp = authentication_utilities.generate_and_cache_otp(
-            request.user.email_address + 'email_address_update_authorization_otp_hash_and_salt'
-        )
+        email_address_update_otp = otp_states.issue(request.user.email_address, 'email_address_update')
         authentication_utilities.set_cookie(
             response, 
             'email_address_update_authorization_otp', 
@@ -1228,8 +1094,9 @@ def email_address_update_validate_new_email_address(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
     
-        email_address_update_authorization_otp_hash_and_salt = cache.get(request.user.email_address + 'email_address_update_authorization_otp_hash_and_salt')
-        if not email_address_update_authorization_otp_hash_and_salt:
+        # verify the authorization otp, it is only consumed once the ownership OTP is sent
+        outcome, _ = otp_states.verify(request.user.email_address, 'email_address_update', email_address_update_authorization_otp, consume=False)
+        if outcome == OTP_EXPIRED:
             return Response(
                 {"denied": "Could not process your request, your authorization credentials have expired. Returning you to the update email address page shortly."}, 
                 status=status.HTTP_400_BAD_REQUEST
@@ -1242,8 +1109,7 @@ def email_address_update_validate_new_email_address(request):
         if compliant:
             return compliant
     
-        # if everything above checks out verify the provided otp against the stored otp
-        if authentication_utilities.verify_user_otp(account_otp=email_address_update_authorization_otp, stored_hashed_otp_and_salt=email_address_update_authorization_otp_hash_and_salt):
+        if outcome == OTP_VERIFIED:
             new_email_address = request.data.get('new_email_address')
             if not new_email_address:
                 return Response(
@@ -1254,7 +1120,7 @@ def email_address_update_validate_new_email_address(request):
             # validate email format
             validate_email(new_email_address)
 
-            email_address_ownership_otp, hashed_email_address_ownership_otp, email_address_ownership_salt = authentication_utilities.generate_otp()
+            email_address_ownership_otp = new_otp()
             email_response = authentication_utilities.send_otp_email(
                 requesting_user, 
                 email_address_ownership_otp, 
@@ -1263,19 +1129,10 @@ def email_address_update_validate_new_email_address(request):
             )
 
             if email_response['status'] == 'success':
-                email_address_ownership_authorization_otp, hashed_email_address_ownership_authorization_otp, email_address_ownership_authorization_salt = authentication_utilities.generate_otp()
-
-                cache.set( # Cache OTP for 5 mins
-                    new_email_address + 'email_address_update_verify_new_email_address_ownership_otp_hash_and_salt', 
-                    (hashed_email_address_ownership_otp, email_address_ownership_salt), 
-                    timeout=300
-                ) 
-
-                response = Response({"message": "A email address ownership verification OTP has been generated for your account and sent to your email address. It will be valid for the next 5 minutes.",}, status=status.HTTP_200_OK)
+                response = Response({"message": "A email address ownership verification OTP has been generated for your account and sent to your email address. It will be valid for the next 5 minutes.", "delivery_id": email_response['delivery_id']}, status=status.HTTP_200_OK)
             
-                email_address_ownership_authorization_otp = authentication_utilities.generate_and_cache_otp(
-                    request.user.email_address + 'email_address_update_verify_new_email_address_ownership_authorization_otp_hash_and_salt'
-                )
+                # Cache the OTP and the authorization OTP for 5 mins
+                email_address_ownership_authorization_otp = otp_states.issue(request.user.email_address, 'email_address_ownership', otp=email_address_ownership_otp)
 
                 authentication_utilities.set_cookie(
                     response, 
@@ -1294,7 +1151,7 @@ def email_address_update_validate_new_email_address(request):
                     httponly=False
                 )
 
-                cache.delete(request.user.email_address + 'email_address_update_authorization_otp_hash_and_salt')
+                otp_states.discard(request.user.email_address, 'email_address_update')
 
                 response.delete_cookie(
                     'email_address_update_authorization_otp', 
@@ -1313,13 +1170,12 @@ def email_address_update_validate_new_email_address(request):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
         
+        # the incorrect authorization otp discarded the stored one
         response = Response(
             {"denied": "Could not process your request, the provided authorization One Time Passcode is incorrect. Action forrbiden."}, 
             status=status.HTTP_400_BAD_REQUEST
         )
 
-        cache.delete(request.user.email_address + 'email_address_update_authorization_otp_hash_and_salt')
-
         response.delete_cookie(
             'email_address_update_authorization_otp', 
             domain=settings.SESSION_COOKIE_DOMAIN
@@ -1377,88 +1233,34 @@ def email_address_update_verify_new_email_address_ownership(request):
                 status=status.HTTP_400_BAD_REQUEST
             ) 
 
-        # get authorization otp from cache and verify provided otp
-        email_address_update_verify_new_email_address_ownership_otp_hash_and_salt = cache.get(request.user.email_address + 'email_address_update_verify_new_email_address_ownership_otp_hash_and_salt')
-        email_address_update_verify_new_email_address_ownership_authorization_otp_hash_and_salt = cache.get(request.user.email_address + 'email_address_update_verify_new_email_address_ownership_authorization_otp_hash_and_salt')
+        # verify the provided otp and the authorization otp against the stored ones, in a single step
+        outcome, attempts = otp_states.verify(request.user.email_address, 'email_address_ownership', email_address_ownership_authorization_otp, otp=email_address_ownership_otp)
 
-        if not (email_address_update_verify_new_email_address_ownership_otp_hash_and_salt or email_address_update_verify_new_email_address_ownership_authorization_otp_hash_and_salt):
+        if outcome == OTP_EXPIRED:
             return Response({"denied": "Could not process your request, the authorization credentials generated for your account to aid this process have expired. Redirecting you back to the email address update page."}, status=status.HTTP_400_BAD_REQUEST) 
 
-        if authentication_utilities.verify_user_otp(account_otp=email_address_ownership_otp, stored_hashed_otp_and_salt=email_address_update_verify_new_email_address_ownership_otp_hash_and_salt):
-            if authentication_utilities.verify_user_otp(account_otp=email_address_ownership_authorization_otp, stored_hashed_otp_and_salt=email_address_update_verify_new_email_address_ownership_authorization_otp_hash_and_salt):
-                requesting_user.email_address = new_email_address
-                requesting_user.save()
-
-                response = Response({"message": "Your accounts email address has been succesfully updated, use your new credentials on your next authentication into your dashboard."}, status=status.HTTP_200_OK)
-
-                # OTP is verified, prompt the user to set their password
-                cache.delete(request.user.email_address + 'email_address_update_verify_new_email_address_ownership_otp_hash_and_salt')
-                cache.delete(request.user.email_address + 'email_address_update_verify_new_email_address_ownership_authorization_otp_hash_and_salt')
-                cache.delete(request.user.email_address + 'email_address_update_verify_new_email_address_ownership_otp_failed_attempts')
+        if outcome == OTP_INCORRECT:
+            return Response(
+                {"error": f"Could not process your request, the provided email ownership OTP is incorrect. You have {attempts} {'attempts' if attempts > 1 else 'attempt'} remaining."}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-                response.delete_cookie(
-                    'email_address_update_verify_new_email_address_ownership_authorization_otp', 
-                    domain=settings.SESSION_COOKIE_DOMAIN
-                )
+        if outcome == OTP_VERIFIED:
+            requesting_user.email_address = new_email_address
+            requesting_user.save()
 
-                response.delete_cookie(
-                    'email_address_update_verify_new_email_address_ownership_email_address', 
-                    domain=settings.SESSION_COOKIE_DOMAIN
-                )
+            response = Response({"message": "Your accounts email address has been succesfully updated, use your new credentials on your next authentication into your dashboard."}, status=status.HTTP_200_OK)
 
-                response.delete_cookie(
-                    'request_authorized_to_verify_new_email_address_ownership', 
-                    domain=settings.SESSION_COOKIE_DOMAIN
-                )
-            
-                return response
-                        
-            # if there's no error till here verification is successful, delete all cached otps
-            cache.delete(request.user.email_address + 'email_address_update_verify_new_email_address_ownership_otp_hash_and_salt')
-            cache.delete(request.user.email_address + 'email_address_update_verify_new_email_address_ownership_authorization_otp_hash_and_salt')
-            cache.delete(request.user.email_address + 'email_address_update_verify_new_email_address_ownership_otp_failed_attempts')
-            
+        elif outcome == OTP_UNAUTHORIZED:
             # if the authorization otp does'nt match the one stored for the user return an error 
             response = Response({"denied": "Could not process your request, your authorization OTP needed to process this request is invalid. Action forrbiden."}, status=status.HTTP_400_BAD_REQUEST)
 
-            response.delete_cookie(
-                'email_address_update_verify_new_email_address_ownership_authorization_otp', 
-                domain=settings.SESSION_COOKIE_DOMAIN
-            )
-
-            response.delete_cookie(
-                'email_address_update_verify_new_email_address_ownership_email_address', 
-                domain=settings.SESSION_COOKIE_DOMAIN
-            )
-
-            response.delete_cookie(
-                'request_authorized_to_verify_new_email_address_ownership', 
-                domain=settings.SESSION_COOKIE_DOMAIN
-            )
-
-            return response
-
-        attempts = cache.get(request.user.email_address + 'email_address_update_verify_new_email_address_ownership_otp_failed_attempts', 3)
-        
-        if attempts > 0:
-            # Incorrect OTP, decrement attempts and handle expiration
-            attempts -= 1
-            cache.set(request.user.email_address + 'email_address_update_verify_new_email_address_ownership_otp_failed_attempts', attempts, timeout=300)  # Update attempts with expiration
-
-            return Response(
-                {"error": f"Could not process your request, the provided email ownership OTP is incorrect. You have {attempts} {'attempts' if attempts > 1 else 'attempt'} remaining."}, 
-                status=status.HTTP_400_BAD_REQUEST
+        else:
+            response = Response(
+                {"denied": "Could not process your request, you have exceeded the maximum number of email ownership OTP verification attempts. Redirecting you to the update email address page shortly."}, 
+                status=status.HTTP_403_FORBIDDEN
             )
         
-        cache.delete(request.user.email_address + 'email_address_update_verify_new_email_address_ownership_otp_hash_and_salt')
-        cache.delete(request.user.email_address + 'email_address_update_verify_new_email_address_ownership_authorization_otp_hash_and_salt')
-        cache.delete(request.user.email_address + 'email_address_update_verify_new_email_address_ownership_otp_failed_attempts')
-
-        response = Response(
-            {"denied": "Could not process your request, you have exceeded the maximum number of email ownership OTP verification attempts. Redirecting you to the update email address page shortly."}, 
-            status=status.HTTP_403_FORBIDDEN
-        )
-        
         response.delete_cookie(
             'email_address_update_verify_new_email_address_ownership_authorization_otp', 
             domain=settings.SESSION_COOKIE_DOMAIN
@@ -1525,17 +1327,16 @@ def password_update_password_verification(request):
             requesting_user.set_password(new_password)
             requesting_user.save()
 
-            access_tokens = AccountAccessToken.objects.filter(account=requesting_user)
+            # log the account out of all its devices, one write revokes every token issued to it so far
+            access_tokens = requesting_user.access_tokens.all()
+            blacklisted_access_tokens = list(access_tokens.values_list('access_token_string', flat=True)) + session_writes.discard_account(requesting_user.pk)
 
-            for access_token in access_tokens:
-                # Decode the token
-                token = decode(access_token.access_token_string)
-                
-                # Calculate the remaining time for the token to expire
-                expiration_time = token.payload['exp'] - int(time.time())
+            token_revocations.revoke_account(requesting_user.pk)
+            access_tokens.delete()
 
-                if expiration_time > 0:
-                    cache.set(access_token.access_token_string, 'blacklisted', timeout=expiration_time)
+        # close the websockets still authenticated with the blacklisted tokens
+        if blacklisted_access_tokens:
+            async_to_sync(connection_manager.revoke_access_tokens)(str(requesting_user.account_id), blacklisted_access_tokens)
 
         return Response(
             {'message': "Your account password has been successfully updated, use your new credentials on your next authentication into your dashboard."}, 
@@ -1569,17 +1370,15 @@ def log_out(request):
     try:
         access_token = request.COOKIES.get('access_token')
 
-        # Decode the token
-        token = decode(access_token)
-        
-        # Calculate the remaining time for the token to expire
-        expiration_time = token.payload['exp'] - int(time.time())
-        
-        if expiration_time > 0:
-            cache.set(access_token, 'blacklisted', timeout=expiration_time)
+        # revoke the token for the remainder of its lifespan
+        token_revocations.revoke(access_token)
+
+        # close the websockets still authenticated with the token
+        async_to_sync(connection_manager.revoke_access_tokens)(str(request.user.account_id), [access_token])
     
-        # delete token from database
+        # delete token from database, or from the sessions waiting to be written to it
         AccountAccessToken.objects.filter(access_token_string=str(access_token)).delete()
+        session_writes.discard_access_token(request.authentication.account_pk, access_token)
 
         return authentication_utilities.remove_authorization_cookies(
             Response(
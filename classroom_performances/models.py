@@ -1,6 +1,5 @@
 # python 
 import uuid
-import numpy as np
 from decimal import Decimal
 
 # django
@@ -16,9 +15,7 @@ from terms.models import Term
 
 # utility functions
 from terms import utils as term_utilities
-
-# tasks
-from term_subject_performances import tasks as  term_subject_performances_tasks
+from seeran_backend import cohort_statistics
 
 
 # Create your models here.
@@ -151,69 +148,21 @@ class ClassroomPerformance(models.Model):
             normalized_score_with_default=models.functions.Coalesce('normalized_score', Decimal(0.00))
         )
 
-        performance_data = performances.aggregate(
-            highest_score=models.Max('normalized_score_with_default'),
-            lowest_score=models.Min('normalized_score_with_default'),
-            average_score=models.Avg('normalized_score_with_default'),
-            standard_deviation=models.StdDev('normalized_score_with_default'),
-            students_in_the_classroom_count=models.Count('id'),
-            students_passing_the_classroom_count=models.Count('id', filter=models.Q(normalized_score_with_default__gte=pass_mark)),
-        )
-        # print(f'performance_data {performance_data}')
+        # Compute the score statistics and percentile buckets of the classroom in one pass
+        statistics = cohort_statistics.describe(performances.order_by('normalized_score_with_default').values_list('normalized_score_with_default', 'student_id'), pass_mark=pass_mark)
 
         # Find students who passed the subject in the current term
-        self.pass_rate = (performance_data['students_passing_the_classroom_count'] / performance_data['students_in_the_classroom_count']) * 100
+        self.pass_rate = (statistics.passed / statistics.count) * 100
         self.failure_rate = 100 - self.pass_rate
-        # print(f'pass_rate {self.pass_rate}')
-
-        self.highest_score = performance_data['highest_score']
-        self.lowest_score = performance_data['lowest_score']
-        self.average_score = performance_data['average_score']
-        self.standard_deviation = performance_data['standard_deviation']
-
-        # Retrieve all scores and the associated student for the assessment
-        student_scores = np.array(performances.order_by('normalized_score').values_list('normalized_score', 'student_id'))
-        # print(f'student_scores {student_scores}')
-        # Extract weighted scores for all students
-        scores = student_scores[:, 0]  # Extract the first column (weighted_score)
-        # print(f'scores {scores}')
-
-        # Calculate median score
-        self.median_score = np.median(scores)
-        # print(f'median_score {self.median_score}')
-
-        # Calculate percentile boundaries
-        percentiles = np.percentile(scores, [Decimal(10), Decimal(25), Decimal(50), Decimal(75), Decimal(90)])
-
-        # Create empty lists for student IDs based on percentile ranges
-        students_in_10th_percentile = []
-        students_in_25th_percentile = []
-        students_in_50th_percentile = []
-        students_in_75th_percentile = []
-        students_in_90th_percentile = []
-
-        # Assign students to percentiles based on their weighted score
-        for weighted_score, student_id in student_scores:
-            if weighted_score <= percentiles[0]:
-                students_in_10th_percentile.append(student_id)
-            elif weighted_score <= percentiles[1]:
-                students_in_25th_percentile.append(student_id)
-            elif weighted_score <= percentiles[2]:
-                students_in_50th_percentile.append(student_id)
-            elif weighted_score <= percentiles[3]:
-                students_in_75th_percentile.append(student_id)
-            else:
-                students_in_90th_percentile.append(student_id)
+
+        self.highest_score = cohort_statistics.to_decimal(statistics.highest)
+        self.lowest_score = cohort_statistics.to_decimal(statistics.lowest)
+        self.average_score = cohort_statistics.to_decimal(statistics.mean)
+        self.median_score = cohort_statistics.to_decimal(statistics.median)
+        self.standard_deviation = cohort_statistics.to_decimal(statistics.standard_deviation)
 
         # Store the percentile distribution
-        self.percentile_distribution = {
-            '10th': {'count': len(students_in_10th_percentile), 'students': students_in_10th_percentile},
-            '25th': {'count': len(students_in_25th_percentile), 'students': students_in_25th_percentile},
-            '50th': {'count': len(students_in_50th_percentile), 'students': students_in_50th_percentile},
-            '75th': {'count': len(students_in_75th_percentile), 'students': students_in_75th_percentile},
-            '90th': {'count': len(students_in_90th_percentile), 'students': students_in_90th_percentile},
-        }
-        # print(f'percentile_distribution {self.percentile_distribution}')
+        self.percentile_distribution = statistics.percentile_distribution()
 
         # Calculate improvement rate
         previous_term = term_utilities.get_previous_term(school=self.school, grade=self.term.grade, end_date=self.term.start_date)
@@ -222,7 +171,7 @@ class ClassroomPerformance(models.Model):
             previous_scores = self.classroom.subject.student_performances.filter(student__in=self.classroom.students.all(), term=previous_term).values_list('normalized_score', flat=True)
             if previous_scores:
                 improved_students = performances.filter(normalized_score__gt=models.F('previous_score')).count()
-                self.improvement_rate = (improved_students / performance_data['students_in_the_classroom_count']) * 100 if performance_data['students_in_the_classroom_count'] > 0 else 0
+                self.improvement_rate = (improved_students / statistics.count) * 100 if statistics.count > 0 else 0
             else:
                 self.improvement_rate = None
         else:
@@ -248,7 +197,7 @@ class ClassroomPerformance(models.Model):
 
         # Calculate the completion rate
         completed_students = student_submissions.filter(submission_count__gte=required_assessments).count()
-        self.completion_rate = (completed_students / performance_data['students_in_the_classroom_count']) * 100
+        self.completion_rate = (completed_students / statistics.count) * 100
         # print(f'completion_rate {self.completion_rate}')
 
         # Determine top performers
@@ -266,9 +215,7 @@ class ClassroomPerformance(models.Model):
 
         self.save()
 
-        term_performance, created = self.term.subject_performances.get_or_create(subject=self.classroom.subject, defaults={'school':self.school})
-        term_subject_performances_tasks.update_term_performance_metrics_task.delay(term_performance_id=term_performance.id)
-        # term_performance.update_performance_metrics()
+        # the term subject performance depending on this classroom is recomputed after it by the analytics pipeline
         # print(f'term_performance {term_performance}')
         # print(f'classroom performance metrics calculated successfully')
 
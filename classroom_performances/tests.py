@@ -1,9 +1,17 @@
 # python
 from datetime import date
 from decimal import Decimal
+from unittest import skipUnless
+from unittest.mock import patch, PropertyMock
+
+# redis, fakeredis (and its Lua runtime, lupa) are test only dependencies left out of requirements.txt
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
 
 # django
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.core.exceptions import ValidationError
 
 # models
@@ -15,6 +23,9 @@ from subjects.models import Subject
 from terms.models import Term
 from classrooms.models import Classroom
 
+# utility functions
+from seeran_backend.recompute import RecomputeScheduler, recompute_scheduler
+
 
 class ClassroomModelTest(TestCase):
     
@@ -147,4 +158,115 @@ class ClassroomModelTest(TestCase):
     #     self.assertEqual(classroom.failure_rate, 50)
     #     self.assertEqual(classroom.average_score, 62.5)
     #     self.assertEqual(classroom.highest_score, 80)
-    #     self.assertEqual(classroom.lowest_score, 45)
\ No newline at end of file
+    #     self.assertEqual(classroom.lowest_score, 45)
+
+
+class RecomputeSchedulerTest(TestCase):
+    """
+    Test cases for the scheduler coalescing performance metric recomputes.
+    """
+
+    def test_marks_are_debounced_within_the_max_delay(self):
+        marked = {'classroom_performance:1': 100.0, 'classroom_performance:2': 108.0, 'term_subject_performance:3': 109.0}
+        first_marked = {'classroom_performance:1': 100.0, 'classroom_performance:2': 108.0, 'term_subject_performance:3': 50.0}
+
+        # quiet for 10 seconds, or dirty for 60 seconds despite being marked a second ago
+        due, next_due = recompute_scheduler.ready(marked, first_marked, now=110.0, quiet_period=10, max_delay=60)
+        self.assertEqual(due, ['classroom_performance:1', 'term_subject_performance:3'])
+        self.assertEqual(next_due, 8.0)
+
+        # every mark of a burst coalesces into the one member, due once the burst goes quiet
+        due, next_due = recompute_scheduler.ready({'classroom_performance:1': 140.0}, {'classroom_performance:1': 100.0}, now=150.0, quiet_period=10, max_delay=60)
+        self.assertEqual((due, next_due), (['classroom_performance:1'], None))
+
+    def test_marks_recompute_once_committed_without_redis(self):
+        with patch.object(recompute_scheduler, 'recompute') as recompute:
+            with self.captureOnCommitCallbacks() as callbacks:
+                recompute_scheduler.mark('classroom_performance', 1)
+                recompute.assert_not_called()
+
+            for callback in callbacks:
+                callback()
+
+        recompute.assert_called_once_with({'classroom_performance': [1]})
+
+
+@skipUnless(fakeredis, 'fakeredis is not installed')
+@override_settings(RECOMPUTE_QUIET_PERIOD=10, RECOMPUTE_MAX_DELAY=60)
+class RecomputeSchedulerRedisTest(TestCase):
+    """
+    Test cases for the Redis dirty set of the scheduler, claimed by the drain with its Lua script.
+    """
+
+    def setUp(self):
+        self.redis = fakeredis.FakeStrictRedis()
+        connection = patch.object(RecomputeScheduler, 'connection', new_callable=PropertyMock, return_value=self.redis)
+        connection.start()
+        self.addCleanup(connection.stop)
+
+        # drains are scheduled, not run, the test drains when the quiet period is over
+        apply_async = patch('seeran_backend.tasks.drain_recomputes_task.apply_async')
+        self.apply_async = apply_async.start()
+        self.addCleanup(apply_async.stop)
+
+        self.scheduler = RecomputeScheduler()
+        self.now = 1000.0
+
+    def mark(self, entity, entity_id, at):
+        with patch('seeran_backend.recompute.time.time', return_value=self.now + at):
+            self.scheduler.mark_dirty(entity, entity_id)
+
+    def drain(self, at):
+        with patch('seeran_backend.recompute.time.time', return_value=self.now + at):
+            return self.scheduler.drain()
+
+    def test_repeated_marks_are_coalesced_into_one_recompute(self):
+        self.mark('classroom_performance', 1, at=0)
+        self.mark('classroom_performance', 1, at=2)
+        self.mark('term_subject_performance', 3, at=3)
+
+        # one pending drain for the whole burst
+        self.apply_async.assert_called_once_with(countdown=10)
+
+        with patch.object(self.scheduler, 'recompute') as recompute:
+            # still inside the quiet period of every entity, the drain schedules itself for the first one due
+            self.assertEqual(self.drain(at=10), 0)
+            recompute.assert_not_called()
+            self.assertEqual(self.apply_async.call_args.kwargs, {'countdown': 2.0})
+
+            self.assertEqual(self.drain(at=13), 2)
+            recompute.assert_called_once_with({'classroom_performance': [1], 'term_subject_performance': [3]})
+
+            # nothing is left dirty or claimed
+            self.assertEqual(self.drain(at=30), 0)
+            self.assertEqual(recompute.call_count, 1)
+
+        self.assertEqual(self.redis.zcard(self.scheduler.dirty_key), 0)
+        self.assertEqual(self.redis.keys(self.scheduler.running_prefix + '*'), [])
+
+    def test_entity_marked_during_its_run_is_recomputed_once_more(self):
+        self.mark('classroom_performance', 1, at=0)
+
+        runs = []
+        def recompute(seeds):
+            runs.append(seeds)
+            if len(runs) == 1:
+                self.mark('classroom_performance', 1, at=11)
+
+        with patch.object(self.scheduler, 'recompute', side_effect=recompute):
+            self.assertEqual(self.drain(at=11), 1)
+            self.assertEqual(self.drain(at=22), 1)
+            self.assertEqual(self.drain(at=40), 0)
+
+        self.assertEqual(runs, [{'classroom_performance': [1]}] * 2)
+
+    def test_entity_still_running_is_left_for_a_later_drain(self):
+        self.mark('classroom_performance', 1, at=0)
+        self.redis.set(self.scheduler.running_prefix + 'classroom_performance:1', 1)
+
+        with patch.object(self.scheduler, 'recompute') as recompute:
+            self.assertEqual(self.drain(at=11), 0)
+            recompute.assert_not_called()
+
+            self.redis.delete(self.scheduler.running_prefix + 'classroom_performance:1')
+            self.assertEqual(self.drain(at=21), 1)
@@ -18,6 +18,9 @@ from grades import utils as grades_utilities
 from subjects import utils as subjects_utilities
 from classrooms import utils as classrooms_utilities
 
+# relationship index
+from accounts.checks.relationships import relationships
+
 
 class Classroom(models.Model):
     """
@@ -76,6 +79,8 @@ class Classroom(models.Model):
         self.clean()
         try:
             super().save(*args, **kwargs)
+            # the classroom's teacher or students may have changed
+            relationships.changed(self.school_id)
         except IntegrityError as e:
             # Handle any database integrity errors (such as unique or foreign key constraints).
             error_message = str(e).lower()
@@ -90,6 +95,10 @@ class Classroom(models.Model):
         except Exception as e:
             raise ValidationError(_(str(e)))  # Catch and raise any exceptions as validation errors
 
+    def delete(self, *args, **kwargs):
+        relationships.changed(self.school_id)
+        return super().delete(*args, **kwargs)
+
     def clean(self):
         if not self.school_id:
             raise ValidationError('Could not proccess your request, a classroom must either be a register classroom or be associated with a subject. Please review the provided information and try again.')
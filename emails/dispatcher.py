@@ -0,0 +1,129 @@
+# python
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from decouple import config
+
+# django
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+# models
+from emails.models import OutgoingEmail
+
+# logging
+import logging
+
+# Get loggers
+emails_logger = logging.getLogger('emails_logger')
+
+
+# responses worth retrying, Mailgun throttling us or failing on its side
+RETRYABLE_RESPONSE_CODES = (429, 500, 502, 503, 504)
+
+
+class MailDispatcher:
+    """
+    Sends emails through Mailgun off the request thread.
+
+    Views queue an email in the `OutgoingEmail` outbox and return straight away, a celery task delivers it once
+    the view's transaction commits. Deliveries share one pooled HTTP session per process, so consecutive emails
+    reuse open TLS connections, and throttled (429) or failed (5xx) deliveries are retried with exponential
+    backoff. The outbox row records the delivery status clients poll.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.client = None
+
+    @property
+    def session(self):
+        # created on first use so every (forked) worker process opens its own connections
+        if self.client is None:
+            with self.lock:
+                if self.client is None:
+                    session = requests.Session()
+                    session.auth = ('api', config('MAILGUN_API_KEY'))
+
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.MAIL_DISPATCH_POOL_SIZE)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+
+                    self.client = session
+
+        return self.client
+
+    def queue(self, payload):
+        """
+        Queues an email for delivery once the current transaction commits.
+
+        Args:
+            payload (dict): The Mailgun form fields of the email.
+
+        Returns:
+            OutgoingEmail: The queued email, its `email_id` is the delivery ID clients poll.
+        """
+        # tasks
+        from emails.tasks import deliver_outgoing_email_task
+
+        email = OutgoingEmail.objects.create(payload=payload)
+        transaction.on_commit(lambda: deliver_outgoing_email_task.delay(str(email.email_id)))
+
+        return email
+
+    def backoff(self, attempts, retry_after=None):
+        """
+        Returns the seconds to wait before the next delivery attempt, doubling with every attempt made
+        and never shorter than a Retry-After header sent back by Mailgun.
+        """
+        delay = min(settings.MAIL_DISPATCH_RETRY_BACKOFF * 2 ** (attempts - 1), settings.MAIL_DISPATCH_MAX_BACKOFF)
+
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+
+        return delay
+
+    def deliver(self, email, final=False):
+        """
+        Makes one delivery attempt of a queued email and records its outcome.
+
+        Args:
+            email (OutgoingEmail): The queued email.
+            final (bool): Whether this is the last attempt, a retryable failure then fails the email.
+
+        Returns:
+            int: The seconds to wait before retrying, None once the email is sent or failed.
+        """
+        url = f"{settings.MAILGUN_API_BASE_URL}/{config('MAILGUN_DOMAIN')}/messages"
+        email.attempts += 1
+
+        try:
+            response = self.session.post(url, data=email.payload, timeout=settings.MAIL_DISPATCH_TIMEOUT)
+            email.response_code = response.status_code
+            retry_after = response.headers.get('Retry-After')
+
+        except requests.RequestException as e:
+            emails_logger.warning(f"Could not reach Mailgun to deliver email {email.email_id}: {str(e)}")
+            response, email.response_code, retry_after = None, None, None
+
+        if response is not None and response.status_code == 200:
+            email.status = 'SENT'
+            email.message_id = response.json().get('id', '')
+            email.sent_at = timezone.now()
+
+        elif final or (response is not None and response.status_code not in RETRYABLE_RESPONSE_CODES):
+            emails_logger.error(f"Could not deliver email {email.email_id}, status {email.response_code} after {email.attempts} attempts.")
+            email.status = 'FAILED'
+
+        if email.status == 'QUEUED':
+            email.save(update_fields=['attempts', 'response_code'])
+            return self.backoff(email.attempts, retry_after)
+
+        # the payload holds one time passcodes, keep it no longer than needed
+        email.payload = {}
+        email.save(update_fields=['payload', 'status', 'attempts', 'response_code', 'message_id', 'sent_at'])
+
+
+# Initialize the MailDispatcher instance
+mail_dispatcher = MailDispatcher()
@@ -1,3 +1,6 @@
+# python
+import uuid
+
 # django
 from django.db import models
 from django.utils import timezone
@@ -39,3 +42,45 @@ class Email(models.Model):
         verbose_name = "Email"
         verbose_name_plural = "Emails"
         ordering = ['received_at']  # Orders emails chronologically within a case
+
+
+class OutgoingEmail(models.Model):
+    """
+    Outbox of emails sent through Mailgun by the mail dispatcher, one row per email.
+
+    Fields:
+        email_id (UUIDField): Public ID of the email, clients poll its delivery status with it.
+        payload (JSONField): The Mailgun form fields of the email, cleared once the email is sent or failed.
+        status (CharField): QUEUED until Mailgun accepts the email (SENT) or it can no longer be delivered (FAILED).
+        attempts (PositiveSmallIntegerField): Number of delivery attempts made.
+        response_code (PositiveSmallIntegerField): HTTP status of the last attempt, None if Mailgun could not be reached.
+        message_id (CharField): The Mailgun message ID of a sent email.
+        queued_at (DateTimeField): Timestamp when the email was queued.
+        sent_at (DateTimeField): Timestamp when Mailgun accepted the email.
+    """
+    email_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    payload = models.JSONField(default=dict)
+
+    status = models.CharField(
+        max_length=10,
+        choices=[
+            ('QUEUED', 'Queued'), 
+            ('SENT', 'Sent'), 
+            ('FAILED', 'Failed')
+        ],
+        default='QUEUED'
+    )
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    response_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    message_id = models.CharField(max_length=255, blank=True)
+
+    queued_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Outgoing email {self.email_id} ({self.get_status_display()})"
+
+    class Meta:
+        verbose_name = "Outgoing Email"
+        verbose_name_plural = "Outgoing Emails"
@@ -3,12 +3,17 @@ from google.cloud import storage
 
 # celery
 from celery import shared_task
+from celery.exceptions import Reject
 
 # decode
 from decouple import config
 
+# models
+from emails.models import OutgoingEmail
+
 # utllity function
 from emails import utils as emails_utilities
+from emails.dispatcher import mail_dispatcher
 
 # logging
 import logging
@@ -50,3 +55,20 @@ def fetch_and_process_incoming_emails(self, *args, **kwargs):
 
         raise self.retry(exc=e)
 
+
+@shared_task(bind=True, max_retries=6)
+def deliver_outgoing_email_task(self, email_id):
+    try:
+        email = OutgoingEmail.objects.get(email_id=email_id)
+    except OutgoingEmail.DoesNotExist:
+        raise Reject('an outgoing email with the provided email ID does not exist')
+
+    # already sent or failed, e.g. a duplicate delivery of this task
+    if email.status != 'QUEUED':
+        return email.status
+
+    retry_in = mail_dispatcher.deliver(email, final=self.request.retries >= self.max_retries)
+    if retry_in is not None:
+        raise self.retry(countdown=retry_in)
+
+    return email.status
@@ -1,3 +1,108 @@
-from django.test import TestCase
+# python
+import os
+import json
+import threading
+from unittest.mock import patch
+from urllib.parse import parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 
-# Create your tests here.
+# django
+from django.test import TestCase, override_settings
+
+# models
+from emails.models import OutgoingEmail
+
+# tasks
+from emails.tasks import deliver_outgoing_email_task
+
+# utility functions
+from emails.dispatcher import mail_dispatcher
+
+
+class FakeMailgun:
+    """
+    Local stand-in for the Mailgun messages API, answering with the scripted status codes in order (200 once
+    they run out) and recording the form data of every request.
+    """
+
+    def __init__(self, *response_codes):
+        self.response_codes = list(response_codes)
+        self.requests = []
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length'])).decode()
+                fake.requests.append({key: values[0] for key, values in parse_qs(body).items()})
+
+                response_code = fake.response_codes.pop(0) if fake.response_codes else 200
+                content = json.dumps({'id': f'<{len(fake.requests)}@fake.mailgun>', 'message': 'Queued. Thank you.'}).encode()
+
+                self.send_response(response_code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server.server_port}/v3'
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@patch.dict(os.environ, {'MAILGUN_DOMAIN': 'seeran.test', 'MAILGUN_API_KEY': 'key'})
+class MailDispatcherTest(TestCase):
+
+    def setUp(self):
+        mail_dispatcher.client = None
+        self.payload = {'to': 'john.doe@example.com', 'subject': 'One Time Passcode', 'v:onetimecode': '123456'}
+
+    def deliver(self, fake_mailgun):
+        with self.captureOnCommitCallbacks() as callbacks, override_settings(MAILGUN_API_BASE_URL=fake_mailgun.url):
+            email = mail_dispatcher.queue(self.payload)
+
+        with override_settings(MAILGUN_API_BASE_URL=fake_mailgun.url), patch.object(deliver_outgoing_email_task, 'delay', lambda email_id: deliver_outgoing_email_task.apply(args=[email_id])):
+            for callback in callbacks:
+                callback()
+
+        email.refresh_from_db()
+        return email
+
+    def test_queued_email_is_delivered(self):
+        with FakeMailgun() as fake_mailgun:
+            email = self.deliver(fake_mailgun)
+
+        self.assertEqual((email.status, email.attempts, email.message_id), ('SENT', 1, '<1@fake.mailgun>'))
+        self.assertEqual(fake_mailgun.requests, [self.payload])
+        self.assertEqual(email.payload, {})
+
+    def test_throttled_and_failed_deliveries_are_retried_with_backoff(self):
+        email = OutgoingEmail.objects.create(payload=self.payload)
+
+        with FakeMailgun(429, 503) as fake_mailgun, override_settings(MAILGUN_API_BASE_URL=fake_mailgun.url, MAIL_DISPATCH_RETRY_BACKOFF=5):
+            retries = [mail_dispatcher.deliver(email) for _ in range(3)]
+
+        self.assertEqual(retries, [5, 10, None])
+        self.assertEqual((email.status, email.attempts, email.response_code), ('SENT', 3, 200))
+
+    def test_rejected_email_fails_without_retrying(self):
+        with FakeMailgun(400) as fake_mailgun:
+            email = self.deliver(fake_mailgun)
+
+        self.assertEqual((email.status, email.attempts, email.response_code), ('FAILED', 1, 400))
+
+        response = self.client.get(f'/api/emails/delivery-status/{email.email_id}/', secure=True)
+        self.assertEqual(response.json(), {'status': 'FAILED', 'attempts': 1})
@@ -4,5 +4,8 @@ from . import views
 urlpatterns = [
     # recieving api endpoint
     path('parse-email/', views.parse_email, name='recieves an email parses it, allocates a case if without and saves to db.'),
+
+    # delivery status of queued emails
+    path('delivery-status/<uuid:delivery_id>/', views.delivery_status, name='returns the delivery status of a queued email.'),
     
 ]
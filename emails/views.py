@@ -2,6 +2,9 @@
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 
+# models
+from emails.models import OutgoingEmail
+
 # utllity function
 from emails import utils as emails_utilities
 
@@ -50,3 +53,21 @@ def parse_email(request):
     
     # Process each email (you can use your existing parsing logic here)
     return emails_utilities.process_email(request.POST)
+
+
+def delivery_status(request, delivery_id):
+    """
+    Endpoint to poll the delivery status of an email queued by the mail dispatcher,
+    e.g. the One Time Passcode email of a login request.
+
+    Returns:
+        JsonResponse with the status (QUEUED, SENT or FAILED) and the delivery attempts made.
+    """
+    if request.method != 'GET':
+        return JsonResponse({"error": "Could not process your request, only GET requests are allowed at this endpoint"}, status=405)
+
+    email = OutgoingEmail.objects.filter(email_id=delivery_id).values('status', 'attempts').first()
+    if email is None:
+        return JsonResponse({"error": "Could not process your request, an email with the provided delivery ID does not exist"}, status=404)
+
+    return JsonResponse(email)
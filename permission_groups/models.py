@@ -6,6 +6,9 @@ from django.db import models, IntegrityError
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
 
+# utility functions
+from account_permissions import utils as permissions_utilities
+
 
 class AdminPermissionGroup(models.Model):
     """
@@ -49,6 +52,7 @@ class AdminPermissionGroup(models.Model):
         self.clean()  # Calls the clean method to validate the instance
         try:
             super().save(*args, **kwargs)  # Calls the parent class's save method
+            permissions_utilities.permissions_changed(self.school_id)
         except IntegrityError as e:
             # Handle unique constraint violation on group name
             if 'unique constraint' in str(e).lower():
@@ -58,6 +62,10 @@ class AdminPermissionGroup(models.Model):
         except Exception as e:
             raise ValidationError(_(str(e)))
 
+    def delete(self, *args, **kwargs):
+        permissions_utilities.permissions_changed(self.school_id)
+        return super().delete(*args, **kwargs)
+
     def clean(self):
         """
         Custom validation method to ensure the integrity of the model's data.
@@ -153,6 +161,7 @@ class TeacherPermissionGroup(models.Model):
         self.clean()  # Calls the clean method to validate the instance
         try:
             super().save(*args, **kwargs)  # Calls the parent class's save method
+            permissions_utilities.permissions_changed(self.school_id)
         except IntegrityError as e:
             # Handle unique constraint violation on group name
             if 'unique constraint' in str(e).lower():
@@ -162,6 +171,10 @@ class TeacherPermissionGroup(models.Model):
         except Exception as e:
             raise ValidationError(_(str(e)))
 
+    def delete(self, *args, **kwargs):
+        permissions_utilities.permissions_changed(self.school_id)
+        return super().delete(*args, **kwargs)
+
     def clean(self):
         """
         Custom validation method to ensure the integrity of the model's data.
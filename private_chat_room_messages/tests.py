@@ -1,3 +1,55 @@
-from django.test import TestCase
+# django
+from django.test import TestCase, override_settings
+from django.core.cache import cache
 
-# Create your tests here.
+# models
+from accounts.models import BaseAccount
+from private_chat_rooms.models import PrivateChatRoom, PrivateChatRoomMembership
+from private_chat_room_messages.models import PrivateMessage
+
+# utility functions
+from private_chat_room_messages.utils import get_unread_messages_count, adjust_unread_messages_count
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class UnreadMessagesCounterTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+        self.sender = BaseAccount.objects.create(name='John', surname='Doe', email_address='john.doe@example.com', role='TEACHER')
+        self.recipient = BaseAccount.objects.create(name='Jane', surname='Doe', email_address='jane.doe@example.com', role='TEACHER')
+        self.outsider = BaseAccount.objects.create(name='Jim', surname='Doe', email_address='jim.doe@example.com', role='TEACHER')
+
+        self.chat_room = PrivateChatRoom.objects.create()
+        PrivateChatRoomMembership.objects.create(chat_room=self.chat_room, participant=self.sender)
+        PrivateChatRoomMembership.objects.create(chat_room=self.chat_room, participant=self.recipient)
+
+    def send_message(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            PrivateMessage.objects.create(author=self.sender, message_content='hi', chat_room=self.chat_room)
+            adjust_unread_messages_count(self.recipient.account_id, 1)
+
+    def test_counter_is_rebuilt_from_the_accounts_chat_rooms(self):
+        PrivateMessage.objects.create(author=self.sender, message_content='hi', chat_room=self.chat_room)
+
+        self.assertEqual(get_unread_messages_count(self.recipient), 1)
+        # the sender's own messages and other accounts' chat rooms are not counted
+        self.assertEqual(get_unread_messages_count(self.sender), 0)
+        self.assertEqual(get_unread_messages_count(self.outsider), 0)
+
+    def test_counter_follows_sent_and_read_messages_without_querying(self):
+        self.assertEqual(get_unread_messages_count(self.recipient), 0)
+
+        self.send_message()
+        self.send_message()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_messages_count(self.recipient), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            marked_read = self.chat_room.messages.filter(read_receipt=False).exclude(author=self.recipient).update(read_receipt=True)
+            adjust_unread_messages_count(self.recipient.account_id, -marked_read)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_messages_count(self.recipient), 0)
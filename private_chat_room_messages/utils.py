@@ -0,0 +1,49 @@
+# django
+from django.conf import settings
+from django.db import transaction
+from django.core.cache import cache
+
+# models
+from private_chat_room_messages.models import PrivateMessage
+
+# utility functions
+from seeran_backend.utils import adjust_cached_counter
+
+
+def unread_messages_key(account_id):
+    return f'unread_messages_{account_id}'
+
+
+def get_unread_messages_count(account):
+    """
+    Returns the number of private messages sent to an account that it has not read yet.
+
+    The count is served from the account's cached counter, the counter is rebuilt from the database
+    (messages in the account's chat rooms, authored by someone else and without a read receipt) when it is missing.
+
+    Args:
+        account (BaseAccount): The account to count unread messages for.
+
+    Returns:
+        int: The number of unread messages.
+    """
+    key = unread_messages_key(account.account_id)
+
+    unread_messages_count = cache.get(key)
+    if unread_messages_count is None:
+        unread_messages_count = PrivateMessage.objects.filter(chat_room__participants=account, read_receipt=False).exclude(author=account).count()
+        cache.add(key, unread_messages_count, timeout=settings.UNREAD_COUNTERS_TIMEOUT)
+
+    return unread_messages_count
+
+
+def adjust_unread_messages_count(account_id, delta):
+    """
+    Moves an account's unread messages counter by `delta` once the current transaction commits.
+
+    Args:
+        account_id (str): The account ID of the recipient (or reader) of the messages.
+        delta (int): Positive for newly sent messages, negative for messages that were read.
+    """
+    key = unread_messages_key(account_id)
+    transaction.on_commit(lambda: adjust_cached_counter(key, delta))
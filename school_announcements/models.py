@@ -37,6 +37,10 @@ class Announcement(models.Model):
                 requesting_account = BaseAccount.objects.get(account_id=user)
                 self.accounts_reached.add(requesting_account)
 
+                # imported here, the counters module imports this one
+                from school_announcements.utils import announcement_reached
+                announcement_reached(requesting_account.account_id)
+
         except BaseAccount.DoesNotExist:
             # Handle the case where the base user account does not exist.
             raise ValidationError(_('Could not process your request, an account with the provided credentials does not exist. Error updating announcement reached status.. Please check the account details and try again.'))
@@ -0,0 +1,65 @@
+# django
+from django.conf import settings
+from django.db import transaction
+from django.core.cache import cache
+
+# models
+from school_announcements.models import Announcement
+
+# utility functions
+from seeran_backend.utils import adjust_cached_counter
+
+
+def school_announcements_key(school_id):
+    return f'school_announcements_{school_id}'
+
+
+def announcements_reached_key(account_id):
+    return f'announcements_reached_{account_id}'
+
+
+def get_unread_announcements_count(account, school):
+    """
+    Returns the number of announcements of a school that an account has not seen yet.
+
+    Counted as the school's announcements minus the ones the account has been reached by, both served from
+    cached counters so a new announcement costs one increment instead of one per account in the school.
+    Missing counters are rebuilt from the database.
+
+    Args:
+        account (BaseAccount): The account to count unread announcements for.
+        school (School): The school the account belongs to.
+
+    Returns:
+        int: The number of unread announcements.
+    """
+    school_key = school_announcements_key(school.pk)
+    reached_key = announcements_reached_key(account.account_id)
+
+    counters = cache.get_many([school_key, reached_key])
+
+    if school_key not in counters:
+        counters[school_key] = Announcement.objects.filter(school=school).count()
+        cache.add(school_key, counters[school_key], timeout=settings.UNREAD_COUNTERS_TIMEOUT)
+
+    if reached_key not in counters:
+        counters[reached_key] = Announcement.objects.filter(school=school, accounts_reached=account).count()
+        cache.add(reached_key, counters[reached_key], timeout=settings.UNREAD_COUNTERS_TIMEOUT)
+
+    return max(counters[school_key] - counters[reached_key], 0)
+
+
+def announcement_created(school_id):
+    """
+    Counts a new announcement of a school once the current transaction commits.
+    """
+    key = school_announcements_key(school_id)
+    transaction.on_commit(lambda: adjust_cached_counter(key, 1))
+
+
+def announcement_reached(account_id):
+    """
+    Counts an announcement an account has just seen once the current transaction commits.
+    """
+    key = announcements_reached_key(account_id)
+    transaction.on_commit(lambda: adjust_cached_counter(key, 1))
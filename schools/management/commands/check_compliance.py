@@ -1,18 +1,32 @@
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils import timezone
+from datetime import timedelta
+from asgiref.sync import async_to_sync
 from schools.models import School
-from balances.models import Bill
+from accounts.context import account_contexts
+from seeran_backend.middleware import connection_manager
 
 class Command(BaseCommand):
     help = 'Check compliance of schools'
 
     def handle(self, *args, **options):
-        schools = School.objects.all()
-        for school in schools:
-            # Get the date 7 days ago
-            seven_days_ago = timezone.now().date() - timezone.timedelta(days=7)
-            # Check if the school has been in arrears for 7 days
-            if school.in_arears and school.balance.last_updated.date() <= seven_days_ago:
-                # Set the none_compliant field to True
-                school.none_compliant = True
-                school.save()
+        # Get the date 7 days ago
+        seven_days_ago = timezone.now() - timedelta(days=7)
+
+        with transaction.atomic():
+            # Schools that have been in arrears for 7 days, and still have access
+            school_ids = list(set(
+                School.objects.filter(in_arrears=True, none_compliant=False, principal__balance__last_updated__lte=seven_days_ago).values_list('pk', flat=True)
+            ))
+
+            if school_ids:
+                # Deny them access with a single update, and cache their compliance flag for the accounts context
+                School.objects.filter(pk__in=school_ids).update(none_compliant=True)
+                account_contexts.schools_denied_access(school_ids)
+
+        # Close the open sessions of the schools' accounts
+        for school_id in school_ids:
+            async_to_sync(connection_manager.deny_school_access)(school_id)
+
+        self.stdout.write(f'{len(school_ids)} schools denied access.')
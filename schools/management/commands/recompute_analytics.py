@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from schools.models import School
+from terms.models import Term
+from seeran_backend.analytics_pipeline import AnalyticsRun, school_seeds
+
+class Command(BaseCommand):
+    help = 'Recompute the performance metrics and progress reports of a school in one analytics pipeline run'
+
+    def add_arguments(self, parser):
+        parser.add_argument('school_id', help='School ID of the school to recompute')
+        parser.add_argument('--term', dest='term_id', help='Term ID of the term to recompute, every term of the school by default')
+
+    def handle(self, *args, **options):
+        try:
+            school = School.objects.get(school_id=options['school_id'])
+            term = Term.objects.get(term_id=options['term_id'], school=school) if options['term_id'] else None
+        except (School.DoesNotExist, Term.DoesNotExist):
+            raise CommandError('a school or term with the provided credentials does not exist.')
+
+        # End of term recompute runs as one bounded job, every stage recomputing its entities once
+        trace = AnalyticsRun(school_seeds(school, term)).execute()
+
+        for stage in trace['stages']:
+            self.stdout.write(f"{stage['stage']}: {stage['entities']} recomputed, {stage['failures']} failed in {stage['seconds']}s")
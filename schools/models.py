@@ -7,6 +7,9 @@ from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
 
+# utility functions
+from accounts.context import account_contexts
+
 
 class School(models.Model):
     """
@@ -171,6 +174,13 @@ class School(models.Model):
         except Exception as e:
             raise ValidationError(_(str(e)))  # Catch and raise any exceptions as validation errors
 
+        # drop the cached compliance flag of the school's accounts
+        account_contexts.school_changed(self.pk)
+
+    def delete(self, *args, **kwargs):
+        account_contexts.school_changed(self.pk)
+        return super().delete(*args, **kwargs)
+
     def clean(self):
         """
         Custom validation method to ensure data integrity for contact number, email, and logo.
@@ -1,12 +1,22 @@
 # python
 import uuid
+from io import StringIO
+from datetime import timedelta
 
 # django
 from django.test import TestCase
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.cache import cache
+from django.utils import timezone
 
 # models
 from .models import School
+from accounts.models import Principal
+from balances.models import Balance
+
+# utility functions
+from accounts.context import account_contexts
 
 
 class SchoolModelTest(TestCase):
@@ -353,3 +363,25 @@ class SchoolModelTest(TestCase):
         """
         school = School.objects.create(**self.school_data)
         self.assertEqual(str(school), school.name)
+
+
+class CheckComplianceCommandTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+        self.schools = []
+        for index, last_updated in enumerate([timezone.now() - timedelta(days=8), timezone.now()]):
+            school = School.objects.create(name=f'Test School {index}', email_address=f'testschool{index}@example.com', contact_number=f'012345678{index}', in_arrears=True)
+            principal = Principal.objects.create(name='Bob', surname='Brown', email_address=f'bob.brown{index}@example.com', contact_number=f'012345678{index}', role='PRINCIPAL', school=school)
+            Balance.objects.filter(pk=Balance.objects.create(user=principal).pk).update(last_updated=last_updated)
+            self.schools.append(school)
+
+    def test_schools_in_arrears_for_a_week_are_denied_access(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('check_compliance', stdout=StringIO())
+
+        overdue, recent = self.schools
+        self.assertEqual(list(School.objects.filter(none_compliant=True).values_list('pk', flat=True)), [overdue.pk])
+        self.assertIs(cache.get(account_contexts.school_key(overdue.pk)), True)
+        self.assertIsNone(cache.get(account_contexts.school_key(recent.pk)))
@@ -0,0 +1,181 @@
+# python
+import time
+import uuid
+from collections import defaultdict
+
+# django
+from django.apps import apps
+
+# utility functions
+from student_subject_performances.utils import update_student_subject_performances
+
+# logging
+import logging
+
+# Get loggers
+logger = logging.getLogger(__name__)
+
+
+# the stages of the pipeline in dependency order, each stage's recompute marks the stages after it dirty
+STAGES = ('assessment', 'student_subject_performance', 'classroom_performance', 'term_subject_performance', 'progress_report')
+
+
+class AnalyticsRun:
+    """
+    One run of the analytics pipeline, transcripts to progress reports.
+
+    The run keeps a dirty set per stage and recomputes the stages in dependency order: assessment metrics (from
+    their transcripts), student subject performances, classroom performances, term subject performances and
+    progress reports. Each stage recomputes its whole dirty set in one batch and marks what depends on it dirty
+    in the stages after it, so an entity reached through several paths is recomputed once per run. The run is
+    recorded in a single trace of how many entities each stage recomputed, how many failed and how long it took.
+
+    Dirty entities are keyed by primary key, except student subject performances, keyed by
+    (subject_id, term_id, student_id), and progress reports, keyed by (student_id, term_id).
+    """
+
+    def __init__(self, seeds):
+        """
+        Args:
+            seeds (dict): The dirty entities the run starts from, per stage.
+        """
+        self.run_id = uuid.uuid4().hex
+        self.dirty = {stage: set() for stage in STAGES}
+        for stage, keys in seeds.items():
+            self.dirty[stage].update(keys)
+
+        self.trace = {'run_id': self.run_id, 'stages': []}
+
+    def execute(self):
+        """
+        Runs every stage with dirty entities in dependency order.
+
+        Returns:
+            dict: The trace of the run.
+        """
+        for stage in STAGES:
+            keys = self.dirty[stage]
+            if not keys:
+                continue
+
+            start = time.perf_counter()
+            failures = getattr(self, f'recompute_{stage}s')(keys)
+            self.trace['stages'].append({'stage': stage, 'entities': len(keys), 'failures': failures, 'seconds': round(time.perf_counter() - start, 3)})
+
+        logger.info(f"analytics run {self.run_id}: " + ', '.join(f"{stage['stage']} {stage['entities']} ({stage['failures']} failed) in {stage['seconds']}s" for stage in self.trace['stages']))
+        return self.trace
+
+    def attempt(self, stage, key, function, *args):
+        # a failing entity is logged and skipped, the rest of its stage and the stages after it still run
+        try:
+            function(*args)
+            return 0
+
+        except Exception as e:
+            logger.error(f'analytics run {self.run_id} could not recompute {stage} {key}: {str(e)}')
+            return 1
+
+    def recompute_assessments(self, keys):
+        Assessment = apps.get_model('assessments', 'Assessment')
+
+        failures = 0
+        for assessment in Assessment.objects.filter(id__in=keys, grades_released=True).select_related('classroom', 'grade', 'subject'):
+            failures += self.attempt('assessment', assessment.id, assessment.update_performance_metrics)
+
+            # the subject performances of every student the assessment was set for
+            accessed_students = (assessment.classroom.students if assessment.classroom else assessment.grade.students)
+            self.dirty['student_subject_performance'].update(
+                (assessment.subject_id, assessment.term_id, student_id) for student_id in accessed_students.values_list('id', flat=True)
+            )
+
+        return failures
+
+    def recompute_student_subject_performances(self, keys):
+        Subject = apps.get_model('subjects', 'Subject')
+        Term = apps.get_model('terms', 'Term')
+        Classroom = apps.get_model('classrooms', 'Classroom')
+        ClassroomPerformance = apps.get_model('classroom_performances', 'ClassroomPerformance')
+        TermSubjectPerformance = apps.get_model('term_subject_performances', 'TermSubjectPerformance')
+
+        students = defaultdict(set)
+        for subject_id, term_id, student_id in keys:
+            students[(subject_id, term_id)].add(student_id)
+
+        subjects = Subject.objects.select_related('grade', 'school').in_bulk({subject_id for subject_id, _ in students})
+        terms = Term.objects.in_bulk({term_id for _, term_id in students})
+
+        failures = 0
+        for (subject_id, term_id), student_ids in students.items():
+            subject, term = subjects.get(subject_id), terms.get(term_id)
+            if subject is None or term is None:
+                continue
+
+            failures += self.attempt('student_subject_performance', (subject_id, term_id), update_student_subject_performances, subject, term, subject.grade, subject.school, student_ids)
+
+            # the subject's classrooms the students are in, and the subject's performance for the term
+            for classroom in Classroom.objects.filter(subject=subject, students__in=student_ids).distinct():
+                classroom_performance, created = ClassroomPerformance.objects.get_or_create(classroom=classroom, term=term, defaults={'school': classroom.school})
+                self.dirty['classroom_performance'].add(classroom_performance.id)
+
+            term_performance, created = TermSubjectPerformance.objects.get_or_create(subject=subject, term=term, defaults={'school': subject.school})
+            self.dirty['term_subject_performance'].add(term_performance.id)
+
+            self.dirty['progress_report'].update((student_id, term_id) for student_id in student_ids)
+
+        return failures
+
+    def recompute_classroom_performances(self, keys):
+        ClassroomPerformance = apps.get_model('classroom_performances', 'ClassroomPerformance')
+        TermSubjectPerformance = apps.get_model('term_subject_performances', 'TermSubjectPerformance')
+
+        failures = 0
+        for classroom_performance in ClassroomPerformance.objects.filter(id__in=keys).select_related('classroom__subject', 'term', 'school'):
+            failures += self.attempt('classroom_performance', classroom_performance.id, classroom_performance.update_performance_metrics)
+
+            subject = classroom_performance.classroom.subject
+            if subject:
+                term_performance, created = TermSubjectPerformance.objects.get_or_create(subject=subject, term=classroom_performance.term, defaults={'school': classroom_performance.school})
+                self.dirty['term_subject_performance'].add(term_performance.id)
+
+        return failures
+
+    def recompute_term_subject_performances(self, keys):
+        TermSubjectPerformance = apps.get_model('term_subject_performances', 'TermSubjectPerformance')
+
+        failures = 0
+        for term_performance in TermSubjectPerformance.objects.filter(id__in=keys).select_related('subject', 'term', 'school'):
+            failures += self.attempt('term_subject_performance', term_performance.id, term_performance.update_performance_metrics)
+
+        return failures
+
+    def recompute_progress_reports(self, keys):
+        ProgressReport = apps.get_model('student_progress_reports', 'ProgressReport')
+
+        students = defaultdict(set)
+        for student_id, term_id in keys:
+            students[term_id].add(student_id)
+
+        failures = 0
+        for term_id, student_ids in students.items():
+            # only reports that have been generated before, reports are not created by a recompute
+            for report in ProgressReport.objects.filter(term_id=term_id, student_id__in=student_ids).select_related('student', 'term', 'grade'):
+                failures += self.attempt('progress_report', report.id, report.generate_progress_report)
+
+        return failures
+
+
+def school_seeds(school, term=None):
+    """
+    Returns the seeds of an end of term recompute of a school, every assessment with released grades.
+
+    Args:
+        school (School): The school to recompute.
+        term (Term): The term to recompute, every term of the school if None.
+    """
+    Assessment = apps.get_model('assessments', 'Assessment')
+
+    assessments = Assessment.objects.filter(school=school, grades_released=True)
+    if term is not None:
+        assessments = assessments.filter(term=term)
+
+    return {'assessment': set(assessments.values_list('id', flat=True))}
@@ -0,0 +1,109 @@
+# python
+from typing import NamedTuple
+from decimal import Decimal, ROUND_HALF_UP
+import numpy as np
+
+
+# the percentile buckets students are placed in, a student lands in the first bucket whose cut point their score does not exceed
+PERCENTILES = (10, 25, 50, 75, 90)
+PERCENTILE_LABELS = ('10th', '25th', '50th', '75th', '90th')
+
+
+class CohortStatistics(NamedTuple):
+    """
+    The score statistics of a cohort of students, as float64 values.
+
+    Attributes:
+        count (int): The number of scores.
+        mean (float): The average score.
+        median (float): The median score.
+        mode (float): The most common score, the lowest of them on a tie.
+        standard_deviation (float): The population standard deviation of the scores.
+        highest (float): The highest score.
+        lowest (float): The lowest score.
+        interquartile_range (float): The spread between the 25th and 75th percentiles.
+        passed (int): The number of scores at or above the pass mark, None without a pass mark.
+        cut_points (numpy.ndarray): The scores at the 10th, 25th, 50th, 75th and 90th percentiles.
+        buckets (numpy.ndarray): The index into `PERCENTILES` of each student's bucket.
+        student_ids (numpy.ndarray): The student of each score.
+    """
+    count: int
+    mean: float
+    median: float
+    mode: float
+    standard_deviation: float
+    highest: float
+    lowest: float
+    interquartile_range: float
+    passed: int
+    cut_points: np.ndarray
+    buckets: np.ndarray
+    student_ids: np.ndarray
+
+    def students_per_percentile(self):
+        """
+        Returns the IDs of the students in each bucket, keyed by the bucket's percentile.
+        """
+        return {percentile: self.student_ids[self.buckets == index].tolist() for index, percentile in enumerate(PERCENTILES)}
+
+    def percentile_distribution(self):
+        """
+        Returns the `percentile_distribution` stored on the performance models.
+        """
+        return {
+            PERCENTILE_LABELS[PERCENTILES.index(percentile)]: {'count': len(students), 'students': students}
+            for percentile, students in self.students_per_percentile().items()
+        }
+
+
+def describe(rows, pass_mark=None):
+    """
+    Computes the statistics of a cohort in one vectorized pass.
+
+    Args:
+        rows (iterable): (score, student_id) pairs, e.g. from `values_list`. Scores may be Decimals but not None.
+        pass_mark (Decimal): The pass mark to count passing scores against, optional.
+
+    Returns:
+        CohortStatistics: The statistics of the cohort, None if it has no scores.
+    """
+    rows = list(rows)
+    if not rows:
+        return None
+
+    # converting each column on its own is several times faster than numpy converting a list of Decimal tuples
+    scores, student_ids = zip(*rows)
+    scores = np.fromiter(map(float, scores), dtype=np.float64, count=len(rows))
+    student_ids = np.fromiter(student_ids, dtype=np.int64, count=len(rows))
+
+    cut_points = np.percentile(scores, PERCENTILES)
+    q1, q3 = np.percentile(scores, (25, 75))
+
+    # np.unique sorts, so argmax picks the lowest of equally common scores
+    unique_scores, counts = np.unique(scores, return_counts=True)
+
+    return CohortStatistics(
+        count=scores.size,
+        mean=scores.mean(),
+        median=np.median(scores),
+        mode=unique_scores[np.argmax(counts)],
+        standard_deviation=scores.std(),
+        highest=scores.max(),
+        lowest=scores.min(),
+        interquartile_range=q3 - q1,
+        passed=None if pass_mark is None else int(np.count_nonzero(scores >= float(pass_mark))),
+        cut_points=cut_points,
+        # side='left' counts the cut points strictly below each score, so a score equal to a cut point stays in its bucket
+        buckets=np.searchsorted(cut_points[:-1], scores, side='left'),
+        student_ids=student_ids,
+    )
+
+
+def to_decimal(value):
+    """
+    Converts a statistic back to a Decimal rounded to two places, the precision of the score fields.
+    """
+    if value is None or np.isnan(value):
+        return None
+
+    return Decimal(repr(float(value))).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
@@ -1,24 +1,30 @@
 # django
 import time
 import re
+import asyncio
+from collections import deque, Counter
 
-# simlpe jwt
-from rest_framework_simplejwt.tokens import AccessToken
+# rest framework
 from rest_framework import status
 
 # channels
 from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
 
 # djnago
 from django.http import JsonResponse
+from django.http.cookie import parse_cookie
 from django.conf import settings
 from django.core.cache import cache
 
-# models
-from accounts.models import BaseAccount
-
 # utility functions
-from authentication.utils import validate_access_token
+from websockets.utils import response_encoder
+from authentication.pipeline import authenticate, AuthenticationFailed, TOKEN_MISSING, TOKEN_INVALID, TOKEN_REVOKED, ACCOUNT_MISSING
+from accounts.context import account_contexts, SCHOOL_ROLES
+from seeran_backend.rate_limits import rate_limiter
+
+# presence
+from websockets.presence import presence
 
 
 class IPThrottledEndpointsMiddleware:
@@ -29,19 +35,11 @@ class IPThrottledEndpointsMiddleware:
     - /api/auth/account-activation-credentials-verification/
     - /api/auth/password-reset-email-verification/
 
-    Configuration:
+    Configuration (`settings.RATE_LIMITS`, keyed by endpoint):
     - rate_limit: Maximum number of requests allowed per IP within the time window.
     - time_window: The time window (in seconds) within which the requests are counted.
     """
 
-    # Dictionary for storing the rate limits and time windows for each endpoint
-    rate_limits = {
-        '/api/auth/login/': {'rate_limit': 3, 'time_window': 3600},  # 3 requests per hour for login
-        '/api/auth/account-activation-credentials-verification/': {'rate_limit': 3, 'time_window': 3600},  # 3 requests per hour for account activation
-        '/api/auth/credentials-reset-email-verification/': {'rate_limit': 3, 'time_window': 3600},  # 3 requests per hour for password reset
-        # Add more endpoints as needed
-    }
-
     def get_ip_address(self, request):
         """
         Helper method to extract the client's IP address from the request.
@@ -89,13 +87,9 @@ class IPThrottledEndpointsMiddleware:
         """
         # Check if the requested endpoint has a rate limit defined
         endpoint = request.path
-        if endpoint not in self.rate_limits:
+        if endpoint not in settings.RATE_LIMITS:
             return self.get_response(request)  # No rate limit for this endpoint
 
-        # Get the rate limit and time window for this endpoint
-        rate_limit = self.rate_limits[endpoint]['rate_limit']
-        time_window = self.rate_limits[endpoint]['time_window']
-
         # Get the IP address of the client
         ip_address = self.get_ip_address(request)
         
@@ -103,68 +97,32 @@ class IPThrottledEndpointsMiddleware:
         if not ip_address:
             return self.get_response(request)
 
-        # Generate a unique cache key using the IP address to track the request history
-        cache_key = f"throttle_ip_address_{ip_address}_{endpoint}"
-
-        # Retrieve the request history (list of timestamps) from the cache
-        history = cache.get(cache_key, [])
-        
-        # If the history is not a list (corrupted or empty), reset it to an empty list
-        if not isinstance(history, list):
-            history = []
-
-        # Get the current time (in seconds since the epoch)
-        now = time.time()
-
-        # Clean the history by removing timestamps that are older than the time window
-        history = [timestamp for timestamp in history if timestamp > (now - time_window)]
-
-        # If the number of requests in the history exceeds the allowed rate limit, throttle the request
-        if len(history) >= rate_limit:
-            wait_time = time_window - (now - history[0])  # Time the user needs to wait before making another request
+        # Count the request against the endpoint's limit, one atomic check shared by every worker
+        wait_time = rate_limiter.hit(endpoint, ip_address)
 
+        # If the rate limit is exceeded, throttle the request
+        if wait_time:
             # Sanitize the endpoint to create a valid cookie name (avoid special characters)
             sanitized_endpoint = re.sub(r'[^a-zA-Z0-9_-]', '_', endpoint)
 
-            # Create the throttle cookie
-            throttle_cookie_name = f'throttle{sanitized_endpoint}'
-            throttle_cookie_value = f'Device throttled from sending requests to endpoint: {endpoint}'
-
             # Create a response indicating that the rate limit has been exceeded
             response = JsonResponse(
                 {'error': 'Could not process your request, too many requests received from your IP address. Please try again later.'},
                 status=status.HTTP_429_TOO_MANY_REQUESTS
             )
 
-            # Set the throttle cookie in the response
+            # Set the throttle cookie in the response, the request's other cookies are left as they are
             response.set_cookie(
-                throttle_cookie_name,
-                throttle_cookie_value,
+                f'throttle{sanitized_endpoint}',
+                f'Device throttled from sending requests to endpoint: {endpoint}',
                 domain=settings.SESSION_COOKIE_DOMAIN,
                 samesite=settings.SESSION_COOKIE_SAMESITE,
-                max_age=int(wait_time),  # Cookie expires after the wait time (in seconds)
+                max_age=wait_time,  # Cookie expires after the wait time (in seconds)
                 secure=True
             )
 
-            # Add existing cookies from the request to the response, preserving any that were sent
-            for cookie_name, cookie_value in request.COOKIES.items():
-                if cookie_name != throttle_cookie_name:  # Avoid replacing the throttle cookie
-                    response.set_cookie(
-                        cookie_name,
-                        cookie_value,
-                        domain=settings.SESSION_COOKIE_DOMAIN,
-                        samesite=settings.SESSION_COOKIE_SAMESITE,
-                        secure=True
-                    )
-
-            # Return the response with all cookies set
             return response
 
-        # If the rate limit is not exceeded, allow the request to proceed
-        # Add the current timestamp to the history to track the request
-        history.append(now)
-        cache.set(cache_key, history, timeout=time_window)
-
         # Call the next middleware or the view itself
         return self.get_response(request)
 
@@ -180,22 +138,22 @@ class WebsocketTokenAuthenticationMiddleware:
         app (ASGI application): The ASGI application instance.
     """
 
-    @database_sync_to_async
-    def get_account(self, account_id):
-        """
-        Fetches the user's account ID and role from the database.
+    # errors sent to connections the authentication pipeline turns away
+    authentication_errors = {
+        TOKEN_MISSING: 'Could not process your request, no access token was provided.',
+        TOKEN_INVALID: 'Could not process your request, your access token has expired.',
+        TOKEN_REVOKED: 'Could not process your request, your access token has been blacklisted and cannot be used to access the system.',
+        ACCOUNT_MISSING: 'An account with the provided credentials does not exists. Please review you account details and try again.',
+    }
 
-        Args:
-            user_id (int): The ID of the user to fetch.
+    def authenticate(self, access_token):
+        authentication = authenticate(access_token)
 
-        Returns:
-            tuple: A tuple containing the user's account ID and role.
+        school = None
+        if authentication.role in SCHOOL_ROLES:
+            school = account_contexts.get(authentication.account_id, authentication.role).school_pk
 
-        Raises:
-            CustomUser.DoesNotExist: If the user does not exist.
-        """
-        account = BaseAccount.objects.values('account_id', 'role').get(id=account_id)
-        return (str(account['account_id']), account['role'])
+        return authentication, school
 
     def __init__(self, app):
         """
@@ -222,124 +180,306 @@ class WebsocketTokenAuthenticationMiddleware:
         scope['role'] = None
         scope['authentication_error'] = None
 
-        # Check if the 'cookie' header is present
-        if b'cookie' in headers:
-            try:
-                # Decode the cookies
-                cookies = headers[b'cookie'].decode()
-                cookie_dict = {k: v for k, v in (cookie.split('=') for cookie in cookies.split('; '))}
-                # Retrieve the access token from the cookies
-                access_token = cookie_dict.get('access_token')
-
-                # Check if the access token is in cache (indicating it might be invalid/blacklisted)
-                if not access_token:
-                    # Handle unauthorized roles
-                    scope['path'] = '/ws/authentication-error/'
-                    scope['authentication_error'] = 'Could not process your request, no access token was provided.'
-                    return await self.app(scope, receive, send)
-                
-                elif cache.get(access_token):
-                    # Handle unauthorized roles
-                    scope['path'] = '/ws/authentication-error/'
-                    scope['authentication_error'] = 'Could not process your request, your access token has been blacklisted and cannot be used to access the system.'
-                    return await self.app(scope, receive, send)
-
-                # Validate the access token
-                authorized = validate_access_token(access_token)
-
-                # If the token is not valid, send an error message
-                if authorized is None:
-                    # Handle unauthorized roles
-                    scope['path'] = '/ws/authentication-error/'
-                    scope['authentication_error'] = 'Could not process your request, your access token has expired.'
-                    return await self.app(scope, receive, send)
-
-                # Decode the access token to get the user ID
-                decoded_token = AccessToken(access_token)
-                # Fetch the user and their role from the database
-                scope['account'], scope['role'] = await self.get_account(decoded_token['user_id'])
-                scope['access_token'] = access_token
-
-                # Redirect based on user role
-                if scope['role'] == 'FOUNDER':
-                    scope['path'] = '/ws/founder/'  # Change path for FOUNDER role
-                elif scope['role'] in ['PRINCIPAL', 'ADMIN']:
-                    scope['path'] = '/ws/admin/'  # Change path for ADMIN role
-                elif scope['role'] == 'TEACHER':
-                    scope['path'] = '/ws/teacher/'  # Change path for TEACHER role
-                elif scope['role'] == 'STUDENT':
-                    scope['path'] = '/ws/student/'  # Change path for STUDENT role
-                elif scope['role'] == 'PARENT':
-                    scope['path'] = '/ws/parent/'  # Change path for PARENT role
-
-                # Call the next application/middleware in the stack
-                return await self.app(scope, receive, send)
-
-            except BaseAccount.DoesNotExist:
-                # If the user does not exist, close the connection
-                # Handle unauthorized roles
-                scope['path'] = '/ws/authentication-error/'
-                scope['authentication_error'] = 'An account with the provided credentials does not exists. Please review you account details and try again.'
-                return await self.app(scope, receive, send)
-
-            # If any other exception occurs, close the connection and send the error message
-            except Exception as e:
-                # Handle unauthorized roles
-                scope['path'] = '/ws/authentication-error/'
-                scope['authentication_error'] = str(e)
-                return await self.app(scope, receive, send)
-
-        # Handle unauthorized roles
-        scope['path'] = '/ws/authentication-error/'
-        scope['authentication_error'] = 'Could not process your request, no access token was provided.'
+        try:
+            # Retrieve the access token from the cookies
+            access_token = parse_cookie(headers[b'cookie'].decode()).get('access_token') if b'cookie' in headers else None
+
+            # Verify and decode the access token and resolve its account, this is the only time the connection's token is verified
+            authentication, school = await database_sync_to_async(self.authenticate)(access_token)
+
+        except AuthenticationFailed as e:
+            # Handle unauthorized roles
+            scope['path'] = '/ws/authentication-error/'
+            scope['authentication_error'] = self.authentication_errors[e.reason]
+            return await self.app(scope, receive, send)
+
+        # If any other exception occurs, close the connection and send the error message
+        except Exception as e:
+            # Handle unauthorized roles
+            scope['path'] = '/ws/authentication-error/'
+            scope['authentication_error'] = str(e)
+            return await self.app(scope, receive, send)
+
+        scope['account'], scope['role'] = authentication.account_id, authentication.role
+        # the school's sessions are closed as soon as it is denied access
+        scope['school'] = school
+        scope['access_token'] = access_token
+        # the consumer closes the connection when the token expires
+        scope['access_token_expiry'] = authentication.token['exp']
+
+        # Redirect based on user role
+        if scope['role'] == 'FOUNDER':
+            scope['path'] = '/ws/founder/'  # Change path for FOUNDER role
+        elif scope['role'] in ['PRINCIPAL', 'ADMIN']:
+            scope['path'] = '/ws/admin/'  # Change path for ADMIN role
+        elif scope['role'] == 'TEACHER':
+            scope['path'] = '/ws/teacher/'  # Change path for TEACHER role
+        elif scope['role'] == 'STUDENT':
+            scope['path'] = '/ws/student/'  # Change path for STUDENT role
+        elif scope['role'] == 'PARENT':
+            scope['path'] = '/ws/parent/'  # Change path for PARENT role
+
         # Call the next application/middleware in the stack
         return await self.app(scope, receive, send)
 
 
+class OutboundQueue:
+    """
+    Bounded queue of messages waiting to be written to a single WebSocket connection.
+
+    Messages are written by a dedicated drain task, so a stalled client only delays its own socket and never
+    the coroutine that raised the event or the other sockets of the same account.
+
+    Attributes:
+        websocket (WebSocket): The WebSocket connection the queue writes to.
+        messages (deque): Pending (coalesce key, event type, message) entries, oldest first.
+        above_high_water_since (float): Monotonic time the queue first went above the high-water mark, None while below it.
+    """
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.messages = deque()
+        self.above_high_water_since = None
+        self.closed = False
+        self.ready = asyncio.Event()
+        self.task = asyncio.get_running_loop().create_task(self.drain())
+
+    def coalesce(self, coalesce_key, message):
+        """
+        Replaces a pending message that is superseded by `message`.
+
+        Returns:
+            bool: True if a pending message was replaced, False if none shares the coalesce key.
+        """
+        if coalesce_key is None:
+            return False
+
+        for index, (pending_key, event_type, _) in enumerate(self.messages):
+            if pending_key == coalesce_key:
+                self.messages[index] = (coalesce_key, event_type, message)
+                return True
+
+        return False
+
+    def put(self, coalesce_key, event_type, message):
+        self.messages.append((coalesce_key, event_type, message))
+        self.ready.set()
+
+    async def drain(self):
+        """
+        Writes queued messages to the socket in order until the queue is closed.
+        """
+        try:
+            while not self.closed:
+                await self.ready.wait()
+
+                while self.messages:
+                    _, event_type, message = self.messages.popleft()
+
+                    if len(self.messages) <= settings.WEBSOCKET_SEND_QUEUE_HIGH_WATER_MARK:
+                        self.above_high_water_since = None
+
+                    await self.websocket.send(**response_encoder.encode(message, getattr(self.websocket, 'binary_framing', False), event_type))
+
+                self.ready.clear()
+
+        except asyncio.CancelledError:
+            pass
+
+        except Exception:
+            # The socket is gone, anything still queued can no longer be delivered
+            self.close()
+
+    def close(self):
+        """
+        Stops the drain task and discards pending messages.
+
+        Returns:
+            int: The number of messages that were discarded.
+        """
+        self.closed = True
+        discarded = len(self.messages)
+        self.messages.clear()
+
+        if self.task is not asyncio.current_task():
+            self.task.cancel()
+
+        return discarded
+
+
 class ConnectionManager:
     """
     Manages WebSocket connections, tracking active connections by user account ID.
 
     This class provides methods to connect, disconnect, and send messages to active WebSocket connections.
 
+    When `WEBSOCKET_DELIVERY_MODE` is 'channel_layer' every socket also joins a per-account group on the
+    configured channel layer, and account events are delivered with `group_send`. This lets an event raised
+    on one ASGI worker reach sockets held by any other worker. In 'local' mode events only reach the sockets
+    held by the current process.
+
+    Events are written through a bounded per-socket `OutboundQueue`. Superseded events (such as an older
+    unread message count) are coalesced while they wait, messages beyond the queue's maximum size are dropped,
+    and a socket that stays above the high-water mark for longer than the eviction grace period is closed.
+
     Attributes:
-        active_connections (dict): A dictionary mapping user account IDs to lists of WebSocket connections.
+        active_connections (dict): A dictionary mapping user account IDs to lists of WebSocket connections held by this process.
+        outbound_queues (dict): A dictionary mapping WebSocket connections to their outbound queues.
+        school_connections (dict): A dictionary mapping school primary keys to the WebSocket connections of their accounts held by this process.
+        stats (Counter): Queued, coalesced, dropped and evicted message counters for this process.
     """
 
+    # prefix of the cache key holding the number of open sockets an account has across all workers
+    connection_count_prefix = 'websocket_connections_'
+
+    # events where a newer message replaces a pending one, mapped to the message field that scopes the replacement
+    coalesced_events = {
+        'unread_messages': None,
+        'read_receipt': 'chat',
+    }
+
+    # close code sent to sockets evicted for not keeping up with their outbound queue
+    slow_consumer_close_code = 4008
+
     def __init__(self):
         """
         Initializes the ConnectionManager with an empty dictionary for active connections.
         """
         self.active_connections = {}
+        self.outbound_queues = {}
+        self.school_connections = {}
+        self.stats = Counter()
+        self.heartbeat_task = None
 
-    async def connect(self, account_id, websocket):
+    @property
+    def channel_layer(self):
+        """
+        Returns the channel layer used for cross-worker delivery, or None when running in local mode.
+        """
+        if getattr(settings, 'WEBSOCKET_DELIVERY_MODE', 'local') != 'channel_layer':
+            return None
+        return get_channel_layer()
+
+    def group_name(self, account_id):
+        """
+        Returns the channel layer group every socket of an account joins.
+
+        Args:
+            account_id (str): The account ID of the user.
+        """
+        return f'account_{account_id}'
+
+    def school_group_name(self, school):
+        """
+        Returns the channel layer group every socket of a school's accounts joins.
+
+        Args:
+            school (int): The primary key of the school.
+        """
+        return f'school_{school}'
+
+    async def connect(self, account_id, websocket, school=None):
         """
         Adds a new WebSocket connection for a user.
 
         Args:
             account_id (str): The account ID of the user.
             websocket (WebSocket): The WebSocket connection instance.
+            school (int): The primary key of the user's school, None for accounts not linked to a school.
         """
         if account_id not in self.active_connections:
             self.active_connections[account_id] = []
 
         self.active_connections[account_id].append(websocket)
+        self.outbound_queues[websocket] = OutboundQueue(websocket)
+
+        if school is not None:
+            self.school_connections.setdefault(school, set()).add(websocket)
+
+        channel_layer = self.channel_layer
+        if channel_layer is not None:
+            await channel_layer.group_add(self.group_name(account_id), websocket.channel_name)
+            if school is not None:
+                await channel_layer.group_add(self.school_group_name(school), websocket.channel_name)
+
+            # Track how many sockets the account holds across all workers
+            connection_count_key = self.connection_count_prefix + str(account_id)
+            await cache.aadd(connection_count_key, 0, timeout=settings.WEBSOCKET_CONNECTION_COUNT_TIMEOUT)
+            await cache.aincr(connection_count_key)
+            await cache.atouch(connection_count_key, timeout=settings.WEBSOCKET_CONNECTION_COUNT_TIMEOUT)
 
+        await presence.connect(account_id)
 
-    async def disconnect(self, account_id, websocket):
+        if self.heartbeat_task is None or self.heartbeat_task.done():
+            self.heartbeat_task = asyncio.get_running_loop().create_task(self.heartbeat())
+
+
+    async def disconnect(self, account_id, websocket, school=None):
         """
         Removes a WebSocket connection for a user.
 
         Args:
             account_id (str): The account ID of the user.
             websocket (WebSocket): The WebSocket connection instance.
+            school (int): The primary key of the user's school, as passed to `connect`.
         """
+        if school is not None and websocket in self.school_connections.get(school, ()):
+            self.school_connections[school].discard(websocket)
+            if not self.school_connections[school]:
+                del self.school_connections[school]
+
+            channel_layer = self.channel_layer
+            if channel_layer is not None:
+                await channel_layer.group_discard(self.school_group_name(school), websocket.channel_name)
+
         if account_id in self.active_connections:
             if websocket in self.active_connections[account_id]:
                 self.active_connections[account_id].remove(websocket)
+
+                outbound_queue = self.outbound_queues.pop(websocket, None)
+                if outbound_queue is not None:
+                    self.stats['dropped'] += outbound_queue.close()
+
+                # the account goes offline with its last socket, on any worker in channel layer mode
+                last_connection = not self.active_connections[account_id]
+
+                channel_layer = self.channel_layer
+                if channel_layer is not None:
+                    await channel_layer.group_discard(self.group_name(account_id), websocket.channel_name)
+
+                    connection_count_key = self.connection_count_prefix + str(account_id)
+                    try:
+                        last_connection = await cache.adecr(connection_count_key) <= 0
+                        if last_connection:
+                            await cache.adelete(connection_count_key)
+                    except ValueError:
+                        # The counter already expired, nothing left to decrement
+                        pass
+
+                if last_connection:
+                    await presence.disconnect(account_id)
+
             if not self.active_connections[account_id]:
                 del self.active_connections[account_id]
 
+        if not self.active_connections and self.heartbeat_task is not None:
+            self.heartbeat_task.cancel()
+            self.heartbeat_task = None
+
+
+    async def heartbeat(self):
+        """
+        Keeps the presence of the accounts held by this process alive for as long as it holds sockets.
+        """
+        while self.active_connections:
+            await asyncio.sleep(settings.WEBSOCKET_PRESENCE_HEARTBEAT_SECONDS)
+
+            try:
+                await presence.heartbeat(list(self.active_connections), len(self.outbound_queues))
+            except Exception:
+                # The cache is unreachable, the next beat tries again before the presence keys expire
+                pass
+
 
     def get_active_connections(self):
         """
@@ -349,19 +489,169 @@ class ConnectionManager:
             dict: A dictionary of active connections.
         """
         return self.active_connections
-    
-    
-    async def send_message(self, account_id, message):
+
+
+    async def is_connected(self, account_id):
         """
-        Sends a message to all active WebSocket connections for a user.
+        Checks whether an account has at least one open WebSocket connection on any worker.
 
         Args:
             account_id (str): The account ID of the user.
-            message (str): The message to send.
+
+        Returns:
+            bool: True if the account is connected anywhere, False otherwise.
         """
+        if self.active_connections.get(account_id):
+            return True
+
+        if self.channel_layer is None:
+            return False
+
+        return await presence.is_online(account_id)
+
+
+    async def send_event(self, account_id, event_type, message):
+        """
+        Delivers an account event to every open WebSocket connection of a user.
+
+        In channel layer mode the event is sent to the account group, each receiving consumer handles it with
+        the method named after `event_type` and passes the message back to `deliver`.
+
+        Args:
+            account_id (str): The account ID of the user.
+            event_type (str): The event type, one of 'text_message', 'text_message_fan', 'read_receipt' or 'unread_messages'.
+            message (dict): The JSON serializable message to send.
+        """
+        channel_layer = self.channel_layer
+        if channel_layer is not None:
+            # nothing to fan out to accounts without an open socket
+            if not await presence.is_online(account_id):
+                self.stats['skipped_offline'] += 1
+                return
+
+            return await channel_layer.group_send(self.group_name(account_id), {'type': event_type, 'message': message})
+
         connections = self.active_connections.get(account_id, [])
         for connection in connections:
-            await connection.send(text_data=message)
+            await self.deliver(connection, message, event_type)
+
+
+    async def revoke_access_tokens(self, account_id, access_tokens):
+        """
+        Closes every WebSocket connection of a user that was authenticated with one of the given (blacklisted) access tokens.
+
+        Consumers verify their access token once when connecting, blacklisting a token only reaches its open
+        connections through this call.
+
+        Args:
+            account_id (str): The account ID of the user.
+            access_tokens (list): The access tokens that were blacklisted.
+        """
+        event = {'type': 'access_token_revoked', 'access_tokens': [str(access_token) for access_token in access_tokens]}
+
+        channel_layer = self.channel_layer
+        if channel_layer is not None:
+            return await channel_layer.group_send(self.group_name(account_id), event)
+
+        connections = list(self.active_connections.get(account_id, []))
+        for connection in connections:
+            await connection.access_token_revoked(event)
+
+
+    async def deny_school_access(self, school):
+        """
+        Closes every WebSocket connection of the accounts of a school that has just been denied access.
+
+        Args:
+            school (int): The primary key of the school.
+        """
+        event = {'type': 'school_denied_access', 'school': school}
+
+        channel_layer = self.channel_layer
+        if channel_layer is not None:
+            return await channel_layer.group_send(self.school_group_name(school), event)
+
+        connections = list(self.school_connections.get(school, ()))
+        for connection in connections:
+            await connection.school_denied_access(event)
+
+
+    async def deliver(self, websocket, message, event_type=None):
+        """
+        Queues a message for a single WebSocket connection held by this process.
+
+        The call never waits on the socket itself, the message is written by the connection's drain task.
+
+        Args:
+            websocket (WebSocket): The WebSocket connection instance.
+            message (dict): The JSON serializable message to send.
+            event_type (str): The event type of the message, used to coalesce superseded events.
+        """
+        outbound_queue = self.outbound_queues.get(websocket)
+        if outbound_queue is None or outbound_queue.closed:
+            self.stats['dropped'] += 1
+            return
+
+        coalesce_key = None
+        if event_type in self.coalesced_events:
+            scope_field = self.coalesced_events[event_type]
+            coalesce_key = (event_type, message.get(scope_field)) if scope_field else (event_type,)
+
+        if outbound_queue.coalesce(coalesce_key, message):
+            self.stats['coalesced'] += 1
+            return
+
+        if len(outbound_queue.messages) >= settings.WEBSOCKET_SEND_QUEUE_MAX_SIZE:
+            self.stats['dropped'] += 1
+        else:
+            outbound_queue.put(coalesce_key, event_type, message)
+            self.stats['queued'] += 1
+
+        if len(outbound_queue.messages) > settings.WEBSOCKET_SEND_QUEUE_HIGH_WATER_MARK:
+            now = time.monotonic()
+            if outbound_queue.above_high_water_since is None:
+                outbound_queue.above_high_water_since = now
+
+            elif now - outbound_queue.above_high_water_since >= settings.WEBSOCKET_SEND_QUEUE_EVICTION_SECONDS:
+                self.evict(websocket)
+
+
+    def evict(self, websocket):
+        """
+        Force closes a WebSocket connection that has stayed above its outbound queue's high-water mark.
+
+        The close is scheduled rather than awaited so the caller is never held up by the slow socket.
+
+        Args:
+            websocket (WebSocket): The WebSocket connection instance.
+        """
+        outbound_queue = self.outbound_queues.get(websocket)
+        if outbound_queue is None or outbound_queue.closed:
+            return
+
+        self.stats['dropped'] += outbound_queue.close()
+        self.stats['evicted'] += 1
+
+        asyncio.get_running_loop().create_task(websocket.close(code=self.slow_consumer_close_code))
+
+
+    def get_stats(self):
+        """
+        Returns the outbound queue counters of this process along with the current queue depth.
+
+        Returns:
+            dict: Queued, coalesced, dropped and evicted message counts, the events skipped for offline accounts,
+                the number of open queues and the messages waiting in them.
+        """
+        return {
+            'queued': self.stats['queued'],
+            'coalesced': self.stats['coalesced'],
+            'dropped': self.stats['dropped'],
+            'evicted': self.stats['evicted'],
+            'skipped_offline': self.stats['skipped_offline'],
+            'queues': len(self.outbound_queues),
+            'pending': sum(len(outbound_queue.messages) for outbound_queue in self.outbound_queues.values()),
+        }
 
 
 # Initialize the ConnectionManager instance
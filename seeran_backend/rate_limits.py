@@ -0,0 +1,121 @@
+# python
+import time
+import math
+import secrets
+from collections import defaultdict
+
+# django
+from django.conf import settings
+from django.core.cache import cache
+
+# redis
+from django_redis import get_redis_connection
+
+
+# sliding window log of one rule and identity, trimmed, checked and appended to in a single atomic step on the
+# redis server, using the server's clock so workers with drifting clocks agree. Returns 0 when the request is
+# allowed, otherwise the milliseconds until the oldest request in the window leaves it.
+SLIDING_WINDOW_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local window = tonumber(ARGV[1])
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[2]) then
+    redis.call('ZADD', KEYS[1], now, ARGV[3])
+    redis.call('PEXPIRE', KEYS[1], window)
+    return 0
+end
+
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+return math.max(tonumber(oldest[2]) + window - now, 1)
+"""
+
+
+class RateLimiter:
+    """
+    Sliding window rate limits shared by every worker.
+
+    Rules are configured in `settings.RATE_LIMITS`, keyed by HTTP endpoint or websocket request description,
+    each allowing `rate_limit` requests per `time_window` seconds to one identity (an IP address or an account).
+    With the Redis cache a request costs one round trip running `SLIDING_WINDOW_SCRIPT`, so concurrent requests
+    on different workers can never overshoot a limit. Other cache backends fall back to an approximate sliding
+    window made of two fixed window counters.
+    """
+
+    prefix = 'rate_limit_'
+
+    def __init__(self):
+        self.script = None
+        # rule -> allowed and throttled requests in this process
+        self.stats = defaultdict(lambda: {'allowed': 0, 'throttled': 0})
+
+    @property
+    def connection(self):
+        try:
+            return get_redis_connection('default')
+        except NotImplementedError:
+            return None
+
+    def get_rule(self, rule):
+        return settings.RATE_LIMITS.get(rule)
+
+    def hit(self, rule, identity):
+        """
+        Counts a request against a rule, unless the identity already reached the rule's limit.
+
+        Args:
+            rule (str): The endpoint or request description the rule is configured for.
+            identity (str): Who the request is counted for, an IP address or an account ID.
+
+        Returns:
+            int: 0 if the request is allowed (or the rule does not exist), otherwise the seconds to wait before retrying.
+        """
+        limits = self.get_rule(rule)
+        if limits is None:
+            return 0
+
+        key = f'{self.prefix}{rule}_{identity}'
+
+        connection = self.connection
+        if connection is not None:
+            if self.script is None:
+                self.script = connection.register_script(SLIDING_WINDOW_SCRIPT)
+
+            wait = math.ceil(self.script(keys=[key], args=[limits['time_window'] * 1000, limits['rate_limit'], secrets.token_hex(8)]) / 1000)
+        else:
+            wait = self.approximate_hit(key, limits['rate_limit'], limits['time_window'])
+
+        self.stats[rule]['throttled' if wait else 'allowed'] += 1
+        return wait
+
+    def approximate_hit(self, key, rate_limit, time_window):
+        # the previous window's count weighted by how much of it still overlaps the sliding window
+        now = time.time()
+        window, elapsed = divmod(now, time_window)
+
+        current_key, previous_key = f'{key}_{int(window)}', f'{key}_{int(window) - 1}'
+        counts = cache.get_many([current_key, previous_key])
+
+        estimate = counts.get(previous_key, 0) * (1 - elapsed / time_window) + counts.get(current_key, 0)
+        if estimate >= rate_limit:
+            return max(math.ceil(time_window - elapsed), 1)
+
+        if not cache.add(current_key, 1, timeout=time_window * 2):
+            cache.incr(current_key)
+
+        return 0
+
+    def get_stats(self):
+        """
+        Returns the allowed and throttled requests of every rule hit in this process.
+
+        Returns:
+            dict: rule -> {'allowed', 'throttled'}.
+        """
+        return {rule: dict(counts) for rule, counts in self.stats.items()}
+
+
+# Initialize the RateLimiter instance
+rate_limiter = RateLimiter()
@@ -0,0 +1,192 @@
+# python
+import time
+
+# django
+from django.conf import settings
+from django.db import transaction
+
+# redis
+from django_redis import get_redis_connection
+
+# utility functions
+from seeran_backend.utils import LOCK_EXPIRE
+from seeran_backend.analytics_pipeline import AnalyticsRun
+
+# logging
+import logging
+
+# Get loggers
+logger = logging.getLogger(__name__)
+
+
+# the entities whose performance metrics are recomputed through the scheduler, each is an analytics pipeline stage
+RECOMPUTE_ENTITIES = ('assessment', 'classroom_performance', 'term_subject_performance')
+
+
+# claims a dirty entity for a run in one atomic step on the redis server. An entity already being recomputed, or
+# marked dirty again since the drain read the dirty set, is left for a later drain. Returns 1 if claimed.
+CLAIM_SCRIPT = """
+if redis.call('EXISTS', KEYS[3]) == 1 then
+    return 0
+end
+
+if tonumber(redis.call('ZSCORE', KEYS[1], ARGV[1])) ~= tonumber(ARGV[2]) then
+    return 0
+end
+
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('SET', KEYS[3], '1', 'EX', ARGV[3])
+return 1
+"""
+
+
+class RecomputeScheduler:
+    """
+    Coalesces the recomputes of performance metrics triggered by grading.
+
+    A trigger only marks the entity dirty, in a sorted set scored by the last time it was marked and a hash of the
+    first time it was marked since its last run. A debounced drain task recomputes every entity that has been
+    quiet for `RECOMPUTE_QUIET_PERIOD` seconds, or dirty for `RECOMPUTE_MAX_DELAY` seconds, once, together in one
+    analytics pipeline run that also recomputes whatever depends on them. An entity marked
+    while it is being recomputed stays dirty and runs exactly once more after the current run, so no update is
+    lost and a burst of edits costs one run per window.
+
+    Without the redis cache, or with tasks running eagerly, there is no worker to debounce on and entities are
+    recomputed straight away.
+    """
+
+    dirty_key = 'recompute_dirty'
+    first_marked_key = 'recompute_first_marked'
+    running_prefix = 'recompute_running_'
+    drain_scheduled_key = 'recompute_drain_scheduled'
+
+    def __init__(self):
+        self.script = None
+
+    @property
+    def connection(self):
+        try:
+            return get_redis_connection('default')
+        except NotImplementedError:
+            return None
+
+    def mark(self, entity, entity_id):
+        """
+        Marks an entity's performance metrics for a recompute once the current transaction commits.
+
+        Args:
+            entity (str): One of `RECOMPUTE_ENTITIES`.
+            entity_id (int): The primary key of the entity.
+        """
+        transaction.on_commit(lambda: self.mark_dirty(entity, entity_id))
+
+    def mark_dirty(self, entity, entity_id):
+        # tasks
+        from seeran_backend.tasks import drain_recomputes_task
+
+        connection = self.connection
+        if connection is None:
+            return self.recompute({entity: [entity_id]})
+
+        member, now = f'{entity}:{entity_id}', time.time()
+
+        pipeline = connection.pipeline()
+        pipeline.zadd(self.dirty_key, {member: now})
+        pipeline.hsetnx(self.first_marked_key, member, now)
+        # one pending drain is enough, it reschedules itself while entities stay dirty
+        pipeline.set(self.drain_scheduled_key, 1, nx=True, ex=settings.RECOMPUTE_MAX_DELAY * 2)
+        scheduled = pipeline.execute()[2]
+
+        if scheduled:
+            drain_recomputes_task.apply_async(countdown=settings.RECOMPUTE_QUIET_PERIOD)
+
+    def ready(self, marked, first_marked, now, quiet_period, max_delay):
+        """
+        Returns the dirty members due for a recompute and the seconds until the next one is due, None if none is left.
+
+        Args:
+            marked (dict): The last time each member was marked.
+            first_marked (dict): The first time each member was marked since its last run.
+            now (float): The current time.
+            quiet_period (int): The seconds a member must go unmarked before it is recomputed.
+            max_delay (int): The most seconds a member waits for a quiet period.
+        """
+        due, next_due = [], None
+        for member, last in marked.items():
+            due_at = min(last + quiet_period, first_marked.get(member, last) + max_delay)
+            if due_at <= now:
+                due.append(member)
+            else:
+                next_due = due_at - now if next_due is None else min(next_due, due_at - now)
+
+        return due, next_due
+
+    def drain(self, eager=False):
+        """
+        Recomputes the dirty entities that are due, and schedules the next drain if any are left.
+
+        Args:
+            eager (bool): Whether tasks run eagerly, every dirty entity is then due at once.
+
+        Returns:
+            int: The number of entities recomputed.
+        """
+        # tasks
+        from seeran_backend.tasks import drain_recomputes_task
+
+        connection = self.connection
+        if connection is None:
+            return 0
+
+        if self.script is None:
+            self.script = connection.register_script(CLAIM_SCRIPT)
+
+        # entities marked from here on schedule a drain of their own
+        connection.delete(self.drain_scheduled_key)
+
+        pipeline = connection.pipeline()
+        pipeline.zrange(self.dirty_key, 0, -1, withscores=True)
+        pipeline.hgetall(self.first_marked_key)
+        marked, first_marked = pipeline.execute()
+
+        marked = {member.decode(): score for member, score in marked}
+        first_marked = {member.decode(): float(score) for member, score in first_marked.items()}
+
+        quiet_period, max_delay = (0, 0) if eager else (settings.RECOMPUTE_QUIET_PERIOD, settings.RECOMPUTE_MAX_DELAY)
+        due, next_due = self.ready(marked, first_marked, time.time(), quiet_period, max_delay)
+
+        claimed, seeds = [], {}
+        for member in due:
+            running_key = self.running_prefix + member
+            if not self.script(keys=[self.dirty_key, self.first_marked_key, running_key], args=[member, repr(marked[member]), LOCK_EXPIRE]):
+                # claimed by another drain, or still running, it stays dirty for the next drain
+                next_due = settings.RECOMPUTE_QUIET_PERIOD if next_due is None else next_due
+                continue
+
+            entity, entity_id = member.split(':')
+            seeds.setdefault(entity, []).append(int(entity_id))
+            claimed.append(running_key)
+
+        if claimed:
+            try:
+                self.recompute(seeds)
+            finally:
+                connection.delete(*claimed)
+
+        if next_due is not None and not eager and connection.set(self.drain_scheduled_key, 1, nx=True, ex=settings.RECOMPUTE_MAX_DELAY * 2):
+            drain_recomputes_task.apply_async(countdown=max(next_due, 1))
+
+        return len(claimed)
+
+    def recompute(self, seeds):
+        # entities deleted since they were marked are skipped by the run, failures are logged in its trace
+        try:
+            AnalyticsRun(seeds).execute()
+
+        except Exception as e:
+            logger.error(f'Could not recompute the performance metrics of {seeds}: {str(e)}')
+
+
+# Initialize the RecomputeScheduler instance
+recompute_scheduler = RecomputeScheduler()
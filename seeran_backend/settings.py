@@ -238,6 +238,8 @@ INSTALLED_APPS = [
 
     'emails',
     'email_cases',
+
+    'websockets',
     
     # third party apps
     'corsheaders', # handle cors 
@@ -366,6 +368,109 @@ CHANNEL_LAYERS = {
 
 
 
+# websocket delivery
+# 'channel_layer' fans account events (chat messages, read receipts, unread counts) out through the channel layer
+# so sockets held by any ASGI worker receive them, 'local' only reaches sockets held by the sending process
+WEBSOCKET_DELIVERY_MODE = config('WEBSOCKET_DELIVERY_MODE', default='channel_layer')
+
+# how long (in seconds) an account's cross-worker connection count survives without a new connection,
+# bounds how long a crashed worker can make an account look connected
+WEBSOCKET_CONNECTION_COUNT_TIMEOUT = 60 * 60 * 24
+
+# presence, every worker refreshes the presence of the accounts it holds each heartbeat (in seconds), an account
+# whose worker stopped sending heartbeats goes offline once the TTL (in seconds) runs out
+WEBSOCKET_PRESENCE_HEARTBEAT_SECONDS = 30
+WEBSOCKET_PRESENCE_TTL = 90
+
+# per socket outbound queue, events beyond the max size are dropped and a socket that stays above
+# the high-water mark for longer than the eviction grace period (in seconds) is closed
+WEBSOCKET_SEND_QUEUE_HIGH_WATER_MARK = 100
+WEBSOCKET_SEND_QUEUE_MAX_SIZE = 500
+WEBSOCKET_SEND_QUEUE_EVICTION_SECONDS = 10
+
+# response encoding, MessagePack frames of at least the threshold (in bytes) are deflated with the preset response dictionary
+# when that makes them smaller, the level trades CPU time for ratio (1 fastest - 9 smallest)
+WEBSOCKET_COMPRESSION_THRESHOLD = 1024
+WEBSOCKET_COMPRESSION_LEVEL = 6
+
+# requests that carry a request id run concurrently, at most this many at a time per socket, and at most
+# the pending limit (running plus waiting) before new ones are turned away
+WEBSOCKET_MAX_CONCURRENT_REQUESTS = 4
+WEBSOCKET_MAX_PENDING_REQUESTS = 32
+
+# most sub-requests a single BATCH request may carry
+WEBSOCKET_MAX_BATCH_SIZE = 20
+
+# how long (in seconds) the cached unread message and announcement counters live before they are rebuilt from the database,
+# bounds how long a counter that drifted (a lost update) can stay wrong
+UNREAD_COUNTERS_TIMEOUT = 60 * 60 * 24
+
+# how long (in seconds) compiled account permission sets stay in the shared cache, sets of an outdated
+# permissions version are never read again and simply expire
+PERMISSIONS_CACHE_TIMEOUT = 60 * 60 * 24
+
+# number of compiled account permission sets every process keeps in memory
+PERMISSIONS_LOCAL_CACHE_SIZE = 10000
+
+# how long (in seconds) every process reuses the permissions version of a school before reading it from the shared cache again,
+# bounds how long permission group changes made through another process take to apply
+PERMISSIONS_VERSION_LOCAL_TIMEOUT = 2
+
+# how long (in seconds) school relationship indexes (teacher-student and parent-child) stay in the shared cache
+RELATIONSHIPS_CACHE_TIMEOUT = 60 * 60 * 24
+
+# number of school relationship indexes every process keeps in memory
+RELATIONSHIPS_LOCAL_CACHE_SIZE = 64
+
+# how long (in seconds) account context snapshots (account, school and grade keys, school compliance) stay
+# in the shared cache, entries are dropped whenever their account or school is saved
+ACCOUNT_CONTEXT_TIMEOUT = 60 * 60 * 24
+
+# number of revoked access tokens the Bloom filter of every process is sized for, and its false positive
+# rate at that size, a false positive only costs one cache read to confirm the token was not revoked
+TOKEN_REVOCATION_FILTER_CAPACITY = 100000
+TOKEN_REVOCATION_FILTER_ERROR_RATE = 0.001
+
+# sliding window rate limits, `rate_limit` requests per `time_window` seconds, http endpoints are limited per
+# IP address and websocket requests (by description, for routes registered with a rate limit) per account
+RATE_LIMITS = {
+    '/api/auth/login/': {'rate_limit': 3, 'time_window': 3600},  # 3 requests per hour for login
+    '/api/auth/account-activation-credentials-verification/': {'rate_limit': 3, 'time_window': 3600},  # 3 requests per hour for account activation
+    '/api/auth/credentials-reset-email-verification/': {'rate_limit': 3, 'time_window': 3600},  # 3 requests per hour for password reset
+    'message_private': {'rate_limit': 30, 'time_window': 60},  # 30 private messages a minute
+    'send_marketing_email': {'rate_limit': 20, 'time_window': 3600},  # 20 marketing emails an hour
+}
+
+# Mailgun messages API, point it at a local fake Mailgun server for tests and benchmarks
+MAILGUN_API_BASE_URL = config('MAILGUN_API_BASE_URL', default='https://api.eu.mailgun.net/v3')
+
+# open connections to Mailgun every worker process keeps, and how long (in seconds) a delivery attempt may take
+MAIL_DISPATCH_POOL_SIZE = 10
+MAIL_DISPATCH_TIMEOUT = 10
+
+# seconds before retrying a throttled or failed delivery, doubled with every attempt up to the maximum
+MAIL_DISPATCH_RETRY_BACKOFF = 5
+MAIL_DISPATCH_MAX_BACKOFF = 300
+
+# expired access tokens deleted per statement by the hourly prune, bounds how long each delete holds its locks
+ACCESS_TOKEN_PRUNE_CHUNK_SIZE = 1000
+
+# seconds between two recorded uses of an access token, the requests in between do not update its browser's last used time,
+# each process tracks at most that many tokens before forgetting the ones whose interval is over
+ACCESS_TOKEN_TOUCH_INTERVAL = 60
+ACCESS_TOKEN_TOUCH_MAX_TRACKED = 10000
+
+# seconds a performance metrics entity must go without changes before it is recomputed
+RECOMPUTE_QUIET_PERIOD = 10
+
+# most seconds a performance metrics entity waits for a quiet period, so a long grading session still sees its metrics update
+RECOMPUTE_MAX_DELAY = 60
+
+# where assessment statistics are computed, 'database' computes them inside Postgres (NumPy is used on other databases), 'numpy' in the app server
+COHORT_STATISTICS_ENGINE = 'database'
+
+
+
 """
     If your Redis server is using a self-signed certificate or a certificate from an internal CA, 
     ensure that the CA certificate chain is correctly configured on the Django application server. 
@@ -411,14 +516,25 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'emails.tasks.fetch_and_process_incoming_emails',
         'schedule': crontab(minute='*/5'),  # Every 5 minutes
     },
+    'flush-session-writes-every-minute': {
+        'task': 'account_access_tokens.tasks.flush_session_writes_task',
+        'schedule': crontab(minute='*'),  # Every minute
+    },
+    'prune-expired-access-tokens-every-hour': {
+        'task': 'account_access_tokens.tasks.prune_expired_access_tokens_task',
+        'schedule': crontab(minute=0),  # Every hour
+    },
 }
 
 CELERY_IMPORTS = (
     'term_subject_performances.tasks',
     'student_subject_performances.tasks',
     'classrooms.tasks',
+    'classroom_performances.tasks',
     'assessments.tasks',
     'emails.tasks',
+    'account_access_tokens.tasks',
+    'seeran_backend.tasks',
     # Add other app tasks here
 )
 
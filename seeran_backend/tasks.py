@@ -0,0 +1,13 @@
+# celery
+from celery import shared_task
+
+# utility functions
+from seeran_backend.recompute import recompute_scheduler
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def drain_recomputes_task(self):
+    try:
+        return {"recomputed": recompute_scheduler.drain(eager=bool(self.request.is_eager))}
+    except Exception as e:
+        raise self.retry(exc=e)
@@ -1,6 +1,6 @@
 # python
-import gzip
-from io import BytesIO
+import functools
+from contextvars import ContextVar
 
 # celery
 from celery.signals import task_failure
@@ -9,12 +9,6 @@ from celery.signals import task_failure
 from django.core.cache import cache
 
 
-def compress_data(data):
-    buf = BytesIO()
-    with gzip.GzipFile(fileobj=buf, mode='wb') as f:
-        f.write(data.encode('utf-8'))
-    return buf.getvalue()
-
 LOCK_EXPIRE = 60 * 15  # Lock expires after 15 minutes
 
 def acquire_lock(lock_id):
@@ -24,6 +18,52 @@ def acquire_lock(lock_id):
 def release_lock(lock_id):
     cache.delete(lock_id)
 
+
+def adjust_cached_counter(key, delta):
+    """
+    Moves a cached counter by `delta`.
+
+    A counter that is not cached is left alone, it is rebuilt from the database the next time it is read.
+    A counter that would go negative has drifted and is dropped so the next read rebuilds it.
+    """
+    try:
+        if cache.incr(key, delta) < 0:
+            cache.delete(key)
+
+    except ValueError:
+        pass
+
+
+# results of the lookups every sub-request of a websocket BATCH repeats, None outside a batch
+batch_memo = ContextVar('batch_memo', default=None)
+
+def memoize_within_batch(function):
+    """
+    Reuses a function's result for the remaining sub-requests of a websocket BATCH request.
+
+    Batches only carry read actions, so the requesting account and its permission checks can not
+    change between the sub-requests. Outside a batch the function runs as usual.
+    """
+    @functools.wraps(function)
+    def wrapper(*args):
+        memo = batch_memo.get()
+        if memo is None:
+            return function(*args)
+
+        key = (function.__qualname__,) + args
+        try:
+            hash(key)
+        except TypeError:
+            # unhashable arguments (straight from the request details), nothing to reuse
+            return function(*args)
+
+        if key not in memo:
+            memo[key] = function(*args)
+
+        return memo[key]
+
+    return wrapper
+
 @task_failure.connect
 def task_failed_handler(sender=None, **kwargs):
     task_id = kwargs['task_id']
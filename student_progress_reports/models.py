@@ -91,7 +91,7 @@ class ProgressReport(models.Model):
             # Get the Subject model dynamically
             Subject = apps.get_model('subjects', 'Subject')
             # Get all subjects the student is enrolled in
-            students_subjects = Subject.objects.filter(id__in=self.student.subject_performances.values('subject_id', flat=True))
+            students_subjects = Subject.objects.filter(id__in=self.student.subject_performances.values_list('subject_id', flat=True))
 
             for subject in students_subjects:
                 performance = self.student.subject_performances.filter(subject=subject, term__start_date__year=self.term.start_date.year).aggregate(total_score=models.Sum('weighted_score'))['total_score']
@@ -111,10 +111,8 @@ class ProgressReport(models.Model):
 
         self.passed = False if failed_major_subjects >= self.grade.major_subjects or failed_subjects >= self.grade.none_major_subjects else True
 
-        attendance_data = self.student.aggregate(
-            absences=models.Count('absences'),
-            late_arrivals=models.Count('late_arrival'),
-        )
+        self.days_absent = self.student.absences.count()
+        self.days_late = self.student.late_arrivals.count()
 
         total_school_days = self.term.school_days
         if not total_school_days:
@@ -122,7 +120,7 @@ class ProgressReport(models.Model):
             self.term.save()
             total_school_days = self.term.school_days
 
-        self.attendance_percentage = (1 - (attendance_data['absences'] / total_school_days)) * 100
+        self.attendance_percentage = (1 - (self.days_absent / total_school_days)) * 100
 
         self.save()
 
@@ -1,6 +1,5 @@
 # python 
 import uuid
-import numpy as np
 
 # django 
 from django.db import models, IntegrityError
@@ -14,6 +13,9 @@ from grades.models import Grade
 from terms.models import Term
 from subjects.models import Subject
 
+# utility functions
+from student_subject_performances.utils import update_student_subject_performances
+
 
 class StudentSubjectPerformance(models.Model):
     """
@@ -131,73 +133,8 @@ class StudentSubjectPerformance(models.Model):
         - Scores, pass rates, and completion rates.
         - Statistical data like highest, lowest, median, and mode scores.
         - Determines whether the student passed the subject.
-        """
-
-        # Fetch all formal assessments for the subject in this term.
-        grade_assessments = self.subject.assessments.filter(term=self.term, formal=True, grades_released=True)
-
-        # If no assessments exist, set relevant scores to None.
-        if not grade_assessments.exists():
-            self.score = self.normalized_score = self.weighted_score = self.average_score = '0.00'
-            # print('no assessments')
-            return
-
-        grade_assessments_count = grade_assessments.count()
-        pass_mark = self.subject.pass_mark
-
-        # Fetch the student's transcripts and submissions for the subject's assessments.
-        students_transcripts = self.student.transcripts.filter(assessment__in=grade_assessments)
-
-        if not students_transcripts.exists():
-            self.score = self.normalized_score = self.weighted_score = self.average_score = '0.00'
-            return
-
-        students_transcripts_data = students_transcripts.aggregate(
-            score=models.Sum('weighted_score'),
-            maximum_score_achievable=models.Sum('assessment__percentage_towards_term_mark'),
-            passed_assessments_count=models.Count('id', filter=models.Q(percent_score__gte=pass_mark)),
-            average=models.Avg('percent_score'),
-            highest=models.Max('percent_score'),
-            lowest=models.Min('percent_score')
-        )
-
-        # Calculate the student's total score across all assessments.
-        self.score = students_transcripts_data['score']
-
-        # Update normalized and weighted scores if valid scores exist.
-        if self.score > 0 and students_transcripts_data['maximum_score_achievable'] > 0:
-            self.normalized_score = (self.score / students_transcripts_data['maximum_score_achievable']) * 100
-            self.weighted_score = self.normalized_score * (self.term.weight / 100)
-        else:
-            self.normalized_score = 0
-            self.weighted_score = 0
-
-        # Determine if the student passed based on the normalized score and pass mark.
-        if self.normalized_score:
-            self.passed = self.normalized_score >= pass_mark
-
-        # Calculate the pass rate: number of assessments passed by the student.
-        self.pass_rate = (students_transcripts_data['passed_assessments_count'] / grade_assessments_count) * 100
-
-        # Calculate the average score across all assessments.
-        self.average_score = students_transcripts_data['average']
-        self.highest_score = students_transcripts_data['highest']
-        self.lowest_score = students_transcripts_data['lowest']
-
-        # Retrieve all scores for further statistical analysis.
-        scores = np.array(students_transcripts.values_list('weighted_score', flat=True))
-        if scores.size > 0:
-            # Calculate highest, lowest, median, and mode scores.
-            self.median_score = np.median(scores)
-
-            # Calculate the mode score (most frequent score).
-            unique_scores, counts = np.unique(scores, return_counts=True)
-            self.mode_score = unique_scores[np.argmax(counts)]
-
-        # Calculate the completion rate: percentage of assessments the student has submitted.
-        submitted_assessments_count = self.student.assessment_submissions.filter(assessment__in=grade_assessments).exclude(status='NOT_SUBMITTED').count()
-        self.completion_rate = (submitted_assessments_count / grade_assessments_count) * 100
-
-        # Save the updated performance metrics.
-        self.save()
 
+        Shares `update_student_subject_performances` with the bulk recompute run when grades are released.
+        """
+        update_student_subject_performances(self.subject, self.term, self.grade, self.school, [self.student_id])
+        self.refresh_from_db()
@@ -1,3 +1,142 @@
+# python
+from datetime import date
+from decimal import Decimal
+
+# django
 from django.test import TestCase
+from django.db import connection
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+
+# models
+from .models import StudentSubjectPerformance
+from schools.models import School
+from accounts.models import Student
+from grades.models import Grade
+from terms.models import Term
+from subjects.models import Subject
+from assessments.models import Assessment
+from assessment_submissions.models import AssessmentSubmission
+from assessment_transcripts.models import AssessmentTranscript
+from classrooms.models import Classroom
+from classroom_performances.models import ClassroomPerformance
+from term_subject_performances.models import TermSubjectPerformance
+
+# utility functions
+from student_subject_performances.utils import update_student_subject_performances
+from seeran_backend.analytics_pipeline import AnalyticsRun
+
+
+class StudentSubjectPerformanceBulkUpdateTest(TestCase):
+    """
+    Test cases for recomputing the subject performances of many students at once.
+    """
+
+    def setUp(self):
+        self.school = School.objects.create(
+            name='Test School',
+            email_address='secondaryschool@example.com',
+            contact_number='0123456789',
+            student_count=130,
+            teacher_count=24,
+            admin_count=19,
+            in_arrears=False,
+            none_compliant=False,
+            type='SECONDARY',
+            province='GAUTENG',
+            district='GAUTENG WEST',
+            grading_system='A-F Grading',
+            library_details='Well-stocked library',
+            laboratory_details='State-of-the-art labs',
+            sports_facilities='Football field, Basketball court',
+            operating_hours='07:45 - 14:00',
+            location='456 INNER St',
+            website='https://secondaryschool.com',
+        )
+        self.grade = Grade.objects.create(major_subjects=1, none_major_subjects=2, grade='10', school=self.school)
+        self.subject = Subject.objects.create(subject='MATHEMATICS', major_subject=True, pass_mark=Decimal('50.00'), grade=self.grade, school=self.school)
+        self.term = Term.objects.create(term_name='Term 1', weight=Decimal('20.00'), start_date=date(2024, 1, 15), end_date=date(2024, 4, 10), grade=self.grade, school=self.school)
+
+        self.assessments = Assessment.objects.bulk_create([
+            Assessment(
+                title=title, dead_line=timezone.now(), total=Decimal('100.00'), formal=True, percentage_towards_term_mark=percentage, grades_released=True,
+                term=self.term, subject=self.subject, grade=self.grade, school=self.school
+            )
+            for title, percentage in (('Midterm Exam', Decimal('30.00')), ('Assignment', Decimal('20.00')))
+        ])
+
+    def add_students(self, *percent_scores):
+        """
+        Creates a student per pair of percent scores, with a transcript and submission for each non None score.
+        """
+        students = []
+        for index, scores in enumerate(percent_scores):
+            student = Student.objects.create(
+                name=f'Student {index}', surname='Wang', passport_number=f'65235{len(Student.objects.all()):04d}', role='STUDENT', grade=self.grade, school=self.school
+            )
+            students.append(student)
+
+            for assessment, percent_score in zip(self.assessments, scores):
+                if percent_score is None:
+                    continue
+
+                AssessmentSubmission.objects.bulk_create([AssessmentSubmission(assessment=assessment, student=student, status='ON_TIME')])
+                AssessmentTranscript.objects.bulk_create([AssessmentTranscript(
+                    assessment=assessment, student=student, score=percent_score, percent_score=percent_score,
+                    weighted_score=percent_score * assessment.percentage_towards_term_mark / 100, school=self.school, comment=''
+                )])
+
+        return students
+
+    def update(self, students):
+        with CaptureQueriesContext(connection) as queries:
+            update_student_subject_performances(self.subject, self.term, self.grade, self.school, [student.id for student in students])
+
+        return len(queries)
+
+    def test_metrics_are_computed_and_upserted(self):
+        passing, failing, absent = self.add_students((Decimal('80.00'), Decimal('60.00')), (Decimal('40.00'), None), (None, None))
+        self.update([passing, failing, absent])
+
+        performance = StudentSubjectPerformance.objects.get(student=passing, subject=self.subject, term=self.term)
+        self.assertEqual((performance.score, performance.normalized_score, performance.weighted_score), (Decimal('36.00'), Decimal('72.00'), Decimal('14.40')))
+        self.assertEqual((performance.pass_rate, performance.completion_rate, performance.passed), (Decimal('100.00'), Decimal('100.00'), True))
+        self.assertEqual((performance.average_score, performance.median_score, performance.mode_score), (Decimal('70.00'), Decimal('18.00'), Decimal('12.00')))
+
+        performance = StudentSubjectPerformance.objects.get(student=failing, subject=self.subject, term=self.term)
+        self.assertEqual((performance.normalized_score, performance.pass_rate, performance.completion_rate, performance.passed), (Decimal('40.00'), Decimal('0.00'), Decimal('50.00'), False))
+
+        # a student without transcripts gets an empty performance
+        performance = StudentSubjectPerformance.objects.get(student=absent, subject=self.subject, term=self.term)
+        self.assertIsNone(performance.score)
+
+        # a second recompute updates the existing rows in place
+        self.update([passing, failing, absent])
+        self.assertEqual(StudentSubjectPerformance.objects.count(), 3)
+
+    def test_queries_do_not_grow_with_the_number_of_students(self):
+        few = self.update(self.add_students(*[(Decimal('70.00'), Decimal('55.00'))] * 2))
+        many = self.update(self.add_students(*[(Decimal('70.00'), Decimal('55.00'))] * 20))
+
+        self.assertEqual(few, many)
+
+    def test_analytics_run_recomputes_each_stage_once_in_dependency_order(self):
+        students = self.add_students((Decimal('80.00'), Decimal('60.00')), (Decimal('40.00'), Decimal('45.00')), (Decimal('65.00'), None))
+
+        classroom = Classroom.objects.create(classroom_number='E pod 403', group='10A', subject=self.subject, grade=self.grade, school=self.school)
+        classroom.students.add(*students)
+        for assessment in self.assessments:
+            assessment.classroom = classroom
+        Assessment.objects.bulk_update(self.assessments, ['classroom'])
+
+        trace = AnalyticsRun({'assessment': [assessment.id for assessment in self.assessments]}).execute()
+
+        # both assessments reach the same student, classroom and term performances, which are recomputed once
+        self.assertEqual(
+            [(stage['stage'], stage['entities'], stage['failures']) for stage in trace['stages']],
+            [('assessment', 2, 0), ('student_subject_performance', 3, 0), ('classroom_performance', 1, 0), ('term_subject_performance', 1, 0), ('progress_report', 3, 0)]
+        )
 
-# Create your tests here.
+        self.assertEqual(StudentSubjectPerformance.objects.filter(subject=self.subject, term=self.term).count(), 3)
+        self.assertEqual(ClassroomPerformance.objects.get(classroom=classroom, term=self.term).pass_rate, Decimal('66.67'))
+        self.assertEqual(TermSubjectPerformance.objects.get(subject=self.subject, term=self.term).pass_rate, Decimal('66.67'))
@@ -0,0 +1,122 @@
+# python
+from collections import defaultdict
+import numpy as np
+
+# django
+from django.db import models
+from django.apps import apps
+from django.utils import timezone
+
+# utility functions
+from seeran_backend.cohort_statistics import to_decimal
+
+
+# the metrics a recompute overwrites on existing performance rows
+METRIC_FIELDS = [
+    'score', 'normalized_score', 'weighted_score', 'passed', 'pass_rate', 'average_score', 'highest_score',
+    'lowest_score', 'median_score', 'mode_score', 'completion_rate', 'last_updated',
+]
+
+
+def update_student_subject_performances(subject, term, grade, school, student_ids, batch_size=500):
+    """
+    Recomputes the subject performances of many students for a term in a handful of grouped queries.
+
+    The transcript aggregates, transcript scores and submission counts of every student are fetched grouped by
+    student, the metrics are computed in memory, and every performance row is written with one upsert per batch,
+    so the number of queries does not grow with the number of students. A student without transcripts keeps
+    their performance row as it is, creating it first if needed.
+
+    Args:
+        subject (Subject): The subject of the performances.
+        term (Term): The term of the performances.
+        grade (Grade): The grade new performance rows are created in.
+        school (School): The school new performance rows are created in.
+        student_ids (iterable): The primary keys of the students.
+        batch_size (int): The number of rows per upsert.
+    """
+    # models
+    StudentSubjectPerformance = apps.get_model('student_subject_performances', 'StudentSubjectPerformance')
+    AssessmentTranscript = apps.get_model('assessment_transcripts', 'AssessmentTranscript')
+    AssessmentSubmission = apps.get_model('assessment_submissions', 'AssessmentSubmission')
+
+    student_ids = list(student_ids)
+    if not student_ids:
+        return
+
+    def performance(student_id, **metrics):
+        return StudentSubjectPerformance(student_id=student_id, subject=subject, term=term, grade=grade, school=school, **metrics)
+
+    # Fetch all formal assessments for the subject in this term.
+    grade_assessments = subject.assessments.filter(term=term, formal=True, grades_released=True)
+    grade_assessments_count = grade_assessments.count()
+
+    transcripts = AssessmentTranscript.objects.filter(student_id__in=student_ids, assessment__in=grade_assessments)
+    students_transcripts_data = {}
+
+    if grade_assessments_count:
+        students_transcripts_data = {
+            data['student_id']: data for data in transcripts.values('student_id').annotate(
+                score=models.Sum('weighted_score'),
+                maximum_score_achievable=models.Sum('assessment__percentage_towards_term_mark'),
+                passed_assessments_count=models.Count('id', filter=models.Q(percent_score__gte=subject.pass_mark)),
+                average=models.Avg('percent_score'),
+                highest=models.Max('percent_score'),
+                lowest=models.Min('percent_score'),
+            ).order_by()
+        }
+
+    # Students without transcripts keep their performance, it only has to exist.
+    StudentSubjectPerformance.objects.bulk_create(
+        [performance(student_id) for student_id in student_ids if student_id not in students_transcripts_data], batch_size=batch_size, ignore_conflicts=True
+    )
+
+    if not students_transcripts_data:
+        return
+
+    # Retrieve all scores of every student for further statistical analysis.
+    students_scores = defaultdict(list)
+    for student_id, weighted_score in transcripts.values_list('student_id', 'weighted_score'):
+        students_scores[student_id].append(float(weighted_score))
+
+    # Count the assessments each student has submitted.
+    submitted_assessments_counts = dict(
+        AssessmentSubmission.objects.filter(student_id__in=students_transcripts_data, assessment__in=grade_assessments).exclude(status='NOT_SUBMITTED')
+        .values('student_id').annotate(submitted=models.Count('id')).order_by().values_list('student_id', 'submitted')
+    )
+
+    now = timezone.now()
+    performances = []
+    for student_id, data in students_transcripts_data.items():
+        score = data['score']
+
+        # Update normalized and weighted scores if valid scores exist.
+        if score > 0 and data['maximum_score_achievable'] > 0:
+            normalized_score = (score / data['maximum_score_achievable']) * 100
+            weighted_score = normalized_score * (term.weight / 100)
+        else:
+            normalized_score = weighted_score = 0
+
+        # Calculate the median and mode (most frequent, the lowest on a tie) of the student's scores.
+        scores = np.array(students_scores[student_id])
+        unique_scores, counts = np.unique(scores, return_counts=True)
+
+        performances.append(performance(
+            student_id,
+            score=score,
+            normalized_score=normalized_score,
+            weighted_score=weighted_score,
+            passed=bool(normalized_score) and normalized_score >= subject.pass_mark,
+            pass_rate=(data['passed_assessments_count'] / grade_assessments_count) * 100,
+            average_score=data['average'],
+            highest_score=data['highest'],
+            lowest_score=data['lowest'],
+            median_score=to_decimal(np.median(scores)),
+            mode_score=to_decimal(unique_scores[np.argmax(counts)]),
+            completion_rate=(submitted_assessments_counts.get(student_id, 0) / grade_assessments_count) * 100,
+            last_updated=now,
+        ))
+
+    StudentSubjectPerformance.objects.bulk_create(
+        performances, batch_size=batch_size, update_conflicts=True, unique_fields=['student', 'subject', 'term', 'school'], update_fields=METRIC_FIELDS
+    )
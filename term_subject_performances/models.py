@@ -1,7 +1,6 @@
 # python 
 import uuid
-import numpy as np
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import Decimal
 
 # django 
 from django.db import models, IntegrityError
@@ -16,6 +15,7 @@ from subjects.models import Subject
 
 # utility functions
 from terms import utils as term_utilities
+from seeran_backend import cohort_statistics
 
 
 class TermSubjectPerformance(models.Model):
@@ -151,67 +151,21 @@ class TermSubjectPerformance(models.Model):
             normalized_score_with_default=models.functions.Coalesce('normalized_score', Decimal(0.00))
         )
 
-        performance_data = performances.aggregate(
-            highest_score=models.Max('normalized_score_with_default'),
-            lowest_score=models.Min('normalized_score_with_default'),
-            average_score=models.Avg('normalized_score_with_default'),
-            stddev=models.StdDev('normalized_score_with_default'),
-            students_passing_the_term=models.Count('id', filter=models.Q(normalized_score_with_default__gte=self.subject.pass_mark)),
-            students_in_the_subject_count=models.Count('student')
-        )
-        # print(f'performance_data: {performance_data}')
+        # Compute the score statistics and percentile buckets of the subject in one pass
+        statistics = cohort_statistics.describe(performances.order_by('normalized_score_with_default').values_list('normalized_score_with_default', 'student_id'), pass_mark=self.subject.pass_mark)
 
-        self.highest_score = performance_data['highest_score']
-        self.lowest_score = performance_data['lowest_score']
-        self.average_score = performance_data['average_score']
-        self.standard_deviation = performance_data['stddev']
+        self.highest_score = cohort_statistics.to_decimal(statistics.highest)
+        self.lowest_score = cohort_statistics.to_decimal(statistics.lowest)
+        self.average_score = cohort_statistics.to_decimal(statistics.mean)
+        self.median_score = cohort_statistics.to_decimal(statistics.median)
+        self.standard_deviation = cohort_statistics.to_decimal(statistics.standard_deviation)
         
         # Calculate pass rate
-        self.pass_rate = (performance_data['students_passing_the_term'] / performance_data['students_in_the_subject_count']) * 100
-        # print(f'pass_rate: {self.pass_rate}')
+        self.pass_rate = (statistics.passed / statistics.count) * 100
         self.failure_rate = 100 - self.pass_rate
 
-        # Retrieve and sort scores for statistical calculations.
-        student_scores = performances.order_by('normalized_score').values_list('normalized_score', 'student_id')
-        scores = np.array([score[0] for score in student_scores])
-        # print(f'scores: {scores}')
-
-        if scores.size > 0:
-            # Calculate median score
-            self.median_score = np.median(scores)
-
-            # Calculate percentile boundaries
-            percentiles = np.percentile(scores, [Decimal(10), Decimal(25), Decimal(50), Decimal(75), Decimal(90)])
-
-            # Create empty lists for student IDs based on percentile ranges
-            students_in_10th_percentile = []
-            students_in_25th_percentile = []
-            students_in_50th_percentile = []
-            students_in_75th_percentile = []
-            students_in_90th_percentile = []
-
-            # Assign students to percentiles based on their weighted score
-            for weighted_score, student_id in student_scores:
-                if weighted_score <= percentiles[0]:
-                    students_in_10th_percentile.append(student_id)
-                elif weighted_score <= percentiles[1]:
-                    students_in_25th_percentile.append(student_id)
-                elif weighted_score <= percentiles[2]:
-                    students_in_50th_percentile.append(student_id)
-                elif weighted_score <= percentiles[3]:
-                    students_in_75th_percentile.append(student_id)
-                else:
-                    students_in_90th_percentile.append(student_id)
-
-            # Store the percentile distribution
-            self.percentile_distribution = {
-                '10th': {'count': len(students_in_10th_percentile), 'students': students_in_10th_percentile},
-                '25th': {'count': len(students_in_25th_percentile), 'students': students_in_25th_percentile},
-                '50th': {'count': len(students_in_50th_percentile), 'students': students_in_50th_percentile},
-                '75th': {'count': len(students_in_75th_percentile), 'students': students_in_75th_percentile},
-                '90th': {'count': len(students_in_90th_percentile), 'students': students_in_90th_percentile},
-            }
-            # print(f'percentile_distribution: {self.percentile_distribution}')
+        # Store the percentile distribution
+        self.percentile_distribution = statistics.percentile_distribution()
 
         students_in_the_subject = Student.objects.filter(id__in=performances.values_list('student_id', flat=True)).distinct()
 
@@ -226,7 +180,7 @@ class TermSubjectPerformance(models.Model):
                     1 for performance in performances
                     if previous_subject_scores_dict.get(performance.student_id) is not None and performance.normalized_score > previous_subject_scores_dict[performance.student_id]
                 )
-                self.improvement_rate = (improved_students / performance_data['students_in_the_subject_count']) * 100
+                self.improvement_rate = (improved_students / statistics.count) * 100
             else:
                 self.improvement_rate = None
         else:
@@ -248,7 +202,7 @@ class TermSubjectPerformance(models.Model):
         # print(f'required_assessments: {required_assessments}')
 
         completed_students = student_submissions.filter(submission_count__gte=required_assessments).count()
-        self.completion_rate = (completed_students / performance_data['students_in_the_subject_count']) * 100
+        self.completion_rate = (completed_students / statistics.count) * 100
         # print(f'completion_rate: {self.completion_rate}')
 
         # Identify top performers.
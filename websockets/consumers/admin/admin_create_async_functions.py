@@ -38,6 +38,7 @@ from accounts import utils as accounts_utilities
 from account_permissions import utils as permissions_utilities
 from audit_logs import utils as audits_utilities
 from schools import utils as schools_utilities
+from school_announcements.utils import announcement_created
 from grades import utils as grades_utilities
 from subjects import utils as subjects_utilities
 
@@ -351,6 +352,7 @@ def create_announcement(account, role, details):
         if serializer.is_valid():
             with transaction.atomic():
                 announcement = Announcement.objects.create(**serializer.validated_data)
+                announcement_created(announcement.school_id)
 
                 response = 'the announcement is now available to all users in the school and the parents linked to them.'
                 audits_utilities.log_audit(
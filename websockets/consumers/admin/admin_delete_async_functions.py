@@ -25,10 +25,7 @@ from audit_logs import utils as audits_utilities
 from schools import utils as schools_utilities
 from grades import utils as grades_utilities
 from subjects import utils as subjects_utilities
-
-# tasks
-from term_subject_performances import tasks as  term_subject_performances_tasks
-from classroom_performances import tasks as  classroom_performances_tasks
+from seeran_backend.recompute import recompute_scheduler
 
 
 
@@ -417,9 +414,9 @@ def delete_assessment(account, role, details):
             assessment.delete()
 
         if classroom:
-            classroom_performances_tasks.update_classroom_performance_metrics_task.delay(classroom_performance_id=classroom_performance.id)
+            recompute_scheduler.mark('classroom_performance', classroom_performance.id)
         else:
-            term_subject_performances_tasks.update_term_performance_metrics_task.delay(term_performance_id=term_performance.id)
+            recompute_scheduler.mark('term_subject_performance', term_performance.id)
 
         return {"message": response}
 
@@ -1,8 +1,3 @@
-# python
-import base64
-import zlib
-import json
-
 # django
 from django.db import models
 from django.utils import timezone
@@ -62,13 +57,7 @@ def form_data_for_subscribing_accounts_to_permission_group(user, role, details):
 
         serialized_accounts = SourceAccountSerializer(accounts, many=True).data
 
-        # Compress the serialized data
-        compressed_accounts = zlib.compress(json.dumps(serialized_accounts).encode('utf-8'))
-
-        # Encode compressed data as base64 for safe transport
-        encoded_accounts = base64.b64encode(compressed_accounts).decode('utf-8')
-
-        return {"accounts": encoded_accounts}
+        return {"accounts": serialized_accounts}
     
     except AdminPermissionGroup.DoesNotExist:
         # Handle the case where the provided grade ID does not exist
@@ -116,13 +105,7 @@ def form_data_for_creating_classroom(user, role, details):
         # Serialize the list of teachers
         serialized_teachers = TeacherAccountSerializer(teachers, many=True).data
 
-        # Compress the serialized data
-        compressed_teachers = zlib.compress(json.dumps(serialized_teachers).encode('utf-8'))
-
-        # Encode compressed data as base64 for safe transport
-        encoded_teachers = base64.b64encode(compressed_teachers).decode('utf-8')
-
-        return {"teachers": encoded_teachers}
+        return {"teachers": serialized_teachers}
         
     except Subject.DoesNotExist:
         return {'error': 'a subject in your school with the provided credentials does not exist, please check the subject details and try again'}
@@ -225,13 +208,7 @@ def form_data_for_adding_students_to_classroom(user, role, details):
         # Serialize the list of students to return them in the response
         serialized_students = StudentSourceAccountSerializer(students, many=True).data
 
-        # Compress the serialized data
-        compressed_students = zlib.compress(json.dumps(serialized_students).encode('utf-8'))
-
-        # Encode compressed data as base64 for safe transport
-        encoded_students = base64.b64encode(compressed_students).decode('utf-8')
-
-        return {"students": encoded_students}
+        return {"students": serialized_students}
     
     except Classroom.DoesNotExist:
         # Handle case where the classroom does not exist
@@ -277,13 +254,7 @@ def form_data_for_classroom_attendance_register(user, role, details):
 
         serialized_students = StudentSourceAccountSerializer(students, many=True).data
 
-        # Compress the serialized data
-        compressed_students = zlib.compress(json.dumps(serialized_students).encode('utf-8'))
-
-        # Encode compressed data as base64 for safe transport
-        encoded_students = base64.b64encode(compressed_students).decode('utf-8')
-
-        return {"students": encoded_students, "attendance_register_taken" : attendance_register_taken}
+        return {"students": serialized_students, "attendance_register_taken" : attendance_register_taken}
             
     except Classroom.DoesNotExist:
         return {'error': 'Could not proccess your request, a classroom in your school with the provided credentials does not exist. Please review the classroom details and try again.'}
@@ -402,13 +373,7 @@ def form_data_for_collecting_assessment_submissions(account, role, details):
         # Serialize the student data
         serialized_students = StudentSourceAccountSerializer(students, many=True).data
 
-        # Compress the serialized data
-        compressed_students = zlib.compress(json.dumps(serialized_students).encode('utf-8'))
-
-        # Encode compressed data as base64 for safe transport
-        encoded_students = base64.b64encode(compressed_students).decode('utf-8')
-
-        return {'students': encoded_students}
+        return {'students': serialized_students}
     
     except Assessment.DoesNotExist:
         # Handle the case where the provided grade ID does not exist
@@ -454,13 +419,7 @@ def form_data_for_assessment_submissions(user, role, details):
         # Serialize the student data
         serialized_students = StudentSourceAccountSerializer(students, many=True).data
 
-        # Compress the serialized data
-        compressed_students = zlib.compress(json.dumps(serialized_students).encode('utf-8'))
-
-        # Encode compressed data as base64 for safe transport
-        encoded_students = base64.b64encode(compressed_students).decode('utf-8')
-
-        return {'students': encoded_students}
+        return {'students': serialized_students}
     
     except Assessment.DoesNotExist:
         # Handle the case where the provided grade ID does not exist
@@ -539,13 +498,7 @@ def form_data_for_adding_students_to_group_timetable(account, role, details):
         students = requesting_account.school.students.filter(grade=group_schedule.grade).exclude(timetables=group_schedule)
         serialized_students = StudentSourceAccountSerializer(students, many=True).data
 
-        # Compress the serialized data
-        compressed_students = zlib.compress(json.dumps(serialized_students).encode('utf-8'))
-
-        # Encode compressed data as base64 for safe transport
-        encoded_students = base64.b64encode(compressed_students).decode('utf-8')
-
-        return {'students': encoded_students}
+        return {'students': serialized_students}
     
     except StudentGroupTimetable.DoesNotExist:
         # Handle case where the group schedule does not exist
@@ -16,6 +16,9 @@ from accounts import utils as accounts_utilities
 from account_permissions import utils as permissions_utilities
 from audit_logs import utils as audits_utilities
 
+# relationship index
+from accounts.checks.relationships import relationships
+
 
 @database_sync_to_async
 def link_parent(account, role, details):
@@ -44,6 +47,7 @@ def link_parent(account, role, details):
         if existing_parent:
             with transaction.atomic():
                 existing_parent.children.add(student)
+                relationships.changed(student.school_id)
 
                 response = f'A parent account with the provided credentials already exists. The two accounts have been linked, if this is a mistake, unlink the parent from the students account and review the parents information.'
                 audits_utilities.log_audit(actor=requesting_account, action='LINK', target_model='ACCOUNT', target_object_id=str(student.account_id) if student else 'N/A', outcome='LINKED', server_response=response, school=requesting_account.school,)
@@ -57,6 +61,7 @@ def link_parent(account, role, details):
             with transaction.atomic():
                 parent = Parent.objects.create(**serializer.validated_data)
                 parent.children.add(student)
+                relationships.changed(student.school_id)
 
                 response = f'parent account successfully created and linked to student. the parent can now sign-in and activate their account'
                 audits_utilities.log_audit(actor=requesting_account, action='LINK', target_model='ACCOUNT', target_object_id=str(student.account_id) if student else 'N/A', outcome='LINKED', server_response=response, school=requesting_account.school,)
@@ -0,0 +1,244 @@
+# routes
+from websockets.routes import route_registry, HEAVY_ROUTE_CONCURRENCY
+
+# admin async functions
+from . import admin_create_async_functions
+from . import admin_view_async_functions
+from . import admin_update_async_functions
+from . import admin_delete_async_functions
+from . import admin_search_async_functions
+from . import admin_submit_async_functions
+from . import admin_form_data_async_functions
+from . import admin_link_async_functions
+from . import admin_unlink_async_functions
+
+# general async functions
+from websockets.consumers.general import general_email_async_functions
+
+# general routes
+from websockets.consumers.general.general_routes import send_account_confirmation
+
+
+ADMIN_ROLES = ('ADMIN', 'PRINCIPAL')
+
+
+async def send_created_account_confirmation(response, account, details):
+    if response.get('account'):
+        return await general_email_async_functions.send_account_confirmation_email(response['account'])
+
+    return response
+
+
+# VIEW
+
+route_registry.register_many(ADMIN_ROLES, 'VIEW', {
+    'view_school_details': admin_view_async_functions.view_school_details,
+
+    'view_school_announcements': admin_view_async_functions.view_school_announcements,
+}, signature=('account', 'role'), read_only=True)
+
+# SEARCH
+
+route_registry.register_many(ADMIN_ROLES, 'SEARCH', {
+    'search_audit_entries': admin_search_async_functions.search_audit_entries,
+
+    'search_month_attendance_records': admin_search_async_functions.search_month_attendance_records,
+}, read_only=True, max_concurrency=HEAVY_ROUTE_CONCURRENCY)
+
+route_registry.register_many(ADMIN_ROLES, 'SEARCH', {
+    'search_audit_entry': admin_search_async_functions.search_audit_entry,
+
+    'search_permission_groups': admin_search_async_functions.search_permission_groups,
+    'search_permission_group': admin_search_async_functions.search_permission_group,
+
+    'search_permission_group_subscribers': admin_search_async_functions.search_permission_group_subscribers,
+
+    'search_accounts': admin_search_async_functions.search_accounts,
+    'search_students': admin_search_async_functions.search_students,
+    'search_parents': admin_search_async_functions.search_parents,
+
+    'search_account': admin_search_async_functions.search_account,
+
+    'search_school_announcement': admin_search_async_functions.search_school_announcement,
+
+    'search_grades': admin_search_async_functions.search_grades,
+    'search_grade': admin_search_async_functions.search_grade,
+    'search_grade_details': admin_search_async_functions.search_grade_details,
+    'search_grade_register_classrooms': admin_search_async_functions.search_grade_register_classrooms,
+
+    'search_subject': admin_search_async_functions.search_subject,
+    'search_subject_details': admin_search_async_functions.search_subject_details,
+
+    'search_grade_terms': admin_search_async_functions.search_grade_terms,
+    'search_term_details': admin_search_async_functions.search_term_details,
+    'search_term_subject_performance': admin_search_async_functions.search_term_subject_performance,
+
+    'search_classroom': admin_search_async_functions.search_classroom,
+    'search_classroom_details': admin_search_async_functions.search_classroom_details,
+    'search_classroom_subject_performance': admin_search_async_functions.search_classroom_subject_performance,
+
+    'search_teacher_classrooms': admin_search_async_functions.search_teacher_classrooms,
+
+    'search_student_classroom_performance': admin_search_async_functions.search_student_classroom_performance,
+    'search_student_classroom_card': admin_search_async_functions.search_student_classroom_card,
+    'search_student_activity': admin_search_async_functions.search_student_activity,
+
+    'search_student_attendance': admin_search_async_functions.search_student_attendance,
+
+    'search_assessments': admin_search_async_functions.search_assessments,
+    'search_assessment': admin_search_async_functions.search_assessment,
+
+    'search_transcripts': admin_search_async_functions.search_transcripts,
+    'search_student_assessment_transcript': admin_search_async_functions.search_student_assessment_transcript,
+    'search_transcript': admin_search_async_functions.search_transcript,
+
+    'search_teacher_timetables': admin_search_async_functions.search_teacher_timetables,
+
+    'search_group_timetables': admin_search_async_functions.search_group_timetables,
+    'search_group_timetable_details': admin_search_async_functions.search_group_timetable_details,
+    'search_group_timetable_timetables': admin_search_async_functions.search_group_timetable_timetables,
+    'search_group_timetable_subscribers': admin_search_async_functions.search_group_timetable_subscribers,
+
+    'search_timetable_sessions': admin_search_async_functions.search_timetable_sessions,
+}, read_only=True)
+
+# fields JSON clients keep receiving base64 encoded and zlib compressed
+route_registry.pack_fields(ADMIN_ROLES, 'SEARCH', {
+    'search_audit_entries': ('entries',),
+    'search_month_attendance_records': ('records',),
+    'search_permission_group_subscribers': ('subscribers',),
+    'search_accounts': ('accounts',),
+    'search_students': ('students',),
+    'search_parents': ('parents',),
+    'search_account': ('account',),
+    'search_classroom': ('classroom',),
+    'search_student_attendance': ('records',),
+    'search_group_timetable_subscribers': ('students',),
+})
+
+# FORM DATA
+
+route_registry.register_many(ADMIN_ROLES, 'FORM DATA', {
+    'form_data_for_subscribing_accounts_to_permission_group': admin_form_data_async_functions.form_data_for_subscribing_accounts_to_permission_group,
+
+    'form_data_for_creating_classroom': admin_form_data_async_functions.form_data_for_creating_classroom,
+    'form_data_for_updating_classroom_teacher': admin_form_data_async_functions.form_data_for_updating_classroom_teacher,
+
+    'form_data_for_adding_students_to_classroom': admin_form_data_async_functions.form_data_for_adding_students_to_classroom,
+
+    'form_data_for_classroom_attendance_register': admin_form_data_async_functions.form_data_for_classroom_attendance_register,
+
+    'form_data_for_setting_assessment': admin_form_data_async_functions.form_data_for_setting_assessment,
+    'form_data_for_updating_assessment': admin_form_data_async_functions.form_data_for_updating_assessment,
+
+    'form_data_for_collecting_assessment_submissions': admin_form_data_async_functions.form_data_for_collecting_assessment_submissions,
+    'form_data_for_assessment_submissions': admin_form_data_async_functions.form_data_for_assessment_submissions,
+    'form_data_for_assessment_submission_details': admin_form_data_async_functions.form_data_for_assessment_submission_details,
+
+    'form_data_for_adding_students_to_group_timetable': admin_form_data_async_functions.form_data_for_adding_students_to_group_timetable,
+}, read_only=True)
+
+# fields JSON clients keep receiving base64 encoded and zlib compressed
+route_registry.pack_fields(ADMIN_ROLES, 'FORM DATA', {
+    'form_data_for_subscribing_accounts_to_permission_group': ('accounts',),
+    'form_data_for_creating_classroom': ('teachers',),
+    'form_data_for_adding_students_to_classroom': ('students',),
+    'form_data_for_classroom_attendance_register': ('students',),
+    'form_data_for_collecting_assessment_submissions': ('students',),
+    'form_data_for_assessment_submissions': ('students',),
+    'form_data_for_adding_students_to_group_timetable': ('students',),
+})
+
+# UPDATE
+
+route_registry.register_many(ADMIN_ROLES, 'UPDATE', {
+    'update_school_account_details': admin_update_async_functions.update_school_account_details,
+
+    'update_permission_group_subscribers': admin_update_async_functions.update_permission_group_subscribers,
+
+    'update_account_details': admin_update_async_functions.update_account_details,
+
+    'update_grade_details': admin_update_async_functions.update_grade_details,
+
+    'update_subject_details': admin_update_async_functions.update_subject_details,
+
+    'update_term_details': admin_update_async_functions.update_term_details,
+
+    'update_assessment': admin_update_async_functions.update_assessment,
+    'update_assessment_as_collected': admin_update_async_functions.update_assessment_as_collected,
+    'update_assessment_as_graded': admin_update_async_functions.update_assessment_as_graded,
+
+    'update_student_assessment_transcript': admin_update_async_functions.update_student_assessment_transcript,
+
+    'update_classroom_details': admin_update_async_functions.update_classroom_details,
+    'update_classroom_teacher': admin_update_async_functions.update_classroom_teacher,
+    'update_classroom_students': admin_update_async_functions.update_classroom_students,
+
+    'update_group_timetable_details': admin_update_async_functions.update_group_timetable_details,
+    'update_group_timetable_subscribers': admin_update_async_functions.update_group_timetable_subscribers,
+})
+
+# SUBMIT
+
+route_registry.register_many(ADMIN_ROLES, 'SUBMIT', {
+    'submit_attendance_register': admin_submit_async_functions.submit_attendance_register,
+
+    'submit_assessment_submissions': admin_submit_async_functions.submit_assessment_submissions,
+    'submit_student_transcript_score': admin_submit_async_functions.submit_student_transcript_score,
+})
+
+# DELETE
+
+route_registry.register(ADMIN_ROLES, 'DELETE', 'delete_school_account', admin_delete_async_functions.delete_school_account, signature=('account', 'role'))
+route_registry.register_many(ADMIN_ROLES, 'DELETE', {
+    'delete_permission_group': admin_delete_async_functions.delete_permission_group,
+
+    'delete_account': admin_delete_async_functions.delete_account,
+
+    'delete_grade': admin_delete_async_functions.delete_grade,
+
+    'delete_subject': admin_delete_async_functions.delete_subject,
+
+    'delete_term': admin_delete_async_functions.delete_term,
+
+    'delete_classroom': admin_delete_async_functions.delete_classroom,
+
+    'delete_assessment': admin_delete_async_functions.delete_assessment,
+
+    'delete_timetable': admin_delete_async_functions.delete_timetable,
+
+    'delete_group_timetable': admin_delete_async_functions.delete_group_timetable,
+})
+
+# LINK
+
+route_registry.register(ADMIN_ROLES, 'LINK', 'link_parent', admin_link_async_functions.link_parent, after=send_account_confirmation)
+
+# UNLINK
+
+route_registry.register(ADMIN_ROLES, 'UNLINK', 'unlink_parent', admin_unlink_async_functions.unlink_parent)
+
+# CREATE
+
+route_registry.register(ADMIN_ROLES, 'CREATE', 'create_account', admin_create_async_functions.create_account, after=send_created_account_confirmation)
+route_registry.register_many(ADMIN_ROLES, 'CREATE', {
+    'create_permission_group': admin_create_async_functions.create_permission_group,
+
+    'create_announcement': admin_create_async_functions.create_announcement,
+
+    'create_grade': admin_create_async_functions.create_grade,
+
+    'create_subject': admin_create_async_functions.create_subject,
+
+    'create_term': admin_create_async_functions.create_term,
+
+    'create_classroom': admin_create_async_functions.create_classroom,
+
+    'create_assessment': admin_create_async_functions.create_assessment,
+
+    'create_timetable': admin_create_async_functions.create_timetable,
+
+    'create_group_timetable': admin_create_async_functions.create_group_timetable,
+
+    'create_student_activity': admin_create_async_functions.create_student_activity,
+})
@@ -1,8 +1,3 @@
-# python
-import base64
-import zlib
-import json
-
 # channels
 from channels.db import database_sync_to_async
 
@@ -84,13 +79,7 @@ def search_audit_entries(user, role, details):
         entries = requesting_account.school.audit_logs.only('actor__name', 'actor__surname', 'outcome', 'target_model', 'timestamp', 'audit_entry_id').filter(action=details['action'])
         serialized_entries = AuditEntriesSerializer(entries, many=True).data
 
-        # Compress the serialized data
-        compressed_entries = zlib.compress(json.dumps(serialized_entries).encode('utf-8'))
-
-        # Encode compressed data as base64 for safe transport
-        encoded_entries = base64.b64encode(compressed_entries).decode('utf-8')
-
-        return {"entries": encoded_entries}
+        return {"entries": serialized_entries}
 
     except Exception as e:
         # Handle any unexpected errors with a general error message
@@ -240,13 +229,7 @@ def search_permission_group_subscribers(user, role, details):
 
         serialized_subscribers = SourceAccountSerializer(subscribers, many=True).data
 
-        # Compress the serialized data
-        compressed_subscribers = zlib.compress(json.dumps(serialized_subscribers).encode('utf-8'))
-
-        # Encode compressed data as base64 for safe transport
-        encoded_subscribers = base64.b64encode(compressed_subscribers).decode('utf-8')
-
-        return {"subscribers": encoded_subscribers}
+        return {"subscribers": serialized_subscribers}
     
     except AdminPermissionGroup.DoesNotExist:
         # Handle the case where the provided grade ID does not exist
@@ -323,12 +306,7 @@ def search_accounts(user, role, details):
             teachers = requesting_account.school.teachers.only('name', 'surname', 'email_address', 'profile_picture', 'account_id')
             serialized_accounts = TeacherAccountSerializer(teachers, many=True).data
 
-        # Compress the serialized data
-        compressed_accounts = zlib.compress(json.dumps(serialized_accounts).encode('utf-8'))
-        # Encode compressed data as base64 for safe transport
-        encoded_accounts = base64.b64encode(compressed_accounts).decode('utf-8')
-
-        return {"accounts": encoded_accounts}
+        return {"accounts": serialized_accounts}
 
     except Exception as e:
         # Handle any unexpected errors with a general error message
@@ -373,13 +351,8 @@ def search_account(user, role, details):
             # Serialize the requested user's details and return the serialized data.
             serialized_account = Serializer(instance=requested_account).data
 
-        # Compress the serialized data
-        compressed_account = zlib.compress(json.dumps(serialized_account).encode('utf-8'))
-        # Encode compressed data as base64 for safe transport
-        encoded_account = base64.b64encode(compressed_account).decode('utf-8')
-
         # Return the serialized user data if everything is successful.
-        return {"account": encoded_account}
+        return {"account": serialized_account}
     
     except Exception as e:
         # Handle any other unexpected errors and return the error message.
@@ -405,12 +378,7 @@ def search_students(user, role, details):
         grade = requesting_account.school.grades.prefetch_related('students').get(grade_id=details['grade'])
         serialized_students = StudentSourceAccountSerializer(grade.students.only('name', 'surname', 'id_number', 'passport_number', 'email_address', 'profile_picture', 'account_id'), many=True).data
 
-        # Compress the serialized data
-        compressed_students = zlib.compress(json.dumps(serialized_students).encode('utf-8'))
-        # Encode compressed data as base64 for safe transport
-        encoded_students = base64.b64encode(compressed_students).decode('utf-8')
-
-        return {"students": encoded_students}
+        return {"students": serialized_students}
     
     except Grade.DoesNotExist:
         # Handle the case where the provided grade ID does not exist
@@ -444,12 +412,7 @@ def search_parents(user, role, details):
         # Serialize the parents to return them in the response
         serialized_parents = ParentAccountSerializer(parents, many=True).data
 
-        # Compress the serialized data
-        compressed_parents = zlib.compress(json.dumps(serialized_parents).encode('utf-8'))
-        # Encode compressed data as base64 for safe transport
-        encoded_parents = base64.b64encode(compressed_parents).decode('utf-8')
-
-        return {"parents": encoded_parents}
+        return {"parents": serialized_parents}
                        
     except Student.DoesNotExist:
         # Handle the case where the provided account ID does not exist
@@ -759,13 +722,7 @@ def search_classroom(account, role, details):
         classroom = requesting_account.school.classrooms.get(classroom_id=details['classroom'])
         serialized_classroom = ClassroomSerializer(classroom).data
 
-        # Compress the serialized data
-        compressed_classroom = zlib.compress(json.dumps(serialized_classroom).encode('utf-8'))
-
-        # Encode compressed data as base64 for safe transport
-        encoded_classroom = base64.b64encode(compressed_classroom).decode('utf-8')
-
-        return {"classroom": encoded_classroom}
+        return {"classroom": serialized_classroom}
     
     except Classroom.DoesNotExist:
         # Handle case where the classroom does not exist
@@ -1387,13 +1344,7 @@ def search_group_timetable_subscribers(user, role, details):
         group_schedule = requesting_account.school.group_timetables.prefetch_related('subscribers').get(group_timetable_id=details['group_timetable'])
         serialized_students = StudentSourceAccountSerializer(group_schedule.subscribers, many=True).data
 
-        # Compress the serialized data
-        compressed_subscribers = zlib.compress(json.dumps(serialized_students).encode('utf-8'))
-
-        # Encode compressed data as base64 for safe transport
-        encoded_subscribers = base64.b64encode(compressed_subscribers).decode('utf-8')
-
-        return {"students": encoded_subscribers}
+        return {"students": serialized_students}
                 
     except StudentGroupTimetable.DoesNotExist:
         # Handle case where the group schedule does not exist
@@ -1460,13 +1411,7 @@ def search_month_attendance_records(account, role, details):
         # For each absent instance, get the corresponding Late instance
         attendance_records = ClassroomAttendanceSerializer(attendances, many=True).data
 
-        # Compress the serialized data
-        compressed_attendance_records = zlib.compress(json.dumps(attendance_records).encode('utf-8'))
-
-        # Encode compressed data as base64 for safe transport
-        encoded_attendance_records = base64.b64encode(compressed_attendance_records).decode('utf-8')
-
-        return {'records': encoded_attendance_records}
+        return {'records': attendance_records}
     
     except Classroom.DoesNotExist:
         return {'error': 'Could not process your request, a classroom in your school with the provided credentials does not exist. Please check the classrooms details and try again.'}
@@ -1507,13 +1452,7 @@ def search_student_attendance(account, role, details):
         # For each absent instance, get the corresponding Late instance
         attendance_records = StudentAttendanceSerializer(sorted_attendances, many=True, context={'student': student.id}).data
 
-        # Compress the serialized data
-        compressed_attendance_records = zlib.compress(json.dumps({'records': attendance_records, 'days_absent': days_absent}).encode('utf-8'))
-
-        # Encode compressed data as base64 for safe transport
-        encoded_attendance_records = base64.b64encode(compressed_attendance_records).decode('utf-8')
-
-        return {'records': encoded_attendance_records}
+        return {'records': {'records': attendance_records, 'days_absent': days_absent}}
     
     except Classroom.DoesNotExist:
         return {'error': 'Could not process your request, a classroom in your school with the provided credentials does not exist. Please check the classrooms details and try again.'}
@@ -13,6 +13,9 @@ from accounts import utils as users_utilities
 from account_permissions import utils as permissions_utilities
 from audit_logs import utils as audits_utilities
 
+# relationship index
+from accounts.checks.relationships import relationships
+
 
 @database_sync_to_async
 def unlink_parent(user, role, details):
@@ -43,6 +46,7 @@ def unlink_parent(user, role, details):
         # Remove the child from the parent's list of children
         with transaction.atomic():
             parent.children.remove(student)
+            relationships.changed(student.school_id)
             if parent.children.len <= 0:
                 parent.is_active = False
                 parent.save()
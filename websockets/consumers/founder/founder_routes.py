@@ -0,0 +1,115 @@
+# routes
+from websockets.routes import route_registry
+
+# founder async functions
+from . import founder_create_async_functions
+from . import founder_delete_async_functions
+from . import founder_search_async_functions
+from . import founder_email_async_functions
+from . import founder_update_async_functions
+from . import founder_view_async_functions
+
+# general async functions
+from websockets.consumers.general import general_upload_async_functions
+from websockets.consumers.general import general_submit_async_functions
+from websockets.consumers.general import general_update_async_functions
+from websockets.consumers.general import general_view_async_functions
+from websockets.consumers.general import general_verify_async_functions
+from websockets.consumers.general import general_email_async_functions
+
+# general routes
+from websockets.consumers.general.general_routes import send_account_confirmation
+
+
+FOUNDER_ROLES = ('FOUNDER',)
+
+
+async def send_email_update_one_time_pin(response, account, details):
+    if response.get('user'):
+        return await general_email_async_functions.send_one_time_pin_email(response.get('user'), reason='This OTP was generated in response to your email update request..')
+
+    return response
+
+
+async def send_password_update_one_time_pin(response, account, details):
+    if response.get('user'):
+        return await general_email_async_functions.send_one_time_pin_email(response.get('user'), reason='This OTP was generated in response to your password update request..')
+
+    return response
+
+
+# VIEW
+
+route_registry.register(FOUNDER_ROLES, 'VIEW', 'view_my_security_information', general_view_async_functions.view_my_security_information, signature=('account', 'role'), read_only=True)
+route_registry.register(FOUNDER_ROLES, 'VIEW', 'view_schools', founder_view_async_functions.view_schools, signature=(), read_only=True)
+
+# SEARCH
+
+route_registry.register_many(FOUNDER_ROLES, 'SEARCH', {
+    'school': founder_search_async_functions.search_school,
+    'school_details': founder_search_async_functions.search_school_details,
+
+    'search_threads': founder_search_async_functions.search_threads,
+    'search_thread': founder_search_async_functions.search_thread,
+
+    'search_thread_messages': founder_search_async_functions.search_thread_messages,
+
+    'principal_profile': founder_search_async_functions.search_principal_profile,
+    'principal_details': founder_search_async_functions.search_principal_details,
+
+    'principal_invoices': founder_search_async_functions.search_principal_invoices,
+    'principal_invoice': founder_search_async_functions.search_principal_invoice,
+
+    'bug_reports': founder_search_async_functions.search_bug_reports,
+    'bug_report': founder_search_async_functions.search_bug_report,
+}, signature=('details',), read_only=True)
+
+# fields JSON clients keep receiving base64 encoded and zlib compressed
+route_registry.pack_fields(FOUNDER_ROLES, 'SEARCH', {
+    'search_threads': ('threads',),
+    'search_thread': ('thread',),
+})
+
+# VERIFY
+
+route_registry.register(FOUNDER_ROLES, 'VERIFY', 'verify_email_address', general_verify_async_functions.verify_email_address, signature=('details',), after=send_email_update_one_time_pin)
+route_registry.register(FOUNDER_ROLES, 'VERIFY', 'verify_password', general_verify_async_functions.verify_password, signature=('account', 'details'), after=send_password_update_one_time_pin)
+route_registry.register(FOUNDER_ROLES, 'VERIFY', 'verify_otp', general_verify_async_functions.verify_otp, signature=('account', 'details'))
+
+# UPDATE
+
+route_registry.register_many(FOUNDER_ROLES, 'UPDATE', {
+    'update_email_address': general_update_async_functions.update_email_address,
+    'update_password': general_update_async_functions.update_password,
+}, signature=('account', 'details', 'access_token'))
+route_registry.register(FOUNDER_ROLES, 'UPDATE', 'update_multi_factor_authentication', general_update_async_functions.update_multi_factor_authentication, signature=('account', 'details'))
+route_registry.register_many(FOUNDER_ROLES, 'UPDATE', {
+    'update_bug_report_details': founder_update_async_functions.update_bug_report_details,
+    'update_principal_account_details': founder_update_async_functions.update_principal_account_details,
+    'update_school_details_details': founder_update_async_functions.update_school_account_details,
+}, signature=('details',))
+
+# MESSAGE
+
+route_registry.register(FOUNDER_ROLES, 'MESSAGE', 'email_thread_reply', founder_email_async_functions.email_thread_reply, signature=('account', 'details'))
+route_registry.register(FOUNDER_ROLES, 'MESSAGE', 'send_marketing_email', founder_email_async_functions.send_marketing_email, signature=('account', 'details'), rate_limited=True)
+
+# SUBMIT
+
+route_registry.register(FOUNDER_ROLES, 'SUBMIT', 'submit_case_response', general_submit_async_functions.submit_case_response, signature=('details',))
+
+# DELETE
+
+route_registry.register_many(FOUNDER_ROLES, 'DELETE', {
+    'delete_school_account': founder_delete_async_functions.delete_school_account,
+    'delete_principal_account': founder_delete_async_functions.delete_principal_account,
+}, signature=('details',))
+
+# UPLOAD
+
+route_registry.register(FOUNDER_ROLES, 'UPLOAD', 'remove_profile_picture', general_upload_async_functions.remove_profile_picture, signature=('account',))
+
+# CREATE
+
+route_registry.register(FOUNDER_ROLES, 'CREATE', 'create_school_account', founder_create_async_functions.create_school_account, signature=('details',))
+route_registry.register(FOUNDER_ROLES, 'CREATE', 'create_principal_account', founder_create_async_functions.create_principal_account, signature=('details',), after=send_account_confirmation)
@@ -1,8 +1,3 @@
-# python
-import base64
-import zlib
-import json
-
 # channels
 from channels.db import database_sync_to_async
 
@@ -32,14 +27,8 @@ def search_threads(details):
         # Serialize the fetched schools data
         serialized_threads = EmailCasesSerializer(threads, many=True).data
 
-        # Compress the serialized data
-        compressed_threads = zlib.compress(json.dumps(serialized_threads).encode('utf-8'))
-
-        # Encode compressed data as base64 for safe transport
-        encoded_threads = base64.b64encode(compressed_threads).decode('utf-8')
-
         # Return the serialized data in a dictionary
-        return {'threads': encoded_threads}
+        return {'threads': serialized_threads}
 
     except Exception as e:
         # Handle any unexpected errors and return a general error message
@@ -55,14 +44,8 @@ def search_thread(details):
         # Serialize the fetched schools data
         serialized_threads = EmailCaseSerializer(thread).data
 
-        # Compress the serialized data
-        compressed_thread = zlib.compress(json.dumps(serialized_threads).encode('utf-8'))
-
-        # Encode compressed data as base64 for safe transport
-        encoded_thread = base64.b64encode(compressed_thread).decode('utf-8')
-
         # Return the serialized data in a dictionary
-        return {'thread': encoded_thread}
+        return {'thread': serialized_threads}
     
     except Case.DoesNotExist:
         return {"error": "a email case with the provided credentials can not be found"}
@@ -0,0 +1,279 @@
+# python
+import time
+import asyncio
+import logging
+
+# asgiref
+from asgiref.sync import ThreadSensitiveContext
+
+# channels
+from channels.generic.websocket import AsyncWebsocketConsumer
+
+# django
+from django.conf import settings
+
+# websocket manager
+from seeran_backend.middleware import connection_manager
+
+# utility functions
+from seeran_backend.utils import batch_memo
+
+# utility functions
+from websockets.utils import MSGPACK_SUBPROTOCOL, decode_frame, response_encoder
+
+# routes
+from websockets.routes import route_registry
+
+
+logger = logging.getLogger(__name__)
+
+
+class GeneralConsumer(AsyncWebsocketConsumer):
+    """
+    Base consumer shared by the role consumers.
+
+    Clients that request the 'msgpack' subprotocol exchange binary MessagePack frames, compressed payloads
+    then travel as raw bytes. Every other client keeps the plain JSON text protocol. Responses go through
+    the shared response encoder, which compresses the large MessagePack ones.
+
+    Requests are handled one at a time unless they carry a 'request_id'. Those run as tasks, at most
+    `WEBSOCKET_MAX_CONCURRENT_REQUESTS` at a time per socket, and their responses echo the request id so
+    the client can match them, a slow search then no longer holds up the cheap requests behind it.
+
+    Requests are answered by the route registered for the connection's role in the route registry, the
+    role consumers only import their route declarations.
+
+    A 'BATCH' request carries several read only requests (a dashboard's panels) in one frame, they share
+    one database thread and resolve the requesting account and its permissions once.
+
+    The access token is verified once by the authentication middleware. The connection is closed when the
+    token expires or when the connection manager reports it blacklisted, so requests only check those flags.
+
+    Account events (chat messages, read receipts and unread message counts) are fanned out by the
+    connection manager through the channel layer, every consumer that joined the recipient's account
+    group receives them here and queues them on its own socket.
+    """
+
+    # True once the connection has negotiated MessagePack framing
+    binary_framing = False
+
+    # True once the connection's access token has been blacklisted
+    revoked = False
+
+    # close code sent when the connection's access token expires or is blacklisted
+    unauthenticated_close_code = 4001
+
+    # the registry the consumer looks requests up in
+    routes = route_registry
+
+    # errors sent back for a request without an action or description, and for a request no route answered
+    invalid_request_error = 'invalid request..'
+    unanswered_request_error = 'provided information is invalid.. request revoked'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # request id -> task of the requests in flight on this socket
+        self.in_flight_requests = {}
+        self.request_slots = asyncio.Semaphore(settings.WEBSOCKET_MAX_CONCURRENT_REQUESTS)
+        self.access_token_expiry_timer = None
+
+    async def accept(self, subprotocol=None, headers=None):
+        if subprotocol is None and MSGPACK_SUBPROTOCOL in self.scope.get('subprotocols', []):
+            subprotocol = MSGPACK_SUBPROTOCOL
+
+        self.binary_framing = subprotocol == MSGPACK_SUBPROTOCOL
+        await super().accept(subprotocol, headers)
+
+        access_token_expiry = self.scope.get('access_token_expiry')
+        if access_token_expiry is not None and self.access_token_expiry_timer is None:
+            loop = asyncio.get_running_loop()
+            self.access_token_expiry_timer = loop.call_later(
+                max(access_token_expiry - time.time(), 0), lambda: loop.create_task(self.access_token_expired())
+            )
+
+    def authenticated(self):
+        """
+        Checks whether the connection's access token can still be used, without verifying the token again.
+
+        Returns:
+            bool: True if the token has neither been blacklisted nor expired.
+        """
+        access_token_expiry = self.scope.get('access_token_expiry')
+        return not self.revoked and access_token_expiry is not None and time.time() < access_token_expiry
+
+    async def access_token_expired(self):
+        await self.send_response({'error': 'Could not process your request, your access token has expired. Please log in again.'})
+        await self.close(code=self.unauthenticated_close_code)
+
+    def decode_request(self, text_data=None, bytes_data=None):
+        return decode_frame(text_data, bytes_data)
+
+    async def websocket_disconnect(self, message):
+        if self.access_token_expiry_timer is not None:
+            self.access_token_expiry_timer.cancel()
+
+        for task in self.in_flight_requests.values():
+            task.cancel()
+
+        await super().websocket_disconnect(message)
+
+    async def send_response(self, response, description=None, request_id=None, packed_fields=()):
+        if request_id is not None:
+            response = {**response, 'request_id': request_id}
+
+        await self.send(**response_encoder.encode(response, self.binary_framing, description, packed_fields))
+
+# RECIEVE
+
+    async def receive(self, text_data=None, bytes_data=None):
+        account = self.scope.get('account')
+        role = self.scope.get('role')
+        access_token = self.scope.get('access_token')
+
+        if not (account and role and access_token and self.authenticated()):
+            await self.send_response({'error': 'request not authenticated.. access denied'})
+            return await self.close()
+
+        data = self.decode_request(text_data, bytes_data)
+        action = data.get('action')
+        description = data.get('description')
+        details = data.get('details')
+        request_id = data.get('request_id')
+
+        if not action or not description:
+            return await self.send_response({'error': self.invalid_request_error}, request_id=request_id)
+
+        if request_id is not None:
+            # the client matches responses by request id, run the request alongside the others in flight on this socket
+            return await self.start_request(request_id, self.process_request(action, description, details, account, role, access_token, request_id))
+
+        await self.process_request(action, description, details, account, role, access_token)
+
+    async def process_request(self, action, description, details, account, role, access_token, request_id=None):
+        response = await self.handle_request(action, description, details, account, role, access_token)
+
+        if response:
+            route = self.routes.get(role, action, description)
+            return await self.send_response(response, description, request_id, route.packed_fields if route else ())
+
+        return await self.send_response({'error': self.unanswered_request_error}, request_id=request_id)
+
+    async def start_request(self, request_id, request):
+        """
+        Starts a request that carries a request id as its own task and returns without waiting for it.
+
+        Args:
+            request_id (str or int): The client chosen id echoed back in the response.
+            request (coroutine): The coroutine that handles the request and sends its response.
+        """
+        error = None
+        if not isinstance(request_id, (str, int)) or isinstance(request_id, bool):
+            error = 'Could not process your request, the request id should be a string or an integer.'
+        elif request_id in self.in_flight_requests:
+            error = 'Could not process your request, a request with the same request id is still being processed.'
+        elif len(self.in_flight_requests) >= settings.WEBSOCKET_MAX_PENDING_REQUESTS:
+            error = 'Could not process your request, too many requests are being processed on this connection. Please wait for some responses and try again.'
+
+        if error:
+            request.close()
+            return await self.send_response({'error': error}, request_id=request_id if isinstance(request_id, (str, int)) else None)
+
+        task = asyncio.get_running_loop().create_task(self.run_request(request_id, request))
+        self.in_flight_requests[request_id] = task
+        task.add_done_callback(lambda _: self.in_flight_requests.pop(request_id, None))
+
+    async def run_request(self, request_id, request):
+        try:
+            async with self.request_slots:
+                # sync handlers of this request get their own thread instead of the thread shared by the
+                # whole process, otherwise a slow query would still hold up the other requests' queries
+                async with ThreadSensitiveContext():
+                    await request
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception:
+            logger.exception('websocket request %s failed', request_id)
+            await self.send_response({'error': 'Could not process your request, an internal error occurred. If this problem persist open a bug report ticket.'}, request_id=request_id)
+
+# HANDLER/ROUTER
+
+    async def handle_request(self, action, description, details, account, role, access_token):
+        if action == 'BATCH':
+            return await self.handle_batch(description, details, account, role, access_token)
+
+        return await self.routes.dispatch(role, action, description, details, account, access_token)
+
+# BATCH
+
+    async def handle_batch(self, description, details, account, role, access_token):
+        """
+        Handles a BATCH request, a list of read requests answered together in one response.
+
+        Args:
+            description (str): Describes the batch (for example the dashboard it loads), used for the encoding stats.
+            details (dict): {'requests': [{'id': ..., 'action': ..., 'description': ..., 'details': {...}}, ...]}.
+
+        Returns:
+            dict: {'batch': {<entry id>: <response>}}, entries without an id are keyed by their position.
+        """
+        entries = details.get('requests') if isinstance(details, dict) else None
+
+        if not isinstance(entries, list) or not entries or not all(isinstance(entry, dict) for entry in entries):
+            return {'error': 'Could not process your request, a batch request should provide a list of requests.'}
+
+        if len(entries) > settings.WEBSOCKET_MAX_BATCH_SIZE:
+            return {'error': f'Could not process your request, a batch request can carry at most {settings.WEBSOCKET_MAX_BATCH_SIZE} requests.'}
+
+        responses = {}
+        memo = batch_memo.set({})
+        try:
+            # one thread, and so one database connection, for every sub-request of the batch
+            async with ThreadSensitiveContext():
+                for index, entry in enumerate(entries):
+                    entry_id = str(entry.get('id', index))
+                    action = entry.get('action')
+                    entry_description = entry.get('description')
+
+                    # read only routes can share the account and permission lookups of the batch
+                    route = self.routes.get(role, action, entry_description)
+                    if not route or not route.read_only:
+                        responses[entry_id] = {'error': 'Could not process your request, only read only view, search and form data requests can be batched.'}
+                        continue
+
+                    response = await route(account, role, entry.get('details') or {}, access_token)
+                    responses[entry_id] = response or {'error': 'Could not process your request, the provided information is invalid.. request revoked'}
+
+        finally:
+            batch_memo.reset(memo)
+
+        return {'batch': responses}
+
+# EVENTS
+
+    async def text_message(self, event):
+        await connection_manager.deliver(self, event['message'], event['type'])
+
+    async def text_message_fan(self, event):
+        await connection_manager.deliver(self, event['message'], event['type'])
+
+    async def read_receipt(self, event):
+        await connection_manager.deliver(self, event['message'], event['type'])
+
+    async def unread_messages(self, event):
+        await connection_manager.deliver(self, event['message'], event['type'])
+
+    async def access_token_revoked(self, event):
+        if self.scope.get('access_token') not in event['access_tokens']:
+            return
+
+        self.revoked = True
+        await self.send_response({'error': 'Could not process your request, your access token has been blacklisted and cannot be used to access the system.'})
+        await self.close(code=self.unauthenticated_close_code)
+
+    async def school_denied_access(self, event):
+        self.revoked = True
+        await self.send_response({'denied': 'Could not process your request, access denied. Your school no longer has an active account on our system.'})
+        await self.close(code=self.unauthenticated_close_code)
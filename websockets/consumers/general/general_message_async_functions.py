@@ -20,6 +20,7 @@ from accounts.checks import permission_checks
 
 # utility functions 
 from accounts import utils as accounts_utilities
+from private_chat_room_messages.utils import adjust_unread_messages_count
 
 
 @database_sync_to_async
@@ -73,6 +74,7 @@ def message_private(account, role, details):
             )
 
             new_message.unread_by.add(requested_account)
+            adjust_unread_messages_count(requested_user.account_id, 1)
 
         # Serialize the new message
         serialized_message = PrivateChatRoomMessageSerializer(new_message, context={'participant': account}).data
@@ -0,0 +1,115 @@
+# websocket manager
+from seeran_backend.middleware import connection_manager
+
+# routes
+from websockets.routes import route_registry
+
+# general async functions
+from . import general_message_async_functions
+from . import general_upload_async_functions
+from . import general_update_async_functions
+from . import general_search_async_functions
+from . import general_view_async_functions
+from . import general_verify_async_functions
+from . import general_email_async_functions
+
+
+# roles served by the school consumers (admin, teacher, student and parent)
+SCHOOL_ROLES = ('PRINCIPAL', 'ADMIN', 'TEACHER', 'STUDENT', 'PARENT')
+
+
+# POST PROCESSING
+
+async def send_chat_room_read_receipts(response, account, details):
+    if response.get('user'):
+        await connection_manager.send_event(response['user'], 'read_receipt', {'description': 'read_receipt', 'chat': response['chat']})
+        await connection_manager.send_event(account, 'unread_messages', {'unread_messages': response['unread_messages']})
+
+        return {'messages': response['messages'], 'next_cursor': response['next_cursor']}
+
+    return response
+
+
+async def send_read_receipt(response, account, details):
+    if response.get('user'):
+        await connection_manager.send_event(response['user'], 'read_receipt', {'description': 'read_receipt', 'chat': response['chat']})
+        return {'message': 'read receipt sent'}
+
+    return response
+
+
+async def send_private_message(response, account, details):
+    if response.get('recipient'):
+        await connection_manager.send_event(response['recipient']['account_id'], 'text_message', {'description': 'text_message', 'message': response['message'], 'author': response['author']})
+        await connection_manager.send_event(response['author']['account_id'], 'text_message_fan', {'description': 'text_message_fan', 'message': response['message'], 'recipient': response['recipient']})
+
+        return {'message': 'private message successfully sent'}
+
+    return response
+
+
+async def send_one_time_pin(response, account, details):
+    if response.get('user'):
+        return await general_email_async_functions.send_one_time_pin_email(response.get('user'), reason='This OTP was generated in response to your request.')
+
+    return response
+
+
+async def send_email_revalidation_one_time_pin(response, account, details):
+    if response.get('user'):
+        response = await general_email_async_functions.send_email_revalidation_one_time_pin_email(response['user'])
+
+        if response.get('message'):
+            return await general_update_async_functions.update_email_ban_otp_sends(details)
+
+    return response
+
+
+async def send_account_confirmation(response, account, details):
+    if response.get('user'):
+        return await general_email_async_functions.send_account_confirmation_email(response['user'])
+
+    return response
+
+
+# VIEW
+
+route_registry.register(SCHOOL_ROLES, 'VIEW', 'view_my_security_information', general_view_async_functions.view_my_security_information, signature=('account', 'role'), read_only=True)
+route_registry.register_many(SCHOOL_ROLES, 'VIEW', {
+    'view_my_email_address_status_information': general_view_async_functions.view_my_email_address_status_information,
+
+    'view_chat_rooms': general_view_async_functions.view_chat_rooms,
+}, signature=('account',), read_only=True)
+
+# SEARCH
+
+route_registry.register(SCHOOL_ROLES, 'SEARCH', 'search_email_ban', general_search_async_functions.search_email_ban, signature=('details',), read_only=True)
+route_registry.register(SCHOOL_ROLES, 'SEARCH', 'search_chat_room', general_search_async_functions.search_chat_room, read_only=True)
+
+# marks the fetched messages as read, so it is not batchable
+route_registry.register(SCHOOL_ROLES, 'SEARCH', 'search_chat_room_messages', general_search_async_functions.search_chat_room_messages, signature=('account', 'details'), after=send_chat_room_read_receipts)
+
+# VERIFY
+
+route_registry.register(SCHOOL_ROLES, 'VERIFY', 'verify_email', general_verify_async_functions.verify_email_address, signature=('role', 'details'), after=send_one_time_pin)
+route_registry.register(SCHOOL_ROLES, 'VERIFY', 'verify_password', general_verify_async_functions.verify_password, signature=('account', 'details'), after=send_one_time_pin)
+route_registry.register(SCHOOL_ROLES, 'VERIFY', 'verify_otp', general_verify_async_functions.verify_otp, signature=('account', 'details'))
+route_registry.register(SCHOOL_ROLES, 'VERIFY', 'verify_email_ban_revalidation_otp_send', general_verify_async_functions.verify_email_ban_revalidation_otp_send, signature=('account', 'details'), after=send_email_revalidation_one_time_pin)
+route_registry.register(SCHOOL_ROLES, 'VERIFY', 'verify_email_ban_revalidation_otp', general_verify_async_functions.verify_email_ban_revalidation_otp, signature=('account', 'details'))
+
+# UPDATE
+
+route_registry.register_many(SCHOOL_ROLES, 'UPDATE', {
+    'update_email_address': general_update_async_functions.update_email_address,
+    'update_password': general_update_async_functions.update_password,
+}, signature=('account', 'details', 'access_token'))
+route_registry.register(SCHOOL_ROLES, 'UPDATE', 'update_multi_factor_authentication', general_update_async_functions.update_multi_factor_authentication, signature=('account', 'details'))
+route_registry.register(SCHOOL_ROLES, 'UPDATE', 'update_messages_as_read', general_update_async_functions.update_messages_as_read, signature=('account', 'details'), after=send_read_receipt)
+
+# MESSAGE
+
+route_registry.register(SCHOOL_ROLES, 'MESSAGE', 'message_private', general_message_async_functions.message_private, after=send_private_message, rate_limited=True)
+
+# UPLOAD
+
+route_registry.register(SCHOOL_ROLES, 'UPLOAD', 'remove_profile_picture', general_upload_async_functions.remove_profile_picture, signature=('account',))
@@ -18,6 +18,7 @@ from private_chat_room_messages.serializers import PrivateChatRoomMessageSeriali
 
 # utility functions 
 from accounts import utils as accounts_utilities
+from private_chat_room_messages.utils import adjust_unread_messages_count
 
 # checks
 from accounts.checks import permission_checks
@@ -122,7 +123,9 @@ def search_chat_room_messages(user, details):
         unread_count = unread_messages.count()
 
         if unread_count > 0:
-            unread_messages.update(read_receipt=True)
+            # the rows actually updated, another request may have marked some of them read in the meantime
+            marked_read = unread_messages.update(read_receipt=True)
+            adjust_unread_messages_count(requesting_user.account_id, -marked_read)
 
         return {
             'messages': serialized_messages,
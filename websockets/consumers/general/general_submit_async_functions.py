@@ -15,22 +15,21 @@ from rest_framework_simplejwt.exceptions import TokenError
 # models 
 from account_access_tokens.models import AccountAccessToken
 
+# utility functions
+from account_access_tokens.revocation import token_revocations
+from account_access_tokens.write_behind import session_writes
+
 
 @database_sync_to_async
 def submit_case_response(access_token):
          
     try:
-        # Decode the token
-        token = decode(access_token)
-        
-        # Calculate the remaining time for the token to expire
-        expiration_time = token.payload['exp'] - int(time.time())
-        
-        if expiration_time > 0:
-            cache.set(access_token, 'blacklisted', timeout=expiration_time)
+        # revoke the token for the remainder of its lifespan
+        token_revocations.revoke(access_token)
     
-        # delete token from database
+        # delete token from database, or from the sessions waiting to be written to it
         AccountAccessToken.objects.filter(access_token_string=str(access_token)).delete()
+        session_writes.discard_access_token(decode(access_token, verify=False)['user_id'], access_token)
         
         return {"message": "logged you out successful"}
     
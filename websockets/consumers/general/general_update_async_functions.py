@@ -4,6 +4,9 @@ import time
 # channels
 from channels.db import database_sync_to_async
 
+# asgiref
+from asgiref.sync import async_to_sync
+
 # django
 from django.db import transaction
 from django.core.exceptions import ValidationError
@@ -23,6 +26,30 @@ from private_chat_rooms.models import PrivateChatRoom
 
 # utility functions 
 from authentication.utils import verify_user_otp
+from private_chat_room_messages.utils import adjust_unread_messages_count
+from account_access_tokens.revocation import token_revocations
+
+# websocket manager
+from seeran_backend.middleware import connection_manager
+
+
+def revoke_access_token(account_id, access_token):
+    """
+    Revokes the access token an account update was made with, deletes it, and closes the websockets still
+    authenticated with it once the update is committed.
+
+    Args:
+        account_id (str): The account ID of the user.
+        access_token (str): The encoded access token.
+    """
+    # revoke the token for the remainder of its lifespan
+    token_revocations.revoke(access_token)
+
+    # delete token from database
+    AccountAccessToken.objects.filter(access_token_string=str(access_token)).delete()
+
+    # close the websockets still authenticated with the token
+    transaction.on_commit(lambda: async_to_sync(connection_manager.revoke_access_tokens)(str(account_id), [access_token]))
 
 
 @database_sync_to_async
@@ -66,23 +93,15 @@ def update_email_address(user, details, access_token):
         if not verify_user_otp(details.get('authorization_otp'), hashed_authorization_otp):
             return {"denied": "Could not process your request, incorrect authorization OTP, action forrbiden"}
     
-        EmailAddressBan.objects.filter(email=account.email).delete()
-        
-        account.email = details.get('new_email')
-        account.email_ban_amount = 0
-        account.save()
-        
-        # Decode the token
-        token = decode(access_token)
-        
-        # Calculate the remaining time for the token to expire
-        expiration_time = token.payload['exp'] - int(time.time())
-        
-        if expiration_time > 0:
-            cache.set(access_token, 'blacklisted', timeout=expiration_time)
-    
-        # delete token from database
-        AccountAccessToken.objects.filter(token=str(access_token)).delete()
+        with transaction.atomic():
+            EmailAddressBan.objects.filter(email=account.email).delete()
+            
+            account.email = details.get('new_email')
+            account.email_ban_amount = 0
+            account.save()
+            
+            # log the token out, here and on every websocket still authenticated with it
+            revoke_access_token(user, access_token)
     
         return {"message": "email changed successfully"}
     
@@ -107,20 +126,12 @@ def update_password(user, details, access_token):
     
         validate_password(details.get('new_password'))
         
-        account.set_password(details.get('new_password'))
-        account.save()
-        
-        # Decode the token
-        token = decode(access_token)
-        
-        # Calculate the remaining time for the token to expire
-        expiration_time = token.payload['exp'] - int(time.time())
-        
-        if expiration_time > 0:
-            cache.set(access_token, 'blacklisted', timeout=expiration_time)
-    
-        # delete token from database
-        AccountAccessToken.objects.filter(token=str(access_token)).delete()
+        with transaction.atomic():
+            account.set_password(details.get('new_password'))
+            account.save()
+            
+            # log the token out, here and on every websocket still authenticated with it
+            revoke_access_token(user, access_token)
     
         return {"message": "Your accounts password has been successfully updated, you should use your new credetials to log in into your account."}
     
@@ -175,7 +186,8 @@ def update_messages_as_read(account, details):
             # Check if there are any messages that match the criteria
             if messages_to_update.exists():
                 # Mark the messages as read
-                messages_to_update.update(read_receipt=True)
+                marked_read = messages_to_update.update(read_receipt=True)
+                adjust_unread_messages_count(requesting_user.account_id, -marked_read)
                 return {"read": True, 'user': str(requested_user.account_id), 'chat': str(requesting_user.account_id)}
             
             else:
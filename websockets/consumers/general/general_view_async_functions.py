@@ -17,6 +17,9 @@ from email_address_bans.serializers import EmailBansSerializer
 # utility functions 
 from accounts import utils as accounts_utilities
 
+# presence
+from websockets.presence import presence
+
 
 # Function to retrieve and return the security information of a user's account
 @database_sync_to_async
@@ -100,8 +103,13 @@ def view_chat_rooms(account):
 
         # Step 3: Serialize the chat rooms using a serializer to prepare the data for the API or frontend
         serialized_chat_rooms = PrivateChatRoomsSerializer(chat_rooms, many=True, context={'account': account}).data
+
+        # Step 4: Flag the participants that are online, one presence lookup for the whole chat list
+        online_accounts = presence.online(chat_room['participant']['account_id'] for chat_room in serialized_chat_rooms if chat_room['participant'])
+        for chat_room in serialized_chat_rooms:
+            chat_room['online'] = bool(chat_room['participant']) and str(chat_room['participant']['account_id']) in online_accounts
         
-        # Step 4: Return the serialized chat rooms as part of the response
+        # Step 5: Return the serialized chat rooms as part of the response
         return {'chat_rooms': serialized_chat_rooms}
 
     # Handle cases where the user account does not exist in the database
@@ -1,14 +1,9 @@
 # channels
 from channels.db import database_sync_to_async
 
-# django
-from django.db.models import Q
-
-# models
-from private_chat_room_messages.models import PrivateMessage
-
 # utility functions 
 from accounts import utils as accounts_utilities
+from private_chat_room_messages.utils import get_unread_messages_count
 
 # mappings
 from accounts.mappings import serializer_mappings
@@ -26,18 +21,15 @@ def account_details(account, role):
         if not requesting_account.children.filter(school__none_compliant=False).exists():
             return {"denied": "Could not process your request, all of the children linked to your account have their accounts deactivated. For more information about this you can read our Termination Policy for why you're seeing this."}
 
-        # Fetch unread messages for the user
-        # unread_messages_count = PrivateMessage.objects.filter(
-        #     Q(chat_room__participant_one=requesting_account) | Q(chat_room__participant_two=requesting_account),
-        #     read_receipt=False
-        # ).exclude(author=requesting_account).count()
+        # Unread messages in the user's chat rooms, from the cached counter
+        unread_messages_count = get_unread_messages_count(requesting_account)
 
         Serializer = serializer_mappings.account_details[role]
         # Serialize the user
         serialized_account = Serializer(instance=requesting_account).data
 
         # Return the serialized account details along with unread counts
-        return {'websocket_authenticated' : {'account': serialized_account, 'messages': 0}}
+        return {'websocket_authenticated' : {'account': serialized_account, 'messages': unread_messages_count}}
     
     except Exception as e:
         return {'error': str(e)}
@@ -0,0 +1,47 @@
+# routes
+from websockets.routes import route_registry
+
+# parent async functions
+from . import parent_view_async_functions
+from . import parent_search_async_functions
+
+
+PARENT_ROLES = ('PARENT',)
+
+
+# VIEW
+
+route_registry.register_many(PARENT_ROLES, 'VIEW', {
+    'view_school_announcements': parent_view_async_functions.view_school_announcements,
+
+    'children': parent_view_async_functions.children,
+}, signature=('account', 'role'), read_only=True)
+
+# fields JSON clients keep receiving base64 encoded and zlib compressed
+route_registry.pack_fields(PARENT_ROLES, 'VIEW', {'children': ('children',)})
+
+# SEARCH
+
+route_registry.register(PARENT_ROLES, 'SEARCH', 'search_group_timetables', parent_search_async_functions.search_group_timetables, signature=('account', 'role'), read_only=True)
+route_registry.register_many(PARENT_ROLES, 'SEARCH', {
+    'search_grade_terms': parent_search_async_functions.search_grade_terms,
+
+    'search_classroom': parent_search_async_functions.search_classroom,
+
+    'search_student_classrooms': parent_search_async_functions.search_student_classrooms,
+    'search_student_classroom_performance': parent_search_async_functions.search_student_classroom_performance,
+
+    'search_student_attendance': parent_search_async_functions.search_student_attendance,
+
+    'search_student_classroom_card': parent_search_async_functions.search_student_classroom_card,
+    'search_student_activity': parent_search_async_functions.search_student_activity,
+
+    'search_student_assessment_transcript': parent_search_async_functions.search_student_assessment_transcript,
+
+    'search_group_timetable_timetables': parent_search_async_functions.search_group_timetable_timetables,
+
+    'search_timetable_sessions': parent_search_async_functions.search_timetable_sessions,
+}, read_only=True)
+
+# fields JSON clients keep receiving base64 encoded and zlib compressed
+route_registry.pack_fields(PARENT_ROLES, 'SEARCH', {'search_student_attendance': ('records',)})
@@ -1,8 +1,3 @@
-# python
-import base64
-import zlib
-import json
-
 # channels
 from channels.db import database_sync_to_async
 
@@ -70,12 +65,7 @@ def children(account, role):
 
         serialized_children = StudentSourceAccountSerializer(requesting_account.children, many=True).data
 
-        # Compress the serialized data
-        compressed_children = zlib.compress(json.dumps(serialized_children).encode('utf-8'))
-        # Encode compressed data as base64 for safe transport
-        encoded_children = base64.b64encode(compressed_children).decode('utf-8')
-
-        return {"children": encoded_children}
+        return {"children": serialized_children}
     
     except Exception as e:
         return { 'error': str(e) }
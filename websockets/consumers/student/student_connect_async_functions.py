@@ -1,11 +1,10 @@
 # channels
 from channels.db import database_sync_to_async
 
-# models
-from private_chat_room_messages.models import PrivateMessage
-
 # utility functions 
 from accounts import utils as accounts_utilities
+from private_chat_room_messages.utils import get_unread_messages_count
+from school_announcements.utils import get_unread_announcements_count
 
 # mappings
 from accounts.mappings import serializer_mappings
@@ -20,11 +19,11 @@ def account_details(account, role):
         if requesting_account.school.none_compliant:
             return {"denied": "access denied"}
         
-        # Fetch announcements relevant to the user's school
-        unread_announcements_count = requesting_account.school.announcements.exclude(accounts_reached=requesting_account).count()
+        # Unread announcements of the user's school, from the cached counters
+        unread_announcements_count = get_unread_announcements_count(requesting_account, requesting_account.school)
 
-        # Fetch unread messages for the user
-        unread_messages_count = PrivateMessage.objects.filter(read_receipt=False).exclude(author=requesting_account).count()
+        # Unread messages in the user's chat rooms, from the cached counter
+        unread_messages_count = get_unread_messages_count(requesting_account)
         
         Serializer = serializer_mappings.account_details[role]
         # Serialize the user
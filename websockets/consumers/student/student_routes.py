@@ -0,0 +1,45 @@
+# routes
+from websockets.routes import route_registry
+
+# student async functions
+from . import student_view_async_functions
+from . import student_search_async_functions
+
+
+STUDENT_ROLES = ('STUDENT',)
+
+
+# VIEW
+
+route_registry.register_many(STUDENT_ROLES, 'VIEW', {
+    'view_school_announcements': student_view_async_functions.view_school_announcements,
+
+    'view_my_classrooms': student_view_async_functions.view_my_classrooms,
+}, signature=('account', 'role'), read_only=True)
+
+# SEARCH
+
+route_registry.register_many(STUDENT_ROLES, 'SEARCH', {
+    'search_student_attendance': student_search_async_functions.search_student_attendance,
+
+    'search_group_timetables': student_search_async_functions.search_group_timetables,
+}, signature=('account', 'role'), read_only=True)
+route_registry.register_many(STUDENT_ROLES, 'SEARCH', {
+    'search_grade_terms': student_search_async_functions.search_grade_terms,
+
+    'search_classroom': student_search_async_functions.search_classroom,
+
+    'search_student_classroom_performance': student_search_async_functions.search_student_classroom_performance,
+
+    'search_student_classroom_card': student_search_async_functions.search_student_classroom_card,
+    'search_student_activity': student_search_async_functions.search_student_activity,
+
+    'search_student_assessment_transcript': student_search_async_functions.search_student_assessment_transcript,
+
+    'search_group_timetable_timetables': student_search_async_functions.search_group_timetable_timetables,
+
+    'search_timetable_sessions': student_search_async_functions.search_timetable_sessions,
+}, read_only=True)
+
+# fields JSON clients keep receiving base64 encoded and zlib compressed
+route_registry.pack_fields(STUDENT_ROLES, 'SEARCH', {'search_student_attendance': ('records',)})
@@ -1,8 +1,3 @@
-# python
-import base64
-import zlib
-import json
-
 # channels
 from channels.db import database_sync_to_async
 
@@ -68,12 +63,7 @@ def search_parents(account, role, details):
         # Serialize the parents to return them in the response
         serialized_parents = ParentAccountSerializer(parents, many=True).data
 
-        # Compress the serialized data
-        compressed_parents = zlib.compress(json.dumps(serialized_parents).encode('utf-8'))
-        # Encode compressed data as base64 for safe transport
-        encoded_parents = base64.b64encode(compressed_parents).decode('utf-8')
-
-        return {"parents": encoded_parents}
+        return {"parents": serialized_parents}
                        
     except Student.DoesNotExist:
         # Handle the case where the provided account ID does not exist
@@ -117,13 +107,8 @@ def search_account(account, role, details):
             # Serialize the requested user's details and return the serialized data.
             serialized_account = Serializer(instance=requested_account).data
 
-        # Compress the serialized data
-        compressed_account = zlib.compress(json.dumps(serialized_account).encode('utf-8'))
-        # Encode compressed data as base64 for safe transport
-        encoded_account = base64.b64encode(compressed_account).decode('utf-8')
-
         # Return the serialized user data if everything is successful.
-        return {"account": encoded_account}
+        return {"account": serialized_account}
     
     except Exception as e:
         # Handle any other unexpected errors and return the error message.
@@ -263,13 +248,7 @@ def search_student_attendance(account, role):
         # For each absent instance, get the corresponding Late instance
         attendance_records = StudentAttendanceSerializer(sorted_attendances, many=True, context={'student': requesting_account.id}).data
 
-        # Compress the serialized data
-        compressed_attendance_records = zlib.compress(json.dumps({'records': attendance_records, 'days_absent': days_absent}).encode('utf-8'))
-
-        # Encode compressed data as base64 for safe transport
-        encoded_attendance_records = base64.b64encode(compressed_attendance_records).decode('utf-8')
-
-        return {'records': encoded_attendance_records}
+        return {'records': {'records': attendance_records, 'days_absent': days_absent}}
     
     except Classroom.DoesNotExist:
         return {'error': 'Could not process your request, a classroom in your school with the provided credentials does not exist. Please check the classrooms details and try again.'}
@@ -1,12 +1,16 @@
 # channels
 from channels.db import database_sync_to_async
 
+# models
+from school_announcements.models import Announcement
+
 # serilializers
 from school_announcements.serializers import AnnouncementsSerializer
 from classrooms.serializers import ClassroomsSerializer
 
 # utility functions 
 from accounts import utils as accounts_utilities
+from accounts.context import account_contexts
 
 
 # Asynchronous database call to retrieve and return announcements for a user's school
@@ -23,12 +27,11 @@ def view_school_announcements(account, role):
         dict: A dictionary containing serialized school announcements, or an error message in case of failure.
     """
     try:
-        # Step 1: Retrieve the requesting user's account and the associated school in a single database query
-        requesting_account = accounts_utilities.get_account_and_linked_school(account, role)
+        # Step 1: Only the school is needed, read it from the cached account context instead of the database
+        context = account_contexts.get(account, role)
 
         # Step 2: Fetch announcements related to the school of the requesting user.
-        # Assume that 'announcements' is a related manager, e.g., through a ForeignKey or ManyToManyField on the School model.
-        announcements = requesting_account.school.announcements
+        announcements = Announcement.objects.filter(school_id=context.school_pk)
 
         # Step 3: Serialize the fetched announcements into a structured format using a serializer.
         serialized_announcements = AnnouncementsSerializer(announcements, many=True, context={'account': account}).data
@@ -1,8 +1,3 @@
-# python
-import base64
-import zlib
-import json
-
 # channels
 from channels.db import database_sync_to_async
 
@@ -63,13 +58,7 @@ def form_data_for_classroom_attendance_register(account, role, details):
 
         serialized_students = StudentSourceAccountSerializer(students, many=True).data
 
-        # Compress the serialized data
-        compressed_students = zlib.compress(json.dumps(serialized_students).encode('utf-8'))
-
-        # Encode compressed data as base64 for safe transport
-        encoded_students = base64.b64encode(compressed_students).decode('utf-8')
-
-        return {"students": encoded_students, "attendance_register_taken" : attendance_register_taken}
+        return {"students": serialized_students, "attendance_register_taken" : attendance_register_taken}
             
     except Classroom.DoesNotExist:
         return {'error': 'Could not proccess your request, a classroom in your school with the provided credentials does not exist. Please review the classroom details and try again.'}
@@ -257,13 +246,7 @@ def form_data_for_collecting_assessment_submissions(account, role, details):
         # Serialize the student data
         serialized_students = StudentSourceAccountSerializer(students, many=True).data
 
-        # Compress the serialized data
-        compressed_students = zlib.compress(json.dumps(serialized_students).encode('utf-8'))
-
-        # Encode compressed data as base64 for safe transport
-        encoded_students = base64.b64encode(compressed_students).decode('utf-8')
-
-        return {'students': encoded_students}
+        return {'students': serialized_students}
     
     except Assessment.DoesNotExist:
         # Handle the case where the provided grade ID does not exist
@@ -312,13 +295,7 @@ def form_data_for_assessment_submissions(account, role, details):
         # Serialize the student data
         serialized_students = StudentSourceAccountSerializer(students, many=True).data
 
-        # Compress the serialized data
-        compressed_students = zlib.compress(json.dumps(serialized_students).encode('utf-8'))
-
-        # Encode compressed data as base64 for safe transport
-        encoded_students = base64.b64encode(compressed_students).decode('utf-8')
-
-        return {'students': encoded_students}
+        return {'students': serialized_students}
     
     except Assessment.DoesNotExist:
         # Handle the case where the provided grade ID does not exist
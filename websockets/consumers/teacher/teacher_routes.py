@@ -0,0 +1,116 @@
+# routes
+from websockets.routes import route_registry, HEAVY_ROUTE_CONCURRENCY
+
+# teacher async functions
+from . import teacher_view_async_functions
+from . import teacher_search_async_functions
+from . import teacher_form_data_async_functions
+from . import teacher_update_async_functions
+from . import teacher_submit_async_functions
+from . import teacher_delete_async_functions
+from . import teacher_create_async_functions
+
+
+TEACHER_ROLES = ('TEACHER',)
+
+
+# VIEW
+
+route_registry.register_many(TEACHER_ROLES, 'VIEW', {
+    'view_my_classrooms': teacher_view_async_functions.view_my_classrooms,
+
+    'view_school_announcements': teacher_view_async_functions.view_school_announcements,
+}, signature=('account', 'role'), read_only=True)
+
+# SEARCH
+
+route_registry.register(TEACHER_ROLES, 'SEARCH', 'search_teacher_timetables', teacher_search_async_functions.search_teacher_timetables, signature=('account', 'role'), read_only=True)
+route_registry.register(TEACHER_ROLES, 'SEARCH', 'search_month_attendance_records', teacher_search_async_functions.search_month_attendance_records, read_only=True, max_concurrency=HEAVY_ROUTE_CONCURRENCY)
+route_registry.register_many(TEACHER_ROLES, 'SEARCH', {
+    'search_parents': teacher_search_async_functions.search_parents,
+
+    'search_account': teacher_search_async_functions.search_account,
+
+    'search_school_announcement': teacher_search_async_functions.search_school_announcement,
+
+    'search_grade_terms': teacher_search_async_functions.search_grade_terms,
+    'search_classroom_subject_performance': teacher_search_async_functions.search_classroom_subject_performance,
+
+    'search_classroom': teacher_search_async_functions.search_classroom,
+
+    'search_student_classroom_performance': teacher_search_async_functions.search_student_classroom_performance,
+
+    'search_student_attendance': teacher_search_async_functions.search_student_attendance,
+
+    'search_assessments': teacher_search_async_functions.search_assessments,
+    'search_assessment': teacher_search_async_functions.search_assessment,
+
+    'search_transcripts': teacher_search_async_functions.search_transcripts,
+    'search_student_assessment_transcript': teacher_search_async_functions.search_student_assessment_transcript,
+    'search_transcript': teacher_search_async_functions.search_transcript,
+
+    'search_student_classroom_card': teacher_search_async_functions.search_student_classroom_card,
+    'search_student_activity': teacher_search_async_functions.search_student_activity,
+
+    'search_timetable_sessions': teacher_search_async_functions.search_timetable_sessions,
+}, read_only=True)
+
+# fields JSON clients keep receiving base64 encoded and zlib compressed
+route_registry.pack_fields(TEACHER_ROLES, 'SEARCH', {
+    'search_month_attendance_records': ('records',),
+    'search_parents': ('parents',),
+    'search_account': ('account',),
+    'search_classroom': ('classroom',),
+    'search_student_attendance': ('records',),
+})
+
+# FORM DATA
+
+route_registry.register_many(TEACHER_ROLES, 'FORM DATA', {
+    'form_data_for_classroom_attendance_register': teacher_form_data_async_functions.form_data_for_classroom_attendance_register,
+
+    'form_data_for_setting_assessment': teacher_form_data_async_functions.form_data_for_setting_assessment,
+    'form_data_for_updating_assessment': teacher_form_data_async_functions.form_data_for_updating_assessment,
+
+    'form_data_for_collecting_assessment_submissions': teacher_form_data_async_functions.form_data_for_collecting_assessment_submissions,
+    'form_data_for_assessment_submissions': teacher_form_data_async_functions.form_data_for_assessment_submissions,
+    'form_data_for_assessment_submission_details': teacher_form_data_async_functions.form_data_for_assessment_submission_details,
+}, read_only=True)
+
+# fields JSON clients keep receiving base64 encoded and zlib compressed
+route_registry.pack_fields(TEACHER_ROLES, 'FORM DATA', {
+    'form_data_for_classroom_attendance_register': ('students',),
+    'form_data_for_collecting_assessment_submissions': ('students',),
+    'form_data_for_assessment_submissions': ('students',),
+})
+
+# UPDATE
+
+route_registry.register_many(TEACHER_ROLES, 'UPDATE', {
+    'update_assessment': teacher_update_async_functions.update_assessment,
+    'update_assessment_as_collected': teacher_update_async_functions.update_assessment_as_collected,
+    'update_assessment_as_graded': teacher_update_async_functions.update_assessment_as_graded,
+
+    'update_student_grade': teacher_update_async_functions.update_student_assessment_transcript,
+})
+
+# SUBMIT
+
+route_registry.register_many(TEACHER_ROLES, 'SUBMIT', {
+    'submit_attendance_register': teacher_submit_async_functions.submit_attendance_register,
+
+    'submit_assessment_submissions': teacher_submit_async_functions.submit_assessment_submissions,
+    'submit_student_transcript_score': teacher_submit_async_functions.submit_student_transcript_score,
+})
+
+# DELETE
+
+route_registry.register(TEACHER_ROLES, 'DELETE', 'delete_assessment', teacher_delete_async_functions.delete_assessment)
+
+# CREATE
+
+route_registry.register_many(TEACHER_ROLES, 'CREATE', {
+    'create_assessment': teacher_create_async_functions.create_assessment,
+
+    'create_student_activity': teacher_create_async_functions.create_student_activity,
+})
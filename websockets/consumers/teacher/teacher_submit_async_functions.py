@@ -30,7 +30,6 @@ def submit_attendance_register(account, role, details):
     try:
         classroom = None  # Initialize classroom as None to prevent issues in error handling
 
-        requesting_user = BaseAccount.objects.get(account_id=account)
         # Retrieve the requesting users account and related school in a single query using select_related
         requesting_account = accounts_utilities.get_account_and_linked_school(account, role)
 
@@ -51,7 +50,7 @@ def submit_attendance_register(account, role, details):
         
         with transaction.atomic():
             # Check if an Absent instance exists for today and the given class
-            attendance_register, created = classroom.attendances.get_or_create(timestamp__date=today, defaults={'attendance_taker': requesting_user, 'classroom': classroom, 'school': requesting_account.school})
+            attendance_register, created = classroom.attendances.get_or_create(timestamp__date=today, defaults={'attendance_taker_id': requesting_account.pk, 'classroom': classroom, 'school': requesting_account.school})
             students = details.get('students', '').split(', ')
 
             if created:
@@ -0,0 +1,117 @@
+# python
+import time
+import uuid
+import random
+from datetime import datetime, timedelta
+
+# django
+from django.core.management.base import BaseCommand
+
+# utility functions
+from websockets.utils import encode_frame, decode_response, ResponseEncoder
+
+
+def account_row(index):
+    return {
+        'name': f'name{index}',
+        'surname': f'surname{index}',
+        'identifier': f'{random.randint(10**12, 10**13 - 1)}',
+        'email_address': f'account{index}@school.example.com',
+        'image': f'https://storage.googleapis.com/seeran-media/profile-pictures/{uuid.uuid4()}.jpg',
+        'account_id': str(uuid.uuid4()),
+    }
+
+
+def timestamp(index):
+    return (datetime(2024, 1, 15, 7, 45) + timedelta(days=index, minutes=index % 60)).isoformat()
+
+
+def audit_entry_row(index):
+    return {
+        'actor': f'surname{index % 40} name{index % 40}',
+        'outcome': random.choice(['GRANTED', 'DENIED', 'ERROR']),
+        'target_model': random.choice(['ACCOUNT', 'CLASSROOM', 'ASSESSMENT', 'ATTENDANCE']),
+        'timestamp': timestamp(index),
+        'audit_entry_id': str(uuid.uuid4()),
+    }
+
+
+def month_attendance_row(index):
+    return {
+        'timestamp': timestamp(index),
+        'absent_students': [account_row(index * 10 + student) for student in range(4)],
+        'late_students': [account_row(index * 10 + student) for student in range(2)],
+    }
+
+
+def student_attendance_row(index):
+    return {'timestamp': timestamp(index), 'absent': index % 3 != 0}
+
+
+# the ten largest search and form data responses, mapped to the response key and the row builder of their payload
+LARGEST_RESPONSES = {
+    'search_accounts': ('accounts', account_row),
+    'search_students': ('students', account_row),
+    'search_parents': ('parents', account_row),
+    'search_audit_entries': ('entries', audit_entry_row),
+    'search_permission_group_subscribers': ('subscribers', account_row),
+    'search_group_timetable_subscribers': ('students', account_row),
+    'search_month_attendance_records': ('records', month_attendance_row),
+    'search_student_attendance': ('records', student_attendance_row),
+    'form_data_for_subscribing_accounts_to_permission_group': ('accounts', account_row),
+    'form_data_for_adding_students_to_classroom': ('students', account_row),
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare websocket framings (bytes on the wire and CPU time) for the ten largest search responses, with and without the response encoder'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500, help='Number of rows in each response payload')
+        parser.add_argument('--iterations', type=int, default=200, help='Number of encode/decode rounds per response')
+
+    def measure(self, function, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        return (time.perf_counter() - start) / iterations * 1_000_000
+
+    def handle(self, *args, **options):
+        random.seed(0)
+        rows, iterations = options['rows'], options['iterations']
+        response_encoder = ResponseEncoder()
+
+        self.stdout.write(f'{rows} rows per response, {iterations} iterations, times in microseconds per frame\n')
+        self.stdout.write(f"{'description':<56}{'framing':<9}{'plain bytes':>13}{'encoded bytes':>15}{'plain enc':>11}{'encoded enc':>13}{'decode':>10}")
+
+        totals = {framing: [0, 0, 0.0, 0.0, 0.0] for framing in ('json', 'msgpack')}
+        for description, (key, row) in LARGEST_RESPONSES.items():
+            response = {key: [row(index) for index in range(rows)]}
+
+            for framing, binary in (('json', False), ('msgpack', True)):
+                plain_frame = encode_frame(response, binary)
+                encoded_frame = response_encoder.encode(response, binary, description, (key,))
+
+                plain = plain_frame['bytes_data'] if binary else plain_frame['text_data'].encode('utf-8')
+                encoded = encoded_frame['bytes_data'] if binary else encoded_frame['text_data']
+
+                # what a client does to get back to the rows
+                assert decode_response(encoded, binary, (key,)) == response
+
+                results = [
+                    len(plain),
+                    len(encoded if binary else encoded.encode('utf-8')),
+                    self.measure(lambda: encode_frame(response, binary), iterations),
+                    self.measure(lambda: response_encoder.encode(response, binary, description, (key,)), iterations),
+                    self.measure(lambda: decode_response(encoded, binary, (key,)), iterations),
+                ]
+                totals[framing] = [total + result for total, result in zip(totals[framing], results)]
+
+                self.stdout.write(f'{description:<56}{framing:<9}{results[0]:>13}{results[1]:>15}{results[2]:>11.1f}{results[3]:>13.1f}{results[4]:>10.1f}')
+
+        for framing, total in totals.items():
+            self.stdout.write(f"{'total':<56}{framing:<9}{total[0]:>13}{total[1]:>15}{total[2]:>11.1f}{total[3]:>13.1f}{total[4]:>10.1f}")
+
+        self.stdout.write('')
+        for framing, total in totals.items():
+            self.stdout.write(f'encoded {framing} frames are {100 - total[1] / total[0] * 100:.1f}% smaller on the wire')
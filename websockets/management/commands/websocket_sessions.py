@@ -0,0 +1,18 @@
+# django
+from django.core.management.base import BaseCommand
+
+# presence
+from websockets.presence import presence
+
+
+class Command(BaseCommand):
+    help = 'Show the concurrent websocket sessions held by every live ASGI worker'
+
+    def handle(self, *args, **options):
+        nodes = sorted(presence.get_node_sessions(), key=lambda node: node['node'])
+
+        self.stdout.write(f"{'node':<48}{'accounts':>10}{'sessions':>10}")
+        for node in nodes:
+            self.stdout.write(f"{node['node']:<48}{node['accounts']:>10}{node['sessions']:>10}")
+
+        self.stdout.write(f"{'total':<48}{sum(node['accounts'] for node in nodes):>10}{sum(node['sessions'] for node in nodes):>10}")
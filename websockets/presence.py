@@ -0,0 +1,196 @@
+# python
+import os
+import time
+import socket
+
+# asgiref
+from asgiref.sync import sync_to_async
+
+# django
+from django.conf import settings
+from django.core.cache import cache
+
+# redis
+from django_redis import get_redis_connection
+
+
+class Presence:
+    """
+    Tracks which accounts are online across every ASGI worker.
+
+    An account is online while its presence key exists. The key is written when one of the account's sockets
+    connects, refreshed by the heartbeat of every worker holding one of its sockets and removed when its last
+    socket disconnects. Keys expire `WEBSOCKET_PRESENCE_TTL` seconds after the last heartbeat, so the accounts
+    of a worker that crashed go offline on their own.
+
+    Every worker also publishes its session counts under its own node key, for capacity planning. Live nodes are
+    kept in a registry (a Redis sorted set, or a cached dict with other cache backends) scored by their last
+    heartbeat, and nodes that missed their heartbeats for the presence TTL are pruned when the registry is read.
+
+    Attributes:
+        node (str): The name this worker reports its sessions under.
+    """
+
+    account_prefix = 'presence_account_'
+    node_prefix = 'presence_node_'
+
+    # node name -> time of its last heartbeat
+    nodes_key = 'presence_nodes'
+
+    def __init__(self):
+        self.node = f'{socket.gethostname()}:{os.getpid()}'
+
+    @property
+    def connection(self):
+        try:
+            return get_redis_connection('default')
+        except NotImplementedError:
+            return None
+
+    def account_key(self, account_id):
+        return self.account_prefix + str(account_id)
+
+    def node_key(self, node):
+        return self.node_prefix + node
+
+    async def connect(self, account_id):
+        """
+        Marks an account online.
+
+        Args:
+            account_id (str): The account ID of the user.
+        """
+        await cache.aset(self.account_key(account_id), 1, timeout=settings.WEBSOCKET_PRESENCE_TTL)
+
+    async def disconnect(self, account_id):
+        """
+        Marks an account offline, called once its last socket on any worker is gone.
+
+        Args:
+            account_id (str): The account ID of the user.
+        """
+        await cache.adelete(self.account_key(account_id))
+
+    async def heartbeat(self, account_ids, sessions):
+        """
+        Refreshes the presence of the accounts held by this worker and publishes the worker's session counts.
+
+        Args:
+            account_ids (list): The account IDs with at least one socket on this worker.
+            sessions (int): The number of sockets held by this worker.
+        """
+        if account_ids:
+            await cache.aset_many({self.account_key(account_id): 1 for account_id in account_ids}, timeout=settings.WEBSOCKET_PRESENCE_TTL)
+
+        await cache.aset(
+            self.node_key(self.node),
+            {'node': self.node, 'accounts': len(account_ids), 'sessions': sessions},
+            timeout=settings.WEBSOCKET_PRESENCE_TTL
+        )
+        await sync_to_async(self.register_node, thread_sensitive=False)(time.time())
+
+    def register_node(self, now):
+        """
+        Records the heartbeat of this worker in the node registry.
+
+        Args:
+            now (float): The time of the heartbeat.
+        """
+        connection = self.connection
+        if connection is None:
+            nodes = cache.get(self.nodes_key) or {}
+            nodes[self.node] = now
+            return cache.set(self.nodes_key, nodes, timeout=None)
+
+        connection.zadd(self.nodes_key, {self.node: now})
+
+    def live_nodes(self):
+        """
+        Returns the workers that sent a heartbeat within the presence TTL, dropping the others from the registry.
+
+        Returns:
+            list: The node names of the live workers.
+        """
+        cutoff = time.time() - settings.WEBSOCKET_PRESENCE_TTL
+
+        connection = self.connection
+        if connection is None:
+            nodes = cache.get(self.nodes_key) or {}
+            live_nodes = {node: heartbeat for node, heartbeat in nodes.items() if heartbeat > cutoff}
+
+            if len(live_nodes) < len(nodes):
+                cache.set(self.nodes_key, live_nodes, timeout=None)
+
+            return list(live_nodes)
+
+        pipeline = connection.pipeline()
+        pipeline.zremrangebyscore(self.nodes_key, '-inf', cutoff)
+        pipeline.zrange(self.nodes_key, 0, -1)
+
+        return [node.decode() for node in pipeline.execute()[1]]
+
+    async def is_online(self, account_id):
+        """
+        Checks whether an account has an open socket on any worker.
+
+        Args:
+            account_id (str): The account ID of the user.
+
+        Returns:
+            bool: True if the account is online.
+        """
+        return await cache.aget(self.account_key(account_id)) is not None
+
+    def online(self, account_ids):
+        """
+        Looks up which of the given accounts are online, in a single cache round trip.
+
+        Args:
+            account_ids (iterable): The account IDs to look up.
+
+        Returns:
+            set: The account IDs (as strings) that are online.
+        """
+        keys = {self.account_key(account_id): str(account_id) for account_id in account_ids}
+        return {keys[key] for key in cache.get_many(list(keys))}
+
+    async def aonline(self, account_ids):
+        """
+        Async variant of `online`.
+        """
+        keys = {self.account_key(account_id): str(account_id) for account_id in account_ids}
+        return {keys[key] for key in await cache.aget_many(list(keys))}
+
+    def online_in_school(self, school):
+        """
+        Counts the online accounts (principal, admins, teachers and students) of a school.
+
+        Args:
+            school (School): The school to count online accounts for.
+
+        Returns:
+            int: The number of online accounts.
+        """
+        account_ids = [
+            *school.principal.values_list('account_id', flat=True),
+            *school.admins.values_list('account_id', flat=True),
+            *school.teachers.values_list('account_id', flat=True),
+            *school.students.values_list('account_id', flat=True),
+        ]
+
+        return len(self.online(account_ids))
+
+    def get_node_sessions(self):
+        """
+        Returns the session counts of every worker that sent a heartbeat within the presence TTL.
+
+        Returns:
+            list: {'node', 'accounts', 'sessions'} dicts, one per live worker.
+        """
+        nodes = cache.get_many([self.node_key(node) for node in self.live_nodes()])
+
+        return list(nodes.values())
+
+
+# Initialize the Presence instance
+presence = Presence()
@@ -0,0 +1,243 @@
+# python
+import time
+import asyncio
+from collections import defaultdict
+
+# asgiref
+from asgiref.sync import sync_to_async
+
+# django
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+# rate limits
+from seeran_backend.rate_limits import rate_limiter
+
+
+# the arguments a route handler can ask for, in the order consumers pass them
+ROUTE_ARGUMENTS = ('account', 'role', 'details', 'access_token')
+
+# request actions mapped to how error messages refer to their descriptions
+ROUTE_ACTIONS = {
+    'VIEW': 'view',
+    'SEARCH': 'search',
+    'VERIFY': 'verify',
+    'FORM DATA': 'form data',
+    'UPDATE': 'update',
+    'MESSAGE': 'message',
+    'SUBMIT': 'submit',
+    'ASSIGN': 'assign',
+    'DELETE': 'delete',
+    'LINK': 'link',
+    'UNLINK': 'unlink',
+    'UPLOAD': 'upload',
+    'CREATE': 'create',
+}
+
+# concurrency limit of the routes scanning a whole school at once, so they cannot starve the other requests of the process
+HEAVY_ROUTE_CONCURRENCY = 2
+
+
+class Route:
+    """
+    A websocket request handler along with everything the consumers need to know to call it.
+
+    Attributes:
+        action (str): The request action, one of `ROUTE_ACTIONS`.
+        description (str): The request description.
+        handler (coroutine function): The async function handling the request.
+        roles (tuple): The roles allowed to make the request.
+        signature (tuple): The arguments the handler takes, in order, out of `ROUTE_ARGUMENTS`.
+        read_only (bool): True if the handler does not write, read only routes can be batched.
+        after (coroutine function): Optional post processing, called with (response, account, details) and returning the final response.
+        max_concurrency (int): Optional limit of requests running the handler at once in this process.
+        rate_limited (bool): True if requests are counted per account against `settings.RATE_LIMITS[description]`.
+        packed_fields (tuple): Response keys JSON clients receive base64 encoded and zlib compressed, as the route sent them before MessagePack framing.
+        stats (dict): Calls, error responses, exceptions, throttled requests and timings of the route in this process.
+    """
+
+    def __init__(self, action, description, handler, roles, signature=('account', 'role', 'details'), read_only=False, after=None, max_concurrency=None, rate_limited=False, packed_fields=()):
+        if action not in ROUTE_ACTIONS:
+            raise ImproperlyConfigured(f'websocket route {description} declares an unknown action {action}')
+
+        if rate_limited and description not in settings.RATE_LIMITS:
+            raise ImproperlyConfigured(f'websocket route {description} is rate limited but has no rule in RATE_LIMITS')
+
+        unknown_arguments = set(signature) - set(ROUTE_ARGUMENTS)
+        if unknown_arguments:
+            raise ImproperlyConfigured(f'websocket route {description} asks for unknown arguments {sorted(unknown_arguments)}')
+
+        self.action = action
+        self.description = description
+        self.handler = handler
+        self.roles = tuple(roles)
+        self.signature = tuple(signature)
+        self.read_only = read_only
+        self.after = after
+        self.max_concurrency = max_concurrency
+        self.rate_limited = rate_limited
+        self.packed_fields = tuple(packed_fields)
+
+        # positions of the handler's arguments in ROUTE_ARGUMENTS, resolved once instead of on every request
+        self.positions = tuple(ROUTE_ARGUMENTS.index(argument) for argument in self.signature)
+        self.slots = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self.stats = {'calls': 0, 'errors': 0, 'exceptions': 0, 'throttled': 0, 'microseconds': 0, 'max_microseconds': 0}
+
+    async def __call__(self, account, role, details, access_token):
+        if self.rate_limited:
+            wait = await sync_to_async(rate_limiter.hit, thread_sensitive=False)(self.description, account)
+            if wait:
+                self.stats['throttled'] += 1
+                return {'error': f'Could not process your request, you have made too many requests of this kind. Please try again in {wait} seconds.'}
+
+        arguments = (account, role, details, access_token)
+        start = time.perf_counter()
+
+        try:
+            if self.slots is None:
+                response = await self.handler(*[arguments[position] for position in self.positions])
+            else:
+                async with self.slots:
+                    response = await self.handler(*[arguments[position] for position in self.positions])
+
+            if self.after is not None:
+                response = await self.after(response, account, details)
+
+        except Exception:
+            self.stats['exceptions'] += 1
+            raise
+
+        finally:
+            elapsed = int((time.perf_counter() - start) * 1_000_000)
+            self.stats['calls'] += 1
+            self.stats['microseconds'] += elapsed
+            self.stats['max_microseconds'] = max(self.stats['max_microseconds'], elapsed)
+
+        if isinstance(response, dict) and 'error' in response:
+            self.stats['errors'] += 1
+
+        return response
+
+
+class RouteRegistry:
+    """
+    Declares which handler answers each websocket request, per role.
+
+    Routes are registered when the role route modules are imported, which also fills one dispatch table per
+    role keyed by (action, description). Consumers look requests up in their role's table, so nothing is
+    rebuilt per message, and every request passes through `Route.__call__`, the one place routes are timed,
+    counted and limited.
+    """
+
+    def __init__(self):
+        self.tables = defaultdict(dict)
+        self.routes = []
+
+    def register(self, roles, action, description, handler, **options):
+        """
+        Registers a handler for the given roles.
+
+        Args:
+            roles (iterable): The roles allowed to make the request.
+            action (str): The request action.
+            description (str): The request description.
+            handler (coroutine function): The async function handling the request.
+            **options: signature, read_only, after, max_concurrency, rate_limited and packed_fields, see `Route`.
+
+        Returns:
+            Route: The registered route.
+        """
+        route = Route(action, description, handler, roles, **options)
+
+        for role in route.roles:
+            if (action, description) in self.tables[role]:
+                raise ImproperlyConfigured(f'websocket route {action} {description} is registered twice for the {role} role')
+
+            self.tables[role][(action, description)] = route
+
+        self.routes.append(route)
+        return route
+
+    def register_many(self, roles, action, handlers, **options):
+        """
+        Registers several handlers of one action sharing the same options.
+
+        Args:
+            roles (iterable): The roles allowed to make the requests.
+            action (str): The request action.
+            handlers (dict): Handlers keyed by request description.
+            **options: signature, read_only, after, max_concurrency, rate_limited and packed_fields, see `Route`.
+        """
+        for description, handler in handlers.items():
+            self.register(roles, action, description, handler, **options)
+
+    def pack_fields(self, roles, action, fields):
+        """
+        Declares the response keys registered routes send packed to JSON clients.
+
+        Args:
+            roles (iterable): The roles whose routes pack the keys.
+            action (str): The request action.
+            fields (dict): Packed response keys keyed by request description.
+        """
+        for role in roles:
+            for description, keys in fields.items():
+                route = self.get(role, action, description)
+                if route is None:
+                    raise ImproperlyConfigured(f'websocket route {action} {description} packs fields but is not registered for the {role} role')
+
+                # the route object is shared by every role it was registered for
+                if not set(route.roles) <= set(roles):
+                    raise ImproperlyConfigured(f'websocket route {action} {description} is shared with roles that do not pack its fields')
+
+                route.packed_fields = tuple(keys)
+
+    def get(self, role, action, description):
+        """
+        Returns the route answering a request for the given role, or None.
+        """
+        return self.tables[role].get((action, description)) if role in self.tables else None
+
+    async def dispatch(self, role, action, description, details, account, access_token):
+        """
+        Answers a request with the route registered for the requesting role.
+
+        Returns:
+            dict: The route's response, or an error if the role has no such route.
+        """
+        route = self.get(role, action, description)
+        if route:
+            return await route(account, role, details, access_token)
+
+        if action in ROUTE_ACTIONS:
+            return {'error': f'Could not process your request, an invalid {ROUTE_ACTIONS[action]} description was provided. If this problem persist open a bug report ticket.'}
+
+        return {'error': 'Could not process your request, an invalid action was provided. If this problem persist open a bug report ticket.'}
+
+    def get_stats(self):
+        """
+        Returns the counters of every route that has been requested in this process, slowest on average first.
+
+        Returns:
+            list: {'action', 'description', 'roles', 'calls', 'errors', 'exceptions', 'throttled', 'average_microseconds', 'max_microseconds'} dicts.
+        """
+        stats = [
+            {
+                'action': route.action,
+                'description': route.description,
+                'roles': list(route.roles),
+                'calls': route.stats['calls'],
+                'errors': route.stats['errors'],
+                'exceptions': route.stats['exceptions'],
+                'throttled': route.stats['throttled'],
+                'average_microseconds': route.stats['microseconds'] // max(route.stats['calls'], 1),
+                'max_microseconds': route.stats['max_microseconds'],
+            }
+            for route in self.routes if route.stats['calls'] or route.stats['throttled']
+        ]
+
+        return sorted(stats, key=lambda route: route['average_microseconds'], reverse=True)
+
+
+# Initialize the RouteRegistry instance
+route_registry = RouteRegistry()
@@ -1,3 +1,868 @@
-from django.test import TestCase
+# python
+import json
+import time
+import zlib
+import uuid
+import base64
+import asyncio
+import threading
+from unittest import skipUnless
+from unittest.mock import AsyncMock, PropertyMock, patch
 
-# Create your tests here.
+# msgpack
+import msgpack
+
+# redis, fakeredis (and its Lua runtime, lupa) are test only dependencies left out of requirements.txt
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+# asgiref
+from asgiref.sync import async_to_sync
+
+# channels
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+
+# django
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.cache import cache
+
+# websocket manager
+from seeran_backend.middleware import ConnectionManager, connection_manager
+
+# utility functions
+from seeran_backend.utils import memoize_within_batch
+
+# general consumer
+from websockets.consumers.general.general_consumer import GeneralConsumer
+from websockets.consumers.general.general_update_async_functions import revoke_access_token
+
+# presence
+from websockets.presence import Presence, presence
+
+# routes
+from websockets.routes import RouteRegistry, route_registry
+
+# role consumers, their imports register the role routes
+from websockets.consumers.admin.admin_consumer import AdminConsumer
+from websockets.consumers.parent.parent_consumer import ParentConsumer
+from websockets.consumers.founder.founder_consumer import FounderConsumer
+
+# utility functions
+from websockets.utils import encode_frame, decode_frame, decode_response, ResponseEncoder
+
+
+class FakeWebsocket:
+    """Stands in for a consumer, records everything written to the socket."""
+
+    def __init__(self, channel_name, stalled=False):
+        self.channel_name = channel_name
+        self.stalled = stalled
+        self.sent = []
+        self.close_code = None
+
+    async def send(self, text_data=None, bytes_data=None, close=False):
+        if self.stalled:
+            # a client that stopped reading, the write never completes
+            await asyncio.Event().wait()
+        self.sent.append(text_data if text_data is not None else bytes_data)
+
+    async def close(self, code=None):
+        self.close_code = code
+
+
+@override_settings(
+    WEBSOCKET_DELIVERY_MODE='channel_layer',
+    CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+)
+class ConnectionManagerChannelLayerTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+        self.manager = ConnectionManager()
+        self.channel_layer = get_channel_layer()
+
+    def test_event_is_delivered_through_the_account_group(self):
+        async def scenario():
+            websocket = FakeWebsocket(await self.channel_layer.new_channel())
+            await self.manager.connect('account-a', websocket)
+
+            await self.manager.send_event('account-a', 'text_message', {'description': 'text_message', 'message': 'hi'})
+
+            # the event travels through the channel layer, as it would when raised on another worker
+            event = await self.channel_layer.receive(websocket.channel_name)
+            await self.manager.disconnect('account-a', websocket)
+
+            return event
+
+        event = async_to_sync(scenario)()
+
+        self.assertEqual(event['type'], 'text_message')
+        self.assertEqual(event['message'], {'description': 'text_message', 'message': 'hi'})
+
+    def test_is_connected_counts_connections_across_workers(self):
+        other_worker_manager = ConnectionManager()
+
+        async def scenario():
+            websocket = FakeWebsocket(await self.channel_layer.new_channel())
+            await other_worker_manager.connect('account-a', websocket)
+
+            connected = (await self.manager.is_connected('account-a'), await self.manager.is_connected('account-b'))
+
+            await other_worker_manager.disconnect('account-a', websocket)
+
+            return connected + (await self.manager.is_connected('account-a'),)
+
+        self.assertEqual(async_to_sync(scenario)(), (True, False, False))
+
+
+@override_settings(
+    WEBSOCKET_DELIVERY_MODE='channel_layer',
+    CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    WEBSOCKET_PRESENCE_TTL=60,
+)
+class PresenceTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+        self.manager = ConnectionManager()
+        self.channel_layer = get_channel_layer()
+
+    def test_account_is_online_until_its_last_socket_disconnects(self):
+        async def scenario():
+            first = FakeWebsocket(await self.channel_layer.new_channel())
+            second = FakeWebsocket(await self.channel_layer.new_channel())
+
+            await self.manager.connect('account-a', first)
+            await self.manager.connect('account-a', second)
+            online = [await presence.aonline(['account-a', 'account-b'])]
+
+            await self.manager.disconnect('account-a', first)
+            online.append(await presence.aonline(['account-a', 'account-b']))
+
+            await self.manager.disconnect('account-a', second)
+            online.append(await presence.aonline(['account-a', 'account-b']))
+
+            return online
+
+        self.assertEqual(async_to_sync(scenario)(), [{'account-a'}, {'account-a'}, set()])
+
+    def test_events_for_offline_accounts_are_skipped(self):
+        async def scenario():
+            await self.manager.send_event('account-b', 'text_message', {'description': 'text_message'})
+
+        async_to_sync(scenario)()
+
+        self.assertEqual(self.manager.get_stats()['skipped_offline'], 1)
+
+    def test_heartbeat_refreshes_presence_and_publishes_node_sessions(self):
+        async def scenario():
+            await presence.heartbeat(['account-a', 'account-b'], 3)
+
+        async_to_sync(scenario)()
+
+        self.assertEqual(presence.online(['account-a', 'account-b', 'account-c']), {'account-a', 'account-b'})
+        self.assertEqual(presence.get_node_sessions(), [{'node': presence.node, 'accounts': 2, 'sessions': 3}])
+
+    def test_nodes_that_stop_sending_heartbeats_are_pruned(self):
+        cache.set(presence.nodes_key, {'crashed:1': time.time() - 120}, timeout=None)
+        cache.set(presence.node_key('crashed:1'), {'node': 'crashed:1', 'accounts': 1, 'sessions': 1}, timeout=None)
+
+        async_to_sync(presence.heartbeat)(['account-a'], 2)
+
+        self.assertEqual(presence.get_node_sessions(), [{'node': presence.node, 'accounts': 1, 'sessions': 2}])
+        self.assertEqual(list(cache.get(presence.nodes_key)), [presence.node])
+
+
+@skipUnless(fakeredis, 'fakeredis is not installed')
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}, WEBSOCKET_PRESENCE_TTL=60)
+class PresenceRedisTest(TestCase):
+    """
+    Test cases for the Redis node registry of the presence tracker.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.redis = fakeredis.FakeStrictRedis()
+
+        connection = patch.object(Presence, 'connection', new_callable=PropertyMock, return_value=self.redis)
+        connection.start()
+        self.addCleanup(connection.stop)
+
+    def test_heartbeats_keep_nodes_live_until_they_stop(self):
+        self.redis.zadd(presence.nodes_key, {'crashed:1': time.time() - 120})
+
+        async_to_sync(presence.heartbeat)(['account-a'], 2)
+        async_to_sync(presence.heartbeat)(['account-a', 'account-b'], 3)
+
+        # every heartbeat of a worker updates the same entry
+        self.assertEqual(presence.get_node_sessions(), [{'node': presence.node, 'accounts': 2, 'sessions': 3}])
+        self.assertEqual(self.redis.zrange(presence.nodes_key, 0, -1), [presence.node.encode()])
+
+
+@override_settings(
+    WEBSOCKET_DELIVERY_MODE='local',
+    WEBSOCKET_SEND_QUEUE_HIGH_WATER_MARK=2,
+    WEBSOCKET_SEND_QUEUE_MAX_SIZE=4,
+    WEBSOCKET_SEND_QUEUE_EVICTION_SECONDS=0,
+)
+class ConnectionManagerOutboundQueueTest(TestCase):
+
+    def setUp(self):
+        self.manager = ConnectionManager()
+
+    def test_event_is_written_to_local_sockets(self):
+        websocket = FakeWebsocket('local')
+
+        async def scenario():
+            await self.manager.connect('account-a', websocket)
+            await self.manager.send_event('account-a', 'unread_messages', {'unread_messages': 3})
+
+            # let the drain task write the message
+            await asyncio.sleep(0)
+            await self.manager.disconnect('account-a', websocket)
+
+        async_to_sync(scenario)()
+
+        self.assertEqual([json.loads(message) for message in websocket.sent], [{'unread_messages': 3}])
+        self.assertEqual(self.manager.get_stats()['queued'], 1)
+
+    def test_stalled_socket_does_not_block_other_sockets(self):
+        stalled_websocket = FakeWebsocket('stalled', stalled=True)
+        websocket = FakeWebsocket('healthy')
+
+        async def scenario():
+            await self.manager.connect('account-a', stalled_websocket)
+            await self.manager.connect('account-a', websocket)
+
+            await self.manager.send_event('account-a', 'text_message', {'description': 'text_message'})
+            await asyncio.sleep(0)
+
+            await self.manager.disconnect('account-a', stalled_websocket)
+            await self.manager.disconnect('account-a', websocket)
+
+        async_to_sync(scenario)()
+
+        self.assertEqual(len(websocket.sent), 1)
+        self.assertEqual(stalled_websocket.sent, [])
+
+    def test_superseded_unread_counts_are_coalesced(self):
+        websocket = FakeWebsocket('stalled', stalled=True)
+
+        async def scenario():
+            await self.manager.connect('account-a', websocket)
+
+            for count in range(3):
+                await self.manager.deliver(websocket, {'unread_messages': count}, 'unread_messages')
+
+            pending = [message for _, _, message in self.manager.outbound_queues[websocket].messages]
+            await self.manager.disconnect('account-a', websocket)
+
+            return pending
+
+        self.assertEqual(async_to_sync(scenario)(), [{'unread_messages': 2}])
+        self.assertEqual(self.manager.get_stats()['coalesced'], 2)
+
+    def test_slow_socket_is_evicted_above_the_high_water_mark(self):
+        websocket = FakeWebsocket('stalled', stalled=True)
+
+        async def scenario():
+            await self.manager.connect('account-a', websocket)
+
+            for index in range(6):
+                await self.manager.deliver(websocket, {'description': 'text_message', 'index': index}, 'text_message')
+
+            # let the scheduled close run
+            await asyncio.sleep(0)
+            await self.manager.disconnect('account-a', websocket)
+
+        async_to_sync(scenario)()
+
+        stats = self.manager.get_stats()
+        self.assertEqual(websocket.close_code, ConnectionManager.slow_consumer_close_code)
+        self.assertEqual(stats['evicted'], 1)
+        # four queued messages discarded by the eviction, two more that arrived after it
+        self.assertEqual(stats['dropped'], 6)
+        self.assertEqual(websocket.sent, [])
+
+
+class FramingTest(TestCase):
+
+    def setUp(self):
+        self.response = {'accounts': [{'name': 'John', 'surname': 'Doe'}], 'thumbnail': b'\x89PNG'}
+
+    def test_json_frames_carry_bytes_as_base64(self):
+        frame = encode_frame(self.response)
+
+        self.assertEqual(json.loads(frame['text_data'])['thumbnail'], 'iVBORw==')
+
+    def test_msgpack_frames_carry_bytes_as_raw_bytes(self):
+        frame = encode_frame(self.response, binary=True)
+
+        self.assertEqual(msgpack.unpackb(frame['bytes_data'], raw=False), self.response)
+
+    def test_requests_are_decoded_from_either_framing(self):
+        request = {'action': 'VIEW', 'description': 'view_chat_rooms', 'details': {}}
+
+        self.assertEqual(decode_frame(text_data=json.dumps(request)), request)
+        self.assertEqual(decode_frame(bytes_data=msgpack.packb(request)), request)
+
+
+@override_settings(WEBSOCKET_COMPRESSION_THRESHOLD=1024, WEBSOCKET_COMPRESSION_LEVEL=6)
+class ResponseEncoderTest(TestCase):
+
+    def setUp(self):
+        self.response_encoder = ResponseEncoder()
+        self.large_response = {
+            'students': [
+                {'name': f'name{index}', 'surname': f'surname{index}', 'identifier': f'{index:013}', 'account_id': f'account-{index}'}
+                for index in range(100)
+            ]
+        }
+
+    def test_small_responses_are_sent_as_is(self):
+        response = {'message': 'ok'}
+
+        frame = self.response_encoder.encode(response, description='view_chat_rooms')
+
+        self.assertEqual(json.loads(frame['text_data']), response)
+        self.assertEqual(self.response_encoder.get_stats()['view_chat_rooms']['compressed'], 0)
+
+    def test_large_json_responses_are_not_compressed_as_a_whole(self):
+        frame = self.response_encoder.encode(self.large_response, description='search_students')
+
+        # clients that negotiated nothing read plain JSON
+        self.assertEqual(json.loads(frame['text_data']), self.large_response)
+        self.assertEqual(self.response_encoder.get_stats()['search_students']['compressed'], 0)
+
+    def test_json_responses_keep_their_packed_fields(self):
+        response = {**self.large_response, 'total': 100}
+
+        text_frame = self.response_encoder.encode(response, description='search_students', packed_fields=('students',))['text_data']
+        bytes_frame = self.response_encoder.encode(response, True, 'search_students', ('students',))['bytes_data']
+
+        # the field is encoded exactly as the handlers used to encode it
+        legacy = base64.b64encode(zlib.compress(json.dumps(self.large_response['students']).encode('utf-8'))).decode('utf-8')
+        self.assertEqual(json.loads(text_frame), {'students': legacy, 'total': 100})
+        self.assertEqual(decode_response(text_frame, packed_fields=('students',)), response)
+
+        # MessagePack clients get the rows as they are
+        self.assertEqual(decode_response(bytes_frame, True), response)
+
+        # errors are never packed
+        error_frame = self.response_encoder.encode({'error': 'denied'}, packed_fields=('students',))['text_data']
+        self.assertEqual(json.loads(error_frame), {'error': 'denied'})
+
+    def test_large_msgpack_responses_are_compressed_with_the_preset_dictionary(self):
+        encoded = self.response_encoder.encode(self.large_response, True, 'search_students')['bytes_data']
+
+        message = decode_frame(bytes_data=encoded)
+        self.assertEqual(message['encoding'], 'zlib')
+        self.assertEqual(decode_response(encoded, True), self.large_response)
+
+        # without the dictionary the payload can not be inflated
+        with self.assertRaises(zlib.error):
+            zlib.decompress(message['payload'])
+
+    def test_the_preset_dictionary_shrinks_a_typical_search_response(self):
+        accounts = [
+            {
+                'name': f'name{index}', 'surname': f'surname{index}', 'identifier': f'{9704125080000 + index * 7919}',
+                'email_address': f'account{index}@school.example.com',
+                'image': f'https://storage.googleapis.com/seeran-media/profile-pictures/{uuid.UUID(int=index * 104729)}.jpg',
+                'account_id': str(uuid.UUID(int=index * 7919)),
+            }
+            for index in range(10)
+        ]
+        data = msgpack.packb({'accounts': accounts}, use_bin_type=True)
+        self.assertGreaterEqual(len(data), settings.WEBSOCKET_COMPRESSION_THRESHOLD)
+
+        compressor = zlib.compressobj(settings.WEBSOCKET_COMPRESSION_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS, 9, zlib.Z_DEFAULT_STRATEGY)
+        without_dictionary = compressor.compress(data) + compressor.flush()
+
+        encoded = self.response_encoder.encode({'accounts': accounts}, True, 'search_accounts')['bytes_data']
+        with_dictionary = decode_frame(bytes_data=encoded)['payload']
+
+        self.assertLess(len(with_dictionary), len(without_dictionary) * 0.8)
+
+    def test_stats_are_kept_per_description(self):
+        self.response_encoder.encode(self.large_response, True, 'search_students')
+        self.response_encoder.encode({'message': 'ok'}, description='view_chat_rooms')
+
+        stats = self.response_encoder.get_stats()
+        self.assertEqual((stats['search_students']['responses'], stats['search_students']['compressed']), (1, 1))
+        self.assertGreater(stats['search_students']['compression_ratio'], 1)
+        self.assertEqual(stats['view_chat_rooms']['compression_ratio'], 1)
+
+
+class RequestIdConsumer(GeneralConsumer):
+    """Handles 'slow' requests with a sync handler that blocks until the test releases it."""
+
+    release = threading.Event()
+
+    async def connect(self):
+        await self.accept()
+
+    async def receive(self, text_data=None, bytes_data=None):
+        data = self.decode_request(text_data, bytes_data)
+        request_id = data.get('request_id')
+
+        if request_id is not None:
+            return await self.start_request(request_id, self.process_request(data['description'], request_id))
+
+        await self.process_request(data['description'])
+
+    async def process_request(self, description, request_id=None):
+        response = await self.handle_request(description)
+        await self.send_response(response, description, request_id)
+
+    @database_sync_to_async
+    def handle_request(self, description):
+        if description == 'slow':
+            self.release.wait(timeout=5)
+        return {'description': description}
+
+
+@override_settings(WEBSOCKET_MAX_CONCURRENT_REQUESTS=4, WEBSOCKET_MAX_PENDING_REQUESTS=2)
+class ConcurrentRequestsTest(TestCase):
+
+    def setUp(self):
+        RequestIdConsumer.release.clear()
+
+    def test_fast_request_is_answered_while_a_slow_one_is_in_flight(self):
+        async def scenario():
+            communicator = WebsocketCommunicator(RequestIdConsumer.as_asgi(), '/ws/')
+            await communicator.connect()
+
+            await communicator.send_json_to({'description': 'slow', 'request_id': 1})
+            await communicator.send_json_to({'description': 'fast', 'request_id': 2})
+
+            first = await communicator.receive_json_from(timeout=2)
+            RequestIdConsumer.release.set()
+            second = await communicator.receive_json_from(timeout=2)
+
+            await communicator.disconnect()
+            return first, second
+
+        first, second = async_to_sync(scenario)()
+
+        self.assertEqual(first, {'description': 'fast', 'request_id': 2})
+        self.assertEqual(second, {'description': 'slow', 'request_id': 1})
+
+    def test_duplicate_and_excess_requests_are_turned_away(self):
+        async def scenario():
+            communicator = WebsocketCommunicator(RequestIdConsumer.as_asgi(), '/ws/')
+            await communicator.connect()
+
+            await communicator.send_json_to({'description': 'slow', 'request_id': 'a'})
+            await communicator.send_json_to({'description': 'slow', 'request_id': 'a'})
+            await communicator.send_json_to({'description': 'slow', 'request_id': 'b'})
+            await communicator.send_json_to({'description': 'slow', 'request_id': 'c'})
+
+            rejected = [await communicator.receive_json_from(timeout=2) for _ in range(2)]
+            RequestIdConsumer.release.set()
+            answered = [await communicator.receive_json_from(timeout=2) for _ in range(2)]
+
+            await communicator.disconnect()
+            return rejected, answered
+
+        rejected, answered = async_to_sync(scenario)()
+
+        self.assertEqual([response['request_id'] for response in rejected], ['a', 'c'])
+        self.assertTrue(all('error' in response for response in rejected))
+        self.assertEqual(sorted(response['request_id'] for response in answered), ['a', 'b'])
+
+
+class AuthenticatedConsumer(GeneralConsumer):
+
+    async def connect(self):
+        await self.accept()
+        await connection_manager.connect(self.scope['account'], self, school=self.scope.get('school'))
+
+    async def disconnect(self, close_code):
+        await connection_manager.disconnect(self.scope['account'], self, school=self.scope.get('school'))
+
+    async def receive(self, text_data=None, bytes_data=None):
+        await self.send_response({'authenticated': self.authenticated()})
+
+
+def authenticated_application(access_token, access_token_expiry, school=None):
+    """Stands in for the authentication middleware, which verifies the token and stores its expiry (and the account's school) in scope."""
+    consumer = AuthenticatedConsumer.as_asgi()
+
+    async def application(scope, receive, send):
+        scope = dict(scope, account='account-a', access_token=access_token, access_token_expiry=access_token_expiry, school=school)
+        return await consumer(scope, receive, send)
+
+    return application
+
+
+@override_settings(WEBSOCKET_DELIVERY_MODE='local')
+class AccessTokenLifetimeTest(TestCase):
+
+    def test_connection_is_closed_when_the_access_token_expires(self):
+        async def scenario():
+            communicator = WebsocketCommunicator(authenticated_application('token-a', time.time() + 0.2), '/ws/')
+            await communicator.connect()
+
+            await communicator.send_json_to({})
+            before_expiry = await communicator.receive_json_from(timeout=1)
+
+            expired = await communicator.receive_json_from(timeout=1)
+            closed = await communicator.receive_output(timeout=1)
+
+            await communicator.disconnect()
+            return before_expiry, expired, closed
+
+        before_expiry, expired, closed = async_to_sync(scenario)()
+
+        self.assertEqual(before_expiry, {'authenticated': True})
+        self.assertIn('expired', expired['error'])
+        self.assertEqual(closed, {'type': 'websocket.close', 'code': GeneralConsumer.unauthenticated_close_code})
+
+    def test_only_connections_using_a_blacklisted_token_are_closed(self):
+        async def scenario():
+            revoked = WebsocketCommunicator(authenticated_application('token-a', time.time() + 60), '/ws/')
+            other = WebsocketCommunicator(authenticated_application('token-b', time.time() + 60), '/ws/')
+            await revoked.connect()
+            await other.connect()
+
+            await connection_manager.revoke_access_tokens('account-a', ['token-a'])
+
+            error = await revoked.receive_json_from(timeout=1)
+            closed = await revoked.receive_output(timeout=1)
+
+            await other.send_json_to({})
+            still_authenticated = await other.receive_json_from(timeout=1)
+
+            await revoked.disconnect()
+            await other.disconnect()
+            return error, closed, still_authenticated
+
+        error, closed, still_authenticated = async_to_sync(scenario)()
+
+        self.assertIn('blacklisted', error['error'])
+        self.assertEqual(closed['code'], GeneralConsumer.unauthenticated_close_code)
+        self.assertEqual(still_authenticated, {'authenticated': True})
+
+    def test_websocket_account_updates_close_the_connections_of_their_token(self):
+        with patch.object(connection_manager, 'revoke_access_tokens', new_callable=AsyncMock) as revoke_access_tokens, patch('websockets.consumers.general.general_update_async_functions.token_revocations'):
+            with self.captureOnCommitCallbacks(execute=True):
+                revoke_access_token('account-a', 'token-a')
+                # nothing is closed before the update commits
+                revoke_access_tokens.assert_not_called()
+
+        revoke_access_tokens.assert_awaited_once_with('account-a', ['token-a'])
+
+    def test_connections_of_a_school_denied_access_are_closed(self):
+        async def scenario():
+            denied = WebsocketCommunicator(authenticated_application('token-a', time.time() + 60, school=1), '/ws/')
+            other = WebsocketCommunicator(authenticated_application('token-b', time.time() + 60, school=2), '/ws/')
+            await denied.connect()
+            await other.connect()
+
+            await connection_manager.deny_school_access(1)
+
+            response = await denied.receive_json_from(timeout=1)
+            closed = await denied.receive_output(timeout=1)
+
+            await other.send_json_to({})
+            still_authenticated = await other.receive_json_from(timeout=1)
+
+            await denied.disconnect()
+            await other.disconnect()
+            return response, closed, still_authenticated
+
+        response, closed, still_authenticated = async_to_sync(scenario)()
+
+        self.assertIn('denied', response)
+        self.assertEqual(closed['code'], GeneralConsumer.unauthenticated_close_code)
+        self.assertEqual(still_authenticated, {'authenticated': True})
+        self.assertEqual(connection_manager.school_connections, {})
+
+
+lookups = []
+
+@memoize_within_batch
+def lookup_requesting_account(account, role):
+    lookups.append((account, role))
+    return {'account': account}
+
+
+def sub_request(description):
+    @database_sync_to_async
+    def handler(account, role, details):
+        lookup_requesting_account(account, role)
+        return {'description': description, 'thread': threading.get_ident()}
+
+    return handler
+
+
+batch_routes = RouteRegistry()
+batch_routes.register(['ADMIN'], 'SEARCH', 'search_grades', sub_request('search_grades'), read_only=True)
+batch_routes.register(['ADMIN'], 'VIEW', 'view_chat_rooms', sub_request('view_chat_rooms'), read_only=True)
+batch_routes.register(['ADMIN'], 'DELETE', 'delete_grade', sub_request('delete_grade'))
+
+
+class BatchConsumer(GeneralConsumer):
+    routes = batch_routes
+
+
+class BatchRequestTest(TestCase):
+
+    def setUp(self):
+        lookups.clear()
+        self.consumer = BatchConsumer()
+
+    def handle_batch(self, details):
+        return async_to_sync(self.consumer.handle_batch)('load_dashboard', details, 'account-a', 'ADMIN', 'token-a')
+
+    def test_sub_requests_share_the_account_lookup_and_thread(self):
+        response = self.handle_batch({'requests': [
+            {'id': 'grades', 'action': 'SEARCH', 'description': 'search_grades', 'details': {}},
+            {'id': 'chats', 'action': 'VIEW', 'description': 'view_chat_rooms'},
+            {'action': 'DELETE', 'description': 'delete_grade'},
+        ]})['batch']
+
+        self.assertEqual(response['grades']['description'], 'search_grades')
+        self.assertEqual(response['chats']['description'], 'view_chat_rooms')
+        self.assertEqual(response['grades']['thread'], response['chats']['thread'])
+        # write actions are never batched
+        self.assertIn('error', response['2'])
+        self.assertEqual(lookups, [('account-a', 'ADMIN')])
+
+        # the memo only lives for the batch
+        lookup_requesting_account('account-a', 'ADMIN')
+        self.assertEqual(len(lookups), 2)
+
+    @override_settings(WEBSOCKET_MAX_BATCH_SIZE=2)
+    def test_invalid_batches_are_rejected(self):
+        self.assertIn('error', self.handle_batch({'requests': []}))
+        self.assertIn('error', self.handle_batch({'requests': [{'action': 'VIEW', 'description': 'view_chat_rooms'}] * 3}))
+
+
+async def echo(*arguments):
+    return {'arguments': list(arguments)}
+
+
+async def fail(details):
+    raise ValueError(details)
+
+
+async def wrap(response, account, details):
+    return {'wrapped': response}
+
+
+class RouteRegistryTest(TestCase):
+
+    def setUp(self):
+        self.routes = RouteRegistry()
+
+    def dispatch(self, role, action, description, details=None):
+        return async_to_sync(self.routes.dispatch)(role, action, description, details, 'account-a', 'token-a')
+
+    def test_handlers_receive_their_declared_arguments(self):
+        self.routes.register(['ADMIN'], 'SEARCH', 'search_grades', echo)
+        self.routes.register(['ADMIN'], 'UPDATE', 'update_password', echo, signature=('account', 'details', 'access_token'), after=wrap)
+
+        self.assertEqual(self.dispatch('ADMIN', 'SEARCH', 'search_grades', {'grade': 1}), {'arguments': ['account-a', 'ADMIN', {'grade': 1}]})
+        self.assertEqual(self.dispatch('ADMIN', 'UPDATE', 'update_password', {}), {'wrapped': {'arguments': ['account-a', {}, 'token-a']}})
+
+    def test_routes_are_only_dispatched_to_their_roles(self):
+        self.routes.register(['ADMIN', 'PRINCIPAL'], 'VIEW', 'view_school_details', echo, signature=())
+
+        self.assertEqual(self.dispatch('PRINCIPAL', 'VIEW', 'view_school_details'), {'arguments': []})
+        self.assertIn('invalid view description', self.dispatch('TEACHER', 'VIEW', 'view_school_details')['error'])
+        self.assertIn('invalid action', self.dispatch('ADMIN', 'INSPECT', 'view_school_details')['error'])
+
+    def test_invalid_declarations_are_rejected(self):
+        self.routes.register(['ADMIN'], 'VIEW', 'view_school_details', echo)
+
+        with self.assertRaises(ImproperlyConfigured):
+            self.routes.register(['ADMIN'], 'VIEW', 'view_school_details', echo)
+        with self.assertRaises(ImproperlyConfigured):
+            self.routes.register(['ADMIN'], 'VIEW', 'view_chat_rooms', echo, signature=('school',))
+        with self.assertRaises(ImproperlyConfigured):
+            self.routes.register(['ADMIN'], 'FETCH', 'view_chat_rooms', echo)
+
+    def test_routes_count_calls_errors_and_exceptions(self):
+        self.routes.register(['ADMIN'], 'SEARCH', 'search_grades', echo)
+        self.routes.register(['ADMIN'], 'DELETE', 'delete_grade', fail, signature=('details',))
+        self.routes.register(['ADMIN'], 'VIEW', 'view_school_details', echo)
+
+        self.dispatch('ADMIN', 'SEARCH', 'search_grades')
+        self.dispatch('ADMIN', 'SEARCH', 'search_grades')
+        with self.assertRaises(ValueError):
+            self.dispatch('ADMIN', 'DELETE', 'delete_grade')
+
+        stats = {route['description']: route for route in self.routes.get_stats()}
+
+        # routes that were never called are left out
+        self.assertEqual(set(stats), {'search_grades', 'delete_grade'})
+        self.assertEqual((stats['search_grades']['calls'], stats['search_grades']['errors']), (2, 0))
+        self.assertEqual((stats['delete_grade']['calls'], stats['delete_grade']['exceptions']), (1, 1))
+
+    @override_settings(
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+        RATE_LIMITS={'message_private': {'rate_limit': 2, 'time_window': 60}},
+    )
+    def test_rate_limited_routes_throttle_each_account(self):
+        cache.clear()
+        self.routes.register(['ADMIN'], 'MESSAGE', 'message_private', echo, rate_limited=True)
+
+        responses = [async_to_sync(self.routes.dispatch)('ADMIN', 'MESSAGE', 'message_private', {}, 'account-a', 'token-a') for _ in range(3)]
+        other_account = async_to_sync(self.routes.dispatch)('ADMIN', 'MESSAGE', 'message_private', {}, 'account-b', 'token-b')
+
+        self.assertNotIn('error', responses[1])
+        self.assertIn('too many requests', responses[2]['error'])
+        self.assertNotIn('error', other_account)
+
+        stats = {route['description']: route for route in self.routes.get_stats()}
+        self.assertEqual((stats['message_private']['calls'], stats['message_private']['throttled']), (3, 1))
+
+        with self.assertRaises(ImproperlyConfigured):
+            self.routes.register(['ADMIN'], 'MESSAGE', 'message_parent', echo, rate_limited=True)
+
+    def test_routes_limit_their_concurrency(self):
+        running, peaks = [], []
+
+        async def search(account, role, details):
+            running.append(1)
+            peaks.append(len(running))
+            await asyncio.sleep(0.02)
+            running.pop()
+            return {}
+
+        route = self.routes.register(['ADMIN'], 'SEARCH', 'search_audit_entries', search, max_concurrency=2)
+
+        async def scenario():
+            await asyncio.gather(*[route('account-a', 'ADMIN', {}, 'token-a') for _ in range(5)])
+
+        async_to_sync(scenario)()
+
+        self.assertEqual(len(peaks), 5)
+        self.assertEqual(max(peaks), 2)
+
+    def test_role_consumers_share_the_school_routes(self):
+        self.assertIs(AdminConsumer.routes, route_registry)
+        self.assertIs(ParentConsumer.routes, route_registry)
+
+        shared = route_registry.get('PRINCIPAL', 'VIEW', 'view_chat_rooms')
+        self.assertIs(route_registry.get('PARENT', 'VIEW', 'view_chat_rooms'), shared)
+        self.assertTrue(shared.read_only)
+
+        # the admin and parent classroom searches are different handlers
+        self.assertIsNot(route_registry.get('ADMIN', 'SEARCH', 'search_classroom'), route_registry.get('PARENT', 'SEARCH', 'search_classroom'))
+        self.assertIsNone(route_registry.get('PARENT', 'DELETE', 'delete_grade'))
+        self.assertFalse(route_registry.get('ADMIN', 'SEARCH', 'search_chat_room_messages').read_only)
+
+
+async def search_students(account, role, details):
+    return {'students': [{'name': f'name{index}', 'surname': f'surname{index}', 'identifier': f'{index:013}'} for index in range(200)]}
+
+
+search_routes = RouteRegistry()
+search_routes.register(['ADMIN'], 'SEARCH', 'search_students', search_students, read_only=True)
+search_routes.pack_fields(['ADMIN'], 'SEARCH', {'search_students': ('students',)})
+
+
+class SearchConsumer(GeneralConsumer):
+    routes = search_routes
+
+    async def connect(self):
+        await self.accept()
+
+
+class PackedFieldsTest(TestCase):
+
+    def communicator(self, subprotocols=None):
+        consumer = SearchConsumer.as_asgi()
+
+        async def application(scope, receive, send):
+            scope = dict(scope, account='account-a', role='ADMIN', access_token='token-a', access_token_expiry=time.time() + 60)
+            return await consumer(scope, receive, send)
+
+        return WebsocketCommunicator(application, '/ws/', subprotocols=subprotocols)
+
+    def test_legacy_json_clients_read_large_searches_as_before(self):
+        async def scenario():
+            communicator = self.communicator()
+            await communicator.connect()
+
+            await communicator.send_json_to({'action': 'SEARCH', 'description': 'search_students', 'details': {}})
+            response = await communicator.receive_json_from(timeout=1)
+
+            await communicator.disconnect()
+            return response
+
+        response = async_to_sync(scenario)()
+
+        # what the client did before MessagePack framing
+        students = json.loads(zlib.decompress(base64.b64decode(response['students'])).decode('utf-8'))
+        self.assertEqual(students, async_to_sync(search_students)('account-a', 'ADMIN', {})['students'])
+
+    def test_msgpack_clients_read_large_searches_unpacked(self):
+        async def scenario():
+            communicator = self.communicator(['msgpack'])
+            await communicator.connect()
+
+            await communicator.send_to(bytes_data=msgpack.packb({'action': 'SEARCH', 'description': 'search_students', 'details': {}}))
+            frame = await communicator.receive_from(timeout=1)
+
+            await communicator.disconnect()
+            return frame
+
+        response = decode_response(async_to_sync(scenario)(), True)
+
+        self.assertEqual(response, async_to_sync(search_students)('account-a', 'ADMIN', {}))
+
+    def test_packed_fields_are_declared_for_registered_routes_only(self):
+        with self.assertRaises(ImproperlyConfigured):
+            search_routes.pack_fields(['ADMIN'], 'SEARCH', {'search_parents': ('parents',)})
+
+        # the classroom search of parents never packed its classroom
+        self.assertEqual(route_registry.get('ADMIN', 'SEARCH', 'search_classroom').packed_fields, ('classroom',))
+        self.assertEqual(route_registry.get('PARENT', 'SEARCH', 'search_classroom').packed_fields, ())
+
+
+class InspectingFounderConsumer(FounderConsumer):
+
+    async def connect(self):
+        await self.accept()
+
+
+class RoleConsumerRequestTest(TestCase):
+
+    def test_role_consumers_receive_requests_through_the_general_consumer(self):
+        consumer = InspectingFounderConsumer.as_asgi()
+
+        async def application(scope, receive, send):
+            scope = dict(scope, account='account-a', role='FOUNDER', access_token='token-a', access_token_expiry=time.time() + 60)
+            return await consumer(scope, receive, send)
+
+        async def scenario():
+            communicator = WebsocketCommunicator(application, '/ws/')
+            await communicator.connect()
+
+            await communicator.send_json_to({'action': 'INSPECT', 'description': 'socket_communication_check', 'request_id': 'check'})
+            inspected = await communicator.receive_json_from(timeout=1)
+
+            await communicator.send_json_to({'action': 'VIEW'})
+            invalid = await communicator.receive_json_from(timeout=1)
+
+            await communicator.disconnect()
+            return inspected, invalid
+
+        inspected, invalid = async_to_sync(scenario)()
+
+        self.assertEqual(inspected, {'socket_communication_successful': True, 'request_id': 'check'})
+        self.assertEqual(invalid, {'error': FounderConsumer.invalid_request_error})
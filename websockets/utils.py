@@ -0,0 +1,241 @@
+# python
+import json
+import time
+import zlib
+import base64
+from collections import defaultdict, Counter
+
+# msgpack
+import msgpack
+
+# django
+from django.conf import settings
+
+
+# websocket subprotocol clients request to switch the connection to binary MessagePack frames
+MSGPACK_SUBPROTOCOL = 'msgpack'
+
+# keys that show up in most responses, most common last since deflate reaches the end of the dictionary cheapest
+RESPONSE_DICTIONARY_KEYS = [
+    'status', 'score', 'total', 'weight', 'subject', 'term', 'grade', 'group', 'section', 'description', 'title',
+    'students', 'parents', 'accounts', 'subscribers', 'entries', 'records', 'classroom', 'teacher', 'student',
+    'absent_students', 'late_students', 'absent', 'days_absent', 'outcome', 'target_model', 'actor',
+    'audit_entry_id', 'timestamp', 'role', 'email_address', 'identifier', 'account_id', 'image', 'surname', 'name',
+]
+
+# rows shaped like the ones the largest responses carry, packed into the dictionary with their map headers, keys and value prefixes
+RESPONSE_DICTIONARY_SAMPLES = [
+    {'timestamp': '2024-01-01T00:00:00', 'absent': False},
+    {'actor': '', 'outcome': 'GRANTED', 'target_model': 'ACCOUNT', 'timestamp': '2024-01-01T00:00:00', 'audit_entry_id': '00000000-0000-0000-0000-000000000000'},
+    {
+        'name': '', 'surname': '', 'identifier': '0000000000000', 'email_address': '@',
+        'image': 'https://storage.googleapis.com/seeran-media/profile-pictures/00000000-0000-0000-0000-000000000000.jpg',
+        'account_id': '00000000-0000-0000-0000-000000000000',
+    },
+]
+
+# preset deflate dictionary shared with clients, compressed responses reference it through the dictionary id in their zlib header.
+# only MessagePack frames are compressed, so it is built out of MessagePack
+RESPONSE_DICTIONARY = (
+    msgpack.packb({'error': 'Could not process your request, ', 'message': ''})
+    + b''.join(msgpack.packb(key) for key in RESPONSE_DICTIONARY_KEYS)
+    + msgpack.packb(RESPONSE_DICTIONARY_SAMPLES, use_bin_type=True)
+)
+
+
+def json_default(value):
+    """
+    Serializes values the standard JSON encoder cannot handle.
+
+    Compressed payloads are carried as raw bytes inside responses, JSON clients receive them base64 encoded.
+    """
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(bytes(value)).decode('utf-8')
+
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def encode_frame(message, binary=False):
+    """
+    Encodes an outgoing message for the framing mode negotiated by the connection.
+
+    Args:
+        message (dict): The message to send.
+        binary (bool): True if the connection negotiated MessagePack framing.
+
+    Returns:
+        dict: The keyword arguments for the consumer's `send`, either `bytes_data` or `text_data`.
+    """
+    if binary:
+        return {'bytes_data': msgpack.packb(message, use_bin_type=True)}
+
+    return {'text_data': json.dumps(message, default=json_default)}
+
+
+def decode_frame(text_data=None, bytes_data=None):
+    """
+    Decodes an incoming frame, binary frames carry MessagePack and text frames carry JSON.
+
+    Args:
+        text_data (str): The text frame received from the client.
+        bytes_data (bytes): The binary frame received from the client.
+
+    Returns:
+        dict: The decoded request.
+    """
+    if bytes_data is not None:
+        return msgpack.unpackb(bytes_data, raw=False)
+
+    return json.loads(text_data)
+
+
+def pack_fields(message, fields):
+    """
+    Packs response fields the way handlers did before MessagePack framing, for clients still reading JSON.
+
+    Each packed field holds its JSON value zlib compressed (no preset dictionary) and base64 encoded.
+
+    Args:
+        message (dict): The response to send.
+        fields (tuple): The response keys to pack.
+
+    Returns:
+        dict: A copy of the response with the fields packed, or the response itself if there is nothing to pack.
+    """
+    if not fields or not isinstance(message, dict) or 'error' in message or not any(field in message for field in fields):
+        return message
+
+    return {
+        key: base64.b64encode(zlib.compress(json.dumps(value, default=json_default).encode('utf-8'))).decode('utf-8') if key in fields else value
+        for key, value in message.items()
+    }
+
+
+def unpack_fields(message, fields):
+    """
+    Reverses `pack_fields` the way a JSON client does.
+    """
+    if not fields or not isinstance(message, dict) or 'error' in message:
+        return message
+
+    return {
+        key: json.loads(zlib.decompress(base64.b64decode(value)).decode('utf-8')) if key in fields else value
+        for key, value in message.items()
+    }
+
+
+class ResponseEncoder:
+    """
+    The single encoding stage every websocket response and account event goes through.
+
+    Messages are framed for the connection (JSON text or MessagePack bytes). On connections that negotiated
+    the MessagePack subprotocol, frames at or above `WEBSOCKET_COMPRESSION_THRESHOLD` bytes are deflated with
+    the preset `RESPONSE_DICTIONARY` and sent as `{'encoding': 'zlib', 'payload': <compressed frame>}`, but
+    only when that is actually smaller than the plain frame. Clients that negotiated nothing keep the JSON
+    protocol they always had, the route's packed fields are sent base64 encoded and zlib compressed (see
+    `pack_fields`) and the rest of the frame as it is. Handlers return plain data and never compress on
+    their own.
+
+    Attributes:
+        stats (defaultdict): Per description counters of responses, compressed responses, plain and encoded bytes and CPU time.
+    """
+
+    def __init__(self):
+        self.stats = defaultdict(Counter)
+        self.compressors = {}
+
+    def compressor(self):
+        """
+        Returns a deflate compressor primed with the preset dictionary.
+
+        Priming happens once per compression level, every response compresses with a cheap copy of the primed template.
+        """
+        level = settings.WEBSOCKET_COMPRESSION_LEVEL
+        if level not in self.compressors:
+            self.compressors[level] = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS, 9, zlib.Z_DEFAULT_STRATEGY, RESPONSE_DICTIONARY)
+
+        return self.compressors[level].copy()
+
+    def encode(self, message, binary=False, description=None, packed_fields=()):
+        """
+        Encodes an outgoing message, compressing MessagePack frames large enough to benefit.
+
+        Args:
+            message (dict): The message to send.
+            binary (bool): True if the connection negotiated MessagePack framing.
+            description (str): The request description (or event type) the message answers, used for the stats.
+            packed_fields (tuple): The response keys JSON clients receive packed, see `Route.packed_fields`.
+
+        Returns:
+            dict: The keyword arguments for the consumer's `send`, either `bytes_data` or `text_data`.
+        """
+        start = time.thread_time()
+
+        frame = encode_frame(message if binary else pack_fields(message, packed_fields), binary)
+        data = frame['bytes_data'] if binary else frame['text_data'].encode('utf-8')
+
+        stats = self.stats[description]
+        stats['responses'] += 1
+        stats['plain_bytes'] += len(data)
+
+        # only clients that negotiated MessagePack framing know to inflate compressed frames
+        if binary and len(data) >= settings.WEBSOCKET_COMPRESSION_THRESHOLD:
+            compressor = self.compressor()
+            payload = compressor.compress(data) + compressor.flush()
+
+            if len(payload) < len(data):
+                frame = encode_frame({'encoding': 'zlib', 'payload': payload}, binary)
+                stats['compressed'] += 1
+
+        stats['encoded_bytes'] += len(frame['bytes_data']) if binary else len(frame['text_data'])
+        stats['cpu_microseconds'] += int((time.thread_time() - start) * 1_000_000)
+
+        return frame
+
+    def get_stats(self):
+        """
+        Returns the encoding counters of this process per description, along with the achieved compression ratio.
+
+        Returns:
+            dict: Counters keyed by description.
+        """
+        return {
+            description: {
+                'responses': stats['responses'],
+                'compressed': stats['compressed'],
+                'plain_bytes': stats['plain_bytes'],
+                'encoded_bytes': stats['encoded_bytes'],
+                'cpu_microseconds': stats['cpu_microseconds'],
+                'compression_ratio': round(stats['plain_bytes'] / stats['encoded_bytes'], 2) if stats['encoded_bytes'] else None,
+            }
+            for description, stats in self.stats.items()
+        }
+
+
+def decode_response(frame, binary=False, packed_fields=()):
+    """
+    Decodes a frame produced by `ResponseEncoder.encode` the way a client does.
+
+    Args:
+        frame (str or bytes): The text or binary frame written to the socket.
+        binary (bool): True if the frame is MessagePack.
+        packed_fields (tuple): The response keys JSON frames carry packed.
+
+    Returns:
+        dict: The original message.
+    """
+    message = decode_frame(bytes_data=frame) if binary else decode_frame(text_data=frame)
+
+    if isinstance(message, dict) and message.get('encoding') == 'zlib':
+        payload = message['payload'] if binary else base64.b64decode(message['payload'])
+
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS, RESPONSE_DICTIONARY)
+        data = decompressor.decompress(payload) + decompressor.flush()
+
+        message = decode_frame(bytes_data=data) if binary else decode_frame(text_data=data.decode('utf-8'))
+
+    return message if binary else unpack_fields(message, packed_fields)
+
+
+# Initialize the ResponseEncoder instance
+response_encoder = ResponseEncoder()